@@ -0,0 +1,185 @@
+"""
+Query-adaptive top-k.
+
+A fixed top_k pays for the worst case on every query: most queries
+have a few clearly relevant chunks, then a sharp drop in similarity.
+
+Adaptive mode:
+- fetch a small k first (default: half of ContextPolicy.max_chunks,
+  at least min_chunks)
+- judge the candidates with Day 4 (admissibility + validation)
+- widen k geometrically ONLY if the filters left fewer admissible
+  chunks than that first k, or the pack would fail validation
+- stop early when a distance gap shows the remaining candidates are
+  irrelevant, or when the index has no more candidates
+
+Candidates past a gap are still handed to Day 4: nothing is dropped
+silently, the gap only stops the search from widening.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from day04_retrieval_to_context.build_context import (
+    ContextPack,
+    ContextPolicy,
+    admissibility_drop_reason,
+)
+
+
+@dataclass(frozen=True)
+class AdaptiveTopKPolicy:
+    """
+    Fields:
+    - initial_k:
+        First fetch size, and the number of admissible candidates
+        that ends the search.
+        None → max(min_chunks, max_chunks // 2) of the ContextPolicy.
+    - max_k:
+        Never fetch more than this many candidates.
+    - growth_factor:
+        k is multiplied by this on every widening round.
+    - distance_gap:
+        A jump of at least this much between consecutive candidate
+        distances ends the search. None disables gap detection.
+    """
+    initial_k: Optional[int] = None
+    max_k: int = 32
+    growth_factor: int = 2
+    distance_gap: Optional[float] = 0.15
+
+
+def distance_gap_index(retrieved: List[Dict], min_gap: float) -> Optional[int]:
+    """
+    Index of the last candidate before the first distance gap ≥ min_gap,
+    or None if there is no such gap.
+    """
+    distances = sorted(
+        c["distance"] for c in retrieved if c.get("distance") is not None
+    )
+    for i in range(len(distances) - 1):
+        if distances[i + 1] - distances[i] >= min_gap:
+            return i
+    return None
+
+
+class AdaptiveSearch:
+    """
+    State of one adaptive retrieval.
+
+    Sync and async callers drive the same object:
+
+        encoded = retriever.encode_query(query)
+        k = search.next_k()
+        while k is not None:
+            retrieved = retriever.retrieve_encoded(query, encoded, top_k=k)
+            pack = assemble(retrieved)
+            k = search.observe(retrieved, pack)
+
+    The query is encoded once; every round reuses it.
+    """
+
+    def __init__(self, policy: AdaptiveTopKPolicy, context_policy: ContextPolicy):
+        self.policy = policy
+        self.context_policy = context_policy
+
+        self.k = policy.initial_k or max(
+            context_policy.min_chunks, context_policy.max_chunks // 2
+        )
+        self.k = min(self.k, policy.max_k)
+        # Admissible candidates that make a round sufficient
+        self.target = min(self.k, context_policy.max_chunks)
+        self.rounds = 0
+        self.candidates_fetched = 0
+        self.stop_reason: Optional[str] = None
+
+    def next_k(self) -> int:
+        return self.k
+
+    def observe(self, retrieved: List[Dict], pack: ContextPack) -> Optional[int]:
+        """
+        Record one round; return the next k, or None to stop.
+        """
+        self.rounds += 1
+        self.candidates_fetched += len(retrieved)
+
+        admissible = sum(
+            1 for c in retrieved
+            if admissibility_drop_reason(c, self.context_policy) is None
+        )
+
+        if pack.is_valid and admissible >= self.target:
+            return self._stop("sufficient")
+
+        if len(retrieved) < self.k:
+            return self._stop("index_exhausted")
+
+        if (
+            self.policy.distance_gap is not None
+            and distance_gap_index(retrieved, self.policy.distance_gap) is not None
+        ):
+            return self._stop("distance_gap")
+
+        if self.k >= self.policy.max_k:
+            return self._stop("max_k")
+
+        self.k = min(self.k * self.policy.growth_factor, self.policy.max_k)
+        return self.k
+
+    def stats(self) -> Dict:
+        return {
+            "rounds": self.rounds,
+            "final_k": self.k,
+            "candidates_fetched": self.candidates_fetched,
+            "stop_reason": self.stop_reason,
+        }
+
+    def _stop(self, reason: str) -> None:
+        self.stop_reason = reason
+        return None
+
+
+def adaptive_retrieve(
+    *,
+    query: str,
+    retriever,
+    context_policy: ContextPolicy,
+    policy: AdaptiveTopKPolicy,
+    assemble: Callable[[List[Dict]], ContextPack],
+):
+    """
+    Run adaptive retrieval; returns (retrieved, context_pack, stats).
+    """
+    search = AdaptiveSearch(policy, context_policy)
+    encoded = retriever.encode_query(query)
+
+    k = search.next_k()
+    while k is not None:
+        retrieved = retriever.retrieve_encoded(query, encoded, top_k=k)
+        pack = assemble(retrieved)
+        k = search.observe(retrieved, pack)
+
+    return retrieved, pack, search.stats()
+
+
+async def aadaptive_retrieve(
+    *,
+    query: str,
+    retriever,
+    context_policy: ContextPolicy,
+    policy: AdaptiveTopKPolicy,
+    assemble: Callable[[List[Dict]], ContextPack],
+):
+    """
+    Async variant of `adaptive_retrieve` (only retrieval is awaited).
+    """
+    search = AdaptiveSearch(policy, context_policy)
+    encoded = await retriever.aencode_query(query)
+
+    k = search.next_k()
+    while k is not None:
+        retrieved = await retriever.aretrieve_encoded(query, encoded, top_k=k)
+        pack = assemble(retrieved)
+        k = search.observe(retrieved, pack)
+
+    return retrieved, pack, search.stats()
@@ -1,13 +1,38 @@
+import time
+import uuid
+from contextlib import nullcontext
+from dataclasses import replace
+from typing import Optional, Tuple
+
+from application.context_builder import build_context_for_query
+from application.deadlines import (
+    ALIGNMENT,
+    GENERATION,
+    STAGE_LAYERS,
+    VERIFICATION,
+    DeadlinePolicy,
+    RequestDeadline,
+    timeout_refusal_reason,
+)
 from application.models import FinalAnswerResponse
-from day05_context_to_answer.answer_generator import generate_answer
+from application.semantic_cache import SemanticCache, policy_fingerprint
+from day05_context_to_answer.answer_generator import agenerate_answer, generate_answer
+from day05_context_to_answer.prefix_reuse import PrefixReuseTracker
 from day06_semantic_validation.semantic_verifier import verify_answer
 from day07_claim_citation_alignment.claim_citation_aligner import align_claims_to_citations
 from day08_presentation.decide import decide_presentation
 from day08_presentation.models import PresentationMode
 from day09_observability.builder import build_decision_trace
 from day09_observability.recorder import TraceRecorder
-from day09_observability.models import PipelineStats
+from day09_observability.models import DecisionTrace, FailureCode, PipelineStats
 from day07_claim_citation_alignment.models import AlignmentStatus
+from infrastructure.deadline import DeadlineExceeded
+from infrastructure.llm.cascade import CascadingLLM
+from infrastructure.llm.circuit_breaker import CircuitBreakerLLM
+from infrastructure.llm.errors import LLMUnavailableError
+
+# Process-wide: prefix reuse is only meaningful across requests
+PROMPT_PREFIX_TRACKER = PrefixReuseTracker()
 
 
 def answer_query_with_policy(
@@ -16,17 +41,151 @@ def answer_query_with_policy(
     llm,
     generation_policy,
     presentation_policy,
+    deadline: Optional[RequestDeadline] = None,
 ) -> FinalAnswerResponse:
+    """
+    Day 5 → Day 9 for an assembled ContextPack.
 
-    # -------------------------
-    # Day 5 — Generate answer
-    # -------------------------
-    answer = generate_answer(
+    `deadline` is the request's deadline, started at the entry point
+    and already used by retrieval (see application.deadlines).
+    """
+    response, trace = _answer_and_trace(
         context_pack=context_pack,
         llm=llm,
-        policy=generation_policy,
+        generation_policy=generation_policy,
+        presentation_policy=presentation_policy,
+        deadline=deadline,
     )
 
+    TraceRecorder.record(trace)
+
+    return response
+
+
+async def aanswer_query_with_policy(
+    *,
+    context_pack,
+    llm,
+    generation_policy,
+    presentation_policy,
+    deadline: Optional[RequestDeadline] = None,
+) -> FinalAnswerResponse:
+    """
+    Async variant of `answer_query_with_policy`.
+
+    The LLM round trip is awaited (llm.agenerate), so an in-flight
+    generation holds no worker thread, and is cancelled when its share
+    of `deadline` runs out. Day 6 → Day 9 are pure CPU.
+    """
+    cascade = _begin_cascade(llm)
+
+    try:
+        _check_not_timed_out(deadline)
+
+        while True:
+            generation = agenerate_answer(
+                context_pack=context_pack,
+                llm=llm,
+                policy=generation_policy,
+                prefix_tracker=PROMPT_PREFIX_TRACKER,
+            )
+            try:
+                if deadline is not None:
+                    answer = await deadline.run(GENERATION, generation)
+                else:
+                    answer = await generation
+            except LLMUnavailableError:
+                if not _fell_back(cascade):
+                    raise
+                continue
+
+            with _stage(deadline, VERIFICATION) as stage_deadline:
+                verification_report = _verify(answer, context_pack, llm, stage_deadline)
+            if not _escalated(cascade, answer, verification_report):
+                break
+    except DeadlineExceeded as e:
+        response, trace = _timed_out(context_pack, llm, deadline, e.stage)
+    except LLMUnavailableError:
+        response, trace = _llm_unavailable(context_pack, llm, deadline)
+    else:
+        response, trace = _answer_and_trace(
+            context_pack=context_pack,
+            llm=llm,
+            generation_policy=generation_policy,
+            presentation_policy=presentation_policy,
+            answer=answer,
+            verification_report=verification_report,
+            deadline=deadline,
+        )
+
+    TraceRecorder.record(trace)
+
+    return response
+
+
+def _answer_and_trace(
+    *,
+    context_pack,
+    llm,
+    generation_policy,
+    presentation_policy,
+    answer=None,
+    verification_report=None,
+    deadline: Optional[RequestDeadline] = None,
+) -> Tuple[FinalAnswerResponse, DecisionTrace]:
+    try:
+        _check_not_timed_out(deadline)
+        return _run_layers(
+            context_pack=context_pack,
+            llm=llm,
+            generation_policy=generation_policy,
+            presentation_policy=presentation_policy,
+            answer=answer,
+            verification_report=verification_report,
+            deadline=deadline,
+        )
+    except DeadlineExceeded as e:
+        return _timed_out(context_pack, llm, deadline, e.stage)
+    except LLMUnavailableError:
+        return _llm_unavailable(context_pack, llm, deadline)
+
+
+def _run_layers(
+    *,
+    context_pack,
+    llm,
+    generation_policy,
+    presentation_policy,
+    answer,
+    verification_report,
+    deadline: Optional[RequestDeadline],
+) -> Tuple[FinalAnswerResponse, DecisionTrace]:
+
+    # -------------------------
+    # Day 5 — Generate answer
+    # (+ Day 6, when a model cascade may escalate)
+    # -------------------------
+    if answer is None:
+        cascade = _begin_cascade(llm)
+
+        while True:
+            try:
+                with _stage(deadline, GENERATION):
+                    answer = generate_answer(
+                        context_pack=context_pack,
+                        llm=llm,
+                        policy=generation_policy,
+                        prefix_tracker=PROMPT_PREFIX_TRACKER,
+                    )
+            except LLMUnavailableError:
+                if not _fell_back(cascade):
+                    raise
+                continue
+            with _stage(deadline, VERIFICATION) as stage_deadline:
+                verification_report = _verify(answer, context_pack, llm, stage_deadline)
+            if not _escalated(cascade, answer, verification_report):
+                break
+
     # -------------------------
     # EARLY REFUSAL (Day 5)
     # -------------------------
@@ -48,10 +207,15 @@ def answer_query_with_policy(
 
             presentation_mode=None,
             presentation_reason=None,
-        )
 
-        
-        TraceRecorder.record(trace)
+            # Rejected completions were still paid for
+            stats=_with_deadline_stats(
+                _with_llm_stats(PipelineStats(), llm)
+                if answer.refusal_reason in ESCALATING_REFUSALS
+                else PipelineStats(),
+                deadline,
+            ),
+        )
 
         return FinalAnswerResponse(
             allowed=False,
@@ -60,27 +224,26 @@ def answer_query_with_policy(
             citations=None,
             refusal_reason=answer.refusal_reason,
             presentation_reason=None,
-        )
+        ), trace
 
     # -------------------------
     # Day 6 — Semantic validation
     # -------------------------
-    verification_report = verify_answer(
-        answer_text=answer.text,
-        context_pack=context_pack,
-        llm=llm,
-    )
+    if verification_report is None:
+        with _stage(deadline, VERIFICATION) as stage_deadline:
+            verification_report = _verify(answer, context_pack, llm, stage_deadline)
 
     claims = verification_report.claims
 
     # -------------------------
     # Day 7 — Citation alignment
     # -------------------------
-    citation_results = align_claims_to_citations(
-        claims=claims,
-        sentence_text_to_citation_ids=answer.sentence_text_to_citation_ids,
-        context_pack=context_pack,
-    )
+    with _stage(deadline, ALIGNMENT):
+        citation_results = align_claims_to_citations(
+            claims=claims,
+            sentence_text_to_citation_ids=answer.sentence_text_to_citation_ids,
+            context_pack=context_pack,
+        )
 
     # -------------------------
     # Day 8 — Presentation gate
@@ -94,10 +257,25 @@ def answer_query_with_policy(
     # -------------------------
     # Build stats (Day 09 input)
     # -------------------------
+    retrieval_timings = context_pack.stats.get("retrieval_timings_ms", {})
+
     stats = PipelineStats(
+        retrieval_encode_ms=retrieval_timings.get("encode"),
+        retrieval_search_ms=retrieval_timings.get("search"),
+        retrieval_hydrate_ms=retrieval_timings.get("hydrate"),
+        retrieved_chunks=context_pack.stats.get("retrieved_count"),
         approved_chunks=context_pack.stats.get("approved_count"),
         dropped_chunks=context_pack.stats.get("dropped_count"),
         total_context_chars=context_pack.stats.get("total_chars"),
+        context_tokens_before_compression=answer.generation_stats.get(
+            "context_tokens_before_compression"
+        ),
+        context_tokens_after_compression=answer.generation_stats.get(
+            "context_tokens_after_compression"
+        ),
+        prompt_prefix_reuse=answer.generation_stats.get("prefix_reuse_fraction"),
+        predicted_prompt_tokens=answer.generation_stats.get("predicted_prompt_tokens"),
+        prompt_chunks_trimmed=answer.generation_stats.get("prompt_chunks_trimmed"),
         claim_count=len(claims),
         aligned_citations=sum(
             1 for r in citation_results
@@ -109,24 +287,9 @@ def answer_query_with_policy(
     # -------------------------
     # Day 12 — LLM usage & cost
     # -------------------------
-    usage = llm.get_last_usage()
+    stats = _with_llm_stats(stats, llm)
+    stats = _with_deadline_stats(stats, deadline)
 
-    if usage is not None:
-        stats = PipelineStats(
-            # Existing stats
-            approved_chunks=stats.approved_chunks,
-            dropped_chunks=stats.dropped_chunks,
-            total_context_chars=stats.total_context_chars,
-            claim_count=stats.claim_count,
-            aligned_citations=stats.aligned_citations,
-
-            # NEW Day 12 fields
-            prompt_tokens=usage.prompt_tokens,
-            completion_tokens=usage.completion_tokens,
-            total_tokens=usage.total_tokens,
-            cost_usd=usage.cost_usd,
-        )
-    
     # -------------------------
     # Final response
     # -------------------------
@@ -179,6 +342,316 @@ def answer_query_with_policy(
         stats=stats,
     )
 
+    return response, trace
+
+
+# Day 5 refusals a stronger model may fix (not e.g. empty context)
+ESCALATING_REFUSALS = frozenset({"missing_or_invalid_citations"})
+
+
+def _with_llm_stats(stats: PipelineStats, llm) -> PipelineStats:
+    # Test doubles may implement only generate()
+    get_last_usage = getattr(llm, "get_last_usage", None)
+    usage = get_last_usage() if get_last_usage is not None else None
+
+    if usage is not None:
+        stats = replace(
+            stats,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            total_tokens=usage.total_tokens,
+            cost_usd=usage.cost_usd,
+            llm_cache_hit=usage.cached,
+        )
+
+    breaker = _circuit_breaker(llm)
+    if breaker is not None:
+        stats = replace(stats, llm_circuit_state=breaker.current_state().value)
+
+    if isinstance(llm, CascadingLLM):
+        route = llm.route()
+        stats = replace(
+            stats,
+            llm_tier=llm.current_tier,
+            llm_escalations=route.escalations,
+            llm_tier_latency_ms=route.latency_ms_by_tier(),
+            llm_tier_cost_usd=route.cost_usd_by_tier(),
+        )
+
+    return stats
+
+
+def _with_deadline_stats(stats: PipelineStats, deadline: Optional[RequestDeadline]) -> PipelineStats:
+    if deadline is None:
+        return stats
+    return replace(
+        stats,
+        deadline_budget_ms=deadline.policy.total_s * 1000.0,
+        stage_ms=dict(deadline.stage_ms),
+        timed_out_stage=deadline.timed_out_stage,
+    )
+
+
+def _stage(deadline: Optional[RequestDeadline], name: str):
+    # Yields the stage's Deadline, or None when the request has none
+    return deadline.stage(name) if deadline is not None else nullcontext()
+
+
+def _check_not_timed_out(deadline: Optional[RequestDeadline]) -> None:
+    # Retrieval timed out before the answer stages were reached
+    if deadline is not None and deadline.timed_out_stage is not None:
+        raise DeadlineExceeded(deadline.timed_out_stage)
+
+
+def _timed_out(
+    context_pack,
+    llm,
+    deadline: RequestDeadline,
+    stage: str,
+) -> Tuple[FinalAnswerResponse, DecisionTrace]:
+    """
+    Fail closed: nothing produced after the budget ran out is shown.
+    """
+    reason = timeout_refusal_reason(stage)
+
+    trace = build_decision_trace(
+        query_text=context_pack.query,
+        context_valid=context_pack.is_valid,
+        context_failure_reason=context_pack.invalid_reason,
+        answer_refusal_reason=None,
+        entailment_passed=None,
+        entailment_failure_code=None,
+        citation_alignment_passed=None,
+        presentation_mode=None,
+        presentation_reason=None,
+        timed_out_layer=STAGE_LAYERS[stage],
+        timeout_reason=reason,
+        # Completions that arrived too late were still paid for
+        stats=_with_deadline_stats(_with_llm_stats(PipelineStats(), llm), deadline),
+    )
+
+    return FinalAnswerResponse(
+        allowed=False,
+        mode=PresentationMode.SUPPRESSED,
+        answer_text=None,
+        citations=None,
+        refusal_reason=reason,
+        presentation_reason=None,
+    ), trace
+
+
+def _circuit_breaker(llm) -> Optional[CircuitBreakerLLM]:
+    # Wrappers (cache, breaker, scheduler, ...) expose `.inner`;
+    # a cascade reports the breaker of its current tier
+    if isinstance(llm, CascadingLLM):
+        llm = llm.tiers[llm.route().tier_index][1]
+    while llm is not None:
+        if isinstance(llm, CircuitBreakerLLM):
+            return llm
+        llm = getattr(llm, "inner", None)
+    return None
+
+
+def _llm_unavailable(
+    context_pack,
+    llm,
+    deadline: Optional[RequestDeadline],
+) -> Tuple[FinalAnswerResponse, DecisionTrace]:
+    """
+    Degraded mode: the LLM circuit is open, so the request is refused
+    at once instead of waiting on a backend known to be failing.
+    """
+    reason = "llm_unavailable"
+
+    trace = build_decision_trace(
+        query_text=context_pack.query,
+        context_valid=context_pack.is_valid,
+        context_failure_reason=context_pack.invalid_reason,
+        answer_refusal_reason=reason,
+        answer_failure_code=FailureCode.LLM_UNAVAILABLE,
+        entailment_passed=None,
+        entailment_failure_code=None,
+        citation_alignment_passed=None,
+        presentation_mode=None,
+        presentation_reason=None,
+        stats=_with_deadline_stats(_with_llm_stats(PipelineStats(), llm), deadline),
+    )
+
+    return FinalAnswerResponse(
+        allowed=False,
+        mode=PresentationMode.SUPPRESSED,
+        answer_text=None,
+        citations=None,
+        refusal_reason=reason,
+        presentation_reason=None,
+    ), trace
+
+
+def _fell_back(cascade) -> bool:
+    """
+    A cascade tier whose circuit is open is skipped: move on to the
+    next tier. True → generate again.
+    """
+    return cascade is not None and cascade.escalate()
+
+
+def _begin_cascade(llm):
+    if isinstance(llm, CascadingLLM):
+        llm.begin()
+        return llm
+    return None
+
+
+def _verify(answer, context_pack, llm, deadline=None):
+    # Day 6 only judges answers Day 5 accepted
+    if answer.refusal_reason is not None:
+        return None
+    return verify_answer(
+        answer_text=answer.text,
+        context_pack=context_pack,
+        llm=llm,
+        deadline=deadline,
+    )
+
+
+def _escalated(cascade, answer, verification_report) -> bool:
+    """
+    Move a cascade to its next tier if the answer failed the Day 5
+    citation check or Day 6 entailment. True → generate again.
+    """
+    if cascade is None:
+        return False
+
+    failed = (
+        answer.refusal_reason in ESCALATING_REFUSALS
+        or (verification_report is not None and not verification_report.passed)
+    )
+    return failed and cascade.escalate()
+
+
+def answer_query_with_semantic_cache(
+    *,
+    query: str,
+    cache: SemanticCache,
+    context_policy,
+    llm,
+    generation_policy,
+    presentation_policy,
+    retriever=None,
+    deadline_policy: Optional[DeadlinePolicy] = None,
+) -> FinalAnswerResponse:
+    """
+    Full pipeline (Day 3 → Day 9) behind a semantic cache.
+
+    Hit:   the cached response is returned; retrieval and every LLM call
+           are skipped. The cached trace is re-recorded for THIS query
+           with cache_hit=True.
+    Miss:  the full pipeline runs; allowed responses are cached.
+    Audit: a sampled fraction of hits also run the full pipeline, and
+           disagreements are counted as false hits.
+
+    With `deadline_policy`, the request deadline starts here, before
+    the cache lookup.
+    """
+    deadline = deadline_policy.start() if deadline_policy is not None else None
+
+    if retriever is None:
+        from infrastructure.retrieval.retriever import get_retriever
+
+        retriever = get_retriever()
+
+    corpus_version = str(retriever.index_version)
+    policy_hash = policy_fingerprint(
+        context_policy, generation_policy, presentation_policy
+    )
+
+    query_vector = cache.embed_query(query)
+    hit = cache.lookup(
+        query_vector,
+        corpus_version=corpus_version,
+        policy_hash=policy_hash,
+    )
+
+    if hit is not None and not cache.should_audit():
+        cached = hit.entry.trace
+        TraceRecorder.record(
+            replace(
+                cached,
+                query_id=str(uuid.uuid4()),
+                query_text=query,
+                stats=_semantic_hit_stats(cached.stats, hit.similarity),
+                timestamps={"created_at": time.time()},
+                cache_hit=True,
+            )
+        )
+        return _response_copy(hit.entry.response)
+
+    context_pack = build_context_for_query(
+        query=query,
+        policy=context_policy,
+        retriever=retriever,
+        deadline=deadline,
+    )
+    response, trace = _answer_and_trace(
+        context_pack=context_pack,
+        llm=llm,
+        generation_policy=generation_policy,
+        presentation_policy=presentation_policy,
+        deadline=deadline,
+    )
     TraceRecorder.record(trace)
 
-    return response
\ No newline at end of file
+    agreed = hit is not None and _same_answer(hit.entry.response, response)
+    if hit is not None:
+        cache.record_audit(hit, agreed=agreed)
+
+    # An agreeing audit leaves the cached entry as it was
+    if not agreed:
+        cache.store(
+            query,
+            query_vector,
+            response=_response_copy(response),
+            trace=trace,
+            corpus_version=corpus_version,
+            policy_hash=policy_hash,
+        )
+
+    return response
+
+
+def _semantic_hit_stats(stats: PipelineStats, similarity: float) -> PipelineStats:
+    # Decision metrics are replayed; cost and latency are THIS request's:
+    # no LLM call, no retrieval, no pipeline stages
+    return replace(
+        stats,
+        retrieval_encode_ms=None,
+        retrieval_search_ms=None,
+        retrieval_hydrate_ms=None,
+        prompt_tokens=0,
+        completion_tokens=0,
+        total_tokens=0,
+        cost_usd=0.0,
+        llm_cache_hit=True,
+        llm_tier_latency_ms=None,
+        llm_tier_cost_usd=None,
+        deadline_budget_ms=None,
+        stage_ms=None,
+        timed_out_stage=None,
+        semantic_cache_similarity=similarity,
+    )
+
+
+def _response_copy(response: FinalAnswerResponse) -> FinalAnswerResponse:
+    # Cached responses are shared: callers get (and the cache keeps) their own
+    citations = list(response.citations) if response.citations is not None else None
+    return replace(response, citations=citations)
+
+
+def _same_answer(
+    cached: FinalAnswerResponse,
+    fresh: FinalAnswerResponse,
+) -> bool:
+    return (
+        cached.allowed == fresh.allowed
+        and set(cached.citations or []) == set(fresh.citations or [])
+    )
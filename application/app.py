@@ -1,12 +1,15 @@
 import logging
+import os
 from day04_retrieval_to_context.build_context import ContextPolicy
 from application.context_builder import build_context_for_query
 from application.answer_service import answer_query_with_policy
+from application.deadlines import DeadlinePolicy
 from infrastructure.llm.factory import build_llm
 from day05_context_to_answer.policies import GenerationPolicy
 from day08_presentation.models import PresentationPolicy
 
 from infrastructure.llm.factory import build_llm
+from infrastructure.retrieval.retriever import get_retriever
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +28,8 @@ def main():
         max_chars=3000,
         min_chunks=1,
         min_chars=50,
+        # "mmr" also makes the retriever factory attach embeddings
+        selection_strategy=os.getenv("RAG_SELECTION_STRATEGY", "distance"),
     )
 
     generation_policy = GenerationPolicy(
@@ -37,17 +42,33 @@ def main():
         debug_mode=False,
     )
 
+    # One end-to-end budget, started here (RAG_REQUEST_DEADLINE_S)
+    deadline_policy = DeadlinePolicy(
+        total_s=float(os.getenv("RAG_REQUEST_DEADLINE_S", "3")),
+    )
+
     # -------------------------
     # LLM (Fake or Real)
     # -------------------------
     llm = build_llm()  # FakeLLM by default, OpenAI later
 
+    # -------------------------
+    # Retriever (Stub or Vector index, loaded once per process)
+    # -------------------------
+    retriever = get_retriever()
+    logger.info(f"[Retriever] Using backend: {retriever.__class__.__name__}")
+
+    # The request starts now: everything after counts against the budget
+    deadline = deadline_policy.start()
+
     # -------------------------
     # Build context (Day 3 → Day 4)
     # -------------------------
     context_pack = build_context_for_query(
         query=query,
         policy=context_policy,
+        retriever=retriever,
+        deadline=deadline,
     )
 
     # -------------------------
@@ -58,6 +79,7 @@ def main():
         llm=llm,
         generation_policy=generation_policy,
         presentation_policy=presentation_policy,
+        deadline=deadline,
     )
 
     logger.info(response)
@@ -1,29 +1,262 @@
-from day04_retrieval_to_context.build_context import ContextPolicy, build_context_pack
+from typing import Callable, List, Optional
+
+from application.adaptive_retrieval import (
+    AdaptiveTopKPolicy,
+    aadaptive_retrieve,
+    adaptive_retrieve,
+)
+from application.deadlines import RETRIEVAL, RequestDeadline, timeout_refusal_reason
+from day04_retrieval_to_context.assemble import assemble_context
+from day04_retrieval_to_context.build_context import (
+    ContextPack,
+    ContextPolicy,
+    build_context_pack,
+)
+from day04_retrieval_to_context.context_chunk import ContextChunk
+from day04_retrieval_to_context.pack_cache import ContextPackCache
+
+from infrastructure.deadline import DeadlineExceeded
+from infrastructure.retrieval.base import Retriever
+from infrastructure.retrieval.retriever import get_retriever
+
 
-from infrastructure.retrieval.retriever import retrieve_chunks
 def build_context_for_query(
     *,
     query: str,
     policy: ContextPolicy,
+    retriever: Optional[Retriever] = None,
+    top_k: Optional[int] = None,
+    pack_cache: Optional[ContextPackCache] = None,
+    adaptive: Optional[AdaptiveTopKPolicy] = None,
+    deadline: Optional[RequestDeadline] = None,
+):
+    """
+    Retrieve candidates for a query and assemble its ContextPack.
+
+    With `adaptive`, top_k is ignored: k starts small and widens only
+    while Day 4 selection/validation needs more candidates
+    (see application.adaptive_retrieval).
+
+    With `deadline`, retrieval + assembly run as its "retrieval" stage;
+    running out yields an invalid pack ("retrieval_timeout").
+    """
+    if deadline is not None:
+        try:
+            with deadline.stage(RETRIEVAL):
+                return build_context_for_query(
+                    query=query,
+                    policy=policy,
+                    retriever=retriever,
+                    top_k=top_k,
+                    pack_cache=pack_cache,
+                    adaptive=adaptive,
+                )
+        except DeadlineExceeded:
+            return timed_out_context_pack(query, policy)
+
+    retriever = retriever or get_retriever()
+
+    if adaptive is not None:
+        assemble = _pack_builder(query, policy, retriever, pack_cache, _selected_pack_assembler(retriever))
+        retrieved, context_pack, adaptive_stats = adaptive_retrieve(
+            query=query,
+            retriever=retriever,
+            context_policy=policy,
+            policy=adaptive,
+            assemble=assemble,
+        )
+        return _with_retrieval_stats(context_pack, retrieved, retriever, adaptive_stats)
+
+    retrieved = retriever.retrieve(query, top_k=top_k)
+
+    return _context_pack_from_retrieved(
+        query=query,
+        policy=policy,
+        retrieved=retrieved,
+        retriever=retriever,
+        pack_cache=pack_cache,
+    )
+
+
+async def abuild_context_for_query(
+    *,
+    query: str,
+    policy: ContextPolicy,
+    retriever: Optional[Retriever] = None,
+    top_k: Optional[int] = None,
+    pack_cache: Optional[ContextPackCache] = None,
+    adaptive: Optional[AdaptiveTopKPolicy] = None,
+    deadline: Optional[RequestDeadline] = None,
 ):
-    retrieved = retrieve_chunks(query)
+    """
+    Async variant of `build_context_for_query`.
+
+    Only retrieval is awaited; context assembly is pure CPU work.
+    With `deadline`, retrieval is cancelled when its share runs out.
+    """
+    if deadline is not None:
+        try:
+            return await deadline.run(RETRIEVAL, abuild_context_for_query(
+                query=query,
+                policy=policy,
+                retriever=retriever,
+                top_k=top_k,
+                pack_cache=pack_cache,
+                adaptive=adaptive,
+            ))
+        except DeadlineExceeded:
+            return timed_out_context_pack(query, policy)
+
+    retriever = retriever or get_retriever()
+
+    if adaptive is not None:
+        assemble = _pack_builder(query, policy, retriever, pack_cache, _selected_pack_assembler(retriever))
+        retrieved, context_pack, adaptive_stats = await aadaptive_retrieve(
+            query=query,
+            retriever=retriever,
+            context_policy=policy,
+            policy=adaptive,
+            assemble=assemble,
+        )
+        return _with_retrieval_stats(context_pack, retrieved, retriever, adaptive_stats)
+
+    retrieved = await retriever.aretrieve(query, top_k=top_k)
+
+    return _context_pack_from_retrieved(
+        query=query,
+        policy=policy,
+        retrieved=retrieved,
+        retriever=retriever,
+        pack_cache=pack_cache,
+    )
+
+
+def timed_out_context_pack(query: str, policy: ContextPolicy) -> ContextPack:
+    # Fail closed: nothing retrieved in time is treated as no context
+    return ContextPack(
+        query=query,
+        policy=policy,
+        approved_chunks=[],
+        dropped_chunks=[],
+        is_valid=False,
+        invalid_reason=timeout_refusal_reason(RETRIEVAL),
+    )
 
-    approved = []
-    dropped = []
+
+def _candidate_records(retrieved: List[dict]) -> List[ContextChunk]:
+    candidates = []
 
     for chunk in retrieved:
-        approved.append(
-            {
-                "text": chunk["text"],
-                "metadata": chunk.get("metadata", {}),
-                "score": chunk.get("score"),          # OBSERVATION ONLY
-                "_reason": "retrieved_candidate",
-            }
+        # One slotted record per candidate; text/metadata are shared
+        candidate = ContextChunk(
+            text=chunk["text"],
+            metadata=chunk.get("metadata", {}),
+            score=chunk.get("score"),             # OBSERVATION ONLY
+            reason="retrieved_candidate",
         )
 
-    return build_context_pack(
+        # Real indexes also return identity + geometry (used by Day 4 / Day 6)
+        if "chunk_id" in chunk:
+            candidate["chunk_id"] = chunk["chunk_id"]
+        if "distance" in chunk:
+            candidate["distance"] = chunk["distance"]
+        if "embedding" in chunk:
+            candidate["embedding"] = chunk["embedding"]
+
+        candidates.append(candidate)
+
+    return candidates
+
+
+def _assemble_context_pack(query: str, policy: ContextPolicy, retrieved: List[dict]):
+    context_pack = build_context_pack(
         query=query,
         policy=policy,
-        approved_chunks=approved,
-        dropped_chunks=dropped,
-    )
\ No newline at end of file
+        approved_chunks=_candidate_records(retrieved),
+        dropped_chunks=[],
+    )
+
+    return context_pack
+
+
+class _StoreNeighborIndex:
+    """Ingestion-time neighbors from a retriever's chunk store, as candidate records."""
+
+    def __init__(self, chunk_store):
+        self.chunk_store = chunk_store
+
+    def neighbors(self, doc_id, chunk_index: int, window: int = 1) -> List[ContextChunk]:
+        records = self.chunk_store.neighbors(doc_id, chunk_index, window)
+        for record in records:
+            # Citable like a retrieved hit (see hydrate_hit)
+            record["metadata"].setdefault("source", record["chunk_id"])
+        return _candidate_records(records)
+
+
+def _selected_pack_assembler(retriever: Retriever) -> Callable:
+    # Neighbors come from the chunk store when the retriever has one
+    # (not only from the top-k); the pack cache keys on index_version
+    chunk_store = getattr(retriever, "chunk_store", None)
+    neighbor_index = _StoreNeighborIndex(chunk_store) if chunk_store is not None else None
+
+    def _assemble_selected_pack(query: str, policy: ContextPolicy, retrieved: List[dict]):
+        # Full Day 4 judgment: selection filters, neighbors, budget
+        return assemble_context(
+            _candidate_records(retrieved), policy, query=query, neighbor_index=neighbor_index
+        )
+
+    return _assemble_selected_pack
+
+
+def _pack_builder(
+    query: str,
+    policy: ContextPolicy,
+    retriever: Retriever,
+    pack_cache: Optional[ContextPackCache],
+    assemble: Callable,
+) -> Callable[[List[dict]], object]:
+    def build(retrieved: List[dict]):
+        if pack_cache is None:
+            return assemble(query, policy, retrieved)
+
+        # Same candidates + policy + index → same pack (stored frozen)
+        return pack_cache.get_or_build(
+            query=query,
+            candidates=retrieved,
+            policy=policy,
+            index_version=retriever.index_version,
+            variant=assemble.__name__,
+            build=lambda: assemble(query, policy, retrieved),
+        )
+
+    return build
+
+
+def _context_pack_from_retrieved(
+    *,
+    query: str,
+    policy: ContextPolicy,
+    retrieved: List[dict],
+    retriever: Retriever,
+    pack_cache: Optional[ContextPackCache] = None,
+):
+    build = _pack_builder(query, policy, retriever, pack_cache, _assemble_context_pack)
+    return _with_retrieval_stats(build(retrieved), retrieved, retriever)
+
+
+def _with_retrieval_stats(context_pack, retrieved, retriever, adaptive_stats=None):
+    # Observation only: retrieval cost never influences judgment
+    context_pack.stats["retrieved_count"] = len(retrieved)
+
+    if adaptive_stats is not None:
+        context_pack.stats["adaptive_top_k"] = adaptive_stats
+
+    timings = retriever.get_last_timings()
+    if timings is not None:
+        context_pack.stats["retrieval_timings_ms"] = {
+            "encode": timings.encode_ms,
+            "search": timings.search_ms,
+            "hydrate": timings.hydrate_ms,
+        }
+
+    return context_pack
@@ -0,0 +1,123 @@
+"""
+End-to-end request deadline.
+
+One budget per request (default 3s, the p99 SLO), started at the entry
+point and carried through every stage:
+
+    retrieval → generation → verification → alignment
+
+Each stage gets a share of the budget REMAINING when it starts, so
+time a fast stage does not use flows to the stages after it. A stage
+that runs out fails closed: the request is refused with a
+stage-specific reason (e.g. "generation_timeout") and the trace
+records a DEADLINE_EXCEEDED signal on the matching layer.
+
+Async stages are cancelled when their share runs out. Sync stages
+cannot be interrupted; they are checked when they return, and the
+LLM scheduler and Day 6 verifier also stop early on their own.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+from day09_observability.models import PipelineLayer
+from infrastructure.deadline import Deadline, DeadlineExceeded, deadline_scope
+
+T = TypeVar("T")
+
+RETRIEVAL = "retrieval"
+GENERATION = "generation"
+VERIFICATION = "verification"
+ALIGNMENT = "alignment"
+
+# Layer that reports a stage's timeout in the DecisionTrace
+# (retrieval has no layer of its own: Day 4 is where its output is judged)
+STAGE_LAYERS: Dict[str, PipelineLayer] = {
+    RETRIEVAL: PipelineLayer.DAY_04_CONTEXT,
+    GENERATION: PipelineLayer.DAY_05_GENERATION,
+    VERIFICATION: PipelineLayer.DAY_06_ENTAILMENT,
+    ALIGNMENT: PipelineLayer.DAY_07_CITATION_ALIGNMENT,
+}
+
+
+def timeout_refusal_reason(stage: str) -> str:
+    return f"{stage}_timeout"
+
+
+@dataclass(frozen=True)
+class DeadlinePolicy:
+    """
+    Fields:
+    - total_s:
+        Budget for the whole request.
+    - *_share:
+        Fraction of the REMAINING budget a stage may use, in (0, 1].
+        Leave headroom in early stages for the ones after them.
+    """
+    total_s: float = 3.0
+    retrieval_share: float = 0.25
+    generation_share: float = 0.8
+    verification_share: float = 0.8
+    alignment_share: float = 1.0
+
+    def share(self, stage: str) -> float:
+        return getattr(self, f"{stage}_share")
+
+    def start(self, *, clock: Callable[[], float] = time.monotonic) -> "RequestDeadline":
+        return RequestDeadline(self, clock=clock)
+
+
+class RequestDeadline:
+    """
+    Deadline of one request, plus what each stage spent.
+
+    Create it at the entry point (`DeadlinePolicy.start()`) and pass the
+    same object to context building and answering.
+    """
+
+    def __init__(self, policy: DeadlinePolicy, *, clock: Callable[[], float] = time.monotonic):
+        self.policy = policy
+        self.deadline = Deadline(policy.total_s, clock=clock)
+        self._clock = clock
+
+        self.stage_ms: Dict[str, float] = {}
+        self.timed_out_stage: Optional[str] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Deadline]:
+        """
+        Run a sync stage within its share of the remaining budget.
+
+        Raises DeadlineExceeded(name) if no budget is left to start, if
+        anything inside raises TimeoutError, or if the stage returns
+        after its deadline.
+        """
+        child = self.deadline.child(self.policy.share(name))
+        if child.expired:
+            self._timed_out(name)
+
+        start = self._clock()
+        try:
+            with deadline_scope(child):
+                yield child
+        except TimeoutError as e:
+            self._timed_out(name, e)
+        finally:
+            self.stage_ms[name] = self.stage_ms.get(name, 0.0) + (self._clock() - start) * 1000.0
+
+        if child.expired:
+            self._timed_out(name)
+
+    async def run(self, name: str, awaitable: Awaitable[T]) -> T:
+        """
+        Await an async stage, cancelling it when its share runs out.
+        """
+        with self.stage(name) as child:
+            return await asyncio.wait_for(awaitable, timeout=child.remaining_s())
+
+    def _timed_out(self, name: str, cause: Optional[BaseException] = None) -> None:
+        self.timed_out_stage = name
+        raise DeadlineExceeded(name) from cause
@@ -0,0 +1,145 @@
+"""
+End-to-end load test of the async pipeline.
+
+Drives retrieval → context → generation → presentation with many
+concurrent queries against whatever `build_llm()` / `get_retriever()`
+select. With the local stand-in server no network is needed:
+
+    python -m infrastructure.llm.standin_server --latency-ms 300 --latency-sigma 0.5 &
+    RAG_ENV=local python -m application.load_test --requests 500 --concurrency 50
+
+Reports throughput, latency percentiles, outcome counts, and the LLM
+scheduler's queue/wait metrics when one is in the stack.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from application.answer_service import aanswer_query_with_policy
+from application.context_builder import abuild_context_for_query
+from application.deadlines import DeadlinePolicy
+from day04_retrieval_to_context.build_context import ContextPolicy
+from day05_context_to_answer.policies import GenerationPolicy
+from day08_presentation.models import PresentationPolicy
+
+DEFAULT_QUERIES = (
+    "How long does a refund take?",
+    "What is the refund policy?",
+    "How do I contact support?",
+)
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(p / 100.0 * len(ordered)), len(ordered) - 1)]
+
+
+async def run_load(
+    *,
+    requests: int,
+    concurrency: int,
+    queries=DEFAULT_QUERIES,
+    llm=None,
+    retriever=None,
+    deadline_policy: Optional[DeadlinePolicy] = None,
+) -> Dict:
+    if llm is None:
+        from infrastructure.llm.factory import build_llm
+        llm = build_llm()
+    if retriever is None:
+        from infrastructure.retrieval.retriever import get_retriever
+        retriever = get_retriever()
+
+    context_policy = ContextPolicy(
+        max_chunks=5,
+        max_chars=3000,
+        min_chunks=1,
+        min_chars=50,
+        selection_strategy=os.getenv("RAG_SELECTION_STRATEGY", "distance"),
+    )
+    generation_policy = GenerationPolicy(refuse_if_no_context=True)
+    presentation_policy = PresentationPolicy(allow_partial=False, allow_warnings=True, debug_mode=False)
+
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    outcomes: Counter = Counter()
+
+    async def one(i: int) -> None:
+        async with slots:
+            start = time.perf_counter()
+            deadline = deadline_policy.start() if deadline_policy is not None else None
+            try:
+                context_pack = await abuild_context_for_query(
+                    query=queries[i % len(queries)],
+                    policy=context_policy,
+                    retriever=retriever,
+                    deadline=deadline,
+                )
+                response = await aanswer_query_with_policy(
+                    context_pack=context_pack,
+                    llm=llm,
+                    generation_policy=generation_policy,
+                    presentation_policy=presentation_policy,
+                    deadline=deadline,
+                )
+                outcomes["allowed" if response.allowed else f"refused:{response.refusal_reason}"] += 1
+            except Exception as e:
+                outcomes[f"error:{type(e).__name__}"] += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "outcomes": dict(outcomes),
+    }
+
+    scheduler = _find_stats(llm)
+    if scheduler is not None:
+        report["llm_scheduler"] = scheduler
+    return report
+
+
+def _find_stats(llm) -> Optional[Dict]:
+    # Walk wrappers (cache → scheduler → backend) for a scheduler
+    while llm is not None:
+        if hasattr(llm, "stats") and "queue_depth" in llm.stats():
+            return llm.stats()
+        llm = getattr(llm, "inner", None)
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end pipeline load test")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--deadline-s", type=float, default=None,
+                        help="per-request deadline (e.g. 3.0 for the p99 SLO)")
+    args = parser.parse_args()
+
+    deadline_policy = DeadlinePolicy(total_s=args.deadline_s) if args.deadline_s else None
+    report = asyncio.run(run_load(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        deadline_policy=deadline_policy,
+    ))
+    for key, value in report.items():
+        print(f"{key:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
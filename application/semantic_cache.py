@@ -0,0 +1,268 @@
+"""
+Semantic (near-duplicate query) cache.
+
+"how long do refunds take" and "refund processing time" are the same
+question. Without this cache each paraphrase pays for retrieval,
+generation, entailment checks and alignment all over again.
+
+How it works:
+- Each answered query is embedded and stored with its final response
+  and DecisionTrace.
+- A new query is embedded and compared (cosine) against stored queries.
+- If the best match is above `threshold`, the stored response is served.
+
+Safety rules:
+- Entries are partitioned by (corpus_version, policy_hash).
+  An answer produced from another corpus or under other policies
+  is NEVER served.
+- Only allowed responses are cached. Refusals are cheap and may be
+  transient; caching them would make a bad moment permanent.
+
+Monitoring:
+- hit rate (hits / lookups)
+- false hits: reported explicitly (`report_false_hit`) or found by
+  audit sampling (a fraction of hits is re-run through the full pipeline
+  and compared). False hits evict the entry they came from.
+"""
+
+import hashlib
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from application.models import FinalAnswerResponse
+from day09_observability.models import DecisionTrace
+
+PartitionKey = Tuple[str, str]
+
+
+def policy_fingerprint(*policies) -> str:
+    """
+    Stable hash of the policies that shaped an answer.
+
+    Policies are frozen dataclasses, so their repr is a complete,
+    deterministic description of their fields.
+    """
+    payload = "|".join(repr(p) for p in policies)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class SemanticCacheEntry:
+    entry_id: int
+    query: str
+    response: FinalAnswerResponse
+    trace: DecisionTrace
+    expires_at: float
+
+
+@dataclass(frozen=True)
+class SemanticCacheHit:
+    entry: SemanticCacheEntry
+    similarity: float
+
+
+class _Partition:
+    """
+    Vectors of one (corpus_version, policy_hash) partition.
+
+    Rows are L2-normalized, so cosine similarity is a single matmul.
+    The matrix is rebuilt lazily after inserts/evictions.
+    """
+
+    def __init__(self):
+        self.entries: List[SemanticCacheEntry] = []
+        self.vectors: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    def add(self, entry: SemanticCacheEntry, vector: np.ndarray) -> None:
+        self.entries.append(entry)
+        self.vectors.append(vector)
+        self._matrix = None
+
+    def remove_at(self, index: int) -> None:
+        del self.entries[index]
+        del self.vectors[index]
+        self._matrix = None
+
+    def best_match(self, vector: np.ndarray) -> Tuple[int, float]:
+        if self._matrix is None:
+            self._matrix = np.vstack(self.vectors)
+        similarities = self._matrix @ vector
+        index = int(np.argmax(similarities))
+        return index, float(similarities[index])
+
+
+class SemanticCache:
+    """
+    In-memory near-duplicate query cache.
+
+    `embed` maps a query string to a vector (e.g. the retriever's
+    sentence-transformer `encode`). It is called once per lookup.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Sequence[float]],
+        *,
+        threshold: float = 0.92,
+        max_entries_per_partition: int = 1024,
+        ttl_s: float = 3600.0,
+        audit_rate: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        if not 0.0 <= audit_rate <= 1.0:
+            raise ValueError("audit_rate must be in [0, 1]")
+
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries_per_partition = max_entries_per_partition
+        self.ttl_s = ttl_s
+        self.audit_rate = audit_rate
+
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._partitions: Dict[PartitionKey, _Partition] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+        self.audits = 0
+        self.false_hits = 0
+
+    # ---- lookup / store ----
+
+    def embed_query(self, query: str) -> np.ndarray:
+        vector = np.asarray(self.embed(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(
+        self,
+        query_vector: np.ndarray,
+        *,
+        corpus_version: str,
+        policy_hash: str,
+    ) -> Optional[SemanticCacheHit]:
+        with self._lock:
+            self.lookups += 1
+
+            partition = self._partitions.get((corpus_version, policy_hash))
+            if partition is None or not partition.entries:
+                return None
+
+            self._expire(partition)
+            if not partition.entries:
+                return None
+
+            index, similarity = partition.best_match(query_vector)
+            if similarity < self.threshold:
+                return None
+
+            self.hits += 1
+            return SemanticCacheHit(
+                entry=partition.entries[index],
+                similarity=similarity,
+            )
+
+    def store(
+        self,
+        query: str,
+        query_vector: np.ndarray,
+        *,
+        response: FinalAnswerResponse,
+        trace: DecisionTrace,
+        corpus_version: str,
+        policy_hash: str,
+    ) -> Optional[SemanticCacheEntry]:
+        if not response.allowed:
+            return None
+
+        with self._lock:
+            # A newer corpus makes every older partition unreachable
+            stale = [k for k in self._partitions if k[0] != corpus_version]
+            for key in stale:
+                self.evictions += len(self._partitions.pop(key).entries)
+
+            partition = self._partitions.setdefault(
+                (corpus_version, policy_hash), _Partition()
+            )
+
+            entry = SemanticCacheEntry(
+                entry_id=next(self._ids),
+                query=query,
+                response=response,
+                trace=trace,
+                expires_at=self._clock() + self.ttl_s,
+            )
+            partition.add(entry, query_vector)
+            self.stores += 1
+
+            while len(partition.entries) > self.max_entries_per_partition:
+                partition.remove_at(0)  # oldest first
+                self.evictions += 1
+
+            return entry
+
+    # ---- false-hit monitoring ----
+
+    def should_audit(self) -> bool:
+        """
+        Decide whether this hit is re-verified by the full pipeline.
+        """
+        return self.audit_rate > 0 and self._rng.random() < self.audit_rate
+
+    def record_audit(self, hit: SemanticCacheHit, *, agreed: bool) -> None:
+        with self._lock:
+            self.audits += 1
+        if not agreed:
+            self.report_false_hit(hit.entry.entry_id)
+
+    def report_false_hit(self, entry_id: int) -> None:
+        """
+        A served answer did not fit the query it was served for.
+        Count it and evict the entry so it cannot happen again.
+        """
+        with self._lock:
+            self.false_hits += 1
+            for partition in self._partitions.values():
+                for i, entry in enumerate(partition.entries):
+                    if entry.entry_id == entry_id:
+                        partition.remove_at(i)
+                        self.evictions += 1
+                        return
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "entries": sum(len(p.entries) for p in self._partitions.values()),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "audits": self.audits,
+                "false_hits": self.false_hits,
+                "false_hit_rate": self.false_hits / self.hits if self.hits else 0.0,
+            }
+
+    # ---- internals ----
+
+    def _expire(self, partition: _Partition) -> None:
+        # Caller holds self._lock
+        now = self._clock()
+        for i in reversed(range(len(partition.entries))):
+            if partition.entries[i].expires_at <= now:
+                partition.remove_at(i)
+                self.evictions += 1
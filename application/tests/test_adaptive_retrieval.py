@@ -0,0 +1,207 @@
+import asyncio
+
+from application.adaptive_retrieval import AdaptiveTopKPolicy, distance_gap_index
+from application.context_builder import abuild_context_for_query, build_context_for_query
+from day04_retrieval_to_context.build_context import ContextPolicy
+from infrastructure.retrieval.base import Retriever
+from infrastructure.retrieval.cache import CachedRetriever
+from infrastructure.retrieval.tests.fake_store import FakeEmbeddingModel, FakeVectorStore
+from infrastructure.retrieval.vector_store import VectorStoreRetriever
+
+
+def chunk(i, distance, text=None):
+    return {
+        "chunk_id": f"doc::{i:03d}",
+        "text": text or f"Refund rule {i} explains approvals, payouts and timelines.",
+        "distance": distance,
+        "metadata": {"source": f"doc::{i:03d}"},
+    }
+
+
+class RankedRetriever(Retriever):
+    """
+    Returns the first top_k of a fixed ranking; records every k asked.
+    """
+
+    def __init__(self, ranking):
+        self.ranking = ranking
+        self.calls = []
+
+    def retrieve(self, query, *, top_k=None, filters=None):
+        self.calls.append(top_k)
+        return [dict(c) for c in self.ranking[:top_k]]
+
+
+POLICY = ContextPolicy(max_chunks=3, min_chars=10)
+
+
+def test_distance_gap_index():
+    ranked = [chunk(0, 0.10), chunk(1, 0.12), chunk(2, 0.55), chunk(3, 0.60)]
+
+    assert distance_gap_index(ranked, 0.2) == 1
+    assert distance_gap_index(ranked, 0.5) is None
+
+
+def test_sharp_query_needs_one_round():
+    retriever = RankedRetriever([chunk(i, 0.1 + 0.01 * i) for i in range(20)])
+
+    pack = build_context_for_query(
+        query="refunds",
+        policy=POLICY,
+        retriever=retriever,
+        adaptive=AdaptiveTopKPolicy(),
+    )
+
+    # Fewer candidates than a fixed top_k of max_chunks
+    assert retriever.calls == [1]
+    assert pack.is_valid
+    assert pack.stats["adaptive_top_k"]["stop_reason"] == "sufficient"
+    assert pack.stats["retrieved_count"] == 1
+
+
+def test_widens_when_filters_drop_too_many():
+    ranking = [chunk(i, 0.1 + 0.01 * i, text="COPYRIGHT 2022 ACME CORP") for i in range(4)]
+    ranking += [chunk(i, 0.2 + 0.01 * i) for i in range(4, 20)]
+    retriever = RankedRetriever(ranking)
+
+    pack = build_context_for_query(
+        query="refunds",
+        policy=POLICY,
+        retriever=retriever,
+        adaptive=AdaptiveTopKPolicy(distance_gap=None),
+    )
+
+    assert retriever.calls == [1, 2, 4, 8]
+    assert len(pack.approved_chunks) == 3
+    assert all("COPYRIGHT" not in c["text"] for c in pack.approved_chunks)
+    assert pack.stats["adaptive_top_k"]["candidates_fetched"] == 15
+
+
+def test_distance_gap_stops_widening():
+    # Too few admissible chunks, but everything past the gap is far away
+    ranking = [chunk(0, 0.1), chunk(1, 0.12)]
+    ranking += [chunk(i, 0.9, text="ALL RIGHTS RESERVED") for i in range(2, 20)]
+    retriever = RankedRetriever(ranking)
+
+    pack = build_context_for_query(
+        query="refunds",
+        policy=ContextPolicy(max_chunks=4, min_chars=10),
+        retriever=retriever,
+        adaptive=AdaptiveTopKPolicy(initial_k=4, distance_gap=0.3),
+    )
+
+    assert retriever.calls == [4]
+    assert pack.stats["adaptive_top_k"]["stop_reason"] == "distance_gap"
+
+
+def test_stops_at_max_k_and_when_index_exhausted():
+    junk = [chunk(i, 0.1, text="TABLE OF CONTENTS") for i in range(50)]
+
+    capped = RankedRetriever(junk)
+    build_context_for_query(
+        query="q", policy=POLICY, retriever=capped,
+        adaptive=AdaptiveTopKPolicy(max_k=10, distance_gap=None),
+    )
+    assert capped.calls == [1, 2, 4, 8, 10]
+
+    small = RankedRetriever(junk[:5])
+    pack = build_context_for_query(
+        query="q", policy=POLICY, retriever=small,
+        adaptive=AdaptiveTopKPolicy(distance_gap=None),
+    )
+    assert small.calls == [1, 2, 4, 8]
+    assert pack.stats["adaptive_top_k"]["stop_reason"] == "index_exhausted"
+    assert not pack.is_valid
+
+
+def test_async_adaptive_matches_sync():
+    ranking = [chunk(i, 0.1, text="COPYRIGHT") for i in range(3)]
+    ranking += [chunk(i, 0.2) for i in range(3, 10)]
+
+    sync_retriever = RankedRetriever(ranking)
+    async_retriever = RankedRetriever(ranking)
+    adaptive = AdaptiveTopKPolicy(distance_gap=None)
+
+    expected = build_context_for_query(
+        query="q", policy=POLICY, retriever=sync_retriever, adaptive=adaptive
+    )
+    actual = asyncio.run(
+        abuild_context_for_query(
+            query="q", policy=POLICY, retriever=async_retriever, adaptive=adaptive
+        )
+    )
+
+    assert async_retriever.calls == sync_retriever.calls
+    assert [c["chunk_id"] for c in actual.approved_chunks] == [
+        c["chunk_id"] for c in expected.approved_chunks
+    ]
+
+
+class CountingModel(FakeEmbeddingModel):
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, show_progress_bar=False):
+        if isinstance(texts, str):
+            self.encoded.append(texts)
+        return super().encode(texts, show_progress_bar=show_progress_bar)
+
+
+def indexed(model, n_junk):
+    retriever = VectorStoreRetriever(model, FakeVectorStore())
+    retriever.add_chunks([
+        {
+            "doc_id": "policy.txt",
+            "chunk_id": f"policy.txt::{i:03d}",
+            "section_title": "Refunds",
+            "text": "COPYRIGHT refunds policy" if i < n_junk else f"Refund approvals take {i} business days after support reviews the request.",
+            "doc_label": "POLICY",
+            "confidence": 0.9,
+        }
+        for i in range(12)
+    ])
+    return retriever
+
+
+def test_widening_rounds_encode_the_query_once():
+    model = CountingModel()
+    retriever = indexed(model, n_junk=3)
+
+    pack = build_context_for_query(
+        query="copyright refunds policy",
+        policy=ContextPolicy(min_chars=10),
+        retriever=retriever,
+        adaptive=AdaptiveTopKPolicy(distance_gap=None),
+    )
+
+    assert pack.is_valid
+    assert pack.stats["adaptive_top_k"]["rounds"] == 3
+    assert model.encoded == ["copyright refunds policy"]
+
+
+def test_clean_query_fetches_fewer_candidates_than_fixed_top_k():
+    retriever = indexed(CountingModel(), n_junk=0)
+    policy = ContextPolicy(min_chars=10)
+
+    adaptive = build_context_for_query(
+        query="refund approvals", policy=policy, retriever=retriever, adaptive=AdaptiveTopKPolicy()
+    )
+    fixed = build_context_for_query(query="refund approvals", policy=policy, retriever=retriever)
+
+    assert adaptive.is_valid and fixed.is_valid
+    assert adaptive.stats["adaptive_top_k"]["candidates_fetched"] == 2
+    assert fixed.stats["retrieved_count"] == 5
+
+
+def test_cached_rounds_never_encode():
+    model = CountingModel()
+    retriever = CachedRetriever(indexed(model, n_junk=3))
+    adaptive = AdaptiveTopKPolicy(distance_gap=None)
+
+    for _ in range(2):
+        asyncio.run(abuild_context_for_query(
+            query="copyright refunds policy", policy=POLICY, retriever=retriever, adaptive=adaptive
+        ))
+
+    assert model.encoded == ["copyright refunds policy"]
+    assert retriever.stats()["hits"] >= 2
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from application import answer_service
+from application.answer_service import aanswer_query_with_policy, answer_query_with_policy
+from day06_semantic_validation.semantic_verifier import VerificationReport
+from day08_presentation.models import PresentationPolicy
+from day09_observability.recorder import TraceRecorder
+from infrastructure.llm.base import LLM, LLMUsage
+from infrastructure.llm.cascade import CascadingLLM
+
+CITED = "Refunds are processed within 5–7 business days [doc_1]."
+UNCITED = "Refunds are processed within 5–7 business days."
+WRONG = "Refunds are instant [doc_1]."
+
+
+class TierLLM(LLM):
+    def __init__(self, response, cost):
+        self.response = response
+        self.cost = cost
+        self.calls = 0
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        self.calls += 1
+        self._record_usage(LLMUsage(100, 10, 110, self.cost))
+        return self.response
+
+
+@pytest.fixture(autouse=True)
+def entailment(monkeypatch):
+    # Day 6 stand-in: only the instant-refund claim is not entailed
+    def verify(*, answer_text, context_pack, llm, deadline=None):
+        passed = "instant" not in answer_text
+        return VerificationReport(
+            passed=passed,
+            claims=[],
+            claim_results=[],
+            failure_reason=None if passed else "Claim not entailed",
+        )
+
+    monkeypatch.setattr(answer_service, "verify_answer", verify)
+    TraceRecorder.clear()
+    yield
+    TraceRecorder.clear()
+
+
+def answer(cascade, pack, policy):
+    return answer_query_with_policy(
+        context_pack=pack,
+        llm=cascade,
+        generation_policy=policy,
+        presentation_policy=PresentationPolicy(),
+    )
+
+
+def test_cheap_tier_answer_is_kept_when_it_validates(context_pack_with_content, permissive_generation_policy):
+    small, large = TierLLM(CITED, 0.001), TierLLM(CITED, 0.01)
+    cascade = CascadingLLM([("small", small), ("large", large)])
+
+    response = answer(cascade, context_pack_with_content, permissive_generation_policy)
+
+    assert response.allowed
+    assert large.calls == 0
+
+    stats = TraceRecorder.get_all()[-1].stats
+    assert stats.llm_tier == "small"
+    assert stats.llm_escalations == 0
+    assert stats.cost_usd == 0.001
+
+
+@pytest.mark.parametrize("cheap_answer", [UNCITED, WRONG])
+def test_escalates_on_citation_or_entailment_failure(
+    cheap_answer, context_pack_with_content, permissive_generation_policy
+):
+    small, large = TierLLM(cheap_answer, 0.001), TierLLM(CITED, 0.01)
+    cascade = CascadingLLM([("small", small), ("large", large)])
+
+    response = answer(cascade, context_pack_with_content, permissive_generation_policy)
+
+    assert response.allowed
+    assert response.answer_text == CITED
+    assert (small.calls, large.calls) == (1, 1)
+
+    stats = TraceRecorder.get_all()[-1].stats
+    assert stats.llm_tier == "large"
+    assert stats.llm_escalations == 1
+    assert stats.llm_tier_cost_usd == {"small": 0.001, "large": 0.01}
+    assert set(stats.llm_tier_latency_ms) == {"small", "large"}
+    assert stats.cost_usd == pytest.approx(0.011)
+
+
+def test_strongest_tier_failure_is_final(context_pack_with_content, permissive_generation_policy):
+    cascade = CascadingLLM([("small", TierLLM(UNCITED, 0)), ("large", TierLLM(UNCITED, 0))])
+
+    response = answer(cascade, context_pack_with_content, permissive_generation_policy)
+
+    assert response.refusal_reason == "missing_or_invalid_citations"
+    assert TraceRecorder.get_all()[-1].stats.llm_escalations == 1
+
+
+def test_async_pipeline_escalates(context_pack_with_content, permissive_generation_policy):
+    small, large = TierLLM(WRONG, 0.001), TierLLM(CITED, 0.01)
+    cascade = CascadingLLM([("small", small), ("large", large)])
+
+    response = asyncio.run(aanswer_query_with_policy(
+        context_pack=context_pack_with_content,
+        llm=cascade,
+        generation_policy=permissive_generation_policy,
+        presentation_policy=PresentationPolicy(),
+    ))
+
+    assert response.answer_text == CITED
+    assert TraceRecorder.get_all()[-1].stats.llm_tier == "large"
@@ -0,0 +1,87 @@
+from application import answer_service
+from application.answer_service import answer_query_with_policy
+from application.adaptive_retrieval import AdaptiveTopKPolicy
+from application.context_builder import build_context_for_query
+from day04_retrieval_to_context.build_context import ContextPolicy
+from day04_retrieval_to_context.pack_cache import ContextPackCache
+from day05_context_to_answer.policies import GenerationPolicy
+from day06_semantic_validation.claims import extract_claims
+from day06_semantic_validation.semantic_verifier import VerificationReport
+from day08_presentation.models import PresentationPolicy
+from infrastructure.llm.fake import FakeLLM
+from infrastructure.retrieval.tests.fake_store import build_indexed_retriever
+
+
+def test_pack_cache_reuses_assembly_but_not_retrieval_stats():
+    retriever = build_indexed_retriever()
+    cache = ContextPackCache()
+    policy = ContextPolicy(min_chars=10)
+
+    first = build_context_for_query(
+        query="refunds", policy=policy, retriever=retriever, pack_cache=cache
+    )
+    second = build_context_for_query(
+        query="Refunds!", policy=policy, retriever=retriever, pack_cache=cache
+    )
+
+    assert cache.stats()["hits"] == 1
+    assert second.query == "Refunds!"
+    assert second.approved_chunks == first.approved_chunks
+    assert second.stats["retrieved_count"] == first.stats["retrieved_count"]
+    assert "retrieval_timings_ms" in second.stats
+
+
+def test_cached_pack_goes_through_generation_and_citation_alignment(monkeypatch):
+    def verify(*, answer_text, context_pack, llm, deadline=None):
+        return VerificationReport(passed=True, claims=extract_claims(answer_text), claim_results=[])
+
+    monkeypatch.setattr(answer_service, "verify_answer", verify)
+
+    retriever = build_indexed_retriever(annotate=lambda c: {"source": c["chunk_id"]})
+    cache = ContextPackCache()
+    policy = ContextPolicy(min_chars=10)
+    for query in ("refunds", "Refunds!"):
+        pack = build_context_for_query(query=query, policy=policy, retriever=retriever, pack_cache=cache)
+    assert cache.stats()["hits"] == 1
+
+    chunk = pack.approved_chunks[0]
+    response = answer_query_with_policy(
+        context_pack=pack,
+        llm=FakeLLM(fixed_response=f"{chunk.text} [{chunk.chunk_id}]"),
+        generation_policy=GenerationPolicy(),
+        presentation_policy=PresentationPolicy(),
+    )
+
+    assert response.allowed, response.refusal_reason
+
+
+def test_selected_assembly_expands_with_neighbors_from_the_chunk_store():
+    chunks = [
+        {
+            "doc_id": "travel.txt",
+            "chunk_id": f"travel.txt::{i:03d}",
+            "section_title": "Luggage",
+            "text": text,
+            "doc_label": "POLICY",
+            "confidence": 0.9,
+        }
+        for i, text in enumerate([
+            "Lost luggage is compensated up to a fixed amount per bag.",
+            "Claims must be filed within seven days with the receipt.",
+            "Pets travel in the cabin only on short domestic routes.",
+        ], start=1)
+    ]
+    retriever = build_indexed_retriever(chunks)
+
+    pack = build_context_for_query(
+        query="lost luggage",
+        policy=ContextPolicy(min_chars=10, neighbor_window=1),
+        retriever=retriever,
+        adaptive=AdaptiveTopKPolicy(initial_k=1, max_k=1),
+    )
+
+    assert pack.stats["retrieved_count"] == 1
+    approved = {c.chunk_id: c for c in pack.approved_chunks}
+    assert "travel.txt::002" in approved
+    assert approved["travel.txt::002"]["_reason"].startswith("neighbor of")
+    assert approved["travel.txt::002"].metadata["source"] == "travel.txt::002"
@@ -0,0 +1,234 @@
+import asyncio
+import time
+
+import pytest
+
+from application import answer_service
+from application.answer_service import aanswer_query_with_policy, answer_query_with_policy
+from application.context_builder import abuild_context_for_query, build_context_for_query
+from application.deadlines import DeadlinePolicy
+from day04_retrieval_to_context.build_context import ContextPolicy
+from day06_semantic_validation.semantic_verifier import VerificationReport, verify_answer
+from day08_presentation.models import PresentationPolicy
+from day09_observability.models import FailureCode, PipelineLayer
+from day09_observability.recorder import TraceRecorder
+from infrastructure.deadline import Deadline, DeadlineExceeded
+from infrastructure.llm.base import LLM
+from infrastructure.retrieval.base import Retriever
+
+CITED = "Refunds are processed within 5–7 business days [doc_1]."
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ClockLLM(LLM):
+    """Takes `latency_s` of (fake) clock time per generation."""
+
+    def __init__(self, clock, latency_s, response=CITED):
+        self.clock = clock
+        self.latency_s = latency_s
+        self.response = response
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        self.clock.now += self.latency_s
+        return self.response
+
+
+class SlowAsyncLLM(LLM):
+    def generate(self, *, prompt, max_tokens, temperature):
+        return CITED
+
+    async def agenerate(self, *, prompt, max_tokens, temperature):
+        await asyncio.sleep(5.0)
+        return CITED
+
+
+class SlowRetriever(Retriever):
+    def __init__(self, clock=None):
+        self.clock = clock
+
+    def retrieve(self, query, *, top_k=None, filters=None):
+        self.clock.now += 10.0
+        return [{"text": "Refunds are processed within 5–7 business days.", "metadata": {"source": "doc_1"}}]
+
+    async def aretrieve(self, query, *, top_k=None, filters=None):
+        await asyncio.sleep(5.0)
+        return []
+
+
+@pytest.fixture(autouse=True)
+def entailment(monkeypatch):
+    # Day 6 stand-in; a test may make it slow via `verification_latency_s`
+    def verify(*, answer_text, context_pack, llm, deadline=None):
+        delay = getattr(llm, "verification_latency_s", 0.0)
+        if delay:
+            llm.clock.now += delay
+        return VerificationReport(passed=True, claims=[], claim_results=[])
+
+    monkeypatch.setattr(answer_service, "verify_answer", verify)
+    TraceRecorder.clear()
+    yield
+    TraceRecorder.clear()
+
+
+def answer(pack, llm, policy, deadline):
+    return answer_query_with_policy(
+        context_pack=pack,
+        llm=llm,
+        generation_policy=policy,
+        presentation_policy=PresentationPolicy(),
+        deadline=deadline,
+    )
+
+
+def test_child_deadline_gets_share_of_remaining_and_never_outlives_parent():
+    clock = Clock()
+    parent = Deadline(3.0, clock=clock)
+
+    clock.now = 1.0
+    child = parent.child(0.5)
+    assert child.remaining_s() == pytest.approx(1.0)
+
+    whole = parent.child(1.0)
+    assert whole.expires_at == pytest.approx(parent.expires_at)
+
+    clock.now = 3.0
+    assert parent.expired and child.expired
+
+
+def test_fast_request_is_answered_and_records_stage_times(context_pack_with_content, permissive_generation_policy):
+    clock = Clock()
+    deadline = DeadlinePolicy(total_s=3.0).start(clock=clock)
+
+    response = answer(context_pack_with_content, ClockLLM(clock, 0.5), permissive_generation_policy, deadline)
+
+    assert response.allowed
+    stats = TraceRecorder.get_all()[-1].stats
+    assert stats.timed_out_stage is None
+    assert stats.deadline_budget_ms == 3000.0
+    assert set(stats.stage_ms) == {"generation", "verification", "alignment"}
+    assert stats.stage_ms["generation"] == pytest.approx(500.0)
+
+
+def test_slow_generation_fails_closed_with_generation_timeout(
+    context_pack_with_content, permissive_generation_policy
+):
+    clock = Clock()
+    deadline = DeadlinePolicy(total_s=3.0, generation_share=0.5).start(clock=clock)
+
+    response = answer(context_pack_with_content, ClockLLM(clock, 2.0), permissive_generation_policy, deadline)
+
+    assert not response.allowed
+    assert response.answer_text is None
+    assert response.refusal_reason == "generation_timeout"
+
+    trace = TraceRecorder.get_all()[-1]
+    assert trace.failure_layer == PipelineLayer.DAY_05_GENERATION
+    assert trace.failure_code == FailureCode.DEADLINE_EXCEEDED
+    assert trace.refusal_reason == "generation_timeout"
+    assert [(s.layer, s.passed) for s in trace.layer_signals] == [
+        (PipelineLayer.DAY_04_CONTEXT, True),
+        (PipelineLayer.DAY_05_GENERATION, False),
+    ]
+    assert trace.stats.timed_out_stage == "generation"
+
+
+def test_slow_verification_fails_closed_with_verification_timeout(
+    context_pack_with_content, permissive_generation_policy
+):
+    clock = Clock()
+    llm = ClockLLM(clock, 0.1)
+    llm.verification_latency_s = 5.0
+
+    response = answer(context_pack_with_content, llm, permissive_generation_policy, DeadlinePolicy().start(clock=clock))
+
+    assert response.refusal_reason == "verification_timeout"
+    assert TraceRecorder.get_all()[-1].failure_layer == PipelineLayer.DAY_06_ENTAILMENT
+
+
+def test_verifier_stops_before_next_claim_once_expired(context_pack_with_content):
+    clock = Clock()
+    deadline = Deadline(1.0, clock=clock)
+    clock.now = 2.0
+
+    with pytest.raises(DeadlineExceeded):
+        verify_answer(
+            answer_text=CITED,
+            context_pack=context_pack_with_content,
+            llm=None,
+            deadline=deadline,
+        )
+
+
+def test_slow_retrieval_yields_retrieval_timeout(permissive_generation_policy):
+    clock = Clock()
+    deadline = DeadlinePolicy().start(clock=clock)
+    llm = ClockLLM(clock, 0.1)
+
+    pack = build_context_for_query(
+        query="refunds",
+        policy=ContextPolicy(min_chars=10),
+        retriever=SlowRetriever(clock),
+        deadline=deadline,
+    )
+    assert not pack.is_valid
+    assert pack.invalid_reason == "retrieval_timeout"
+
+    response = answer(pack, llm, permissive_generation_policy, deadline)
+
+    assert response.refusal_reason == "retrieval_timeout"
+    trace = TraceRecorder.get_all()[-1]
+    assert trace.failure_layer == PipelineLayer.DAY_04_CONTEXT
+    assert trace.failure_code == FailureCode.DEADLINE_EXCEEDED
+
+
+def test_async_stages_are_cancelled_when_their_share_runs_out(
+    context_pack_with_content, permissive_generation_policy
+):
+    policy = DeadlinePolicy(total_s=0.2)
+
+    async def run():
+        deadline = policy.start()
+        pack = await abuild_context_for_query(
+            query="refunds",
+            policy=ContextPolicy(),
+            retriever=SlowRetriever(),
+            deadline=deadline,
+        )
+        assert pack.invalid_reason == "retrieval_timeout"
+
+        return await aanswer_query_with_policy(
+            context_pack=context_pack_with_content,
+            llm=SlowAsyncLLM(),
+            generation_policy=permissive_generation_policy,
+            presentation_policy=PresentationPolicy(),
+            deadline=policy.start(),
+        )
+
+    start = time.monotonic()
+    response = asyncio.run(run())
+
+    assert time.monotonic() - start < 1.0
+    assert response.refusal_reason == "generation_timeout"
+    assert TraceRecorder.get_all()[-1].stats.timed_out_stage == "generation"
+
+
+def test_app_entry_point_starts_one_deadline_for_both_calls(monkeypatch):
+    pytest.importorskip("httpx")  # the app builds its LLM through the factory
+    from application import app
+
+    seen = []
+    monkeypatch.setenv("RAG_REQUEST_DEADLINE_S", "2.5")
+    monkeypatch.setattr(app, "build_context_for_query", lambda **kw: seen.append(kw["deadline"]) or "pack")
+    monkeypatch.setattr(app, "answer_query_with_policy", lambda **kw: seen.append(kw["deadline"]))
+
+    app.main()
+
+    assert seen[0] is seen[1]
+    assert seen[0].policy.total_s == 2.5
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from application import answer_service
+from application.answer_service import aanswer_query_with_policy, answer_query_with_policy
+from day06_semantic_validation.semantic_verifier import VerificationReport
+from day08_presentation.models import PresentationPolicy
+from day09_observability.models import FailureCode, PipelineLayer
+from day09_observability.recorder import TraceRecorder
+from infrastructure.llm.base import LLM
+from infrastructure.llm.cascade import CascadingLLM
+from infrastructure.llm.circuit_breaker import BreakerPolicy, CircuitBreakerLLM
+from infrastructure.llm.errors import RetryableLLMError
+
+CITED = "Refunds are processed within 5–7 business days [doc_1]."
+
+
+class DownLLM(LLM):
+    model = "down"
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        raise RetryableLLMError("503 from provider")
+
+
+class UpLLM(LLM):
+    model = "up"
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        return CITED
+
+
+def open_breaker():
+    breaker = CircuitBreakerLLM(DownLLM(), BreakerPolicy(min_calls=1, open_for_s=60))
+    with pytest.raises(RetryableLLMError):
+        breaker.generate(prompt="q", max_tokens=5, temperature=0.0)
+    return breaker
+
+
+@pytest.fixture(autouse=True)
+def entailment(monkeypatch):
+    def verify(*, answer_text, context_pack, llm, deadline=None):
+        return VerificationReport(passed=True, claims=[], claim_results=[])
+
+    monkeypatch.setattr(answer_service, "verify_answer", verify)
+    TraceRecorder.clear()
+    yield
+    TraceRecorder.clear()
+
+
+def test_open_circuit_refuses_with_llm_unavailable(context_pack_with_content, permissive_generation_policy):
+    response = answer_query_with_policy(
+        context_pack=context_pack_with_content,
+        llm=open_breaker(),
+        generation_policy=permissive_generation_policy,
+        presentation_policy=PresentationPolicy(),
+    )
+
+    assert not response.allowed
+    assert response.refusal_reason == "llm_unavailable"
+
+    trace = TraceRecorder.get_all()[-1]
+    assert trace.failure_layer == PipelineLayer.DAY_05_GENERATION
+    assert trace.failure_code == FailureCode.LLM_UNAVAILABLE
+    assert trace.stats.llm_circuit_state == "open"
+
+
+def test_async_open_circuit_refuses_with_llm_unavailable(context_pack_with_content, permissive_generation_policy):
+    response = asyncio.run(aanswer_query_with_policy(
+        context_pack=context_pack_with_content,
+        llm=open_breaker(),
+        generation_policy=permissive_generation_policy,
+        presentation_policy=PresentationPolicy(),
+    ))
+
+    assert response.refusal_reason == "llm_unavailable"
+
+
+def test_cascade_skips_a_tier_whose_circuit_is_open(context_pack_with_content, permissive_generation_policy):
+    cascade = CascadingLLM([("small", open_breaker()), ("large", UpLLM())])
+
+    response = answer_query_with_policy(
+        context_pack=context_pack_with_content,
+        llm=cascade,
+        generation_policy=permissive_generation_policy,
+        presentation_policy=PresentationPolicy(),
+    )
+
+    assert response.allowed
+    assert response.answer_text == CITED
+    assert TraceRecorder.get_all()[-1].stats.llm_tier == "large"
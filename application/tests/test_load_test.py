@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from application.load_test import percentile, run_load
+from infrastructure.llm.fake import FakeLLM
+from infrastructure.llm.standin_server import StandInConfig, StandInServer
+from infrastructure.retrieval.stub import StubRetriever
+from infrastructure.retrieval.tests.fake_store import FakeEmbeddingModel, FakeVectorStore
+from infrastructure.retrieval.vector_store import VectorStoreRetriever
+
+# Day 6 asks the same backend to judge each claim
+ENTAILED = "LABEL: ENTAILED\nRATIONALE: Stated in the context.\nSUPPORTING_CHUNKS: NONE"
+
+
+def refund_corpus():
+    retriever = VectorStoreRetriever(FakeEmbeddingModel(), FakeVectorStore())
+    retriever.add_chunks([
+        {
+            "doc_id": "refunds.md",
+            "chunk_id": f"refunds.md::{i:03d}",
+            "section_title": "Refunds",
+            "text": text,
+            "doc_label": "POLICY",
+            "confidence": 0.9,
+        }
+        for i, text in enumerate([
+            "Refunds are processed within 5–7 business days of approval.",
+            "Contact support by email to start a refund request.",
+        ])
+    ])
+    return retriever
+
+
+def test_percentile_picks_rank():
+    values = [float(i) for i in range(1, 101)]
+
+    assert percentile(values, 50) == 51.0
+    assert percentile(values, 99) == 100.0
+    assert percentile([], 50) == 0.0
+
+
+def test_run_load_accounts_for_every_request():
+    report = asyncio.run(run_load(
+        requests=12,
+        concurrency=4,
+        llm=FakeLLM(fixed_response="Refunds take 5 days."),
+        retriever=StubRetriever(),
+    ))
+
+    assert sum(report["outcomes"].values()) == 12
+    assert report["p50_ms"] <= report["p99_ms"]
+    assert "llm_scheduler" not in report
+
+
+def test_run_load_over_http_against_standin_server():
+    pytest.importorskip("httpx")
+    from infrastructure.llm.openai_llm import OpenAILLM
+
+    config = StandInConfig(
+        rules=(("strict factual verifier", ENTAILED),),
+        default_response="Refunds are processed within 5–7 business days [{source}].",
+    )
+    with StandInServer(config) as server:
+        report = asyncio.run(run_load(
+            requests=12,
+            concurrency=4,
+            llm=OpenAILLM(model="stand-in", api_key="local", base_url=server.base_url),
+            retriever=refund_corpus(),
+        ))
+
+    assert report["outcomes"] == {"allowed": 12}
+    # Answers and entailment checks all went over HTTP
+    assert server.stats.completions > 12
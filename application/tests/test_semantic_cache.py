@@ -0,0 +1,220 @@
+import random
+
+import pytest
+
+from application import answer_service
+from application.answer_service import answer_query_with_semantic_cache
+from application.models import FinalAnswerResponse
+from application.semantic_cache import SemanticCache, policy_fingerprint
+from day04_retrieval_to_context.build_context import ContextPolicy
+from day05_context_to_answer.policies import GenerationPolicy
+from day08_presentation.models import PresentationMode, PresentationPolicy
+from day09_observability.builder import build_decision_trace
+from day09_observability.models import PipelineStats
+from day09_observability.recorder import TraceRecorder
+from infrastructure.retrieval.stub import StubRetriever
+
+VOCAB = ["refund", "refunds", "take", "time", "processing", "long", "shipping", "cost"]
+
+
+def embed(text):
+    # Refund questions share the "refund" direction; shipping points elsewhere
+    words = text.lower().replace("?", "").split()
+    return [float(sum(w.startswith(v) for w in words)) for v in VOCAB]
+
+
+def allowed_response(text="Refunds take 5 days [doc_1]."):
+    return FinalAnswerResponse(
+        allowed=True,
+        mode=PresentationMode.FULL,
+        answer_text=text,
+        citations=["doc_1"],
+        refusal_reason=None,
+        presentation_reason=None,
+    )
+
+
+def trace_for(query):
+    return build_decision_trace(
+        query_text=query,
+        context_valid=True,
+        context_failure_reason=None,
+        answer_refusal_reason=None,
+        entailment_passed=True,
+        entailment_failure_code=None,
+        citation_alignment_passed=True,
+        presentation_mode=PresentationMode.FULL,
+        presentation_reason=None,
+        stats=PipelineStats(
+            retrieval_search_ms=12.0,
+            approved_chunks=2,
+            prompt_tokens=900,
+            completion_tokens=60,
+            total_tokens=960,
+            cost_usd=0.004,
+            llm_cache_hit=False,
+            stage_ms={"generation": 850.0},
+        ),
+    )
+
+
+def store(cache, query, response=None, corpus="1", policy="p"):
+    return cache.store(
+        query,
+        cache.embed_query(query),
+        response=response or allowed_response(),
+        trace=trace_for(query),
+        corpus_version=corpus,
+        policy_hash=policy,
+    )
+
+
+def lookup(cache, query, corpus="1", policy="p"):
+    return cache.lookup(
+        cache.embed_query(query), corpus_version=corpus, policy_hash=policy
+    )
+
+
+def test_paraphrase_hits_and_unrelated_query_misses():
+    cache = SemanticCache(embed, threshold=0.8)
+    store(cache, "how long do refunds take")
+
+    assert lookup(cache, "how long do refunds take?") is not None
+    assert lookup(cache, "shipping cost") is None
+    assert cache.stats()["hit_rate"] == pytest.approx(0.5)
+
+
+def test_partitions_respect_corpus_version_and_policy_hash():
+    cache = SemanticCache(embed, threshold=0.8)
+    store(cache, "how long do refunds take", corpus="1", policy="p")
+
+    assert lookup(cache, "how long do refunds take", corpus="1", policy="q") is None
+
+    store(cache, "shipping cost", corpus="2", policy="p")
+    assert lookup(cache, "how long do refunds take", corpus="1", policy="p") is None
+
+
+def test_refusals_are_not_cached():
+    cache = SemanticCache(embed)
+    refused = FinalAnswerResponse(
+        allowed=False,
+        mode=PresentationMode.SUPPRESSED,
+        answer_text=None,
+        citations=None,
+        refusal_reason="empty_context",
+        presentation_reason=None,
+    )
+
+    assert store(cache, "how long do refunds take", response=refused) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_entries_expire():
+    now = [0.0]
+    cache = SemanticCache(embed, ttl_s=10, clock=lambda: now[0])
+    store(cache, "how long do refunds take")
+
+    now[0] = 10.0
+    assert lookup(cache, "how long do refunds take") is None
+
+
+def test_false_hit_is_counted_and_evicted():
+    cache = SemanticCache(embed, threshold=0.8)
+    entry = store(cache, "how long do refunds take")
+    lookup(cache, "how long do refunds take")
+
+    cache.report_false_hit(entry.entry_id)
+
+    assert cache.stats()["false_hits"] == 1
+    assert cache.stats()["false_hit_rate"] == 1.0
+    assert lookup(cache, "how long do refunds take") is None
+
+
+def test_policy_fingerprint_changes_with_policy():
+    assert policy_fingerprint(GenerationPolicy()) == policy_fingerprint(GenerationPolicy())
+    assert policy_fingerprint(GenerationPolicy()) != policy_fingerprint(
+        GenerationPolicy(temperature=0.0)
+    )
+
+
+# -------------------------
+# Pipeline integration
+# -------------------------
+
+@pytest.fixture
+def counting_pipeline(monkeypatch):
+    calls = []
+
+    def fake_answer_and_trace(*, context_pack, **kwargs):
+        calls.append(context_pack.query)
+        return allowed_response(), trace_for(context_pack.query)
+
+    monkeypatch.setattr(answer_service, "_answer_and_trace", fake_answer_and_trace)
+    TraceRecorder.clear()
+    yield calls
+    TraceRecorder.clear()
+
+
+def run(cache, query):
+    return answer_query_with_semantic_cache(
+        query=query,
+        cache=cache,
+        context_policy=ContextPolicy(min_chars=10),
+        llm=None,
+        generation_policy=GenerationPolicy(),
+        presentation_policy=PresentationPolicy(),
+        retriever=StubRetriever(),
+    )
+
+
+def test_cache_hit_skips_pipeline_and_marks_trace(counting_pipeline):
+    cache = SemanticCache(embed, threshold=0.8)
+
+    first = run(cache, "how long do refunds take")
+    second = run(cache, "How long do refunds take?")
+
+    assert second == first
+    assert counting_pipeline == ["how long do refunds take"]
+
+    miss_trace, hit_trace = TraceRecorder.get_all()
+    assert miss_trace.cache_hit is False
+    assert hit_trace.cache_hit is True
+    assert hit_trace.query_text == "How long do refunds take?"
+    assert hit_trace.query_id != miss_trace.query_id
+    assert hit_trace.stats.semantic_cache_similarity >= 0.8
+
+    # Decisions are replayed; cost and latency are not billed again
+    assert hit_trace.stats.approved_chunks == 2
+    assert hit_trace.stats.total_tokens == 0
+    assert hit_trace.stats.cost_usd == 0.0
+    assert hit_trace.stats.llm_cache_hit is True
+    assert hit_trace.stats.retrieval_search_ms is None
+    assert hit_trace.stats.stage_ms is None
+    assert miss_trace.stats.cost_usd == 0.004
+
+
+def test_audited_hit_reruns_pipeline(counting_pipeline):
+    cache = SemanticCache(embed, threshold=0.8, audit_rate=1.0, rng=random.Random(0))
+
+    run(cache, "how long do refunds take")
+    run(cache, "how long do refunds take")
+
+    assert len(counting_pipeline) == 2
+    assert cache.stats()["audits"] == 1
+    assert cache.stats()["false_hits"] == 0
+    # The agreeing audit did not store a second entry
+    assert cache.stats()["entries"] == 1
+
+
+def test_hits_return_copies_callers_cannot_corrupt(counting_pipeline):
+    cache = SemanticCache(embed, threshold=0.8)
+
+    first = run(cache, "how long do refunds take")
+    first.answer_text = "tampered"
+    second = run(cache, "how long do refunds take")
+    second.citations.append("tampered")
+    third = run(cache, "how long do refunds take")
+
+    assert third is not second
+    assert third.answer_text == "Refunds take 5 days [doc_1]."
+    assert third.citations == ["doc_1"]
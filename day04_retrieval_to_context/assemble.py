@@ -0,0 +1,261 @@
+"""
+Day 4 — Fused context assembly.
+
+`build_context_pack_from_retrieval` used to chain independent passes:
+
+    select_chunks → expand_with_neighbors → order_chunks
+        → enforce_context_budget → stats → validation
+
+Each pass rescanned the candidates, re-ran the filters, and re-measured
+`len(text)` (budget, used_chars, token costs, stats...).
+
+`assemble_context` makes the same decisions with:
+- filter flags and text lengths computed ONCE per chunk
+- selection and neighbor expansion sharing those cached flags
+- budgeting, drop records, usage totals and validation in ONE walk
+  over the ordered chunks
+
+The result is the identical ContextPack (same chunks, same reasons,
+same stats), which the property tests in test_assemble_context.py
+check against the individual pass functions.
+
+Selection must finish before expansion starts: expansion may relabel a
+chunk that selection approves later, so interleaving the two would
+change the outcome.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from day04_retrieval_to_context.build_context import (
+    ContextPack,
+    ContextPolicy,
+    RetrievedNeighborIndex,
+    chunk_filter_flags,
+    chunk_position_key,
+    chunk_relevance,
+    context_budget,
+    pack_knapsack,
+    record_budget_drop,
+    record_drop,
+    select_chunks,
+    validate_context_pack,
+)
+
+
+class _ChunkFacts:
+    """
+    Per-call memo of (length, is_empty, is_boilerplate, is_header).
+
+    Keyed by object identity. Each entry keeps its chunk alive, so an
+    id cannot be reused by another object (chunk stores hand out fresh
+    neighbor copies) while the memo exists.
+    """
+
+    __slots__ = ("policy", "_facts")
+
+    def __init__(self, policy: ContextPolicy):
+        self.policy = policy
+        self._facts: Dict[int, Tuple[Dict, Tuple[int, bool, bool, bool]]] = {}
+
+    def get(self, chunk: Dict) -> Tuple[int, bool, bool, bool]:
+        entry = self._facts.get(id(chunk))
+        if entry is not None:
+            return entry[1]
+
+        text = chunk.get("text", "")
+        if not text.strip():
+            facts = (len(text), True, False, False)
+        else:
+            boilerplate, header = chunk_filter_flags(chunk, self.policy)
+            facts = (len(text), False, boilerplate, header)
+        self._facts[id(chunk)] = (chunk, facts)
+        return facts
+
+    def drop_reason(self, chunk: Dict) -> Optional[str]:
+        # Same order of checks as admissibility_drop_reason
+        _, empty, boilerplate, header = self.get(chunk)
+        if empty:
+            return "empty text"
+        if boilerplate:
+            return "boilerplate detected"
+        if header:
+            return "structural header"
+        return None
+
+
+def _select_by_distance(
+    retrieved: List[Dict],
+    policy: ContextPolicy,
+    facts: _ChunkFacts,
+) -> Tuple[List[Dict], List[Dict]]:
+    approved: List[Dict] = []
+    dropped: List[Dict] = []
+
+    for chunk in sorted(retrieved, key=lambda c: c.get("distance", float("inf"))):
+        reason = facts.drop_reason(chunk)
+        if reason is not None:
+            dropped.append(record_drop(chunk, reason))
+            continue
+
+        chunk["_reason"] = (
+            "passed boilerplate filter; "
+            "passed header filter; "
+            f"semantic distance={chunk.get('distance')}"
+        )
+        approved.append(chunk)
+
+        if len(approved) >= policy.max_chunks:
+            dropped.append(record_drop(chunk, "max_chunks limit reached"))
+            break
+
+    return approved, dropped
+
+
+def _expand(
+    approved: List[Dict],
+    neighbor_index,
+    policy: ContextPolicy,
+    facts: _ChunkFacts,
+) -> List[Dict]:
+    expanded: List[Dict] = []
+    seen = set()
+
+    for chunk in approved:
+        cid = chunk_position_key(chunk) or id(chunk)
+        if cid not in seen:
+            expanded.append(chunk)
+            seen.add(cid)
+
+        key = chunk_position_key(chunk)
+        if key is None:
+            continue
+
+        for n in neighbor_index.neighbors(key[0], key[1], policy.neighbor_window):
+            nid = chunk_position_key(n) or id(n)
+            if nid in seen:
+                continue
+
+            _, empty, boilerplate, _ = facts.get(n)
+            if empty or boilerplate:
+                continue
+
+            n["_reason"] = (
+                f"neighbor of chunk_index="
+                f"{chunk.get('metadata', {}).get('chunk_index')}"
+            )
+            expanded.append(n)
+            seen.add(nid)
+
+            if len(expanded) >= policy.max_chunks:
+                return expanded
+
+    return expanded
+
+
+def _order_key(c: Dict):
+    meta = c.get("metadata", {})
+    if "chunk_index" in meta:
+        return (0, meta["chunk_index"])
+    return (1, c.get("distance", float("inf")))
+
+
+def assemble_context(
+    retrieved: List[Dict],
+    policy: ContextPolicy,
+    *,
+    query: str,
+    neighbor_index=None,
+) -> ContextPack:
+    """
+    Select, expand, order, budget and validate in one assembly.
+
+    Inputs:
+    - retrieved:      raw retrieval output (chunks are annotated in place,
+                      exactly as the individual passes do)
+    - policy:         ContextPolicy
+    - query:          the user query (stored on the pack)
+    - neighbor_index: optional ingestion-time neighbor index
+
+    Outputs:
+    - ContextPack identical to build_context_pack_from_chunks(
+        order_chunks(expand_with_neighbors(select_chunks(...))))
+    """
+    facts = _ChunkFacts(policy)
+
+    # ---- selection ----
+    if policy.selection_strategy == "distance":
+        approved, dropped = _select_by_distance(retrieved, policy, facts)
+    else:
+        # MMR is already a single vectorized pass
+        approved, dropped = select_chunks(retrieved, policy)
+
+    # ---- expansion + ordering ----
+    if neighbor_index is None:
+        neighbor_index = RetrievedNeighborIndex(retrieved)
+
+    ordered = sorted(_expand(approved, neighbor_index, policy, facts), key=_order_key)
+
+    # ---- budget + stats (one walk, precomputed lengths) ----
+    lengths = [facts.get(c)[0] for c in ordered]
+    in_tokens = policy.budget_unit == "tokens"
+    costs = [(n + 3) // 4 for n in lengths] if in_tokens else lengths
+    budget = context_budget(policy)
+
+    if policy.packing_strategy == "knapsack":
+        keep = pack_knapsack(ordered, policy, costs=costs)
+        drop_reason = "context budget exceeded (lower relevance per budget unit)"
+    elif policy.packing_strategy == "greedy":
+        keep = None
+        drop_reason = "context budget exceeded"
+    else:
+        raise ValueError(f"Unknown packing_strategy: {policy.packing_strategy}")
+
+    kept: List[Dict] = []
+    used = 0
+    used_chars = 0
+
+    for i, chunk in enumerate(ordered):
+        fits = (used + costs[i] <= budget) if keep is None else (i in keep)
+        if fits:
+            kept.append(chunk)
+            used += costs[i]
+            used_chars += lengths[i]
+        else:
+            dropped.append(record_budget_drop(chunk, drop_reason))
+
+    stats: Dict[str, Any] = {
+        "approved_count": len(kept),
+        "dropped_count": len(dropped),
+        "max_chars": policy.max_chars,
+        "used_chars": used_chars,
+        "remaining_chars": policy.max_chars - used_chars,
+        "budget_exhausted": used_chars >= policy.max_chars,
+    }
+
+    if in_tokens:
+        stats.update({
+            "max_tokens": budget,
+            "used_tokens": used,
+            "remaining_tokens": budget - used,
+            "budget_exhausted": used >= budget,
+        })
+
+    if policy.packing_strategy != "greedy":
+        stats["packing_strategy"] = policy.packing_strategy
+        stats["packed_relevance"] = sum(chunk_relevance(c) for c in kept)
+
+    is_valid, invalid_reason = validate_context_pack(
+        approved_chunks=kept,
+        policy=policy,
+        stats=stats,
+    )
+
+    return ContextPack(
+        query=query,
+        policy=policy,
+        approved_chunks=kept,
+        dropped_chunks=dropped,
+        stats=stats,
+        is_valid=is_valid,
+        invalid_reason=invalid_reason,
+    )
@@ -14,11 +14,25 @@ Design principles:
 - Human-readable reasons for every inclusion
 """
 
+import hashlib
+import re
+from functools import lru_cache
 from typing import List, Dict, Optional
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+from day04_retrieval_to_context.context_chunk import ContextChunk, DroppedChunkView
 from infrastructure.retrieval.retriever import retrieve_chunks
 
+DEFAULT_BOILERPLATE_MARKERS: Tuple[str, ...] = (
+    "DOCUMENT_START",
+    "TABLE OF CONTENTS",
+    "COPYRIGHT",
+    "ALL RIGHTS RESERVED",
+)
+
 @dataclass(frozen=True)
 class ContextPolicy:
     """
@@ -41,6 +55,31 @@ class ContextPolicy:
         Slightly higher threshold for ALL-CAPS headers,
         which often appear longer but still lack explanatory value.
 
+    - neighbor_window:
+        How many positions on each side of an approved chunk
+        neighbor expansion may pull in (±N).
+
+    - packing_strategy:
+        How chunks are fitted into the budget.
+        "greedy":   keep chunks in order while they fit (default)
+        "knapsack": maximize total relevance under the budget
+
+    - budget_unit:
+        "chars" (budget = max_chars) or
+        "tokens" (budget = max_context_tokens, estimated from length).
+
+    - selection_strategy:
+        "distance": closest chunks first (default)
+        "mmr":      Maximal Marginal Relevance; trades relevance against
+                    redundancy. Needs an 'embedding' on each candidate.
+
+    - mmr_lambda:
+        MMR trade-off: 1.0 = pure relevance, 0.0 = pure diversity.
+
+    - boilerplate_markers:
+        Case-insensitive markers that make a chunk boilerplate.
+        Compiled once into a single pattern per marker set.
+
     Why this matters:
     - Context quality is a POLICY decision, not an algorithmic one
     - Enterprise RAG systems must expose these knobs explicitly
@@ -51,6 +90,13 @@ class ContextPolicy:
     min_chars: int = 100         # NEW: minimum context size
     header_max_chars: int = 40
     uppercase_header_max_chars: int = 80
+    neighbor_window: int = 1
+    packing_strategy: str = "greedy"
+    budget_unit: str = "chars"
+    max_context_tokens: int = 750
+    selection_strategy: str = "distance"
+    mmr_lambda: float = 0.7
+    boilerplate_markers: Tuple[str, ...] = DEFAULT_BOILERPLATE_MARKERS
 
 @dataclass
 class ContextPack:
@@ -227,17 +273,44 @@ def record_drop(chunk: Dict, reason: str) -> Dict:
         - original chunk fields
         - '_dropped': True
         - '_drop_reason': explanation string
+      (a DroppedChunkView for ContextChunk records: same keys, no copy)
 
     Why this matters in RAG:
     - Silent exclusion causes invisible hallucinations
     - Knowing *what was dropped* is as important as knowing *what survived*
     """
+    if isinstance(chunk, (ContextChunk, DroppedChunkView)):
+        # Slotted records: a view, not a copy
+        return DroppedChunkView(chunk, reason)
+
     dropped = dict(chunk)
     dropped["_dropped"] = True
     dropped["_drop_reason"] = reason
     return dropped
 
-def is_boilerplate(text: str) -> bool:
+@lru_cache(maxsize=32)
+def compile_markers(markers: Tuple[str, ...]) -> "re.Pattern":
+    """
+    Compile a marker set into ONE case-insensitive alternation.
+
+    Purpose:
+    - Scan each chunk once, instead of once per marker
+    - Avoid building an uppercased copy of every chunk
+
+    Design notes:
+    - Cached per marker tuple: compiled once per process
+    """
+    if not markers:
+        return re.compile(r"(?!)")  # matches nothing
+    return re.compile(
+        "|".join(re.escape(m) for m in markers),
+        re.IGNORECASE,
+    )
+
+# Everything str.splitlines() treats as a line boundary
+_LINE_BREAK = re.compile(r"[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+def is_boilerplate(text: str, policy: Optional[ContextPolicy] = None) -> bool:
     """
     Determine whether a chunk is boilerplate and should never reach the LLM.
 
@@ -248,6 +321,8 @@ def is_boilerplate(text: str) -> bool:
     Inputs:
     - text:
         Raw chunk text from retrieval.
+    - policy:
+        Optional ContextPolicy supplying boilerplate_markers.
 
     Outputs:
     - True if the chunk is boilerplate and must be dropped.
@@ -261,15 +336,13 @@ def is_boilerplate(text: str) -> bool:
     Design notes:
     - Uses conservative keyword matching
     - Intentionally simple and explainable
+    - Markers are matched by one precompiled pattern
     """
-    BAD_MARKERS = [
-        "DOCUMENT_START",
-        "TABLE OF CONTENTS",
-        "COPYRIGHT",
-        "ALL RIGHTS RESERVED",
-    ]
-    upper = text.upper()
-    return any(marker in upper for marker in BAD_MARKERS)
+    markers = (
+        policy.boilerplate_markers if policy is not None
+        else DEFAULT_BOILERPLATE_MARKERS
+    )
+    return compile_markers(markers).search(text) is not None
 
 def looks_like_header(text: str, policy: ContextPolicy) -> bool:
     """
@@ -296,17 +369,128 @@ def looks_like_header(text: str, policy: ContextPolicy) -> bool:
     - Heuristic-based by necessity
     - Thresholds are policy-driven and configurable
     - Conservative to avoid dropping short explanations
+    - Stripped text is a single line iff it contains no line break:
+      no need to split it into lines
     """
-    lines = [l.strip() for l in text.strip().splitlines() if l.strip()]
+    stripped = text.strip()
 
-    if len(lines) == 1 and len(text) <= policy.header_max_chars:
+    if (
+        stripped
+        and len(text) <= policy.header_max_chars
+        and _LINE_BREAK.search(stripped) is None
+    ):
         return True
 
-    if text.isupper() and len(text) <= policy.uppercase_header_max_chars:
+    if len(text) <= policy.uppercase_header_max_chars and text.isupper():
         return True
 
     return False
 
+FILTER_FLAGS_KEY = "filter_signature"
+
+@lru_cache(maxsize=32)
+def filter_signature(policy: ContextPolicy) -> str:
+    """
+    Short hash of every policy field the text filters depend on.
+
+    Flags stored at ingestion are only trusted when their signature
+    matches the current policy: changing markers or thresholds
+    silently falls back to evaluating the filters again.
+    """
+    payload = repr((
+        policy.boilerplate_markers,
+        policy.header_max_chars,
+        policy.uppercase_header_max_chars,
+    ))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+def compute_filter_flags(text: str, policy: ContextPolicy) -> Dict[str, Any]:
+    """
+    Evaluate the text filters once, as storable metadata flags.
+
+    Purpose:
+    - Run filters at ingestion, not on every query
+    - Turn context selection into a flag check
+
+    Outputs:
+    - {"is_boilerplate": bool, "is_header": bool, "filter_signature": str}
+      (scalar values: safe for vector-store metadata)
+    """
+    text = text.strip()
+    return {
+        "is_boilerplate": is_boilerplate(text, policy),
+        "is_header": looks_like_header(text, policy),
+        FILTER_FLAGS_KEY: filter_signature(policy),
+    }
+
+def annotate_filter_flags(
+    chunks: List[Dict],
+    policy: ContextPolicy,
+) -> List[Dict]:
+    """
+    Batch variant of compute_filter_flags for ingestion.
+
+    Writes the flags into each chunk's metadata (in place)
+    and returns the chunks.
+    """
+    for chunk in chunks:
+        meta = chunk.setdefault("metadata", {})
+        meta.update(compute_filter_flags(chunk.get("text", ""), policy))
+    return chunks
+
+def chunk_filter_flags(chunk: Dict, policy: ContextPolicy) -> Tuple[bool, bool]:
+    """
+    (is_boilerplate, is_header) for a chunk.
+
+    Uses ingestion-time flags when their signature matches the policy,
+    otherwise evaluates the filters now.
+    """
+    meta = chunk.get("metadata") or {}
+
+    if meta.get(FILTER_FLAGS_KEY) == filter_signature(policy):
+        return bool(meta["is_boilerplate"]), bool(meta["is_header"])
+
+    text = chunk.get("text", "").strip()
+    return is_boilerplate(text, policy), looks_like_header(text, policy)
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token for English text).
+
+    Good enough for budgeting; exact counts belong to the tokenizer
+    of the model actually called.
+    """
+    return (len(text) + 3) // 4
+
+def chunk_cost(chunk: Dict, policy: ContextPolicy) -> int:
+    """
+    Budget cost of one chunk, in the policy's budget unit.
+    """
+    text = chunk.get("text", "")
+    if policy.budget_unit == "tokens":
+        return estimate_tokens(text)
+    return len(text)
+
+def context_budget(policy: ContextPolicy) -> int:
+    """
+    Total budget, in the policy's budget unit.
+    """
+    if policy.budget_unit == "tokens":
+        return policy.max_context_tokens
+    return policy.max_chars
+
+def chunk_relevance(chunk: Dict) -> float:
+    """
+    Relevance used by the knapsack packer: 1 - distance.
+
+    Chunks without a distance (e.g. neighbors) get a tiny positive
+    value: they fill leftover space but never displace evidence.
+    """
+    distance = chunk.get("distance")
+    if distance is None:
+        return 1e-6
+    return max(1.0 - distance, 0.0) + 1e-6
+
 def enforce_context_budget(
     chunks: list[Dict],
     policy: ContextPolicy,
@@ -325,7 +509,7 @@ def enforce_context_budget(
         Each chunk is expected to contain 'text'.
 
     - policy:
-        ContextPolicy containing max_chars.
+        ContextPolicy containing the budget and packing strategy.
 
     Outputs:
     - kept_chunks:
@@ -343,20 +527,28 @@ def enforce_context_budget(
     - Budgeting must occur BEFORE LLM invocation
     """
 
-    used_chars = 0
+    budget = context_budget(policy)
+
+    if policy.packing_strategy == "knapsack":
+        keep = pack_knapsack(chunks, policy)
+        drop_reason = "context budget exceeded (lower relevance per budget unit)"
+    elif policy.packing_strategy == "greedy":
+        keep = pack_greedy(chunks, policy)
+        drop_reason = "context budget exceeded"
+    else:
+        raise ValueError(f"Unknown packing_strategy: {policy.packing_strategy}")
+
     kept = []
     dropped = []
 
-    for chunk in chunks:
-        text_len = len(chunk.get("text", ""))
-
-        if used_chars + text_len <= policy.max_chars:
+    for i, chunk in enumerate(chunks):
+        if i in keep:
             kept.append(chunk)
-            used_chars += text_len
         else:
-            dropped_chunk = dict(chunk)
-            dropped_chunk["_drop_reason"] = "context budget exceeded"
-            dropped.append(dropped_chunk)
+            dropped.append(record_budget_drop(chunk, drop_reason))
+
+    used_chars = sum(len(c.get("text", "")) for c in kept)
+    used = sum(chunk_cost(c, policy) for c in kept)
 
     budget_stats = {
         "max_chars": policy.max_chars,
@@ -365,15 +557,198 @@ def enforce_context_budget(
         "budget_exhausted": used_chars >= policy.max_chars,
     }
 
+    if policy.budget_unit == "tokens":
+        budget_stats.update({
+            "max_tokens": budget,
+            "used_tokens": used,
+            "remaining_tokens": budget - used,
+            "budget_exhausted": used >= budget,
+        })
+
+    if policy.packing_strategy != "greedy":
+        budget_stats["packing_strategy"] = policy.packing_strategy
+        budget_stats["packed_relevance"] = sum(chunk_relevance(c) for c in kept)
+
     return kept, dropped, budget_stats
 
+def record_budget_drop(chunk: Dict, reason: str) -> Dict:
+    """
+    Drop record for a chunk that did not fit the budget.
+    """
+    if isinstance(chunk, (ContextChunk, DroppedChunkView)):
+        return DroppedChunkView(chunk, reason)
+
+    dropped_chunk = dict(chunk)
+    dropped_chunk["_drop_reason"] = reason
+    return dropped_chunk
+
+def pack_greedy(chunks: List[Dict], policy: ContextPolicy) -> set:
+    """
+    Keep chunks in order while they still fit.
+
+    Returns the indices of kept chunks.
+    """
+    budget = context_budget(policy)
+    used = 0
+    keep = set()
+
+    for i, chunk in enumerate(chunks):
+        cost = chunk_cost(chunk, policy)
+        if used + cost <= budget:
+            keep.add(i)
+            used += cost
+
+    return keep
+
+# Above this many DP cells, fall back to the ratio heuristic
+KNAPSACK_MAX_CELLS = 2_000_000
+
+# Costs are bucketed so the DP table stays small for large budgets
+KNAPSACK_MAX_CAPACITY = 2_000
+
+def pack_knapsack(
+    chunks: List[Dict],
+    policy: ContextPolicy,
+    costs: Optional[List[int]] = None,
+) -> set:
+    """
+    Choose the subset of chunks with maximum total relevance
+    that fits the budget (0/1 knapsack).
+
+    Purpose:
+    - Stop one long, mediocre chunk from evicting several
+      short, highly relevant ones
+
+    Outputs:
+    - Indices of kept chunks (the caller preserves input order)
+
+    Design notes:
+    - Exact DP over bucketed costs, vectorized per item with NumPy:
+      O(n × capacity) cells, ~100 candidates × 2000 buckets
+    - Costs are rounded UP when bucketed, so the result never
+      exceeds the real budget
+    - Greedy-by-ratio fallback when the table would be too large
+    - `costs` may be passed in when the caller already knows them
+    """
+    budget = context_budget(policy)
+    if costs is None:
+        costs = [chunk_cost(c, policy) for c in chunks]
+    values = [chunk_relevance(c) for c in chunks]
+
+    candidates = [i for i, cost in enumerate(costs) if cost <= budget]
+    if not candidates:
+        return set()
+
+    if sum(costs[i] for i in candidates) <= budget:
+        return set(candidates)
+
+    scale = max(1, -(-budget // KNAPSACK_MAX_CAPACITY))
+    capacity = budget // scale
+
+    if len(candidates) * (capacity + 1) > KNAPSACK_MAX_CELLS:
+        return _pack_by_ratio(candidates, costs, values, budget)
+
+    weights = [-(-costs[i] // scale) for i in candidates]
+
+    best = np.zeros(capacity + 1)
+    took = np.zeros((len(candidates), capacity + 1), dtype=bool)
+
+    for row, (i, w) in enumerate(zip(candidates, weights)):
+        if w > capacity:
+            continue
+        with_item = best[: capacity + 1 - w] + values[i]
+        improved = with_item > best[w:]
+        took[row, w:] = improved
+        best[w:] = np.where(improved, with_item, best[w:])
+
+    keep = set()
+    c = capacity
+    for row in range(len(candidates) - 1, -1, -1):
+        if took[row, c]:
+            keep.add(candidates[row])
+            c -= weights[row]
+
+    return keep
+
+def _pack_by_ratio(candidates, costs, values, budget) -> set:
+    """
+    Greedy by relevance per budget unit, compared against the
+    single most relevant chunk (the classic 1/2-approximation).
+    """
+    order = sorted(
+        candidates,
+        key=lambda i: values[i] / max(costs[i], 1),
+        reverse=True,
+    )
+
+    used = 0
+    keep = set()
+    for i in order:
+        if used + costs[i] <= budget:
+            keep.add(i)
+            used += costs[i]
+
+    best_single = max(candidates, key=lambda i: values[i])
+    if values[best_single] > sum(values[i] for i in keep):
+        return {best_single}
+
+    return keep
+
+class RetrievedNeighborIndex:
+    """
+    Neighbor index over a list of already-retrieved chunks.
+
+    Purpose:
+    - Replace a linear scan per approved chunk with a dict lookup
+    - Offer the same `neighbors(...)` interface as the ingestion-time
+      chunk store (infrastructure.retrieval.chunk_store.ChunkStore)
+
+    Why this matters in RAG:
+    - Larger retrieval fan-outs must not make context assembly quadratic
+
+    Design notes:
+    - Built once per expansion, O(len(chunks))
+    - Only knows chunks that were retrieved; the chunk store also
+      knows chunks that missed the top-k
+    """
+
+    def __init__(self, chunks: List[Dict]):
+        self._by_position: Dict[Tuple[Any, Any], Dict] = {}
+        for c in chunks:
+            key = chunk_position_key(c)
+            if key is not None:
+                self._by_position.setdefault(key, c)
+
+    def neighbors(self, doc_id, chunk_index: int, window: int = 1) -> List[Dict]:
+        found = []
+        for offset in range(1, window + 1):
+            for index in (chunk_index - offset, chunk_index + offset):
+                c = self._by_position.get((doc_id, index))
+                if c is not None:
+                    found.append(c)
+        return found
+
+def chunk_position_key(chunk: Dict) -> Optional[Tuple[Any, Any]]:
+    """
+    (doc_id, chunk_index) of a chunk, or None if it has no position.
+    """
+    meta = chunk.get("metadata", {})
+    doc_id = meta.get("doc_id")
+    idx = meta.get("chunk_index")
+
+    if doc_id is None or idx is None:
+        return None
+
+    return doc_id, idx
+
 def find_neighbor_chunks(
     chunk: Dict,
     all_chunks: List[Dict],
     policy: ContextPolicy,
+    neighbor_index=None,
 ) -> List[Dict]:
     """
-    Find immediate neighboring chunks belonging to the same document.
+    Find neighboring chunks belonging to the same document.
 
     Purpose:
     - Restore continuity lost during chunking
@@ -386,49 +761,45 @@ def find_neighbor_chunks(
 
     - all_chunks:
         Full list of retrieved chunks (raw, unfiltered).
-        Used as the search space for neighbors.
+        Used as the search space when no neighbor_index is given.
 
     - policy:
-        ContextPolicy controlling expansion behavior (future-proof).
+        ContextPolicy controlling expansion behavior (neighbor_window).
+
+    - neighbor_index:
+        Optional object with `neighbors(doc_id, chunk_index, window)`,
+        e.g. the ingestion-time chunk store.
 
     Outputs:
-    - List of neighbor chunk dictionaries (may be empty).
+    - List of neighbor chunk dictionaries (may be empty), nearest first.
 
     Why this matters in RAG:
     - Isolated chunks break reasoning chains
     - Neighbors reduce hallucination caused by missing context
 
     Design notes:
-    - Only immediate neighbors are considered (±1)
+    - Only positions within ±policy.neighbor_window are considered
     - Expansion is conservative by design
     """
 
-    meta = chunk.get("metadata", {})
-    doc_id = meta.get("doc_id")
-    idx = meta.get("chunk_index")
-
-    if doc_id is None or idx is None:
+    key = chunk_position_key(chunk)
+    if key is None:
         return []
 
-    neighbors = []
-
-    for c in all_chunks:
-        m = c.get("metadata", {})
-        if (
-            m.get("doc_id") == doc_id
-            and m.get("chunk_index") in {idx - 1, idx + 1}
-        ):
-            neighbors.append(c)
+    if neighbor_index is None:
+        neighbor_index = RetrievedNeighborIndex(all_chunks)
 
-    return neighbors
+    doc_id, idx = key
+    return neighbor_index.neighbors(doc_id, idx, policy.neighbor_window)
 
 def expand_with_neighbors(
     approved_chunks: List[Dict],
     all_chunks: List[Dict],
     policy: ContextPolicy,
+    neighbor_index=None,
 ) -> List[Dict]:
     """
-    Expand approved context chunks with their immediate neighbors.
+    Expand approved context chunks with their neighbors.
 
     Purpose:
     - Improve coherence of the final context
@@ -439,11 +810,16 @@ def expand_with_neighbors(
         Chunks already approved by selection logic.
 
     - all_chunks:
-        Full retrieval output (used only for neighbor lookup).
+        Full retrieval output (used for neighbor lookup
+        when no neighbor_index is given).
 
     - policy:
         ContextPolicy used to enforce limits.
 
+    - neighbor_index:
+        Optional ingestion-time index (e.g. the chunk store).
+        Lets expansion reach neighbors that missed the top-k.
+
     Outputs:
     - New list of chunks including neighbors.
       All added neighbors include explicit reasons.
@@ -454,31 +830,39 @@ def expand_with_neighbors(
 
     Design notes:
     - Neighbors do NOT bypass policy rules silently
-    - Duplicate chunks are avoided
+    - Duplicate chunks are avoided (by position, else identity)
+    - Cost is O(approved × window), not O(approved × retrieved)
     """
 
+    if neighbor_index is None:
+        neighbor_index = RetrievedNeighborIndex(all_chunks)
+
+    def dedupe_key(c):
+        return chunk_position_key(c) or id(c)
+
     expanded = []
     seen = set()
 
     for chunk in approved_chunks:
-        cid = id(chunk)
+        cid = dedupe_key(chunk)
         if cid not in seen:
             expanded.append(chunk)
             seen.add(cid)
 
-        neighbors = find_neighbor_chunks(chunk, all_chunks, policy)
+        neighbors = find_neighbor_chunks(
+            chunk, all_chunks, policy, neighbor_index=neighbor_index
+        )
 
         for n in neighbors:
-            nid = id(n)
+            nid = dedupe_key(n)
             if nid in seen:
                 continue
 
             # Apply basic filters again (safety)
-            text = n.get("text", "").strip()
-            if not text:
+            if not n.get("text", "").strip():
                 continue
 
-            if is_boilerplate(text):
+            if chunk_filter_flags(n, policy)[0]:
                 continue
 
             n["_reason"] = (
@@ -534,25 +918,39 @@ def select_chunks(
 
     approved = []
     dropped = []
+    # Recorded on every approved chunk when MMR could not run
+    fallback_note = ""
 
-    for chunk in sorted_chunks:
-        text = chunk.get("text", "").strip()
+    if policy.selection_strategy == "mmr":
+        candidates = []
+        for chunk in sorted_chunks:
+            reason = admissibility_drop_reason(chunk, policy)
+            if reason is not None:
+                dropped.append(record_drop(chunk, reason))
+            else:
+                candidates.append(chunk)
 
-        if not text:
-            dropped.append(record_drop(chunk, "empty text"))
-            continue
+        if all(c.get("embedding") is not None for c in candidates):
+            mmr_approved, mmr_dropped = select_mmr(candidates, policy)
+            return mmr_approved, dropped + mmr_dropped
 
-        if is_boilerplate(text):
-            dropped.append(record_drop(chunk, "boilerplate detected"))
-            continue
+        # No embeddings to compare: fall back to distance order
+        dropped = []
+        fallback_note = "mmr unavailable (candidates lack embeddings), distance order; "
 
-        if looks_like_header(text, policy):
-            dropped.append(record_drop(chunk, "structural header"))
+    elif policy.selection_strategy != "distance":
+        raise ValueError(f"Unknown selection_strategy: {policy.selection_strategy}")
+
+    for chunk in sorted_chunks:
+        reason = admissibility_drop_reason(chunk, policy)
+        if reason is not None:
+            dropped.append(record_drop(chunk, reason))
             continue
 
         # ---- APPROVED CHUNK ----
         chunk["_reason"] = (
-            "passed boilerplate filter; "
+            fallback_note
+            + "passed boilerplate filter; "
             "passed header filter; "
             f"semantic distance={chunk.get('distance')}"
         )
@@ -568,6 +966,99 @@ def select_chunks(
     return approved, dropped
 
 
+def admissibility_drop_reason(chunk: Dict, policy: ContextPolicy) -> Optional[str]:
+    """
+    Why a chunk may never enter context, or None if it is admissible.
+
+    Shared by every selection strategy, so filters cannot drift apart.
+    """
+    if not chunk.get("text", "").strip():
+        return "empty text"
+
+    boilerplate, header = chunk_filter_flags(chunk, policy)
+
+    if boilerplate:
+        return "boilerplate detected"
+
+    if header:
+        return "structural header"
+
+    return None
+
+def select_mmr(
+    candidates: List[Dict],
+    policy: ContextPolicy,
+) -> tuple[List[Dict], List[Dict]]:
+    """
+    Select up to max_chunks candidates by Maximal Marginal Relevance.
+
+    Purpose:
+    - Stop near-duplicate chunks from crowding out complementary evidence
+    - Send fewer, more informative chunks to the LLM
+
+    Inputs:
+    - candidates:
+        Admissible chunks, each with 'embedding' and 'distance'.
+    - policy:
+        ContextPolicy (max_chunks, mmr_lambda).
+
+    Outputs:
+    - approved chunks, in selection order, each with an MMR '_reason'
+    - dropped chunks, each with its redundancy in '_drop_reason'
+
+    Design notes:
+    - Relevance = 1 - distance (what retrieval already measured)
+    - Pairwise cosine similarities come from ONE matmul of the
+      normalized embedding matrix; each pick is then an O(n) update
+    """
+    if not candidates:
+        return [], []
+
+    embeddings = np.asarray([c["embedding"] for c in candidates], dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    embeddings = embeddings / np.where(norms == 0, 1.0, norms)
+    similarity = embeddings @ embeddings.T
+
+    relevance = np.asarray(
+        [1.0 - c.get("distance", 1.0) for c in candidates], dtype=np.float32
+    )
+    lam = policy.mmr_lambda
+
+    max_sim = np.zeros(len(candidates), dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+    picked: List[int] = []
+
+    while len(picked) < min(policy.max_chunks, len(candidates)):
+        scores = lam * relevance - (1.0 - lam) * max_sim
+        scores[~available] = -np.inf
+        i = int(np.argmax(scores))
+
+        candidates[i]["_reason"] = (
+            "passed boilerplate filter; "
+            "passed header filter; "
+            f"mmr rank={len(picked) + 1}; "
+            f"relevance={relevance[i]:.3f}; "
+            f"max similarity to selected={max_sim[i]:.3f}"
+        )
+
+        picked.append(i)
+        available[i] = False
+        max_sim = np.maximum(max_sim, similarity[i])
+
+    approved = [candidates[i] for i in picked]
+    dropped = [
+        record_drop(
+            candidates[i],
+            "not selected by MMR "
+            f"(max_chunks={policy.max_chunks}; "
+            f"max similarity to selected={max_sim[i]:.3f})",
+        )
+        for i in np.flatnonzero(available)
+    ]
+
+    return approved, dropped
+
+
 def order_chunks(chunks: List[Dict]) -> List[Dict]:
     """
     Decide the final ordering of context chunks.
@@ -711,6 +1202,35 @@ def build_context_pack_from_chunks(
         invalid_reason=invalid_reason,
     )
 
+def build_context_pack_from_retrieval(
+    *,
+    query: str,
+    retrieved_chunks: List[Dict],
+    policy: ContextPolicy,
+    neighbor_index=None,
+) -> ContextPack:
+    """
+    Full Day 4 assembly from raw retrieval output.
+
+    Same decisions as:
+    - select_chunks         (admissibility, max_chunks)
+    - expand_with_neighbors (continuity)
+    - order_chunks          (reading order)
+    - build_context_pack_from_chunks (budget + validation)
+    computed by the fused engine in assemble.assemble_context.
+
+    Deterministic for a given (candidates, policy, index):
+    see pack_cache.ContextPackCache for memoization.
+    """
+    from day04_retrieval_to_context.assemble import assemble_context
+
+    return assemble_context(
+        retrieved_chunks,
+        policy,
+        query=query,
+        neighbor_index=neighbor_index,
+    )
+
 def get_context_for_citation(citation_id):
     pass
 
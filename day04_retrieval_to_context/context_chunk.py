@@ -0,0 +1,280 @@
+"""
+Day 4 — Compact chunk records for context assembly.
+
+Retrieved chunks used to travel through Day 4 as plain dicts, copied
+at every drop decision and rebuilt again by the application layer.
+At hundreds of candidates per request that is a lot of short-lived
+hash tables.
+
+This module provides:
+- ContextChunk:
+    A __slots__ record for one candidate chunk plus its decision
+    annotations (_reason, _drop_reason). No per-instance __dict__.
+- FrozenContextChunk:
+    A read-only ContextChunk, for chunks shared between requests.
+- DroppedChunkView:
+    A read-only view "this chunk, dropped for reason X".
+    Recording a drop no longer copies the chunk.
+
+Both behave like Mappings with the familiar keys
+('text', 'metadata', 'distance', '_reason', ...), so code and tests
+written against dicts keep working unchanged.
+"""
+
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, Optional
+
+_UNSET = object()
+
+# Mapping key → slot name
+_FIELDS = {
+    "chunk_id": "_chunk_id",
+    "text": "_text",
+    "metadata": "_metadata",
+    "distance": "_distance",
+    "score": "_score",
+    "embedding": "_embedding",
+    "_reason": "_reason_",
+    "_drop_reason": "_drop_reason_",
+}
+
+
+class ContextChunk(MutableMapping):
+    """
+    One candidate context chunk.
+
+    Purpose:
+    - Carry text, metadata, retrieval geometry and decision annotations
+      in a fixed-layout record
+    - Keep dict-style access for existing Day 4–7 code
+
+    Design notes:
+    - Known keys live in slots; a key that was never set is ABSENT
+      (so `"distance" in chunk` means what it meant for dicts)
+    - Unknown keys go to a lazily created overflow dict
+    - Attribute access (chunk.chunk_id, chunk.text, ...) returns None
+      for absent fields
+    """
+
+    __slots__ = tuple(_FIELDS.values()) + ("_extra",)
+
+    def __init__(
+        self,
+        text: Any = _UNSET,
+        metadata: Any = _UNSET,
+        *,
+        chunk_id: Any = _UNSET,
+        distance: Any = _UNSET,
+        score: Any = _UNSET,
+        embedding: Any = _UNSET,
+        reason: Any = _UNSET,
+        drop_reason: Any = _UNSET,
+    ):
+        self._text = text
+        self._metadata = metadata
+        self._chunk_id = chunk_id
+        self._distance = distance
+        self._score = score
+        self._embedding = embedding
+        self._reason_ = reason
+        self._drop_reason_ = drop_reason
+        self._extra = None
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> "ContextChunk":
+        chunk = cls()
+        for key, value in data.items():
+            chunk[key] = value
+        return chunk
+
+    def copy(self) -> "ContextChunk":
+        """
+        Shallow copy: text, metadata and embedding are shared.
+        """
+        new = ContextChunk.__new__(ContextChunk)
+        for slot in _FIELDS.values():
+            setattr(new, slot, getattr(self, slot))
+        new._extra = dict(self._extra) if self._extra else None
+        return new
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    # ---- attribute access ----
+
+    @property
+    def chunk_id(self) -> Optional[str]:
+        return None if self._chunk_id is _UNSET else self._chunk_id
+
+    @property
+    def text(self) -> Optional[str]:
+        return None if self._text is _UNSET else self._text
+
+    @property
+    def metadata(self) -> Dict:
+        return {} if self._metadata is _UNSET else self._metadata
+
+    @property
+    def distance(self) -> Optional[float]:
+        return None if self._distance is _UNSET else self._distance
+
+    @property
+    def reason(self) -> Optional[str]:
+        return None if self._reason_ is _UNSET else self._reason_
+
+    # ---- Mapping protocol ----
+
+    def __getitem__(self, key: str) -> Any:
+        slot = _FIELDS.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+            if value is _UNSET:
+                raise KeyError(key)
+            return value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Hot path in Day 4: avoid exception-based lookups
+        slot = _FIELDS.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+            return default if value is _UNSET else value
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        slot = _FIELDS.get(key)
+        if slot is not None:
+            return getattr(self, slot) is not _UNSET
+        return self._extra is not None and key in self._extra
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        slot = _FIELDS.get(key)
+        if slot is not None:
+            setattr(self, slot, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        slot = _FIELDS.get(key)
+        if slot is not None:
+            if getattr(self, slot) is _UNSET:
+                raise KeyError(key)
+            setattr(self, slot, _UNSET)
+            return
+        if self._extra is None:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for key, slot in _FIELDS.items():
+            if getattr(self, slot) is not _UNSET:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"ContextChunk({self.to_dict()!r})"
+
+
+class FrozenContextChunk(ContextChunk):
+    """
+    A ContextChunk that rejects writes.
+
+    Purpose:
+    - Share one chunk between requests (e.g. cached ContextPacks)
+      while keeping ContextChunk attribute access
+
+    Design notes:
+    - __setitem__ / __delitem__ (and with them update, pop, clear,
+      setdefault) raise TypeError, like a read-only mapping
+    - copy() returns a regular, writable ContextChunk
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> "FrozenContextChunk":
+        chunk = ContextChunk.from_mapping(data)
+        frozen = cls.__new__(cls)
+        for slot in _FIELDS.values():
+            setattr(frozen, slot, getattr(chunk, slot))
+        frozen._extra = chunk._extra
+        return frozen
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        raise TypeError("FrozenContextChunk does not support item assignment")
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError("FrozenContextChunk does not support item deletion")
+
+    def __repr__(self) -> str:
+        return f"FrozenContextChunk({self.to_dict()!r})"
+
+
+class DroppedChunkView(Mapping):
+    """
+    Read-only view of a chunk that was excluded from context.
+
+    Purpose:
+    - Record WHY a chunk was dropped without copying it
+
+    Design notes:
+    - Reads fall through to the underlying chunk, except
+      '_drop_reason' (this view's reason) and '_dropped' (True)
+    - The underlying chunk is shared, not snapshotted
+    """
+
+    __slots__ = ("chunk", "drop_reason")
+
+    def __init__(self, chunk: Mapping, drop_reason: str):
+        if isinstance(chunk, DroppedChunkView):
+            chunk = chunk.chunk
+        self.chunk = chunk
+        self.drop_reason = drop_reason
+
+    @property
+    def chunk_id(self) -> Optional[str]:
+        return self.chunk.get("chunk_id")
+
+    @property
+    def text(self) -> Optional[str]:
+        return self.chunk.get("text")
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "_drop_reason":
+            return self.drop_reason
+        if key == "_dropped":
+            return True
+        return self.chunk[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "_drop_reason":
+            return self.drop_reason
+        if key == "_dropped":
+            return True
+        return self.chunk.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key in ("_drop_reason", "_dropped") or key in self.chunk
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.chunk:
+            if key not in ("_drop_reason", "_dropped"):
+                yield key
+        yield "_dropped"
+        yield "_drop_reason"
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"DroppedChunkView({dict(self)!r})"
@@ -0,0 +1,162 @@
+"""
+Day 4 — ContextPack memoization.
+
+Popular queries bring back the same top-k candidates again and again.
+Selection → expansion → ordering → budgeting is deterministic for a
+given candidate set and policy, so its result can be reused.
+
+Cache key:
+- candidate set: sorted (chunk_id, distance bucket) pairs
+- ContextPolicy (frozen, hashable: every field is part of the key)
+- index version (neighbors and flags come from the index)
+- variant (which assembly function built the pack)
+
+Cached packs are stored FROZEN:
+- chunks become FrozenContextChunks (attribute access kept),
+  their metadata read-only mappings
+- chunk lists become tuples
+Each hit gets a fresh ContextPack shell (own query, own stats dict),
+so a downstream stage can annotate its pack but never corrupt the
+cached one.
+"""
+
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Callable, Dict, Hashable, List, Mapping, Optional, Tuple
+
+from day04_retrieval_to_context.build_context import ContextPack, ContextPolicy
+from day04_retrieval_to_context.context_chunk import FrozenContextChunk
+
+CandidateKey = Tuple[Tuple[str, int], ...]
+
+
+def candidate_set_key(
+    candidates: List[Mapping],
+    *,
+    distance_bucket: float = 1e-3,
+) -> Optional[CandidateKey]:
+    """
+    Order-independent key for a candidate set.
+
+    Distances are bucketed: float noise between identical searches
+    must not defeat the cache.
+    Returns None when a candidate has no chunk_id (not cacheable).
+    """
+    key = []
+    for c in candidates:
+        chunk_id = c.get("chunk_id")
+        if chunk_id is None:
+            return None
+        distance = c.get("distance")
+        bucket = -1 if distance is None else int(round(distance / distance_bucket))
+        key.append((chunk_id, bucket))
+    return tuple(sorted(key))
+
+
+def _freeze_chunk(chunk: Mapping) -> FrozenContextChunk:
+    frozen = dict(chunk)
+    if isinstance(frozen.get("metadata"), dict):
+        frozen["metadata"] = MappingProxyType(dict(frozen["metadata"]))
+    return FrozenContextChunk.from_mapping(frozen)
+
+
+class _FrozenPack:
+    __slots__ = ("policy", "approved", "dropped", "is_valid", "invalid_reason", "stats")
+
+    def __init__(self, pack: ContextPack):
+        self.policy = pack.policy
+        self.approved = tuple(_freeze_chunk(c) for c in pack.approved_chunks)
+        self.dropped = tuple(_freeze_chunk(c) for c in pack.dropped_chunks)
+        self.is_valid = pack.is_valid
+        self.invalid_reason = pack.invalid_reason
+        self.stats = MappingProxyType(dict(pack.stats))
+
+    def thaw(self, query: str) -> ContextPack:
+        return ContextPack(
+            query=query,
+            policy=self.policy,
+            approved_chunks=list(self.approved),
+            dropped_chunks=list(self.dropped),
+            is_valid=self.is_valid,
+            invalid_reason=self.invalid_reason,
+            stats=dict(self.stats),
+        )
+
+
+class ContextPackCache:
+    """
+    Thread-safe LRU cache of assembled ContextPacks.
+    """
+
+    def __init__(self, max_entries: int = 512, *, distance_bucket: float = 1e-3):
+        self.max_entries = max_entries
+        self.distance_bucket = distance_bucket
+
+        self._entries: "OrderedDict[Hashable, _FrozenPack]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(
+        self,
+        *,
+        query: str,
+        candidates: List[Mapping],
+        policy: ContextPolicy,
+        build: Callable[[], ContextPack],
+        index_version: int = 0,
+        variant: Hashable = None,
+    ) -> ContextPack:
+        """
+        Return the cached pack for this candidate set, or build it.
+
+        `build` must be a pure function of (candidates, policy):
+        the query text is NOT part of the key, only of the returned pack.
+        `variant` separates packs built by different assembly functions.
+        """
+        candidate_key = candidate_set_key(
+            candidates, distance_bucket=self.distance_bucket
+        )
+        if candidate_key is None:
+            return build()
+
+        key = (candidate_key, policy, index_version, variant)
+
+        with self._lock:
+            frozen = self._entries.get(key)
+            if frozen is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return frozen.thaw(query)
+            self.misses += 1
+
+        pack = build()
+        frozen = _FrozenPack(pack)
+
+        with self._lock:
+            self._entries[key] = frozen
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        # The caller also gets a frozen view: first and later
+        # requests see identical (read-only) chunks
+        return frozen.thaw(query)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
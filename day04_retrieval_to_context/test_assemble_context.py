@@ -0,0 +1,131 @@
+import copy
+import random
+
+import pytest
+
+from build_context import (
+    ContextPolicy,
+    build_context_pack_from_chunks,
+    expand_with_neighbors,
+    order_chunks,
+    select_chunks,
+)
+from day04_retrieval_to_context.assemble import assemble_context
+from day04_retrieval_to_context.context_chunk import ContextChunk
+from infrastructure.retrieval.chunk_store import ChunkStore
+
+TEXTS = [
+    "Refunds are processed within five business days after approval.",
+    "You may cancel within 30 days for a full refund.",
+    "Shipping is free for orders above fifty dollars in most regions.",
+    "Gift cards never expire and can be used online or in store.",
+    "COPYRIGHT 2022 ACME CORP",
+    "DOCUMENT_START\nCompany Policy",
+    "REFUND POLICY",
+    "   ",
+    "Short.",
+]
+
+
+def random_candidates(rng):
+    chunks = []
+    for _ in range(rng.randint(0, 14)):
+        doc = rng.choice(["a", "b", "c"])
+        index = rng.randint(0, 8)
+        chunk = {
+            "chunk_id": f"{doc}::{index:03d}",
+            "text": rng.choice(TEXTS) * rng.randint(1, 4),
+            "metadata": {"doc_id": doc, "chunk_index": index, "source": f"{doc}::{index:03d}"},
+        }
+        if rng.random() < 0.15:
+            chunk["metadata"] = {"source": "loose"}
+        if rng.random() < 0.9:
+            chunk["distance"] = round(rng.random(), 3)
+        if rng.random() < 0.5:
+            chunk["embedding"] = [rng.random() for _ in range(4)]
+        chunks.append(chunk)
+    return chunks
+
+
+def random_policy(rng):
+    return ContextPolicy(
+        max_chunks=rng.randint(1, 8),
+        max_chars=rng.randint(50, 600),
+        min_chunks=rng.randint(1, 3),
+        min_chars=rng.randint(0, 200),
+        neighbor_window=rng.randint(0, 2),
+        packing_strategy=rng.choice(["greedy", "knapsack"]),
+        budget_unit=rng.choice(["chars", "tokens"]),
+        max_context_tokens=rng.randint(20, 150),
+        selection_strategy=rng.choice(["distance", "distance", "mmr"]),
+    )
+
+
+def reference_pack(query, retrieved, policy, neighbor_index=None):
+    approved, dropped = select_chunks(retrieved, policy)
+    expanded = expand_with_neighbors(
+        approved_chunks=approved,
+        all_chunks=retrieved,
+        policy=policy,
+        neighbor_index=neighbor_index,
+    )
+    return build_context_pack_from_chunks(
+        query=query,
+        policy=policy,
+        approved_chunks=order_chunks(expanded),
+        dropped_chunks=dropped,
+    )
+
+
+def as_plain(pack):
+    return (
+        [dict(c) for c in pack.approved_chunks],
+        [dict(c) for c in pack.dropped_chunks],
+        pack.stats,
+        pack.is_valid,
+        pack.invalid_reason,
+    )
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_fused_assembly_matches_pass_pipeline(seed):
+    rng = random.Random(seed)
+    candidates = random_candidates(rng)
+    policy = random_policy(rng)
+
+    expected = reference_pack("q", copy.deepcopy(candidates), policy)
+    actual = assemble_context(copy.deepcopy(candidates), policy, query="q")
+
+    assert as_plain(actual) == as_plain(expected)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_fused_assembly_matches_with_context_chunks(seed):
+    rng = random.Random(seed)
+    candidates = random_candidates(rng)
+    policy = random_policy(rng)
+
+    def records():
+        return [ContextChunk.from_mapping(copy.deepcopy(c)) for c in candidates]
+
+    expected = reference_pack("q", records(), policy)
+    actual = assemble_context(records(), policy, query="q")
+
+    assert as_plain(actual) == as_plain(expected)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_fused_assembly_matches_with_chunk_store(seed):
+    rng = random.Random(seed)
+    candidates = [c for c in random_candidates(rng) if "doc_id" in c["metadata"]]
+    policy = random_policy(rng)
+
+    store = ChunkStore()
+    store.add(copy.deepcopy(candidates))
+
+    expected = reference_pack("q", copy.deepcopy(candidates), policy, neighbor_index=store)
+    actual = assemble_context(
+        copy.deepcopy(candidates), policy, query="q", neighbor_index=store
+    )
+
+    assert as_plain(actual) == as_plain(expected)
@@ -0,0 +1,91 @@
+import pytest
+
+from build_context import (
+    ContextPolicy,
+    enforce_context_budget,
+    record_drop,
+    select_chunks,
+)
+from day04_retrieval_to_context.context_chunk import ContextChunk, DroppedChunkView
+
+EXPLANATION = "Refunds are processed within 5-7 business days after approval."
+
+
+def make_chunk(**fields):
+    return ContextChunk.from_mapping({
+        "text": EXPLANATION,
+        "metadata": {"source": "policy.txt::001"},
+        **fields,
+    })
+
+
+def test_context_chunk_is_slotted():
+    chunk = make_chunk()
+
+    assert not hasattr(chunk, "__dict__")
+    with pytest.raises(AttributeError):
+        chunk.unexpected_attribute = 1
+
+
+def test_context_chunk_behaves_like_the_dict_it_replaces():
+    data = {
+        "text": EXPLANATION,
+        "metadata": {"source": "policy.txt::001"},
+        "chunk_id": "policy.txt::001",
+        "distance": 0.2,
+        "custom": "kept in overflow",
+    }
+    chunk = ContextChunk.from_mapping(data)
+
+    assert chunk == data
+    assert dict(chunk) == data
+    assert chunk.get("score") is None
+    assert "score" not in chunk
+    assert "distance" in chunk
+    assert chunk.chunk_id == "policy.txt::001"
+
+    chunk["_reason"] = "approved"
+    assert chunk.reason == "approved"
+
+    del chunk["distance"]
+    assert "distance" not in chunk
+    assert chunk.distance is None
+
+
+def test_drops_are_views_not_copies():
+    chunk = make_chunk(distance=0.1)
+
+    dropped = record_drop(chunk, "structural header")
+
+    assert isinstance(dropped, DroppedChunkView)
+    assert dropped.chunk is chunk
+    assert dropped["_drop_reason"] == "structural header"
+    assert dropped["_dropped"] is True
+    assert dropped["text"] == EXPLANATION
+    assert "_drop_reason" not in chunk
+
+    # Re-dropping a dropped chunk does not nest views
+    assert record_drop(dropped, "again").chunk is chunk
+
+
+def test_budget_drops_are_views():
+    chunks = [make_chunk(distance=0.1), make_chunk(distance=0.2)]
+
+    kept, dropped, _ = enforce_context_budget(
+        chunks, ContextPolicy(max_chars=len(EXPLANATION))
+    )
+
+    assert kept == [chunks[0]]
+    assert dropped[0].chunk is chunks[1]
+    assert dropped[0]["_drop_reason"] == "context budget exceeded"
+
+
+def test_selection_annotates_records_in_place():
+    chunk = make_chunk(distance=0.1)
+    header = ContextChunk.from_mapping({"text": "Refund Policy", "distance": 0.05})
+
+    approved, dropped = select_chunks([chunk, header], ContextPolicy())
+
+    assert approved[0] is chunk
+    assert "semantic distance=0.1" in chunk.reason
+    assert dropped[0].chunk is header
@@ -0,0 +1,49 @@
+from build_context import (
+    ContextPolicy,
+    annotate_filter_flags,
+    compile_markers,
+    filter_signature,
+    is_boilerplate,
+    select_chunks,
+)
+
+EXPLANATION = "Refunds are processed within 5-7 business days after approval."
+
+
+def test_markers_are_configurable_and_case_insensitive():
+    policy = ContextPolicy(boilerplate_markers=("internal use only",))
+
+    assert is_boilerplate("INTERNAL USE ONLY - draft", policy)
+    assert not is_boilerplate("COPYRIGHT 2024", policy)
+    assert is_boilerplate("Copyright 2024")  # default markers
+
+
+def test_marker_patterns_are_compiled_once():
+    markers = ("A", "B")
+    assert compile_markers(markers) is compile_markers(markers)
+
+
+def test_ingestion_flags_turn_selection_into_a_flag_check():
+    policy = ContextPolicy()
+    chunk = {"text": EXPLANATION, "distance": 0.1, "metadata": {}}
+    annotate_filter_flags([chunk], policy)
+
+    assert chunk["metadata"]["is_boilerplate"] is False
+    assert chunk["metadata"]["filter_signature"] == filter_signature(policy)
+
+    # Selection trusts the stored flag instead of re-reading the text
+    chunk["metadata"]["is_boilerplate"] = True
+    approved, dropped = select_chunks([chunk], policy)
+
+    assert approved == []
+    assert dropped[0]["_drop_reason"] == "boilerplate detected"
+
+
+def test_flags_from_another_policy_are_ignored():
+    chunk = {"text": EXPLANATION, "distance": 0.1, "metadata": {}}
+    annotate_filter_flags([chunk], ContextPolicy(boilerplate_markers=("refunds",)))
+
+    assert chunk["metadata"]["is_boilerplate"] is True
+
+    approved, _ = select_chunks([chunk], ContextPolicy())
+    assert approved == [chunk]
@@ -0,0 +1,86 @@
+import itertools
+import random
+
+from build_context import (
+    ContextPolicy,
+    chunk_relevance,
+    enforce_context_budget,
+    estimate_tokens,
+    pack_knapsack,
+)
+
+
+def chunk(length, distance, name):
+    return {"text": name[0] * length, "distance": distance, "name": name}
+
+
+def test_knapsack_prefers_several_relevant_chunks_over_one_long_chunk():
+    chunks = [
+        chunk(90, 0.60, "long mediocre"),
+        chunk(30, 0.10, "short a"),
+        chunk(30, 0.15, "short b"),
+        chunk(30, 0.20, "short c"),
+    ]
+
+    greedy_kept, _, _ = enforce_context_budget(chunks, ContextPolicy(max_chars=100))
+    kept, dropped, stats = enforce_context_budget(
+        chunks, ContextPolicy(max_chars=100, packing_strategy="knapsack")
+    )
+
+    assert [c["name"] for c in greedy_kept] == ["long mediocre"]
+    assert [c["name"] for c in kept] == ["short a", "short b", "short c"]
+    assert stats["used_chars"] == 90
+    assert stats["packing_strategy"] == "knapsack"
+
+    assert [d["name"] for d in dropped] == ["long mediocre"]
+    assert all("_drop_reason" in d for d in dropped)
+
+
+def test_knapsack_matches_brute_force_optimum():
+    rng = random.Random(7)
+    policy = ContextPolicy(max_chars=200, packing_strategy="knapsack")
+
+    for _ in range(25):
+        chunks = [
+            chunk(rng.randint(10, 120), rng.random(), f"c{i}")
+            for i in range(10)
+        ]
+
+        keep = pack_knapsack(chunks, policy)
+        assert sum(len(chunks[i]["text"]) for i in keep) <= 200
+
+        best = max(
+            sum(chunk_relevance(chunks[i]) for i in subset)
+            for r in range(len(chunks) + 1)
+            for subset in itertools.combinations(range(len(chunks)), r)
+            if sum(len(chunks[i]["text"]) for i in subset) <= 200
+        )
+        got = sum(chunk_relevance(chunks[i]) for i in keep)
+        assert abs(got - best) < 1e-9
+
+
+def test_large_budgets_are_bucketed_but_never_exceeded():
+    rng = random.Random(3)
+    chunks = [chunk(rng.randint(200, 2_000), rng.random(), f"c{i}") for i in range(100)]
+    policy = ContextPolicy(max_chars=20_000, packing_strategy="knapsack")
+
+    kept, dropped, stats = enforce_context_budget(chunks, policy)
+
+    assert stats["used_chars"] <= 20_000
+    assert len(kept) + len(dropped) == 100
+
+
+def test_token_budget_unit():
+    chunks = [chunk(400, 0.1, "a"), chunk(400, 0.2, "b")]
+    policy = ContextPolicy(
+        max_chars=10_000,
+        budget_unit="tokens",
+        max_context_tokens=estimate_tokens("x" * 400),
+        packing_strategy="knapsack",
+    )
+
+    kept, dropped, stats = enforce_context_budget(chunks, policy)
+
+    assert [c["name"] for c in kept] == ["a"]
+    assert stats["used_tokens"] == 100
+    assert stats["budget_exhausted"] is True
@@ -0,0 +1,76 @@
+from build_context import ContextPolicy, select_chunks
+
+TEXT = "Refunds are processed within 5-7 business days after approval."
+
+
+def candidate(name, distance, embedding):
+    return {
+        "text": f"{TEXT} ({name})",
+        "distance": distance,
+        "embedding": embedding,
+        "name": name,
+    }
+
+
+def near_duplicates_and_one_complement():
+    return [
+        candidate("dup a", 0.10, [1.0, 0.0, 0.0]),
+        candidate("dup b", 0.11, [0.99, 0.01, 0.0]),
+        candidate("dup c", 0.12, [0.98, 0.02, 0.0]),
+        candidate("complement", 0.20, [0.0, 1.0, 0.0]),
+    ]
+
+
+def test_distance_strategy_keeps_near_duplicates():
+    approved, _ = select_chunks(
+        near_duplicates_and_one_complement(), ContextPolicy(max_chunks=2)
+    )
+
+    assert [c["name"] for c in approved] == ["dup a", "dup b"]
+
+
+def test_mmr_prefers_complementary_evidence():
+    approved, dropped = select_chunks(
+        near_duplicates_and_one_complement(),
+        ContextPolicy(max_chunks=2, selection_strategy="mmr", mmr_lambda=0.5),
+    )
+
+    assert [c["name"] for c in approved] == ["dup a", "complement"]
+    assert "mmr rank=2" in approved[1]["_reason"]
+
+    assert sorted(d["name"] for d in dropped) == ["dup b", "dup c"]
+    assert all("not selected by MMR" in d["_drop_reason"] for d in dropped)
+
+
+def test_mmr_lambda_one_is_pure_relevance():
+    approved, _ = select_chunks(
+        near_duplicates_and_one_complement(),
+        ContextPolicy(max_chunks=2, selection_strategy="mmr", mmr_lambda=1.0),
+    )
+
+    assert [c["name"] for c in approved] == ["dup a", "dup b"]
+
+
+def test_mmr_still_applies_admissibility_filters():
+    chunks = near_duplicates_and_one_complement()
+    chunks.append({"text": "COPYRIGHT 2024", "distance": 0.0, "embedding": [0, 0, 1]})
+
+    approved, dropped = select_chunks(
+        chunks, ContextPolicy(max_chunks=5, selection_strategy="mmr")
+    )
+
+    assert len(approved) == 4
+    assert [d["_drop_reason"] for d in dropped] == ["boilerplate detected"]
+
+
+def test_mmr_without_embeddings_falls_back_to_distance_order():
+    chunks = near_duplicates_and_one_complement()
+    for c in chunks:
+        del c["embedding"]
+
+    approved, _ = select_chunks(
+        chunks, ContextPolicy(max_chunks=2, selection_strategy="mmr")
+    )
+
+    assert [c["name"] for c in approved] == ["dup a", "dup b"]
+    assert all(c["_reason"].startswith("mmr unavailable") for c in approved)
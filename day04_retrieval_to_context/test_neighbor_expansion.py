@@ -0,0 +1,80 @@
+from build_context import (
+    ContextPolicy,
+    RetrievedNeighborIndex,
+    expand_with_neighbors,
+    find_neighbor_chunks,
+)
+from infrastructure.retrieval.chunk_store import ChunkStore
+
+
+def make_chunk(index, doc_id="policy1", distance=0.5):
+    """
+    One positioned chunk of a synthetic document.
+    """
+    return {
+        "chunk_id": f"{doc_id}::{index:03d}",
+        "text": f"Paragraph {index} of {doc_id} with enough words to matter.",
+        "distance": distance,
+        "metadata": {"doc_id": doc_id, "chunk_index": index},
+    }
+
+
+def test_window_controls_neighbor_reach():
+    chunks = [make_chunk(i) for i in range(10)]
+    anchor = chunks[5]
+
+    narrow = find_neighbor_chunks(anchor, chunks, ContextPolicy(neighbor_window=1))
+    wide = find_neighbor_chunks(anchor, chunks, ContextPolicy(neighbor_window=2))
+
+    assert [c["metadata"]["chunk_index"] for c in narrow] == [4, 6]
+    assert [c["metadata"]["chunk_index"] for c in wide] == [4, 6, 3, 7]
+
+
+def test_retrieved_index_ignores_other_documents():
+    chunks = [make_chunk(1), make_chunk(2, doc_id="other")]
+    index = RetrievedNeighborIndex(chunks)
+
+    assert index.neighbors("policy1", 1, window=1) == []
+
+
+def test_chunk_store_supplies_neighbors_outside_top_k():
+    store = ChunkStore()
+    store.add(make_chunk(i) for i in range(10))
+
+    approved = [make_chunk(5, distance=0.1)]
+    expanded = expand_with_neighbors(
+        approved_chunks=approved,
+        all_chunks=approved,          # neighbors were NOT retrieved
+        policy=ContextPolicy(max_chunks=5, neighbor_window=1),
+        neighbor_index=store,
+    )
+
+    assert [c["metadata"]["chunk_index"] for c in expanded] == [5, 4, 6]
+    assert expanded[1]["_reason"] == "neighbor of chunk_index=5"
+
+
+def test_neighbors_are_deduplicated_by_position():
+    store = ChunkStore()
+    store.add(make_chunk(i) for i in range(4))
+
+    # Chunk 2 is approved AND a stored neighbor of chunk 1 (a different dict)
+    approved = [make_chunk(1, distance=0.1), make_chunk(2, distance=0.2)]
+    expanded = expand_with_neighbors(
+        approved_chunks=approved,
+        all_chunks=approved,
+        policy=ContextPolicy(max_chunks=10),
+        neighbor_index=store,
+    )
+
+    indices = [c["metadata"]["chunk_index"] for c in expanded]
+    assert sorted(indices) == [0, 1, 2, 3]
+    assert len(indices) == len(set(indices))
+
+
+def test_chunk_store_neighbors_are_copies():
+    store = ChunkStore()
+    store.add(make_chunk(i) for i in range(3))
+
+    store.neighbors("policy1", 1)[0]["_reason"] = "mutated"
+
+    assert "_reason" not in store.get("policy1::000")
@@ -0,0 +1,104 @@
+import pytest
+
+from build_context import ContextPolicy, build_context_pack_from_retrieval
+from day04_retrieval_to_context.pack_cache import ContextPackCache, candidate_set_key
+
+
+def retrieved():
+    return [
+        {
+            "chunk_id": f"policy.txt::{i:03d}",
+            "text": f"Refund rule number {i} explains how approvals and payouts work.",
+            "distance": 0.1 * i,
+            "metadata": {"doc_id": "policy.txt", "chunk_index": i, "source": f"policy.txt::{i:03d}"},
+        }
+        for i in range(1, 4)
+    ]
+
+
+def get(cache, query="q", candidates=None, policy=None, index_version=0, calls=None):
+    policy = policy or ContextPolicy(min_chars=10)
+    candidates = candidates if candidates is not None else retrieved()
+
+    def build():
+        if calls is not None:
+            calls.append(query)
+        return build_context_pack_from_retrieval(
+            query=query, retrieved_chunks=candidates, policy=policy
+        )
+
+    return cache.get_or_build(
+        query=query,
+        candidates=candidates,
+        policy=policy,
+        index_version=index_version,
+        build=build,
+    )
+
+
+def test_candidate_key_ignores_order_and_float_noise():
+    a = retrieved()
+    b = list(reversed(retrieved()))
+    b[0]["distance"] += 1e-7
+
+    assert candidate_set_key(a) == candidate_set_key(b)
+    assert candidate_set_key([{"text": "no id"}]) is None
+
+
+def test_hit_reuses_pack_for_new_query():
+    cache = ContextPackCache()
+    calls = []
+
+    first = get(cache, query="how do refunds work", calls=calls)
+    second = get(cache, query="refund rules?", calls=calls)
+
+    assert calls == ["how do refunds work"]
+    assert second.query == "refund rules?"
+    assert second.approved_chunks == first.approved_chunks
+    assert second.stats == first.stats
+    assert cache.stats()["hits"] == 1
+
+
+def test_cached_pack_cannot_be_mutated_downstream():
+    cache = ContextPackCache()
+    pack = get(cache)
+
+    with pytest.raises(TypeError):
+        pack.approved_chunks[0]["_reason"] = "tampered"
+    with pytest.raises(TypeError):
+        pack.approved_chunks[0]["metadata"]["source"] = "tampered"
+    with pytest.raises(TypeError):
+        pack.approved_chunks[0].update(text="tampered")
+    # Still a ContextChunk for Day 5–7
+    assert pack.approved_chunks[0].chunk_id == "policy.txt::001"
+
+    # Pack shells are per request: annotating one leaves the cache intact
+    pack.stats["retrieved_count"] = 99
+    pack.approved_chunks.clear()
+
+    again = get(cache)
+    assert "retrieved_count" not in again.stats
+    assert len(again.approved_chunks) == 3
+
+
+def test_policy_and_index_version_are_part_of_the_key():
+    cache = ContextPackCache()
+    calls = []
+
+    get(cache, calls=calls)
+    get(cache, calls=calls, policy=ContextPolicy(min_chars=10, max_chunks=2))
+    get(cache, calls=calls, index_version=1)
+
+    assert len(calls) == 3
+
+
+def test_lru_eviction():
+    cache = ContextPackCache(max_entries=1)
+    calls = []
+
+    get(cache, calls=calls, index_version=1)
+    get(cache, calls=calls, index_version=2)
+    get(cache, calls=calls, index_version=1)
+
+    assert len(calls) == 3
+    assert cache.stats()["evictions"] == 2
@@ -1,12 +1,139 @@
 # day05_context_to_answer/answer_generator.py
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
 from infrastructure.llm.base import LLM
+from infrastructure.llm.tokenizer import Tokenizer, get_tokenizer
 from .schemas import Answer, Citation
 from .policies import GenerationPolicy
-from .prompt import render_prompt
-from .citation_validator import validate_citations
+from .prompt import render_canonical_prompt, render_prompt
+from .citation_validator import StreamingCitationValidator, validate_citations
+from .compression import compress_chunks
+
+
+@dataclass
+class PreparedPrompt:
+    """
+    Everything decided BEFORE the LLM is called.
+    """
+    prompt: str
+    sources: list
+    generation_stats: dict = field(default_factory=dict)
+
+
+def generate_answer(
+    *,
+    context_pack,
+    llm: LLM,
+    policy: GenerationPolicy,
+    embed=None,
+    prefix_tracker=None,
+) -> Answer:
+    prepared = prepare_prompt(
+        context_pack=context_pack,
+        policy=policy,
+        embed=embed,
+        prefix_tracker=prefix_tracker,
+        tokenizer=get_tokenizer(getattr(llm, "model", None)),
+    )
+    if isinstance(prepared, Answer):
+        return prepared
+
+    if policy.stream and hasattr(llm, "stream"):
+        validator = StreamingCitationValidator(prepared.sources)
+        deltas = llm.stream(
+            prompt=prepared.prompt,
+            max_tokens=policy.max_answer_tokens,
+            temperature=policy.temperature,
+        )
+        try:
+            for delta in deltas:
+                if validator.feed(delta) is not None:
+                    break
+        finally:
+            # Stop paying for tokens we will never use
+            close = getattr(deltas, "close", None)
+            if close is not None:
+                close()
 
+        return _accept_stream(validator, prepared)
+
+    raw = llm.generate(
+        prompt=prepared.prompt,
+        max_tokens=policy.max_answer_tokens,
+        temperature=policy.temperature,
+    )
+
+    return accept_completion(raw, prepared)
+
+
+async def agenerate_answer(
+    *,
+    context_pack,
+    llm: LLM,
+    policy: GenerationPolicy,
+    embed=None,
+    prefix_tracker=None,
+) -> Answer:
+    """
+    Async variant of `generate_answer`: same decisions, only the LLM
+    call is awaited.
+    """
+    prepared = prepare_prompt(
+        context_pack=context_pack,
+        policy=policy,
+        embed=embed,
+        prefix_tracker=prefix_tracker,
+        tokenizer=get_tokenizer(getattr(llm, "model", None)),
+    )
+    if isinstance(prepared, Answer):
+        return prepared
+
+    if policy.stream and hasattr(llm, "astream"):
+        validator = StreamingCitationValidator(prepared.sources)
+        deltas = llm.astream(
+            prompt=prepared.prompt,
+            max_tokens=policy.max_answer_tokens,
+            temperature=policy.temperature,
+        )
+        try:
+            async for delta in deltas:
+                if validator.feed(delta) is not None:
+                    break
+        finally:
+            aclose = getattr(deltas, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+        return _accept_stream(validator, prepared)
+
+    raw = await llm.agenerate(
+        prompt=prepared.prompt,
+        max_tokens=policy.max_answer_tokens,
+        temperature=policy.temperature,
+    )
+
+    return accept_completion(raw, prepared)
+
+
+def prepare_prompt(
+    *,
+    context_pack,
+    policy: GenerationPolicy,
+    embed=None,
+    prefix_tracker=None,
+    tokenizer: Optional[Tokenizer] = None,
+) -> Union[Answer, PreparedPrompt]:
+    """
+    Render the prompt, or return the refusal that makes the LLM call
+    unnecessary.
+
+    Prompt tokens are counted locally before the call
+    (`predicted_prompt_tokens`). With `policy.max_prompt_tokens`, the
+    least relevant chunks are left out of the prompt until it fits.
+    """
+    tokenizer = tokenizer or get_tokenizer()
 
-def generate_answer(*, context_pack, llm:LLM, policy: GenerationPolicy) -> Answer:
     # --------------------------------------------------
     # Backward-compatible context validity
     # --------------------------------------------------
@@ -21,6 +148,9 @@ def generate_answer(*, context_pack, llm:LLM, policy: GenerationPolicy) -> Answe
             refusal_reason=invalid_reason or "empty_context",
         )
 
+    generation_stats = {}
+    approved_chunks = None
+
     # --------------------------------------------------
     # BACKWARD COMPATIBILITY LAYER (CRITICAL)
     # --------------------------------------------------
@@ -28,17 +158,28 @@ def generate_answer(*, context_pack, llm:LLM, policy: GenerationPolicy) -> Answe
         # Legacy Day-05 FakeContextPack
         context_text = context_pack.context_text.strip()
         sources = getattr(context_pack, "sources", [])
+        blocks = [(None, context_text)]
     else:
         # New ContextPack
         approved_chunks = getattr(context_pack, "approved_chunks", [])
-        context_text = "\n\n".join(
-            chunk["text"] for chunk in approved_chunks
-        ).strip()
-        sources = [
-            chunk.get("metadata", {}).get("source")
-            for chunk in approved_chunks
-            if chunk.get("metadata", {}).get("source") is not None
-        ]
+
+        # Optional: prompt sees only query-relevant sentences.
+        # The ContextPack itself is untouched (Day 6 verifies against it).
+        if policy.compression is not None and approved_chunks:
+            compression = compress_chunks(
+                query=context_pack.query,
+                chunks=approved_chunks,
+                policy=policy.compression,
+                embed=embed,
+            )
+            approved_chunks = compression.chunks
+            generation_stats["context_tokens_before_compression"] = compression.original_tokens
+            generation_stats["context_tokens_after_compression"] = compression.compressed_tokens
+            generation_stats["compressed_spans"] = [
+                (s.chunk_id, s.start, s.end) for s in compression.kept_sentences
+            ]
+
+        context_text, sources, blocks = _prompt_parts(approved_chunks)
 
     # --------------------------------------------------
     # Empty context refusal (MUST happen before citations)
@@ -52,20 +193,110 @@ def generate_answer(*, context_pack, llm:LLM, policy: GenerationPolicy) -> Answe
         )
 
     # --------------------------------------------------
-    # Render prompt
+    # Render prompt + pre-flight token budget
     # --------------------------------------------------
-    prompt = render_prompt(
-        context_text=context_text,
-        query=context_pack.query,
-        sources=sources,
-    )
+    prompt = _render(policy, context_pack.query, context_text, sources, blocks)
+    predicted = tokenizer.count_prompt(prompt)
 
-    raw = llm.generate(
+    ceiling = policy.max_prompt_tokens
+    if ceiling is not None and predicted > ceiling:
+        trimmed = 0
+        # Leave out the least relevant chunk until the prompt fits;
+        # the last chunk is never dropped (that would be a different
+        # refusal, decided by Day 4)
+        while approved_chunks is not None and len(approved_chunks) > 1 and predicted > ceiling:
+            approved_chunks = _without_least_relevant(approved_chunks)
+            trimmed += 1
+            context_text, sources, blocks = _prompt_parts(approved_chunks)
+            prompt = _render(policy, context_pack.query, context_text, sources, blocks)
+            predicted = tokenizer.count_prompt(prompt)
+
+        generation_stats["prompt_chunks_trimmed"] = trimmed
+
+        if predicted > ceiling:
+            generation_stats["predicted_prompt_tokens"] = predicted
+            return Answer(
+                text="I don't have enough information to answer.",
+                citations=[],
+                sentence_text_to_citation_ids={},
+                refusal_reason="prompt_over_token_budget",
+                generation_stats=generation_stats,
+            )
+
+    generation_stats["predicted_prompt_tokens"] = predicted
+    generation_stats["tokenizer"] = tokenizer.name
+
+    if prefix_tracker is not None:
+        generation_stats.update(prefix_tracker.observe(prompt))
+
+    return PreparedPrompt(
         prompt=prompt,
-        max_tokens=policy.max_answer_tokens,
-        temperature=policy.temperature,
+        sources=sources,
+        generation_stats=generation_stats,
     )
 
+
+def _prompt_parts(chunks: list):
+    """
+    (context_text, sources, blocks) for a list of approved chunks.
+    """
+    context_text = "\n\n".join(chunk["text"] for chunk in chunks).strip()
+    sources = [
+        chunk.get("metadata", {}).get("source")
+        for chunk in chunks
+        if chunk.get("metadata", {}).get("source") is not None
+    ]
+    blocks = [
+        (chunk.get("metadata", {}).get("source"), chunk["text"])
+        for chunk in chunks
+    ]
+    return context_text, sources, blocks
+
+
+def _render(policy: GenerationPolicy, query: str, context_text: str, sources: list, blocks: list) -> str:
+    if policy.prompt_layout == "canonical":
+        return render_canonical_prompt(blocks=blocks, query=query, sources=sources)
+    return render_prompt(context_text=context_text, query=query, sources=sources)
+
+
+def _without_least_relevant(chunks: list) -> list:
+    # Highest distance goes first; chunks without one (neighbors) before any
+    def relevance(chunk):
+        distance = chunk.get("distance")
+        return float("-inf") if distance is None else -distance
+
+    drop = min(range(len(chunks)), key=lambda i: relevance(chunks[i]))
+    return chunks[:drop] + chunks[drop + 1:]
+
+
+def _accept_stream(validator: StreamingCitationValidator, prepared: PreparedPrompt) -> Answer:
+    """
+    Refuse an aborted stream; apply the normal rules to a finished one.
+    """
+    violation = validator.finish()
+
+    prepared.generation_stats["streamed_chars"] = validator.chars_received
+
+    if violation is not None:
+        prepared.generation_stats["stream_aborted"] = violation
+        return Answer(
+            text="I don't have enough information to answer.",
+            citations=[],
+            sentence_text_to_citation_ids={},
+            refusal_reason="missing_or_invalid_citations",
+            generation_stats=prepared.generation_stats,
+        )
+
+    return accept_completion(validator.text, prepared)
+
+
+def accept_completion(raw: str, prepared: PreparedPrompt) -> Answer:
+    """
+    Apply the Day 5 acceptance rules to a finished completion.
+    """
+    sources = prepared.sources
+    generation_stats = prepared.generation_stats
+
     text = raw.strip()
 
     # --------------------------------------------------
@@ -77,6 +308,7 @@ def generate_answer(*, context_pack, llm:LLM, policy: GenerationPolicy) -> Answe
             citations=[],
             sentence_text_to_citation_ids={},
             refusal_reason=None,
+            generation_stats=generation_stats,
         )
 
     # --------------------------------------------------
@@ -91,6 +323,7 @@ def generate_answer(*, context_pack, llm:LLM, policy: GenerationPolicy) -> Answe
             citations=[],
             sentence_text_to_citation_ids={},
             refusal_reason="missing_or_invalid_citations",
+            generation_stats=generation_stats,
         )
 
     # --------------------------------------------------
@@ -101,4 +334,5 @@ def generate_answer(*, context_pack, llm:LLM, policy: GenerationPolicy) -> Answe
         citations=sources,
         sentence_text_to_citation_ids={},
         refusal_reason=None,
+        generation_stats=generation_stats,
     )
\ No newline at end of file
@@ -1,4 +1,5 @@
 import re
+from typing import Optional
 
 
 def extract_citations(text: str) -> set[str]:
@@ -15,4 +16,144 @@ def validate_citations(*, answer_text: str, allowed_sources: list[str]) -> bool:
     if not cited:
         return False
 
-    return cited.issubset(allowed)
\ No newline at end of file
+    return cited.issubset(allowed)
+
+# --------------------------------------------------
+# Incremental validation (streaming generation)
+# --------------------------------------------------
+
+REFUSAL_PHRASE = "don't have enough information"
+
+_TERMINATORS = ".!?"
+
+
+class StreamingCitationValidator:
+    """
+    Validate citations sentence by sentence while tokens arrive.
+
+    Rules (stricter than `validate_citations`, per sentence):
+    - a citation whose id is not allowed → violation immediately
+    - a sentence that ends without a citation → violation
+      (the model's own refusal sentence is exempt)
+
+    A citation written after the terminator ("... 30 days. [doc]")
+    belongs to the sentence before it, so a sentence is only judged
+    once the NEXT sentence starts (or the stream ends).
+
+    Boundaries: '.', '!' or '?' followed by whitespace, or a newline.
+    "5.5 days" does not end a sentence.
+    """
+
+    def __init__(self, allowed_sources: list[str], *, require_per_sentence: bool = True):
+        self.allowed = set(allowed_sources)
+        self.require_per_sentence = require_per_sentence
+
+        self.violation: Optional[str] = None
+        self.sentences_checked = 0
+        self.saw_refusal = False
+
+        self._chunks: list[str] = []
+        self._length = 0
+
+        self._sentence: list[str] = []
+        self._sentence_cited = False
+        self._bracket: Optional[list[str]] = None
+        self._maybe_end = False
+        self._ended = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    @property
+    def chars_received(self) -> int:
+        return self._length
+
+    def feed(self, delta: str) -> Optional[str]:
+        """
+        Consume one streamed delta. Returns the violation, if any.
+        """
+        if self.violation is not None:
+            return self.violation
+
+        self._chunks.append(delta)
+        self._length += len(delta)
+
+        for ch in delta:
+            self._consume(ch)
+            if self.violation is not None:
+                break
+
+        return self.violation
+
+    def finish(self) -> Optional[str]:
+        """
+        End of stream: judge the last sentence.
+        """
+        if self.violation is None:
+            self._close_sentence()
+        return self.violation
+
+    # ---- internals ----
+
+    def _consume(self, ch: str) -> None:
+        if self._bracket is not None:
+            if ch == "]":
+                self._close_citation("".join(self._bracket))
+                self._bracket = None
+            elif ch == "[":
+                self._bracket = []
+            else:
+                self._bracket.append(ch)
+            return
+
+        if ch == "[":
+            self._bracket = []
+            return
+
+        if self._maybe_end:
+            self._maybe_end = False
+            if ch.isspace():
+                self._ended = True
+            elif ch in _TERMINATORS:
+                self._maybe_end = True
+
+        if self._ended:
+            if ch.isspace():
+                return
+            self._close_sentence()
+
+        self._sentence.append(ch)
+
+        if ch == "\n":
+            self._ended = True
+        elif ch in _TERMINATORS:
+            self._maybe_end = True
+
+    def _close_citation(self, source_id: str) -> None:
+        if not source_id:
+            return
+        if source_id not in self.allowed:
+            self.violation = f"invalid citation: [{source_id}]"
+            return
+        self._sentence_cited = True
+
+    def _close_sentence(self) -> None:
+        sentence = "".join(self._sentence).strip()
+
+        self._sentence = []
+        self._ended = False
+        self._maybe_end = False
+        cited, self._sentence_cited = self._sentence_cited, False
+
+        if not sentence and not cited:
+            return
+
+        self.sentences_checked += 1
+
+        if REFUSAL_PHRASE in sentence.lower():
+            self.saw_refusal = True
+            return
+
+        if self.require_per_sentence and not cited:
+            self.violation = f"uncited sentence: {sentence[:80]!r}"
@@ -0,0 +1,224 @@
+# day05_context_to_answer/compression.py
+"""
+Extractive context compression (optional, between Day 4 and generation).
+
+Approved chunks are evidence, but usually only one or two sentences
+in each chunk relate to the query. Sending whole chunks pays for tokens
+the model does not need.
+
+This stage:
+- splits approved chunks into sentences (with character offsets)
+- scores each sentence against the query (lexical + optional embedding)
+- keeps the best sentences under a token budget
+- renders kept sentences in original document order
+
+Grounding is preserved:
+- every kept sentence remembers its chunk_id, source and (start, end)
+  offsets inside the original chunk text
+- compression only changes the prompt VIEW; the ContextPack itself
+  (used by Day 6 verification) is untouched
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# A terminator ends a sentence only before whitespace or the end of the
+# text (as in StreamingCitationValidator): "5.5 days" and "e.g." do not.
+_SENTENCE = re.compile(
+    r"[^\n]+?(?:(?<!\be\.g)(?<!\bi\.e)(?<!\bvs)(?<!\bMr)(?<!\bMrs)(?<!\bMs)(?<!\bDr)"
+    r"[.!?]+(?=\s|$)|$)",
+    re.MULTILINE,
+)
+_WORD = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it of on or "
+    "the this to was what when where which who why will with you your".split()
+)
+
+
+@dataclass(frozen=True)
+class CompressionPolicy:
+    """
+    Declarative policy for extractive compression.
+
+    Fields:
+    - max_context_tokens:
+        Token budget for the compressed context.
+    - lexical_weight:
+        Weight of lexical overlap vs embedding similarity
+        (1.0 = lexical only; used alone when no embedder is given).
+    - min_score:
+        Sentences scoring below this are never kept.
+    - min_sentences:
+        Always keep at least this many sentences, even if they score
+        poorly or exceed the budget: a valid ContextPack must never be
+        compressed into an empty prompt.
+    """
+    max_context_tokens: int = 400
+    lexical_weight: float = 0.5
+    min_score: float = 0.0
+    min_sentences: int = 1
+
+
+@dataclass(frozen=True)
+class SentenceSpan:
+    chunk_id: str
+    source: Optional[str]
+    start: int
+    end: int
+    text: str
+    score: float
+
+
+@dataclass
+class CompressionResult:
+    chunks: List[Dict]
+    kept_sentences: List[SentenceSpan]
+    original_tokens: int
+    compressed_tokens: int
+    stats: Dict[str, float] = field(default_factory=dict)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def split_sentences(text: str) -> List[tuple]:
+    """
+    Split text into (start, end, sentence) spans.
+
+    Offsets index into the ORIGINAL text, so citations can point
+    back at the exact evidence.
+    """
+    spans = []
+    for m in _SENTENCE.finditer(text):
+        raw = m.group()
+        stripped = raw.strip()
+        if not stripped:
+            continue
+        start = m.start() + (len(raw) - len(raw.lstrip()))
+        spans.append((start, start + len(stripped), stripped))
+    return spans
+
+
+def _terms(text: str) -> set:
+    return {w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS}
+
+
+def _lexical_scores(query: str, sentences: Sequence[str]) -> np.ndarray:
+    q = _terms(query)
+    if not q:
+        return np.zeros(len(sentences))
+    return np.asarray([len(q & _terms(s)) / len(q) for s in sentences])
+
+
+def _embedding_scores(
+    query: str,
+    sentences: Sequence[str],
+    embed: Callable,
+) -> np.ndarray:
+    vectors = np.asarray(embed([query, *sentences]), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1.0, norms)
+    return np.clip(vectors[1:] @ vectors[0], 0.0, 1.0)
+
+
+def compress_chunks(
+    *,
+    query: str,
+    chunks: List[Dict],
+    policy: CompressionPolicy,
+    embed: Optional[Callable] = None,
+) -> CompressionResult:
+    """
+    Keep only the query-relevant sentences of approved chunks.
+
+    Inputs:
+    - query:  the user question
+    - chunks: approved Day 4 chunks (text, metadata, optional chunk_id)
+    - policy: CompressionPolicy
+    - embed:  optional batch encoder, list[str] -> vectors
+
+    Outputs:
+    - CompressionResult whose `chunks` are copies of the input chunks
+      with 'text' reduced to kept sentences and '_compression' recording
+      the kept (start, end) offsets. Chunks with no kept sentence are
+      omitted.
+    """
+    spans: List[SentenceSpan] = []
+    owners: List[int] = []
+    for position, chunk in enumerate(chunks):
+        meta = chunk.get("metadata", {})
+        chunk_id = chunk.get("chunk_id") or meta.get("source")
+        for start, end, sentence in split_sentences(chunk.get("text", "")):
+            spans.append(SentenceSpan(chunk_id, meta.get("source"), start, end, sentence, 0.0))
+            owners.append(position)
+
+    original_tokens = sum(estimate_tokens(c.get("text", "")) for c in chunks)
+
+    if not spans:
+        return CompressionResult([], [], original_tokens, 0)
+
+    texts = [s.text for s in spans]
+    scores = _lexical_scores(query, texts)
+    if embed is not None and policy.lexical_weight < 1.0:
+        w = policy.lexical_weight
+        scores = w * scores + (1.0 - w) * _embedding_scores(query, texts, embed)
+
+    # Best first; ties broken by document position
+    ranked = sorted(range(len(spans)), key=lambda i: (-scores[i], i))
+
+    kept = set()
+    used = 0
+    for i in ranked:
+        if scores[i] <= policy.min_score and len(kept) >= policy.min_sentences:
+            break
+        cost = estimate_tokens(texts[i])
+        if used + cost > policy.max_context_tokens and len(kept) >= policy.min_sentences:
+            continue
+        kept.add(i)
+        used += cost
+
+    kept_spans: List[SentenceSpan] = []
+    by_chunk: Dict[int, List[SentenceSpan]] = {}
+    for i, s in enumerate(spans):
+        if i not in kept:
+            continue
+        span = SentenceSpan(s.chunk_id, s.source, s.start, s.end, s.text, float(scores[i]))
+        kept_spans.append(span)
+        by_chunk.setdefault(owners[i], []).append(span)
+
+    compressed = []
+    for position, chunk in enumerate(chunks):
+        kept_in_chunk = by_chunk.get(position)
+        if not kept_in_chunk:
+            continue
+
+        c = dict(chunk)
+        c["text"] = " ".join(s.text for s in kept_in_chunk)
+        c["_compression"] = {
+            "chunk_id": kept_in_chunk[0].chunk_id,
+            "spans": [(s.start, s.end) for s in kept_in_chunk],
+            "original_chars": len(chunk.get("text", "")),
+        }
+        compressed.append(c)
+
+    compressed_tokens = sum(estimate_tokens(c["text"]) for c in compressed)
+
+    return CompressionResult(
+        chunks=compressed,
+        kept_sentences=kept_spans,
+        original_tokens=original_tokens,
+        compressed_tokens=compressed_tokens,
+        stats={
+            "sentences_total": len(spans),
+            "sentences_kept": len(kept_spans),
+            "token_reduction": (
+                1.0 - compressed_tokens / original_tokens if original_tokens else 0.0
+            ),
+        },
+    )
@@ -1,9 +1,25 @@
 # day05_context_to_answer/policies.py
 from dataclasses import dataclass
+from typing import Optional
+
+from day05_context_to_answer.compression import CompressionPolicy
 
 
 @dataclass(frozen=True)
 class GenerationPolicy:
     max_answer_tokens: int = 300
     temperature: float = 0.2
-    refuse_if_no_context: bool = True
\ No newline at end of file
+    refuse_if_no_context: bool = True
+
+    # Optional extractive compression of approved chunks before prompting
+    compression: Optional[CompressionPolicy] = None
+
+    # "legacy" | "canonical" (stable prefix for provider prompt caches)
+    prompt_layout: str = "legacy"
+
+    # Stream the completion and abort at the first citation violation
+    stream: bool = False
+
+    # Pre-flight ceiling on prompt tokens (counted locally before the
+    # call); least relevant chunks are left out until the prompt fits
+    max_prompt_tokens: Optional[int] = None
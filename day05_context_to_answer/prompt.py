@@ -1,3 +1,8 @@
+from typing import Optional, Sequence, Tuple
+
+PROMPT_LAYOUTS = ("legacy", "canonical")
+
+
 def render_prompt(*, context_text: str, query: str, sources: list[str]) -> str:
     sources_block = "\n".join(f"- {s}" for s in sources)
 
@@ -25,4 +30,96 @@ Question:
 {query}
 
 Answer:
-"""
\ No newline at end of file
+"""
+
+
+# --------------------------------------------------
+# Canonical layout (prefix-cache friendly)
+# --------------------------------------------------
+#
+# Providers and local servers reuse their prefix/KV cache only for
+# byte-identical prompt prefixes. The canonical layout therefore:
+# - starts with a header that never changes between requests
+# - renders context blocks in a canonical order (by source id, not by
+#   retrieval rank), with normalized whitespace
+# - puts everything request-specific (allowed sources, query) LAST
+#
+# Two requests that share their leading sources share a prompt prefix,
+# even when retrieval returned those chunks in a different order.
+
+CANONICAL_HEADER = """You are a question-answering system.
+
+You must follow ALL rules below:
+- Use ONLY the provided context.
+- Every factual statement MUST include at least one citation.
+- Citations must be copied EXACTLY from the allowed sources list.
+- Use citation format: [source_id]
+- If the answer is not present in the context, say:
+  "I don't have enough information to answer."
+
+Each context block starts with its source id in brackets.
+
+Context:
+---------
+"""
+
+ContextBlock = Tuple[Optional[str], str]
+
+
+def normalize_block_text(text: str) -> str:
+    """
+    Whitespace-normalize one context block.
+
+    Line endings and trailing spaces must not make otherwise identical
+    prompts differ byte-wise.
+    """
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def canonical_block_order(blocks: Sequence[ContextBlock]) -> list[ContextBlock]:
+    # Source ids ('doc.txt::007') sort into document order
+    return sorted(blocks, key=lambda b: (b[0] is None, b[0] or "", b[1]))
+
+
+def render_canonical_prompt(
+    *,
+    blocks: Sequence[ContextBlock],
+    query: str,
+    sources: list[str],
+) -> str:
+    """
+    Render a prompt with a stable prefix.
+
+    Inputs:
+    - blocks:  (source_id, text) pairs; order does not matter
+    - query:   the user question
+    - sources: allowed citation ids
+
+    Output:
+    - header + canonically ordered context + sources + question
+    """
+    rendered = []
+    for source, text in canonical_block_order(
+        [(s, normalize_block_text(t)) for s, t in blocks]
+    ):
+        if not text:
+            continue
+        rendered.append(f"[{source}]\n{text}" if source is not None else text)
+
+    context_block = "\n\n".join(rendered)
+    sources_block = "\n".join(f"- {s}" for s in sorted(set(sources)))
+
+    return f"""{CANONICAL_HEADER}{context_block}
+---------
+
+Allowed sources:
+---------------
+{sources_block}
+---------------
+
+Question:
+{query.strip()}
+
+Answer:
+"""
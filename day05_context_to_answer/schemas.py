@@ -1,5 +1,5 @@
 # day05_context_to_answer/schemas.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional
 
 
@@ -15,3 +15,6 @@ class Answer:
     citations: List[Citation]
     sentence_text_to_citation_ids: dict[str, list[str]]
     refusal_reason: Optional[str] = None
+
+    # Observation only (prompt size, compression, ...)
+    generation_stats: dict = field(default_factory=dict)
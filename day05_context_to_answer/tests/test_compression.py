@@ -0,0 +1,131 @@
+from day04_retrieval_to_context.build_context import ContextPack, ContextPolicy
+from day05_context_to_answer.answer_generator import generate_answer
+from day05_context_to_answer.compression import (
+    CompressionPolicy,
+    compress_chunks,
+    split_sentences,
+)
+from day05_context_to_answer.policies import GenerationPolicy
+
+REFUND_CHUNK = (
+    "Our store values every customer. "
+    "Refunds are processed within 5 business days after approval. "
+    "Staff wear blue uniforms on weekdays. "
+    "Gift cards never expire."
+)
+HOURS_CHUNK = (
+    "The shop opens at 9am. "
+    "Refund requests need a receipt. "
+    "Parking is free behind the building."
+)
+
+
+def approved_chunks():
+    return [
+        {"chunk_id": "policy.txt::001", "text": REFUND_CHUNK, "metadata": {"source": "policy.txt::001"}},
+        {"chunk_id": "policy.txt::002", "text": HOURS_CHUNK, "metadata": {"source": "policy.txt::002"}},
+    ]
+
+
+class RecordingLLM:
+    def __init__(self, response):
+        self.response = response
+        self.prompts = []
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        self.prompts.append(prompt)
+        return self.response
+
+
+def test_split_sentences_keeps_original_offsets():
+    for start, end, sentence in split_sentences(REFUND_CHUNK):
+        assert REFUND_CHUNK[start:end] == sentence
+
+
+def test_split_sentences_does_not_break_decimals():
+    sentences = [s for _, _, s in split_sentences("Refunds take 5.5 business days. Version 2.1 applies.")]
+
+    assert sentences == ["Refunds take 5.5 business days.", "Version 2.1 applies."]
+
+
+def test_split_sentences_does_not_break_abbreviations():
+    text = "Pay by card, e.g. Visa. Ask Dr. Lee, i.e. the owner! Done"
+
+    sentences = [s for _, _, s in split_sentences(text)]
+
+    assert sentences == ["Pay by card, e.g. Visa.", "Ask Dr. Lee, i.e. the owner!", "Done"]
+
+
+def test_compression_keeps_query_relevant_sentences_with_offsets():
+    result = compress_chunks(
+        query="How long do refunds take to be processed?",
+        chunks=approved_chunks(),
+        policy=CompressionPolicy(max_context_tokens=40),
+    )
+
+    kept = [s.text for s in result.kept_sentences]
+    assert "Refunds are processed within 5 business days after approval." in kept
+    assert "Staff wear blue uniforms on weekdays." not in kept
+
+    originals = {c["chunk_id"]: c["text"] for c in approved_chunks()}
+    for span in result.kept_sentences:
+        assert originals[span.chunk_id][span.start:span.end] == span.text
+
+    assert result.compressed_tokens <= 40
+    assert result.stats["token_reduction"] >= 0.4
+
+
+def test_unrelated_query_still_keeps_min_sentences():
+    result = compress_chunks(
+        query="zzz",
+        chunks=approved_chunks(),
+        policy=CompressionPolicy(min_sentences=1),
+    )
+
+    assert len(result.kept_sentences) == 1
+
+
+def test_embedding_similarity_contributes_to_scores():
+    def embed(texts):
+        # Only "parking" sentences point in the query's direction
+        return [[1.0, 0.0] if "arking" in t or "my car" in t else [0.0, 1.0] for t in texts]
+
+    result = compress_chunks(
+        query="where do I leave my car",
+        chunks=approved_chunks(),
+        policy=CompressionPolicy(max_context_tokens=12, lexical_weight=0.0),
+        embed=embed,
+    )
+
+    assert [s.text for s in result.kept_sentences] == [
+        "Parking is free behind the building."
+    ]
+
+
+def test_generate_answer_prompts_with_compressed_context_only():
+    pack = ContextPack(
+        query="How long do refunds take to be processed?",
+        policy=ContextPolicy(),
+        approved_chunks=approved_chunks(),
+        dropped_chunks=[],
+        is_valid=True,
+        invalid_reason=None,
+    )
+    llm = RecordingLLM("Refunds take 5 business days [policy.txt::001].")
+
+    answer = generate_answer(
+        context_pack=pack,
+        llm=llm,
+        policy=GenerationPolicy(compression=CompressionPolicy(max_context_tokens=20)),
+    )
+
+    assert answer.refusal_reason is None
+    assert "Staff wear blue uniforms" not in llm.prompts[0]
+    assert "Refunds are processed within 5 business days" in llm.prompts[0]
+
+    stats = answer.generation_stats
+    assert stats["context_tokens_after_compression"] < stats["context_tokens_before_compression"]
+    assert ("policy.txt::001",) == tuple({cid for cid, _, _ in stats["compressed_spans"]})
+
+    # The ContextPack itself is untouched
+    assert pack.approved_chunks[0]["text"] == REFUND_CHUNK
@@ -0,0 +1,116 @@
+from day04_retrieval_to_context.build_context import ContextPack, ContextPolicy
+from day05_context_to_answer.answer_generator import generate_answer, prepare_prompt
+from day05_context_to_answer.policies import GenerationPolicy
+from infrastructure.llm.tokenizer import ESTIMATING_TOKENIZER, Tokenizer
+
+
+def chunk(source, text, distance):
+    return {
+        "chunk_id": source,
+        "text": text,
+        "distance": distance,
+        "metadata": {"source": source},
+    }
+
+
+CHUNKS = [
+    chunk("refunds.md::001", "Refunds are processed within 5 business days. " * 4, 0.10),
+    chunk("refunds.md::002", "Store credit is issued instantly on request. " * 4, 0.40),
+    chunk("refunds.md::003", "Gift cards cannot be refunded under any policy. " * 4, 0.25),
+]
+
+
+class RecordingLLM:
+    model = "recording"
+
+    def __init__(self, response):
+        self.response = response
+        self.prompts = []
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        self.prompts.append(prompt)
+        return self.response
+
+
+def make_pack(chunks):
+    return ContextPack(
+        query="How long do refunds take?",
+        policy=ContextPolicy(),
+        approved_chunks=list(chunks),
+        dropped_chunks=[],
+        is_valid=True,
+        invalid_reason=None,
+        stats={},
+    )
+
+
+def full_prompt_tokens():
+    prepared = prepare_prompt(context_pack=make_pack(CHUNKS), policy=GenerationPolicy())
+    return prepared.generation_stats["predicted_prompt_tokens"]
+
+
+def test_predicted_prompt_tokens_are_recorded():
+    prepared = prepare_prompt(
+        context_pack=make_pack(CHUNKS),
+        policy=GenerationPolicy(),
+        tokenizer=ESTIMATING_TOKENIZER,
+    )
+
+    stats = prepared.generation_stats
+    assert stats["predicted_prompt_tokens"] == ESTIMATING_TOKENIZER.count_prompt(prepared.prompt)
+    assert stats["tokenizer"] == "chars/4"
+    assert "prompt_chunks_trimmed" not in stats
+
+
+def test_ceiling_leaves_out_least_relevant_chunks_first():
+    ceiling = full_prompt_tokens() - 10
+
+    prepared = prepare_prompt(
+        context_pack=make_pack(CHUNKS),
+        policy=GenerationPolicy(max_prompt_tokens=ceiling),
+    )
+
+    assert "refunds.md::002" not in prepared.prompt  # highest distance
+    assert prepared.sources == ["refunds.md::001", "refunds.md::003"]
+    assert prepared.generation_stats["prompt_chunks_trimmed"] == 1
+    assert prepared.generation_stats["predicted_prompt_tokens"] <= ceiling
+
+
+def test_trimmed_sources_cannot_be_cited():
+    ceiling = full_prompt_tokens() - 10
+    llm = RecordingLLM("Store credit is instant [refunds.md::002].")
+
+    answer = generate_answer(
+        context_pack=make_pack(CHUNKS),
+        llm=llm,
+        policy=GenerationPolicy(max_prompt_tokens=ceiling),
+    )
+
+    assert answer.refusal_reason == "missing_or_invalid_citations"
+
+
+def test_prompt_that_cannot_fit_is_refused_before_the_call():
+    llm = RecordingLLM("unused")
+
+    answer = generate_answer(
+        context_pack=make_pack(CHUNKS),
+        llm=llm,
+        policy=GenerationPolicy(max_prompt_tokens=50),
+    )
+
+    assert llm.prompts == []
+    assert answer.refusal_reason == "prompt_over_token_budget"
+    assert answer.generation_stats["prompt_chunks_trimmed"] == 2
+
+
+def test_exact_tokenizer_is_used_when_given():
+    words = Tokenizer("words", lambda text: text.split())
+
+    prepared = prepare_prompt(
+        context_pack=make_pack(CHUNKS[:1]),
+        policy=GenerationPolicy(),
+        tokenizer=words,
+    )
+
+    assert prepared.generation_stats["predicted_prompt_tokens"] == len(prepared.prompt.split()) + 7
+    assert prepared.generation_stats["tokenizer"] == "words"
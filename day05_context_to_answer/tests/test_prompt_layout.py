@@ -0,0 +1,113 @@
+from day04_retrieval_to_context.build_context import ContextPack, ContextPolicy
+from day05_context_to_answer.answer_generator import generate_answer
+from day05_context_to_answer.policies import GenerationPolicy
+from day05_context_to_answer.prefix_reuse import (
+    PrefixReuseTracker,
+    common_prefix_length,
+)
+from day05_context_to_answer.prompt import CANONICAL_HEADER, render_canonical_prompt
+
+REFUND = {
+    "chunk_id": "policy.txt::001",
+    "text": "Refunds are processed within 5 business days.  \r\n",
+    "metadata": {"source": "policy.txt::001"},
+}
+HOURS = {
+    "chunk_id": "policy.txt::002",
+    "text": "The shop opens at 9am.",
+    "metadata": {"source": "policy.txt::002"},
+}
+
+
+class RecordingLLM:
+    def __init__(self, response):
+        self.response = response
+        self.prompts = []
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        self.prompts.append(prompt)
+        return self.response
+
+
+def make_pack(query, chunks):
+    return ContextPack(
+        query=query,
+        policy=ContextPolicy(),
+        approved_chunks=chunks,
+        dropped_chunks=[],
+        is_valid=True,
+        invalid_reason=None,
+        stats={},
+    )
+
+
+def test_canonical_prompt_ignores_retrieval_order_and_whitespace():
+    a = render_canonical_prompt(
+        blocks=[("b::002", "second"), ("a::001", "first  \r\nline")],
+        query="q",
+        sources=["b::002", "a::001"],
+    )
+    b = render_canonical_prompt(
+        blocks=[("a::001", "first\nline\n"), ("b::002", "second")],
+        query="q",
+        sources=["a::001", "b::002"],
+    )
+
+    assert a == b
+    assert a.startswith(CANONICAL_HEADER)
+    assert a.index("[a::001]") < a.index("[b::002]")
+
+
+def test_canonical_prompt_puts_query_last():
+    prompt = render_canonical_prompt(
+        blocks=[("a::001", "first")],
+        query="When do refunds arrive?",
+        sources=["a::001"],
+    )
+
+    assert prompt.index("Allowed sources:") > prompt.index("[a::001]")
+    assert prompt.rstrip().endswith("Question:\nWhen do refunds arrive?\n\nAnswer:")
+
+
+def test_common_prefix_length():
+    assert common_prefix_length("abcdef", "abcxyz") == 3
+    assert common_prefix_length("abc", "abc") == 3
+    assert common_prefix_length("", "abc") == 0
+    assert common_prefix_length("xbc", "abc") == 0
+
+
+def test_prefix_tracker_reports_shared_fraction():
+    tracker = PrefixReuseTracker(window=4)
+
+    first = tracker.observe("A" * 400 + "x" * 40)
+    second = tracker.observe("A" * 400 + "y" * 40)
+
+    assert first["prefix_reuse_fraction"] == 0.0
+    assert second["prefix_reuse_fraction"] == 100 / 110
+    assert tracker.stats()["observed"] == 2
+
+
+def test_canonical_layout_increases_prefix_reuse():
+    legacy = PrefixReuseTracker()
+    canonical = PrefixReuseTracker()
+    llm = RecordingLLM("Refunds take 5 business days. [policy.txt::001]")
+
+    for policy, tracker in (
+        (GenerationPolicy(), legacy),
+        (GenerationPolicy(prompt_layout="canonical"), canonical),
+    ):
+        # Same evidence, different retrieval order and question
+        for query, chunks in (
+            ("How long do refunds take?", [REFUND, HOURS]),
+            ("When are refunds paid?", [HOURS, REFUND]),
+        ):
+            answer = generate_answer(
+                context_pack=make_pack(query, chunks),
+                llm=llm,
+                policy=policy,
+                prefix_tracker=tracker,
+            )
+            assert answer.refusal_reason is None
+
+    assert canonical.stats()["prefix_reuse_fraction"] > legacy.stats()["prefix_reuse_fraction"]
+    assert "prefix_reuse_fraction" in answer.generation_stats
@@ -0,0 +1,142 @@
+import asyncio
+
+from day04_retrieval_to_context.build_context import ContextPack, ContextPolicy
+from day05_context_to_answer.answer_generator import agenerate_answer, generate_answer
+from day05_context_to_answer.citation_validator import StreamingCitationValidator
+from day05_context_to_answer.policies import GenerationPolicy
+
+ALLOWED = ["policy.txt::001", "policy.txt::002"]
+
+
+class StreamingLLM:
+    """
+    Streams fixed deltas and records how many were consumed.
+    """
+
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.consumed = 0
+        self.closed = False
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        return "".join(self.deltas)
+
+    def stream(self, *, prompt, max_tokens, temperature):
+        try:
+            for delta in self.deltas:
+                self.consumed += 1
+                yield delta
+        finally:
+            self.closed = True
+
+    async def astream(self, *, prompt, max_tokens, temperature):
+        try:
+            for delta in self.deltas:
+                self.consumed += 1
+                yield delta
+        finally:
+            self.closed = True
+
+
+def make_pack():
+    return ContextPack(
+        query="How long do refunds take?",
+        policy=ContextPolicy(),
+        approved_chunks=[
+            {"text": "Refunds take 5 business days.", "metadata": {"source": "policy.txt::001"}},
+            {"text": "Receipts are required.", "metadata": {"source": "policy.txt::002"}},
+        ],
+        dropped_chunks=[],
+        is_valid=True,
+        invalid_reason=None,
+    )
+
+
+def feed_all(validator, text, size=3):
+    for i in range(0, len(text), size):
+        if validator.feed(text[i:i + size]) is not None:
+            break
+    return validator.finish()
+
+
+def test_citation_after_terminator_belongs_to_previous_sentence():
+    v = StreamingCitationValidator(ALLOWED)
+    text = "Refunds take 5.5 days. [policy.txt::001] Receipts are required [policy.txt::002]."
+
+    assert feed_all(v, text) is None
+    assert v.sentences_checked == 2
+
+
+def test_invalid_citation_is_detected_when_bracket_closes():
+    v = StreamingCitationValidator(ALLOWED)
+
+    assert v.feed("Refunds take 5 days [random_bl") is None
+    assert v.feed("og] and more") == "invalid citation: [random_blog]"
+
+
+def test_uncited_sentence_is_detected_when_next_sentence_starts():
+    v = StreamingCitationValidator(ALLOWED)
+
+    assert v.feed("Refunds take 5 days.") is None
+    assert v.feed("  ") is None
+    assert v.feed("Receipts") is not None
+    assert v.violation.startswith("uncited sentence")
+
+
+def test_model_refusal_is_not_a_violation():
+    v = StreamingCitationValidator(ALLOWED)
+
+    assert feed_all(v, "I don't have enough information to answer.") is None
+    assert v.saw_refusal
+
+
+def test_stream_aborts_early_on_uncited_sentence():
+    deltas = ["Refunds ", "take ", "5 days. ", "Also ", "gift ", "cards ", "never ", "expire. ", "[policy.txt::001]"]
+    llm = StreamingLLM(deltas)
+
+    answer = generate_answer(
+        context_pack=make_pack(), llm=llm, policy=GenerationPolicy(stream=True)
+    )
+
+    assert answer.refusal_reason == "missing_or_invalid_citations"
+    assert "stream_aborted" in answer.generation_stats
+    assert llm.consumed == 4
+    assert llm.closed
+
+
+def test_valid_stream_matches_non_streaming_answer():
+    deltas = ["Refunds take ", "5 business days. [policy.txt", "::001] Receipts ", "are required. [policy.txt::002]"]
+
+    streamed = generate_answer(
+        context_pack=make_pack(), llm=StreamingLLM(deltas), policy=GenerationPolicy(stream=True)
+    )
+    batch = generate_answer(
+        context_pack=make_pack(), llm=StreamingLLM(deltas), policy=GenerationPolicy()
+    )
+
+    assert streamed.refusal_reason is None
+    assert streamed.text == batch.text
+    assert streamed.citations == batch.citations
+
+
+def test_async_stream_aborts_on_invalid_citation():
+    llm = StreamingLLM(["Refunds take 5 days ", "[blog.example]", " and more text", " forever."])
+
+    answer = asyncio.run(
+        agenerate_answer(context_pack=make_pack(), llm=llm, policy=GenerationPolicy(stream=True))
+    )
+
+    assert answer.refusal_reason == "missing_or_invalid_citations"
+    assert answer.generation_stats["stream_aborted"] == "invalid citation: [blog.example]"
+    assert llm.consumed == 2
+    assert llm.closed
+
+
+def test_fake_llm_streams_word_by_word():
+    from infrastructure.llm.fake import FakeLLM
+
+    llm = FakeLLM(fixed_response="Refunds take 5 days. [policy.txt::001]")
+    deltas = list(llm.stream(prompt="p", max_tokens=5, temperature=0.0))
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == llm.fixed_response
@@ -8,6 +8,10 @@ from day02_document_to_chunks.chunker import Chunk
 # from context_pack import Chunk
 
 
+# LABEL + one-sentence RATIONALE + SUPPORTING_CHUNKS
+ENTAILMENT_MAX_TOKENS = 100
+
+
 class EntailmentLabel(str, Enum):
     ENTAILED = "entailed"
     NOT_ENTAILED = "not_entailed"
@@ -54,7 +58,7 @@ def check_entailment(
     )
 
     print("DEBUG PROMPT:\n", prompt)
-    response = llm(prompt)
+    response = _ask(llm, prompt)
 
     return _parse_entailment_response(
         claim_text=claim_text,
@@ -105,6 +109,16 @@ SUPPORTING_CHUNKS: <comma-separated chunk_ids or NONE>
 """.strip()
 
 
+def _ask(llm, prompt: str) -> str:
+    """
+    Pipeline LLMs (infrastructure.llm.base.LLM) answer through
+    `generate`; plain prompt → text callables are accepted too.
+    """
+    if hasattr(llm, "generate"):
+        return llm.generate(prompt=prompt, max_tokens=ENTAILMENT_MAX_TOKENS, temperature=0.0)
+    return llm(prompt)
+
+
 # -------------------------
 # Response parsing
 # -------------------------
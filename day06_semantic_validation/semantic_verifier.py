@@ -7,6 +7,7 @@ from .entailment import (
     EntailmentResult,
     EntailmentLabel,
 )
+from infrastructure.deadline import DeadlineExceeded
 
 # Import ContextPack from wherever it currently lives
 # Example:
@@ -39,10 +40,15 @@ def verify_answer(
     answer_text: str,
     context_pack,
     llm,
+    deadline=None,
 ) -> VerificationReport:
     """
     Verify that ALL factual claims in the answer
     are entailed by the cited context.
+
+    `deadline` (infrastructure.deadline.Deadline) is checked before
+    each entailment call: a verification that ran out of time raises
+    DeadlineExceeded instead of passing unverified claims.
     """
     
     claims = extract_claims(answer_text)
@@ -59,6 +65,9 @@ def verify_answer(
     entailment_results: List[EntailmentResult] = []
 
     for claim in claims:
+        if deadline is not None and deadline.expired:
+            raise DeadlineExceeded("verification")
+
         context_chunks = _get_context_for_claim(
             claim=claim,
             context_pack=context_pack,
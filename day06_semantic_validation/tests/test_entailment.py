@@ -79,4 +79,17 @@ def test_entailment_returns_unknown_when_context_is_ambiguous():
         llm=llm,
     )
 
-    assert result.label == EntailmentLabel.UNKNOWN
\ No newline at end of file
+    assert result.label == EntailmentLabel.UNKNOWN
+
+def test_entailment_asks_pipeline_llms_through_generate():
+    from infrastructure.llm.fake import FakeLLM as PipelineLLM
+
+    llm = PipelineLLM(fixed_response="LABEL: ENTAILED\nRATIONALE: Stated.\nSUPPORTING_CHUNKS: c1")
+
+    result = check_entailment(
+        claim_text="Refunds are processed within 5–7 business days.",
+        context_chunks=build_context_chunks(),
+        llm=llm,
+    )
+
+    assert result.label == EntailmentLabel.ENTAILED
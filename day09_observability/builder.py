@@ -36,6 +36,13 @@ def build_decision_trace(
     presentation_mode: Optional[PresentationMode],
     presentation_reason: Optional[str],
 
+    # ---- Day 5 (optional) ----
+    answer_failure_code: Optional[FailureCode] = None,
+
+    # ---- Request deadline ----
+    timed_out_layer: Optional[PipelineLayer] = None,
+    timeout_reason: Optional[str] = None,
+
     # ---- Observability ----
     stats: Optional[PipelineStats] = None,
     timestamps: Optional[dict] = None,
@@ -57,6 +64,37 @@ def build_decision_trace(
     failure_layer: Optional[PipelineLayer] = None
     failure_code: Optional[FailureCode] = None
 
+    # ---------------- Deadline: a stage ran out of time ----------------
+    if timed_out_layer is not None:
+        # Layers before it completed; later layers never ran
+        for layer in PipelineLayer:
+            if layer == timed_out_layer:
+                break
+            layer_signals.append(LayerSignal(layer=layer, passed=True))
+
+        layer_signals.append(
+            LayerSignal(
+                layer=timed_out_layer,
+                passed=False,
+                failure_code=FailureCode.DEADLINE_EXCEEDED,
+                reason=timeout_reason,
+            )
+        )
+
+        return DecisionTrace(
+            query_id=query_id,
+            query_text=query_text,
+            layer_signals=layer_signals,
+            allowed=False,
+            presentation_mode=None,
+            failure_layer=timed_out_layer,
+            failure_code=FailureCode.DEADLINE_EXCEEDED,
+            refusal_reason=timeout_reason,
+            presentation_reason=None,
+            stats=stats or PipelineStats(),
+            timestamps=timestamps or {"created_at": now},
+        )
+
     # ---------------- Day 4: Context ----------------
     if context_valid:
         layer_signals.append(
@@ -88,7 +126,7 @@ def build_decision_trace(
         )
     else:
         failure_layer = PipelineLayer.DAY_05_GENERATION
-        failure_code = FailureCode.MISSING_CITATION  # canonical Day-5 failure
+        failure_code = answer_failure_code or FailureCode.MISSING_CITATION  # canonical Day-5 failure
 
         layer_signals.append(
             LayerSignal(
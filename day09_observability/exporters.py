@@ -6,6 +6,7 @@ from dataclasses import asdict
 from typing import Optional
 
 from .models import DecisionTrace
+from .signals import CIRCUIT_STATE_SIGNAL, SignalName
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +64,33 @@ def export_trace_to_logs(trace: DecisionTrace) -> None:
         logger.exception("Failed to log DecisionTrace")
 
 
+# ---------------------------------------------------------
+# LLM circuit breaker transitions
+# ---------------------------------------------------------
+
+def export_circuit_transition(transition) -> None:
+    """
+    Emit an LLM circuit breaker state change as a signal.
+
+    `transition` is an infrastructure.llm.circuit_breaker.BreakerTransition.
+    Used as the breaker's `on_transition` hook.
+    """
+
+    try:
+        signal = CIRCUIT_STATE_SIGNAL[transition.to_state.value]
+        log = logger.warning if signal is SignalName.LLM_CIRCUIT_OPENED else logger.info
+        log(
+            "RAG_SIGNAL | signal=%s | llm=%s | from=%s | reason=%s",
+            signal.value,
+            transition.name,
+            transition.from_state.value,
+            transition.reason,
+        )
+
+    except Exception:
+        logger.exception("Failed to export circuit breaker transition")
+
+
 # ---------------------------------------------------------
 # Metrics Exporter (stub)
 # ---------------------------------------------------------
@@ -25,6 +25,8 @@ class FailureCode(Enum):
     # Generation layer
     MISSING_CITATION = "missing_citation"
     INVALID_CITATION = "invalid_citation"
+    # LLM backend circuit open: no generation was attempted
+    LLM_UNAVAILABLE = "llm_unavailable"
 
     # Semantic validation
     NOT_ENTAILED = "not_entailed"
@@ -37,6 +39,9 @@ class FailureCode(Enum):
     # Presentation
     SUPPRESSED_BY_POLICY = "suppressed_by_policy"
 
+    # Any layer: its stage ran out of the request's time budget
+    DEADLINE_EXCEEDED = "deadline_exceeded"
+
 
 class PresentationMode(Enum):
     NORMAL = "normal"
@@ -77,12 +82,27 @@ class PipelineStats:
     These are safe to log, aggregate, and monitor.
     """
 
+    # -------- Day 3 --------
+    retrieval_encode_ms: Optional[float] = None
+    retrieval_search_ms: Optional[float] = None
+    retrieval_hydrate_ms: Optional[float] = None
+
     # -------- Day 4 --------
     retrieved_chunks: Optional[int] = None
     approved_chunks: Optional[int] = None
     dropped_chunks: Optional[int] = None
     total_context_chars: Optional[int] = None
 
+    # -------- Day 5 --------
+    context_tokens_before_compression: Optional[int] = None
+    context_tokens_after_compression: Optional[int] = None
+    # Share of prompt tokens identical to the start of a recent prompt
+    prompt_prefix_reuse: Optional[float] = None
+    # Counted locally before the call (compare with prompt_tokens)
+    predicted_prompt_tokens: Optional[int] = None
+    # Chunks left out of the prompt to fit max_prompt_tokens
+    prompt_chunks_trimmed: Optional[int] = None
+
     # -------- Day 6 --------
     claim_count: Optional[int] = None
     entailed_claims: Optional[int] = None
@@ -96,6 +116,25 @@ class PipelineStats:
     completion_tokens: Optional[int] = None
     total_tokens: Optional[int] = None
     cost_usd: Optional[float] = None
+    llm_cache_hit: Optional[bool] = None
+    # LLM circuit breaker state when the request finished
+    llm_circuit_state: Optional[str] = None
+
+    # -------- Model cascade --------
+    # Tier that produced the final answer, and how it got there
+    llm_tier: Optional[str] = None
+    llm_escalations: Optional[int] = None
+    llm_tier_latency_ms: Optional[Dict[str, float]] = None
+    llm_tier_cost_usd: Optional[Dict[str, float]] = None
+
+    # -------- Request deadline --------
+    deadline_budget_ms: Optional[float] = None
+    # Time spent per stage (retrieval, generation, verification, alignment)
+    stage_ms: Optional[Dict[str, float]] = None
+    timed_out_stage: Optional[str] = None
+
+    # -------- Semantic cache --------
+    semantic_cache_similarity: Optional[float] = None
 
 # ---------------------------------------------------------
 # Final trace (one per user query)
@@ -118,4 +157,7 @@ class DecisionTrace:
     presentation_reason: Optional[str]
 
     stats: PipelineStats = field(default_factory=PipelineStats)
-    timestamps: Dict[str, float] = field(default_factory=dict)
\ No newline at end of file
+    timestamps: Dict[str, float] = field(default_factory=dict)
+
+    # True when the response was served from the semantic cache
+    cache_hit: bool = False
\ No newline at end of file
@@ -27,6 +27,11 @@ class SignalName(Enum):
     PRESENTATION_WARNING = "presentation_warning"
     PRESENTATION_SUPPRESSED = "presentation_suppressed"
 
+    # LLM circuit breaker transitions (process-wide, not per query)
+    LLM_CIRCUIT_OPENED = "llm_circuit_opened"
+    LLM_CIRCUIT_HALF_OPENED = "llm_circuit_half_opened"
+    LLM_CIRCUIT_CLOSED = "llm_circuit_closed"
+
 
 # ---------------------------------------------------------
 # Which failure codes are valid for which layer
@@ -37,21 +42,26 @@ LAYER_FAILURE_CODES: Dict[PipelineLayer, Set[FailureCode]] = {
     PipelineLayer.DAY_04_CONTEXT: {
         FailureCode.EMPTY_CONTEXT,
         FailureCode.INSUFFICIENT_CONTEXT,
+        FailureCode.DEADLINE_EXCEEDED,
     },
 
     PipelineLayer.DAY_05_GENERATION: {
         FailureCode.MISSING_CITATION,
         FailureCode.INVALID_CITATION,
+        FailureCode.LLM_UNAVAILABLE,
+        FailureCode.DEADLINE_EXCEEDED,
     },
 
     PipelineLayer.DAY_06_ENTAILMENT: {
         FailureCode.NOT_ENTAILED,
         FailureCode.UNKNOWN_ENTAILMENT,
+        FailureCode.DEADLINE_EXCEEDED,
     },
 
     PipelineLayer.DAY_07_CITATION_ALIGNMENT: {
         FailureCode.MISALIGNED_CITATION,
         FailureCode.EXTRANEOUS_CITATION,
+        FailureCode.DEADLINE_EXCEEDED,
     },
 
     PipelineLayer.DAY_08_PRESENTATION: {
@@ -71,6 +81,17 @@ PRESENTATION_MODE_SIGNAL: Dict[PresentationMode, SignalName] = {
 }
 
 
+# ---------------------------------------------------------
+# Circuit breaker state (value) entered → signal mapping
+# ---------------------------------------------------------
+
+CIRCUIT_STATE_SIGNAL: Dict[str, SignalName] = {
+    "open": SignalName.LLM_CIRCUIT_OPENED,
+    "half_open": SignalName.LLM_CIRCUIT_HALF_OPENED,
+    "closed": SignalName.LLM_CIRCUIT_CLOSED,
+}
+
+
 # ---------------------------------------------------------
 # Optional human-readable descriptions
 # (Safe: diagnostics only, never used for decisions)
@@ -89,6 +110,9 @@ FAILURE_DESCRIPTIONS: Dict[FailureCode, str] = {
     FailureCode.INVALID_CITATION:
         "Answer referenced sources not present in context.",
 
+    FailureCode.LLM_UNAVAILABLE:
+        "The LLM backend was unavailable (circuit open); nothing was generated.",
+
     FailureCode.NOT_ENTAILED:
         "At least one factual claim was not supported by context.",
 
@@ -103,4 +127,7 @@ FAILURE_DESCRIPTIONS: Dict[FailureCode, str] = {
 
     FailureCode.SUPPRESSED_BY_POLICY:
         "Answer was suppressed by presentation policy.",
+
+    FailureCode.DEADLINE_EXCEEDED:
+        "The stage ran out of the request's time budget.",
 }
\ No newline at end of file
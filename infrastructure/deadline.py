@@ -0,0 +1,79 @@
+"""
+Request-scoped deadlines.
+
+A Deadline is an absolute point in time, not a timeout: whatever a
+stage does not use is still available to the stages after it, and a
+nested call can never outlive its caller.
+
+    request = Deadline(3.0)
+    retrieval = request.child(0.25)   # 25% of what is left, capped by request
+
+The deadline of the current stage is also published through a
+ContextVar (`deadline_scope` / `current_deadline`), so code deep in
+the stack, e.g. the LLM scheduler's retry loop, can respect it without
+threading a parameter through every signature.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    A pipeline stage ran out of its share of the request budget.
+    """
+
+    def __init__(self, stage: str):
+        super().__init__(f"deadline exceeded in stage '{stage}'")
+        self.stage = stage
+
+
+class Deadline:
+    def __init__(
+        self,
+        budget_s: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if budget_s < 0:
+            raise ValueError("budget_s must be >= 0")
+
+        self._clock = clock
+        self.budget_s = budget_s
+        self.expires_at = clock() + budget_s
+
+    def remaining_s(self) -> float:
+        return max(self.expires_at - self._clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self._clock() >= self.expires_at
+
+    def child(self, share: float) -> "Deadline":
+        """
+        Deadline for a sub-stage: `share` of the time remaining now.
+        Never later than this deadline.
+        """
+        if not 0.0 < share <= 1.0:
+            raise ValueError("share must be in (0, 1]")
+        return Deadline(share * self.remaining_s(), clock=self._clock)
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar(
+    "rag_request_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
@@ -1,10 +1,14 @@
 # infrastructure/llm/base.py
 
+import os
 from abc import ABC, abstractmethod
-from abc import ABC, abstractmethod
-from typing import Optional
+from contextvars import ContextVar
+import asyncio
+from typing import AsyncIterator, Iterator, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 
+from infrastructure.retrieval.executors import BoundedExecutor
+
 @dataclass
 class LLMUsage:
     prompt_tokens: int
@@ -12,6 +16,36 @@ class LLMUsage:
     total_tokens: int
     cost_usd: float
 
+    # Served from a response cache (no provider call, no cost)
+    cached: bool = False
+
+
+# One generated text and the usage it was billed for
+Completion = Tuple[str, Optional[LLMUsage]]
+
+
+# Per-context (thread / asyncio task) so concurrent generations never
+# read each other's usage. Stores (llm, usage): one LLM's usage is
+# never reported by another.
+_last_usage: ContextVar[Optional[Tuple["LLM", LLMUsage]]] = ContextVar(
+    "rag_last_llm_usage", default=None
+)
+
+# Sync → async bridge for LLMs without a native async client
+LLM_EXECUTOR = BoundedExecutor(
+    max_workers=int(os.getenv("RAG_LLM_WORKERS", "32")),
+    max_pending=int(os.getenv("RAG_LLM_MAX_PENDING", "512")),
+    name="rag-llm",
+)
+
+# Fan-out of sync batches. Separate from LLM_EXECUTOR: a batch sent
+# from one of its workers must not wait on a queue it is blocking.
+LLM_BATCH_EXECUTOR = BoundedExecutor(
+    max_workers=int(os.getenv("RAG_LLM_WORKERS", "32")),
+    max_pending=int(os.getenv("RAG_LLM_MAX_PENDING", "512")),
+    name="rag-llm-batch",
+)
+
 
 class LLM(ABC):
     """
@@ -39,11 +73,141 @@ class LLM(ABC):
         - non-deterministic in production (real LLM)
         """
         raise NotImplementedError
-    
-    
+
+    async def agenerate(
+        self,
+        *,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> str:
+        """
+        Async variant of `generate`.
+
+        Default: run the sync implementation on the bounded LLM
+        executor. Backends with an async client override this so an
+        in-flight generation holds no thread at all.
+        """
+        def _run():
+            text = self.generate(
+                prompt=prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+            return text, self.get_last_usage()
+
+        text, usage = await LLM_EXECUTOR.run(_run)
+
+        # Worker threads have their own context: re-record in ours
+        if usage is not None:
+            self._record_usage(usage)
+
+        return text
+
+    def generate_batch(
+        self,
+        *,
+        prompts: Sequence[str],
+        max_tokens: int,
+        temperature: float,
+    ) -> List[Completion]:
+        """
+        One completion per prompt, in order, each with its usage.
+
+        Default: concurrent `generate` calls, the first on the calling
+        thread and the rest on LLM_BATCH_EXECUTOR. Backends with a
+        batch endpoint override this to answer all prompts in one
+        request.
+        """
+        def one(prompt: str) -> Completion:
+            text = self.generate(
+                prompt=prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+            return text, self.get_last_usage()
+
+        if not prompts:
+            return []
+
+        rest = [LLM_BATCH_EXECUTOR.submit(one, prompt) for prompt in prompts[1:]]
+        try:
+            first = one(prompts[0])
+        finally:
+            # Never return (or raise) with siblings still running
+            for future in rest:
+                future.exception()
+        return [first] + [future.result() for future in rest]
+
+    async def agenerate_batch(
+        self,
+        *,
+        prompts: Sequence[str],
+        max_tokens: int,
+        temperature: float,
+    ) -> List[Completion]:
+        """
+        Async variant of `generate_batch`.
+
+        Default: concurrent `agenerate` calls, multiplexed over the
+        backend's shared connection pool.
+        """
+        async def one(prompt: str) -> Completion:
+            # Own task → own context: usage is not overwritten by siblings
+            text = await self.agenerate(
+                prompt=prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+            return text, self.get_last_usage()
+
+        return list(await asyncio.gather(*(one(p) for p in prompts)))
+
+    def stream(
+        self,
+        *,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> Iterator[str]:
+        """
+        Generate text as a stream of deltas.
+
+        Closing the iterator early (e.g. after a validation failure)
+        must stop generation. Default: the whole completion as one delta.
+        """
+        yield self.generate(
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+
+    async def astream(
+        self,
+        *,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> AsyncIterator[str]:
+        """
+        Async variant of `stream`. Default: one delta from `agenerate`.
+        """
+        yield await self.agenerate(
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+
     def get_last_usage(self) -> Optional[LLMUsage]:
         """
         Optional observability hook.
+        Usage of this LLM's last call in the current context.
         Default: no usage info.
         """
-        return None
\ No newline at end of file
+        recorded = _last_usage.get()
+        if recorded is None or recorded[0] is not self:
+            return None
+        return recorded[1]
+
+    def _record_usage(self, usage: LLMUsage) -> None:
+        _last_usage.set((self, usage))
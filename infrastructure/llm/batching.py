@@ -0,0 +1,280 @@
+"""
+Micro-batching of concurrent LLM calls.
+
+Under concurrency many small, independent prompts (entailment checks,
+short answers) arrive within milliseconds of each other. Sent one by
+one, each pays a full request round trip. MicroBatchingLLM holds a
+call for at most `max_wait_ms`, collects whatever else arrives with
+the same (max_tokens, temperature), and sends them together:
+
+    caller A ─┐
+    caller B ─┼─ window (≤ max_wait_ms or max_batch_size) ─→ inner.generate_batch([A, B, C])
+    caller C ─┘                                                  │
+          ←──────────────── results fanned back ─────────────────┘
+
+How a batch reaches the backend is the inner LLM's choice
+(`LLM.generate_batch` / `agenerate_batch`): one request to a batch
+endpoint (OpenAILLM with `batch_endpoint=True`, the local stand-in
+server), or concurrent single calls (the default, sync and async).
+
+A batch of one is sent as a plain `generate`: a caller alone in its
+window pays only the wait. Streams are never batched.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from infrastructure.llm.base import LLM, Completion, LLMUsage
+
+
+@dataclass(frozen=True)
+class BatchPolicy:
+    """
+    Fields:
+    - max_batch_size:
+        A batch is sent as soon as it has this many prompts.
+    - max_wait_ms:
+        Longest a call waits for others to join its batch.
+    """
+    max_batch_size: int = 16
+    max_wait_ms: float = 5.0
+
+
+def split_usage(usage: Optional[LLMUsage], prompts: Sequence[str], texts: Sequence[str]) -> List[Optional[LLMUsage]]:
+    """
+    Share the usage of one batch request among its prompts.
+
+    Providers report one total per request: prompt tokens are split by
+    prompt length, completion tokens by completion length.
+    """
+    if usage is None:
+        return [None] * len(prompts)
+
+    prompt_chars = sum(len(p) for p in prompts)
+    text_chars = sum(len(t) for t in texts)
+    n = len(prompts)
+
+    shares = []
+    for prompt, text in zip(prompts, texts):
+        prompt_share = len(prompt) / prompt_chars if prompt_chars else 1 / n
+        text_share = len(text) / text_chars if text_chars else 1 / n
+
+        prompt_tokens = round(usage.prompt_tokens * prompt_share)
+        completion_tokens = round(usage.completion_tokens * text_share)
+        share = (
+            (prompt_tokens + completion_tokens) / usage.total_tokens
+            if usage.total_tokens else 1 / n
+        )
+        shares.append(LLMUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            cost_usd=usage.cost_usd * share,
+            cached=usage.cached,
+        ))
+    return shares
+
+
+class _Batch:
+    """Prompts collected in one window, and their callers' futures."""
+
+    def __init__(self, full):
+        self.prompts: List[str] = []
+        self.futures: list = []
+        self.full = full
+        self.opened_at = time.perf_counter()
+
+
+BatchKey = Tuple[int, float]
+
+
+class MicroBatchingLLM(LLM):
+    """
+    Coalesces concurrent generate/agenerate calls into batches.
+    """
+
+    def __init__(self, inner: LLM, policy: BatchPolicy = BatchPolicy()):
+        if policy.max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+
+        self.inner = inner
+        self.policy = policy
+        self.model = getattr(inner, "model", None)
+
+        self._lock = threading.Lock()
+        self._open: Dict[BatchKey, _Batch] = {}
+        # asyncio batches belong to one event loop
+        self._aopen: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[BatchKey, _Batch]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        # The loop only keeps weak references to tasks
+        self._tasks: set = set()
+
+        self.batches = 0
+        self.batched_calls = 0
+        self.largest_batch = 0
+        self._wait_s_total = 0.0
+
+    # ---- LLM interface ----
+
+    def generate(self, *, prompt: str, max_tokens: int, temperature: float) -> str:
+        key = (max_tokens, temperature)
+        future: Future = Future()
+
+        with self._lock:
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _Batch(threading.Event())
+            self._join(batch, prompt, future, lambda: self._open.pop(key, None))
+
+        if leader:
+            # The first caller waits out the window, then sends for everyone
+            batch.full.wait(self.policy.max_wait_ms / 1000.0)
+            with self._lock:
+                if self._open.get(key) is batch:
+                    del self._open[key]
+            self._dispatch(batch, max_tokens, temperature)
+
+        text, usage = future.result()
+        self._record_usage(usage)
+        return text
+
+    async def agenerate(self, *, prompt: str, max_tokens: int, temperature: float) -> str:
+        key = (max_tokens, temperature)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        with self._lock:
+            batches = self._aopen.setdefault(loop, {})
+            batch = batches.get(key)
+            if batch is None:
+                batch = batches[key] = _Batch(asyncio.Event())
+                # Sent by its own task: a cancelled caller never strands the others
+                task = loop.create_task(self._aflush(batches, key, batch, max_tokens, temperature))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            self._join(batch, prompt, future, lambda: batches.pop(key, None))
+
+        text, usage = await future
+        self._record_usage(usage)
+        return text
+
+    def generate_batch(self, *, prompts: Sequence[str], max_tokens: int, temperature: float) -> List[Completion]:
+        # Already a batch: nothing to coalesce
+        return self.inner.generate_batch(prompts=prompts, max_tokens=max_tokens, temperature=temperature)
+
+    async def agenerate_batch(self, *, prompts: Sequence[str], max_tokens: int, temperature: float) -> List[Completion]:
+        return await self.inner.agenerate_batch(prompts=prompts, max_tokens=max_tokens, temperature=temperature)
+
+    def stream(self, *, prompt: str, max_tokens: int, temperature: float):
+        stream = self.inner.stream(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        try:
+            yield from stream
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            self._record_usage(self.inner.get_last_usage())
+
+    async def astream(self, *, prompt: str, max_tokens: int, temperature: float):
+        stream = self.inner.astream(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        try:
+            async for delta in stream:
+                yield delta
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            self._record_usage(self.inner.get_last_usage())
+
+    # ---- observability ----
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "batched_calls": self.batched_calls,
+                "avg_batch_size": self.batched_calls / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "avg_window_ms": self._wait_s_total / self.batches * 1000.0 if self.batches else 0.0,
+            }
+
+    # ---- internals ----
+
+    def _join(self, batch: _Batch, prompt: str, future, close) -> None:
+        # Caller holds self._lock
+        batch.prompts.append(prompt)
+        batch.futures.append(future)
+        if len(batch.prompts) >= self.policy.max_batch_size:
+            close()
+            batch.full.set()
+
+    async def _aflush(self, batches, key: BatchKey, batch: _Batch, max_tokens: int, temperature: float) -> None:
+        try:
+            await asyncio.wait_for(batch.full.wait(), self.policy.max_wait_ms / 1000.0)
+        except asyncio.TimeoutError:
+            pass
+        with self._lock:
+            if batches.get(key) is batch:
+                del batches[key]
+
+        try:
+            completions = await self._acall(batch, max_tokens, temperature)
+        except Exception as e:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            for future in batch.futures:
+                future.cancel()
+            raise
+
+        for future, completion in zip(batch.futures, completions):
+            # A caller may have given up (cancelled) meanwhile
+            if not future.done():
+                future.set_result(completion)
+
+    def _dispatch(self, batch: _Batch, max_tokens: int, temperature: float) -> None:
+        self._count(batch)
+        try:
+            if len(batch.prompts) == 1:
+                text = self.inner.generate(
+                    prompt=batch.prompts[0], max_tokens=max_tokens, temperature=temperature
+                )
+                completions = [(text, self.inner.get_last_usage())]
+            else:
+                completions = self.inner.generate_batch(
+                    prompts=batch.prompts, max_tokens=max_tokens, temperature=temperature
+                )
+        except BaseException as e:
+            for future in batch.futures:
+                future.set_exception(e)
+            return
+
+        for future, completion in zip(batch.futures, completions):
+            future.set_result(completion)
+
+    async def _acall(self, batch: _Batch, max_tokens: int, temperature: float) -> List[Completion]:
+        self._count(batch)
+        if len(batch.prompts) == 1:
+            text = await self.inner.agenerate(
+                prompt=batch.prompts[0], max_tokens=max_tokens, temperature=temperature
+            )
+            return [(text, self.inner.get_last_usage())]
+        return await self.inner.agenerate_batch(
+            prompts=batch.prompts, max_tokens=max_tokens, temperature=temperature
+        )
+
+    def _count(self, batch: _Batch) -> None:
+        with self._lock:
+            self.batches += 1
+            self.batched_calls += len(batch.prompts)
+            self.largest_batch = max(self.largest_batch, len(batch.prompts))
+            self._wait_s_total += time.perf_counter() - batch.opened_at
@@ -0,0 +1,297 @@
+"""
+Content-addressed LLM response cache.
+
+The same rendered prompt (same context, same query) reaches the LLM
+again and again: popular questions in production, and every rerun of
+an evaluation dataset. Each repeat pays full latency and cost.
+
+Cache key:
+    sha256(model, prompt, max_tokens, temperature)
+
+Tiers:
+- memory: in-process LRU (`max_entries`)
+- disk:   one JSON file per entry under `disk_dir`, evicted
+          least-recently-used past `max_disk_bytes`; survives restarts
+          (evaluation reruns hit it)
+
+Sampling:
+- temperature > 0 asks for a fresh sample: bypassed by default
+  (`cache_sampled=True` opts in)
+
+Usage accounting:
+- a hit is recorded as zero-cost LLMUsage(cached=True); the cost the
+  hit avoided is accumulated in `stats()["saved_cost_usd"]`
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from infrastructure.llm.base import LLM, LLMUsage
+
+CachedResponse = Tuple[str, Optional[LLMUsage]]
+
+
+def llm_cache_key(
+    *,
+    model: str,
+    prompt: str,
+    max_tokens: int,
+    temperature: float,
+) -> str:
+    payload = json.dumps(
+        [model, prompt, max_tokens, temperature],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskResponseCache:
+    """
+    Size-bounded directory of cached responses.
+
+    - writes are atomic (temp file + rename)
+    - reads touch the file, so mtime order is LRU order
+    - eviction removes the oldest files until under `max_bytes`
+    """
+
+    def __init__(self, directory: str, *, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._total_bytes = sum(p.stat().st_size for p in self.directory.glob("*/*.json"))
+
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        usage = LLMUsage(**data["usage"]) if data.get("usage") else None
+        return data["text"], usage
+
+    def put(self, key: str, text: str, usage: Optional[LLMUsage]) -> None:
+        payload = json.dumps(
+            {"text": text, "usage": asdict(usage) if usage else None},
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+
+        with self._lock:
+            previous = path.stat().st_size if path.exists() else 0
+
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+
+            self._total_bytes += len(payload) - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        files = sorted(
+            self.directory.glob("*/*.json"),
+            key=lambda p: p.stat().st_mtime,
+        )
+        for path in files:
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except OSError:
+                continue
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+
+class CachingLLM(LLM):
+    """
+    LLM wrapper with memory + disk response caching.
+    """
+
+    def __init__(
+        self,
+        inner: LLM,
+        *,
+        model_id: Optional[str] = None,
+        max_entries: int = 1024,
+        disk_dir: Optional[str] = None,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+        cache_sampled: bool = False,
+    ):
+        self.inner = inner
+        self.model_id = model_id or getattr(inner, "model", type(inner).__name__)
+        self.max_entries = max_entries
+        self.cache_sampled = cache_sampled
+        self.disk = (
+            DiskResponseCache(disk_dir, max_bytes=max_disk_bytes)
+            if disk_dir else None
+        )
+
+        self._memory: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.saved_cost_usd = 0.0
+
+    # ---- LLM interface ----
+
+    def generate(self, *, prompt: str, max_tokens: int, temperature: float) -> str:
+        key = self._key(prompt, max_tokens, temperature)
+        if key is None:
+            text = self.inner.generate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+            return self._passthrough(text)
+
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        text = self.inner.generate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        return self._store(key, text)
+
+    async def agenerate(self, *, prompt: str, max_tokens: int, temperature: float) -> str:
+        key = self._key(prompt, max_tokens, temperature)
+        if key is None:
+            text = await self.inner.agenerate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+            return self._passthrough(text)
+
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        text = await self.inner.agenerate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        return self._store(key, text)
+
+    def stream(self, *, prompt: str, max_tokens: int, temperature: float):
+        key = self._key(prompt, max_tokens, temperature)
+        cached = self._lookup(key) if key is not None else None
+        if cached is not None:
+            yield cached
+            return
+
+        deltas = []
+        stream = self.inner.stream(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        try:
+            for delta in stream:
+                deltas.append(delta)
+                yield delta
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+
+        # Only complete streams are cached (an aborted one is truncated)
+        if key is None:
+            self._passthrough("".join(deltas))
+        else:
+            self._store(key, "".join(deltas))
+
+    # ---- observability ----
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "saved_cost_usd": self.saved_cost_usd,
+            "disk_evictions": self.disk.evictions if self.disk else 0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    # ---- internals ----
+
+    def _key(self, prompt: str, max_tokens: int, temperature: float) -> Optional[str]:
+        if temperature > 0 and not self.cache_sampled:
+            with self._lock:
+                self.bypassed += 1
+            return None
+        return llm_cache_key(
+            model=self.model_id,
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+
+    def _lookup(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, entry)
+
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        text, original = entry
+        if original is not None:
+            with self._lock:
+                self.saved_cost_usd += original.cost_usd
+
+        self._record_usage(LLMUsage(
+            prompt_tokens=0,
+            completion_tokens=0,
+            total_tokens=0,
+            cost_usd=0.0,
+            cached=True,
+        ))
+        return text
+
+    def _store(self, key: str, text: str) -> str:
+        usage = self.inner.get_last_usage()
+        self._remember(key, (text, usage))
+        if self.disk is not None:
+            self.disk.put(key, text, usage)
+        return self._passthrough(text, usage)
+
+    def _passthrough(self, text: str, usage: Optional[LLMUsage] = None) -> str:
+        # The caller asks THIS object for usage: forward the inner call's
+        usage = usage if usage is not None else self.inner.get_last_usage()
+        if usage is not None:
+            self._record_usage(usage)
+        return text
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
@@ -0,0 +1,199 @@
+"""
+Model cascade: cheap model first, stronger model only when needed.
+
+For most questions a small, fast model produces an answer that passes
+the Day 5 citation check and Day 6 entailment. The validators already
+tell us when it does not, so instead of paying for the strong model
+on every request:
+
+    tier 0 (cheap) → validate → pass: done
+                              → fail: escalate to tier 1 → validate ...
+
+CascadingLLM is an ordinary LLM that generates with the CURRENT tier
+of the current request. The pipeline (application/answer_service.py)
+decides when to `escalate()`; this class only routes and records.
+
+Per request (`begin()` starts one, per thread / asyncio task):
+- every attempt's tier, latency and usage (`route()`)
+- `get_last_usage()` returns the SUM over all attempts, so the trace
+  reports what the request really cost
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from infrastructure.llm.base import LLM, LLMUsage
+
+
+@dataclass
+class TierAttempt:
+    tier: str
+    latency_ms: float
+    usage: Optional[LLMUsage]
+
+
+@dataclass
+class CascadeRoute:
+    """
+    Routing record of one request.
+    """
+    tier_index: int = 0
+    attempts: List[TierAttempt] = field(default_factory=list)
+
+    @property
+    def escalations(self) -> int:
+        return self.tier_index
+
+    def latency_ms_by_tier(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for a in self.attempts:
+            totals[a.tier] = totals.get(a.tier, 0.0) + a.latency_ms
+        return totals
+
+    def cost_usd_by_tier(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for a in self.attempts:
+            cost = a.usage.cost_usd if a.usage is not None else 0.0
+            totals[a.tier] = totals.get(a.tier, 0.0) + cost
+        return totals
+
+    def total_usage(self) -> Optional[LLMUsage]:
+        usages = [a.usage for a in self.attempts if a.usage is not None]
+        if not usages:
+            return None
+        return LLMUsage(
+            prompt_tokens=sum(u.prompt_tokens for u in usages),
+            completion_tokens=sum(u.completion_tokens for u in usages),
+            total_tokens=sum(u.total_tokens for u in usages),
+            cost_usd=sum(u.cost_usd for u in usages),
+            cached=all(u.cached for u in usages),
+        )
+
+
+_route: ContextVar[Optional[Tuple["CascadingLLM", CascadeRoute]]] = ContextVar(
+    "rag_cascade_route", default=None
+)
+
+
+class CascadingLLM(LLM):
+    """
+    Ordered (name, LLM) tiers, cheapest first.
+    """
+
+    def __init__(self, tiers: Sequence[Tuple[str, LLM]]):
+        if not tiers:
+            raise ValueError("CascadingLLM needs at least one tier")
+
+        self.tiers = list(tiers)
+        self.model = self.tiers[0][0]
+
+        # Process-wide totals, per tier
+        self._lock = threading.Lock()
+        self.calls = {name: 0 for name, _ in self.tiers}
+        self.escalations = {name: 0 for name, _ in self.tiers[1:]}
+
+    # ---- routing ----
+
+    def begin(self) -> CascadeRoute:
+        """Start a new request at the cheapest tier."""
+        route = CascadeRoute()
+        _route.set((self, route))
+        return route
+
+    def route(self) -> CascadeRoute:
+        current = _route.get()
+        if current is None or current[0] is not self:
+            return self.begin()
+        return current[1]
+
+    def escalate(self) -> bool:
+        """
+        Move the current request to the next tier.
+        Returns False when already at the strongest tier.
+        """
+        route = self.route()
+        if route.tier_index + 1 >= len(self.tiers):
+            return False
+
+        route.tier_index += 1
+        with self._lock:
+            self.escalations[self.tiers[route.tier_index][0]] += 1
+        return True
+
+    @property
+    def current_tier(self) -> str:
+        return self.tiers[self.route().tier_index][0]
+
+    # ---- LLM interface ----
+
+    def generate(self, *, prompt: str, max_tokens: int, temperature: float) -> str:
+        name, llm = self._tier()
+        start = time.perf_counter()
+        text = llm.generate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        self._attempt(name, llm, start)
+        return text
+
+    async def agenerate(self, *, prompt: str, max_tokens: int, temperature: float) -> str:
+        name, llm = self._tier()
+        start = time.perf_counter()
+        text = await llm.agenerate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        self._attempt(name, llm, start)
+        return text
+
+    def stream(self, *, prompt: str, max_tokens: int, temperature: float):
+        name, llm = self._tier()
+        start = time.perf_counter()
+        stream = llm.stream(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        try:
+            yield from stream
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            self._attempt(name, llm, start)
+
+    async def astream(self, *, prompt: str, max_tokens: int, temperature: float):
+        name, llm = self._tier()
+        start = time.perf_counter()
+        stream = llm.astream(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        try:
+            async for delta in stream:
+                yield delta
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            self._attempt(name, llm, start)
+
+    def get_last_usage(self) -> Optional[LLMUsage]:
+        # Everything the current request spent, across tiers
+        current = _route.get()
+        if current is None or current[0] is not self:
+            return None
+        return current[1].total_usage()
+
+    # ---- observability ----
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "escalations": dict(self.escalations),
+            }
+
+    # ---- internals ----
+
+    def _tier(self) -> Tuple[str, LLM]:
+        return self.tiers[self.route().tier_index]
+
+    def _attempt(self, name: str, llm: LLM, start: float) -> None:
+        with self._lock:
+            self.calls[name] += 1
+        self.route().attempts.append(TierAttempt(
+            tier=name,
+            latency_ms=(time.perf_counter() - start) * 1000.0,
+            usage=llm.get_last_usage(),
+        ))
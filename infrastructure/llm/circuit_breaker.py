@@ -0,0 +1,330 @@
+"""
+Circuit breaker around the LLM backend.
+
+When the provider degrades, retries and deadlines still make every
+request wait for it, and pipeline latency collapses with it. The
+breaker watches outcomes over a sliding window and, on sustained
+degradation, stops calling the backend for a while:
+
+    CLOSED ──(error or slow-call rate over threshold)──→ OPEN
+      ↑                                                   │ open_for_s
+      └──── probe succeeds ──── HALF_OPEN ←───────────────┘
+                                    │ probe fails
+                                    └──────────────→ OPEN
+
+While OPEN, calls fail immediately with LLMUnavailableError, which
+the pipeline turns into the "llm_unavailable" refusal. HALF_OPEN lets
+a few probe calls through to test recovery.
+
+Counted as failures: transient provider errors (is_retryable),
+timeouts and scheduler overload. Caller errors (e.g. HTTP 400) mean
+the provider answered, so they count as successes.
+
+Every state change is a BreakerTransition, passed to `on_transition`
+(the factory exports them as Day 9 signals) and kept in `transitions`.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from infrastructure.llm.base import LLM
+from infrastructure.llm.errors import LLMOverloadedError, LLMUnavailableError, is_retryable
+
+
+class BreakerState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class BreakerPolicy:
+    """
+    Fields:
+    - window_s:
+        Outcomes older than this are forgotten.
+    - min_calls:
+        No decision on fewer outcomes than this in the window.
+    - max_error_rate:
+        Open when this share of calls in the window failed.
+    - slow_call_s / max_slow_rate:
+        Open when this share of calls took longer than slow_call_s.
+        slow_call_s=None disables latency tracking.
+    - open_for_s:
+        Time spent OPEN before probing.
+    - half_open_probes:
+        Concurrent probe calls allowed while HALF_OPEN.
+    """
+    window_s: float = 30.0
+    min_calls: int = 10
+    max_error_rate: float = 0.5
+    slow_call_s: Optional[float] = 10.0
+    max_slow_rate: float = 0.8
+    open_for_s: float = 15.0
+    half_open_probes: int = 1
+
+
+@dataclass(frozen=True)
+class BreakerTransition:
+    name: str
+    from_state: BreakerState
+    to_state: BreakerState
+    reason: str
+    at: float
+
+
+def counts_as_failure(exc: BaseException) -> bool:
+    return is_retryable(exc) or isinstance(exc, (TimeoutError, LLMOverloadedError))
+
+
+class CircuitBreakerLLM(LLM):
+    """
+    Fails fast while the wrapped backend is degraded.
+    """
+
+    def __init__(
+        self,
+        inner: LLM,
+        policy: BreakerPolicy = BreakerPolicy(),
+        *,
+        name: Optional[str] = None,
+        on_transition: Optional[Callable[[BreakerTransition], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        max_transitions: int = 100,
+    ):
+        self.inner = inner
+        self.policy = policy
+        self.model = getattr(inner, "model", None)
+        self.name = name or self.model or "llm"
+        self.on_transition = on_transition
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self.state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        # (finished_at, failed, slow)
+        self._window: Deque[Tuple[float, bool, bool]] = deque()
+
+        self.rejected = 0
+        self.transitions: Deque[BreakerTransition] = deque(maxlen=max_transitions)
+
+    # ---- LLM interface ----
+
+    def generate(self, *, prompt: str, max_tokens: int, temperature: float) -> str:
+        probe = self._acquire()
+        started = self._clock()
+        try:
+            text = self.inner.generate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        except Exception as e:
+            self._record(probe, started, failed=counts_as_failure(e))
+            raise
+        except BaseException:
+            self._release(probe)
+            raise
+        self._record(probe, started, failed=False)
+        self._record_usage(self.inner.get_last_usage())
+        return text
+
+    async def agenerate(self, *, prompt: str, max_tokens: int, temperature: float) -> str:
+        probe = self._acquire()
+        started = self._clock()
+        try:
+            text = await self.inner.agenerate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        except Exception as e:
+            self._record(probe, started, failed=counts_as_failure(e))
+            raise
+        except BaseException:
+            # Cancelled: says nothing about the backend
+            self._release(probe)
+            raise
+        self._record(probe, started, failed=False)
+        self._record_usage(self.inner.get_last_usage())
+        return text
+
+    def stream(self, *, prompt: str, max_tokens: int, temperature: float):
+        probe = self._acquire()
+        started = self._clock()
+        stream = self.inner.stream(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        delivered = False
+        try:
+            for delta in stream:
+                delivered = True
+                yield delta
+        except Exception as e:
+            self._record(probe, started, failed=counts_as_failure(e))
+            raise
+        except BaseException:
+            self._abort(probe, started, delivered)
+            raise
+        else:
+            self._record(probe, started, failed=False)
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            self._record_usage(self.inner.get_last_usage())
+
+    async def astream(self, *, prompt: str, max_tokens: int, temperature: float):
+        probe = self._acquire()
+        started = self._clock()
+        stream = self.inner.astream(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        delivered = False
+        try:
+            async for delta in stream:
+                delivered = True
+                yield delta
+        except Exception as e:
+            self._record(probe, started, failed=counts_as_failure(e))
+            raise
+        except BaseException:
+            self._abort(probe, started, delivered)
+            raise
+        else:
+            self._record(probe, started, failed=False)
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            self._record_usage(self.inner.get_last_usage())
+
+    # ---- observability ----
+
+    def current_state(self) -> BreakerState:
+        """State as of now (an expired OPEN period reads as HALF_OPEN)."""
+        with self._lock:
+            events = self._maybe_half_open()
+        self._emit(events)
+        return self.state
+
+    def stats(self) -> Dict[str, object]:
+        state = self.current_state()
+        with self._lock:
+            self._prune(self._clock())
+            calls = len(self._window)
+            return {
+                "state": state.value,
+                "window_calls": calls,
+                "error_rate": sum(f for _, f, _ in self._window) / calls if calls else 0.0,
+                "slow_rate": sum(s for _, _, s in self._window) / calls if calls else 0.0,
+                "rejected": self.rejected,
+                "transitions": len(self.transitions),
+            }
+
+    # ---- internals ----
+
+    def _acquire(self) -> bool:
+        """
+        Admit a call, or raise LLMUnavailableError.
+        Returns True when the call is a HALF_OPEN probe.
+        """
+        with self._lock:
+            events = self._maybe_half_open()
+
+            if self.state == BreakerState.CLOSED:
+                probe = False
+            elif self.state == BreakerState.HALF_OPEN and self._probes < self.policy.half_open_probes:
+                self._probes += 1
+                probe = True
+            else:
+                self.rejected += 1
+                probe = None
+
+        self._emit(events)
+        if probe is None:
+            raise LLMUnavailableError(f"circuit '{self.name}' is {self.state.value}")
+        return probe
+
+    def _release(self, probe: bool) -> None:
+        if probe:
+            with self._lock:
+                self._probes -= 1
+
+    def _abort(self, probe: bool, started: float, delivered: bool) -> None:
+        """
+        Stream closed or cancelled by the caller. Once a delta arrived
+        the backend was answering: record a success. Before that the
+        abort says nothing about the backend.
+        """
+        if delivered:
+            self._record(probe, started, failed=False)
+        else:
+            self._release(probe)
+
+    def _record(self, probe: bool, started: float, *, failed: bool) -> None:
+        now = self._clock()
+        slow = self.policy.slow_call_s is not None and now - started > self.policy.slow_call_s
+
+        with self._lock:
+            if probe:
+                self._probes -= 1
+
+            if self.state == BreakerState.HALF_OPEN:
+                # One probe outcome decides; stragglers from before do not
+                if not probe:
+                    events = []
+                elif failed or slow:
+                    events = [self._transition(BreakerState.OPEN, "probe_failed" if failed else "probe_slow")]
+                else:
+                    self._window.clear()
+                    events = [self._transition(BreakerState.CLOSED, "probe_succeeded")]
+            elif self.state == BreakerState.CLOSED:
+                self._window.append((now, failed, slow))
+                events = self._maybe_open(now)
+            else:
+                # Admitted before the breaker opened: already decided
+                events = []
+
+        self._emit(events)
+
+    def _maybe_open(self, now: float) -> List[BreakerTransition]:
+        self._prune(now)
+        calls = len(self._window)
+        if calls < self.policy.min_calls:
+            return []
+
+        error_rate = sum(f for _, f, _ in self._window) / calls
+        if error_rate >= self.policy.max_error_rate:
+            return [self._transition(BreakerState.OPEN, f"error_rate={error_rate:.2f}")]
+
+        slow_rate = sum(s for _, _, s in self._window) / calls
+        if self.policy.slow_call_s is not None and slow_rate >= self.policy.max_slow_rate:
+            return [self._transition(BreakerState.OPEN, f"slow_rate={slow_rate:.2f}")]
+
+        return []
+
+    def _maybe_half_open(self) -> List[BreakerTransition]:
+        if self.state == BreakerState.OPEN and self._clock() - self._opened_at >= self.policy.open_for_s:
+            return [self._transition(BreakerState.HALF_OPEN, "open_period_elapsed")]
+        return []
+
+    def _prune(self, now: float) -> None:
+        while self._window and now - self._window[0][0] > self.policy.window_s:
+            self._window.popleft()
+
+    def _transition(self, to_state: BreakerState, reason: str) -> BreakerTransition:
+        # Caller holds self._lock
+        event = BreakerTransition(
+            name=self.name,
+            from_state=self.state,
+            to_state=to_state,
+            reason=reason,
+            at=time.time(),
+        )
+        self.state = to_state
+        if to_state == BreakerState.OPEN:
+            self._opened_at = self._clock()
+            self._window.clear()
+        self.transitions.append(event)
+        return event
+
+    def _emit(self, events: List[BreakerTransition]) -> None:
+        # Outside the lock: listeners may log, export, or read stats()
+        if self.on_transition is None:
+            return
+        for event in events:
+            self.on_transition(event)
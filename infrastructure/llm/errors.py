@@ -0,0 +1,86 @@
+"""
+LLM call errors.
+
+Backends raise their own exception types (openai.RateLimitError,
+httpx.ReadTimeout, ...). Callers above the LLM interface only need to
+know two things about a failure:
+- is it worth retrying?
+- did the provider say how long to wait?
+
+Both are answered here without importing any provider SDK.
+"""
+
+from typing import Optional
+
+# HTTP statuses that describe a transient provider condition
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
+# Transport failures, matched by class name (openai / httpx)
+_RETRYABLE_ERROR_NAMES = frozenset({
+    "APITimeoutError",
+    "APIConnectionError",
+    "ConnectError",
+    "ConnectTimeout",
+    "ReadTimeout",
+    "RemoteProtocolError",
+})
+
+
+class LLMError(Exception):
+    """Base class for errors raised by the LLM layer itself."""
+
+
+class RetryableLLMError(LLMError):
+    """A transient failure; `retry_after_s` is the provider's hint, if any."""
+
+    def __init__(self, message: str, *, retry_after_s: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+
+class LLMDeadlineExceededError(LLMError, TimeoutError):
+    """The call's deadline passed before a completion was available."""
+
+
+class LLMOverloadedError(LLMError):
+    """Too many callers are already waiting; rejected without queueing."""
+
+
+class LLMUnavailableError(LLMError):
+    """The backend is considered down (circuit open); failed without calling it."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (LLMDeadlineExceededError, LLMOverloadedError, LLMUnavailableError)):
+        return False
+    if isinstance(exc, RetryableLLMError):
+        return True
+
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+
+    if type(exc).__name__ in _RETRYABLE_ERROR_NAMES:
+        return True
+
+    return isinstance(exc, (TimeoutError, ConnectionError))
+
+
+def retry_after_s(exc: BaseException) -> Optional[float]:
+    """
+    Provider-requested wait (Retry-After), in seconds.
+    """
+    hint = getattr(exc, "retry_after_s", None)
+    if hint is not None:
+        return float(hint)
+
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None  # HTTP-date form: fall back to our own backoff
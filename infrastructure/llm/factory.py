@@ -1,11 +1,72 @@
 import os
+from typing import Optional
 
+from day09_observability.exporters import export_circuit_transition
 from infrastructure.llm.base import LLM
+from infrastructure.llm.batching import BatchPolicy, MicroBatchingLLM
+from infrastructure.llm.cache import CachingLLM
+from infrastructure.llm.cascade import CascadingLLM
+from infrastructure.llm.circuit_breaker import BreakerPolicy, CircuitBreakerLLM
 from infrastructure.llm.fake import FakeLLM
 from infrastructure.llm.openai_llm import OpenAILLM
+from infrastructure.llm.scheduler import ScheduledLLM, SchedulerPolicy
 
 
 def build_llm() -> LLM:
+    """
+    Select the LLM backend from the environment.
+
+    - RAG_ENV=test → FakeLLM
+    - RAG_ENV=prod → OpenAILLM (OPENAI_API_KEY, OPENAI_MODEL) behind
+      a ScheduledLLM (rate limits, retries, deadline)
+    - RAG_ENV=local → the same stack against a local OpenAI-compatible
+      server (RAG_LLM_BASE_URL, default: the stand-in server,
+      `python -m infrastructure.llm.standin_server`)
+
+    Scheduler (prod, local):
+        RAG_LLM_RPM / RAG_LLM_TPM  provider rate limits (unset = none)
+        RAG_LLM_MAX_IN_FLIGHT      concurrent requests (default 16)
+        RAG_LLM_MAX_ATTEMPTS       attempts per call (default 4)
+        RAG_LLM_DEADLINE_S         per-call deadline (default 60)
+        RAG_LLM_HEDGE_AFTER_S      hedge slow calls (unset = off)
+
+    Optional response cache:
+        RAG_LLM_CACHE_SIZE       in-memory entries (0 disables, default)
+        RAG_LLM_CACHE_DIR        enables the disk tier
+        RAG_LLM_CACHE_MAX_BYTES  disk tier size bound
+        RAG_LLM_CACHE_SAMPLED    1 → also cache temperature > 0 calls
+                                 (GenerationPolicy defaults to 0.2;
+                                 default 0: temperature 0 only)
+
+    Circuit breaker (prod, local), around the scheduler:
+        RAG_LLM_BREAKER              0 disables (default 1)
+        RAG_LLM_BREAKER_ERROR_RATE   open at this failure share (default 0.5)
+        RAG_LLM_BREAKER_SLOW_CALL_S  a call slower than this is "slow" (default 10)
+        RAG_LLM_BREAKER_OPEN_S       fail fast this long before probing (default 15)
+
+    Optional micro-batching (prod, local), under the scheduler:
+        RAG_LLM_BATCH_SIZE       max prompts per batch (1 disables, default)
+        RAG_LLM_BATCH_WAIT_MS    collection window (default 5)
+        RAG_LLM_BATCH_ENDPOINT   1 → one /completions request per batch
+                                 (default: 1 for local, 0 for prod, where
+                                 batches are concurrent chat calls)
+
+    Optional model cascade (prod, local):
+        RAG_LLM_CASCADE          comma-separated models, cheapest first
+                                 (e.g. "gpt-4.1-nano,gpt-4.1-mini");
+                                 each tier gets its own scheduler and cache
+    """
+    cascade = [m.strip() for m in os.getenv("RAG_LLM_CASCADE", "").split(",") if m.strip()]
+
+    if cascade and os.getenv("RAG_ENV", "test") != "test":
+        return CascadingLLM([
+            (model, _with_cache(_build_backend(model))) for model in cascade
+        ])
+
+    return _with_cache(_build_backend())
+
+
+def _build_backend(model: Optional[str] = None) -> LLM:
     env = os.getenv("RAG_ENV", "test")
 
     if env == "test":
@@ -18,9 +79,84 @@ def build_llm() -> LLM:
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY is required when RAG_ENV=prod")
 
-        return OpenAILLM(
-            model=os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
+        backend = OpenAILLM(
+            model=model or os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
             api_key=api_key,
+            max_retries=0,
+            batch_endpoint=os.getenv("RAG_LLM_BATCH_ENDPOINT", "0") == "1",
         )
+        return _with_breaker(ScheduledLLM(_with_batching(backend), _scheduler_policy()))
+
+    if env == "local":
+        backend = OpenAILLM(
+            model=model or os.getenv("OPENAI_MODEL", "stand-in"),
+            api_key=os.getenv("OPENAI_API_KEY", "local"),
+            max_retries=0,
+            base_url=os.getenv("RAG_LLM_BASE_URL", "http://127.0.0.1:8089/v1"),
+            batch_endpoint=os.getenv("RAG_LLM_BATCH_ENDPOINT", "1") == "1",
+        )
+        return _with_breaker(ScheduledLLM(_with_batching(backend), _scheduler_policy()))
+
+    raise RuntimeError(f"Unknown RAG_ENV: {env}")
+
+
+def _scheduler_policy() -> SchedulerPolicy:
+    def optional_float(name):
+        value = os.getenv(name)
+        return float(value) if value else None
+
+    return SchedulerPolicy(
+        requests_per_minute=optional_float("RAG_LLM_RPM"),
+        tokens_per_minute=optional_float("RAG_LLM_TPM"),
+        max_in_flight=int(os.getenv("RAG_LLM_MAX_IN_FLIGHT", "16")),
+        max_attempts=int(os.getenv("RAG_LLM_MAX_ATTEMPTS", "4")),
+        deadline_s=float(os.getenv("RAG_LLM_DEADLINE_S", "60")),
+        hedge_after_s=optional_float("RAG_LLM_HEDGE_AFTER_S"),
+    )
+
+
+def _with_breaker(llm: LLM) -> LLM:
+    # Outside the scheduler: an open circuit fails fast, without queueing
+    if os.getenv("RAG_LLM_BREAKER", "1") != "1":
+        return llm
+
+    return CircuitBreakerLLM(
+        llm,
+        BreakerPolicy(
+            max_error_rate=float(os.getenv("RAG_LLM_BREAKER_ERROR_RATE", "0.5")),
+            slow_call_s=float(os.getenv("RAG_LLM_BREAKER_SLOW_CALL_S", "10")),
+            open_for_s=float(os.getenv("RAG_LLM_BREAKER_OPEN_S", "15")),
+        ),
+        on_transition=export_circuit_transition,
+    )
+
+
+def _with_batching(llm: LLM) -> LLM:
+    # Below the scheduler: calls it admitted concurrently are coalesced
+    batch_size = int(os.getenv("RAG_LLM_BATCH_SIZE", "1"))
+    if batch_size <= 1:
+        return llm
+
+    return MicroBatchingLLM(
+        llm,
+        BatchPolicy(
+            max_batch_size=batch_size,
+            max_wait_ms=float(os.getenv("RAG_LLM_BATCH_WAIT_MS", "5")),
+        ),
+    )
+
+
+def _with_cache(llm: LLM) -> LLM:
+    cache_size = int(os.getenv("RAG_LLM_CACHE_SIZE", "0"))
+    disk_dir = os.getenv("RAG_LLM_CACHE_DIR")
+
+    if cache_size <= 0 and not disk_dir:
+        return llm
 
-    raise RuntimeError(f"Unknown RAG_ENV: {env}")
\ No newline at end of file
+    return CachingLLM(
+        llm,
+        max_entries=max(cache_size, 1),
+        disk_dir=disk_dir,
+        max_disk_bytes=int(os.getenv("RAG_LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+        cache_sampled=os.getenv("RAG_LLM_CACHE_SAMPLED", "0") == "1",
+    )
@@ -1,3 +1,5 @@
+import re
+
 from infrastructure.llm.base import LLM, LLMUsage
 
 class FakeLLM(LLM):
@@ -13,6 +15,18 @@ class FakeLLM(LLM):
     def generate(self, prompt: str, max_tokens: int, temperature: float) -> str:
         return self.fixed_response
 
+    async def agenerate(self, *, prompt: str, max_tokens: int, temperature: float) -> str:
+        # No I/O: answer inline instead of occupying an executor slot
+        return self.fixed_response
+
+    def stream(self, *, prompt: str, max_tokens: int, temperature: float):
+        # Word by word, like a real token stream
+        yield from re.findall(r"\S+\s*|\s+", self.fixed_response)
+
+    async def astream(self, *, prompt: str, max_tokens: int, temperature: float):
+        for delta in self.stream(prompt=prompt, max_tokens=max_tokens, temperature=temperature):
+            yield delta
+
     def get_last_usage(self):
         return LLMUsage(
             prompt_tokens=0,
@@ -1,13 +1,65 @@
-from typing import Optional
+import asyncio
+import weakref
+from typing import List, Optional, Sequence
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
 from infrastructure.llm.pricing import estimate_cost
-from openai import OpenAI
-from infrastructure.llm.base import LLM, LLMUsage
+from infrastructure.llm.base import LLM, Completion, LLMUsage
+from infrastructure.llm.batching import split_usage
 
 class OpenAILLM(LLM):
-    def __init__(self, model: str, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+    """
+    OpenAI chat completions behind the LLM interface.
+
+    Connections are pooled and kept alive (one sync pool, one async
+    pool per event loop), so concurrent generations reuse TCP/TLS
+    sessions instead of opening one per request.
+
+    With `batch_endpoint=True`, `generate_batch` sends all prompts in
+    ONE `/completions` request (list-valued `prompt`), as served by
+    batch-capable OpenAI-compatible servers and the local stand-in.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        api_key: str,
+        *,
+        max_connections: int = 200,
+        max_keepalive_connections: int = 50,
+        keepalive_expiry_s: float = 30.0,
+        timeout_s: float = 60.0,
+        max_retries: int = 2,
+        base_url: Optional[str] = None,
+        batch_endpoint: bool = False,
+    ):
         self.model = model
-        self._last_usage: Optional[LLMUsage]= None
+        self.api_key = api_key
+        self.timeout_s = timeout_s
+        # SDK-level retries; 0 when a ScheduledLLM owns retrying
+        self.max_retries = max_retries
+        # None → api.openai.com; any OpenAI-compatible server otherwise
+        self.base_url = base_url
+        self.batch_endpoint = batch_endpoint
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_s,
+        )
+
+        self.client = OpenAI(
+            api_key=api_key,
+            max_retries=max_retries,
+            base_url=base_url,
+            http_client=DefaultHttpxClient(limits=self.limits, timeout=timeout_s),
+        )
+
+        # httpx.AsyncClient binds to one event loop: keep one per loop
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = (
+            weakref.WeakKeyDictionary()
+        )
 
     def generate(self, prompt: str, max_tokens: int, temperature: float) -> str:
         response = self.client.chat.completions.create(
@@ -17,9 +69,121 @@ class OpenAILLM(LLM):
             temperature=temperature,
         )
 
+        self._record_usage(self._usage_from(response))
+
+        return response.choices[0].message.content
+
+    async def agenerate(self, *, prompt: str, max_tokens: int, temperature: float) -> str:
+        response = await self._async_client().chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+
+        self._record_usage(self._usage_from(response))
+
+        return response.choices[0].message.content
+
+    def generate_batch(self, *, prompts: Sequence[str], max_tokens: int, temperature: float) -> List[Completion]:
+        if not self.batch_endpoint:
+            return super().generate_batch(prompts=prompts, max_tokens=max_tokens, temperature=temperature)
+
+        response = self.client.completions.create(
+            model=self.model,
+            prompt=list(prompts),
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        return self._batch_completions(prompts, response)
+
+    async def agenerate_batch(self, *, prompts: Sequence[str], max_tokens: int, temperature: float) -> List[Completion]:
+        if not self.batch_endpoint:
+            return await super().agenerate_batch(prompts=prompts, max_tokens=max_tokens, temperature=temperature)
+
+        response = await self._async_client().completions.create(
+            model=self.model,
+            prompt=list(prompts),
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        return self._batch_completions(prompts, response)
+
+    def stream(self, *, prompt: str, max_tokens: int, temperature: float):
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+
+        # Usage arrives in the final chunk; an aborted stream has none
+        self._record_usage(None)
+        try:
+            for chunk in response:
+                if chunk.usage is not None:
+                    self._record_usage(self._usage_from(chunk))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Closing the HTTP response stops generation server-side
+            response.close()
+
+    async def astream(self, *, prompt: str, max_tokens: int, temperature: float):
+        response = await self._async_client().chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+
+        self._record_usage(None)
+        try:
+            async for chunk in response:
+                if chunk.usage is not None:
+                    self._record_usage(self._usage_from(chunk))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await response.close()
+
+    async def aclose(self) -> None:
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    def _async_client(self) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = AsyncOpenAI(
+                api_key=self.api_key,
+                max_retries=self.max_retries,
+                base_url=self.base_url,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=self.limits, timeout=self.timeout_s
+                ),
+            )
+        return client
+
+    def _batch_completions(self, prompts: Sequence[str], response) -> List[Completion]:
+        texts = [c.text for c in sorted(response.choices, key=lambda c: c.index)]
+        # One usage per request: each prompt is billed its share
+        usages = split_usage(self._usage_from(response), prompts, texts)
+        return list(zip(texts, usages))
+
+    @staticmethod
+    def _usage_from(response) -> Optional[LLMUsage]:
         usage = response.usage
+        if usage is None:
+            return None
 
-        self._last_usage = LLMUsage(
+        return LLMUsage(
             prompt_tokens=usage.prompt_tokens,
             completion_tokens=usage.completion_tokens,
             total_tokens=usage.total_tokens,
@@ -28,9 +192,3 @@ class OpenAILLM(LLM):
                 completion_tokens=usage.completion_tokens,
             ),
         )
-
-        return response.choices[0].message.content
-
-    def get_last_usage(self):
-        return self._last_usage
-
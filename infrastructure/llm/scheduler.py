@@ -0,0 +1,600 @@
+"""
+Rate-limited, concurrency-bounded LLM scheduling.
+
+A bare backend call has no admission control: under load we either
+exceed the provider's rate limits (429s) or pile up blocked callers.
+
+ScheduledLLM wraps any LLM and, for every attempt:
+- reserves capacity from token buckets for requests/min AND tokens/min
+  (token cost estimated from the prompt, corrected from actual usage)
+- takes one of `max_in_flight` slots
+- retries retryable failures with exponential backoff + full jitter,
+  honoring Retry-After
+- gives up at the call's deadline (LLMDeadlineExceededError)
+- optionally sends ONE hedged duplicate if the first attempt is still
+  running after `hedge_after_s`, and keeps whichever finishes first.
+  A hedge is only sent when a slot and rate capacity are free right
+  now: hedging never adds to a queue.
+
+Deadlines:
+- async calls are cancelled at the deadline
+- sync calls cannot be interrupted mid-request; the deadline bounds
+  admission waits and backoff, and the backend's own timeout bounds
+  each attempt. With hedging, the caller stops waiting at the deadline
+  and the abandoned attempt finishes in the background.
+
+Streams are admitted and retried the same way, but only until the
+first delta arrives (a partial answer cannot be replayed).
+
+`stats()` exposes queue depth, admission wait times, retries and hedges.
+"""
+
+import asyncio
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from infrastructure.deadline import current_deadline
+from infrastructure.llm.base import LLM, Completion, LLMUsage
+from infrastructure.llm.errors import (
+    LLMDeadlineExceededError,
+    LLMOverloadedError,
+    is_retryable,
+    retry_after_s,
+)
+from infrastructure.llm.tokenizer import Tokenizer, get_tokenizer
+
+
+@dataclass(frozen=True)
+class SchedulerPolicy:
+    """
+    Fields:
+    - requests_per_minute / tokens_per_minute:
+        Provider rate limits. None disables that bucket.
+    - max_in_flight:
+        Concurrent requests to the backend (per event loop for async).
+    - max_queue:
+        Callers allowed to wait for admission. None = unbounded;
+        beyond it calls fail fast with LLMOverloadedError.
+    - max_attempts:
+        Attempts per call, including the first.
+    - backoff_base_s / backoff_max_s:
+        Exponential backoff bounds (full jitter).
+    - deadline_s:
+        Wall-clock budget per call, including queueing and retries.
+        A request deadline in scope (infrastructure.deadline) can only
+        shorten it.
+    - hedge_after_s:
+        Send one duplicate request after this long. None disables.
+    """
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    max_in_flight: int = 16
+    max_queue: Optional[int] = None
+    max_attempts: int = 4
+    backoff_base_s: float = 0.5
+    backoff_max_s: float = 20.0
+    deadline_s: Optional[float] = 60.0
+    hedge_after_s: Optional[float] = None
+
+
+def estimate_request_tokens(prompt: str, max_tokens: int, tokenizer: Optional[Tokenizer] = None) -> int:
+    # Prompt tokens counted locally, plus the completion we allow
+    return (tokenizer or get_tokenizer()).count_prompt(prompt) + max_tokens
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with reservations.
+
+    `reserve` takes capacity immediately (the balance may go negative)
+    and returns how long the caller must wait before using it. Waiting
+    callers therefore queue in arrival order instead of racing.
+    """
+
+    def __init__(
+        self,
+        per_minute: float,
+        *,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate_per_s = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            # An oversized request waits for a full bucket, not forever
+            self._tokens -= min(amount, self.capacity)
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_s
+
+    def try_reserve(self, amount: float) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens < min(amount, self.capacity):
+                return False
+            self._tokens -= min(amount, self.capacity)
+            return True
+
+    def refund(self, amount: float) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def debit(self, amount: float) -> None:
+        with self._lock:
+            self._tokens -= amount
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._updated) * self.rate_per_s,
+        )
+        self._updated = now
+
+
+class ScheduledLLM(LLM):
+    """
+    LLM wrapper with rate limits, bounded concurrency, retries,
+    deadlines and optional hedging.
+    """
+
+    def __init__(
+        self,
+        inner: LLM,
+        policy: SchedulerPolicy = SchedulerPolicy(),
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ):
+        self.inner = inner
+        self.policy = policy
+        self.model = getattr(inner, "model", type(inner).__name__)
+        self._tokenizer = get_tokenizer(getattr(inner, "model", None))
+
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._requests = (
+            TokenBucket(policy.requests_per_minute, clock=clock)
+            if policy.requests_per_minute else None
+        )
+        self._tokens = (
+            TokenBucket(policy.tokens_per_minute, clock=clock)
+            if policy.tokens_per_minute else None
+        )
+
+        self._slots = threading.BoundedSemaphore(policy.max_in_flight)
+        # asyncio.Semaphore binds to one event loop: keep one per loop
+        self._async_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        # Sync hedging needs a second thread per hedged call
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+        self.rejected = 0
+
+    # ---- LLM interface ----
+
+    def generate(self, *, prompt: str, max_tokens: int, temperature: float) -> str:
+        deadline = self._deadline()
+        estimate = estimate_request_tokens(prompt, max_tokens, self._tokenizer)
+
+        def call() -> Completion:
+            text = self.inner.generate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+            return text, self.inner.get_last_usage()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            self._admit(estimate, deadline)
+            try:
+                if self.policy.hedge_after_s is None:
+                    try:
+                        text, usage = call()
+                    finally:
+                        self._release()
+                else:
+                    text, usage = self._race(call, estimate, deadline)
+            except Exception as e:
+                delay = self._backoff_or_raise(e, attempt, deadline)
+            else:
+                return self._finish(text, usage, estimate)
+
+            time.sleep(delay)
+
+    async def agenerate(self, *, prompt: str, max_tokens: int, temperature: float) -> str:
+        deadline = self._deadline()
+        estimate = estimate_request_tokens(prompt, max_tokens, self._tokenizer)
+
+        async def call() -> Completion:
+            text = await self.inner.agenerate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+            return text, self.inner.get_last_usage()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            slots = await self._aadmit(estimate, deadline)
+            try:
+                text, usage = await self._arace(call, slots, estimate, deadline)
+            except Exception as e:
+                delay = self._backoff_or_raise(e, attempt, deadline)
+            else:
+                return self._finish(text, usage, estimate)
+            finally:
+                slots.release()
+                self._leave_flight()
+
+            # Back off without holding a slot
+            await asyncio.sleep(delay)
+
+    def stream(self, *, prompt: str, max_tokens: int, temperature: float):
+        deadline = self._deadline()
+        estimate = estimate_request_tokens(prompt, max_tokens, self._tokenizer)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            self._admit(estimate, deadline)
+            started = False
+            stream = self.inner.stream(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+            try:
+                for delta in stream:
+                    started = True
+                    yield delta
+            except Exception as e:
+                if started:
+                    raise
+                delay = self._backoff_or_raise(e, attempt, deadline)
+            else:
+                self._finish("", self.inner.get_last_usage(), estimate)
+                return
+            finally:
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+                self._release()
+
+            time.sleep(delay)
+
+    async def astream(self, *, prompt: str, max_tokens: int, temperature: float):
+        deadline = self._deadline()
+        estimate = estimate_request_tokens(prompt, max_tokens, self._tokenizer)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            slots = await self._aadmit(estimate, deadline)
+            started = False
+            stream = self.inner.astream(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+            try:
+                async for delta in stream:
+                    started = True
+                    yield delta
+            except Exception as e:
+                if started:
+                    raise
+                delay = self._backoff_or_raise(e, attempt, deadline)
+            else:
+                self._finish("", self.inner.get_last_usage(), estimate)
+                return
+            finally:
+                aclose = getattr(stream, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+                slots.release()
+                self._leave_flight()
+
+            await asyncio.sleep(delay)
+
+    # ---- observability ----
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "in_flight": self.in_flight,
+                "admitted": self.admitted,
+                "avg_wait_s": self.total_wait_s / self.admitted if self.admitted else 0.0,
+                "max_wait_s": self.max_wait_s,
+                "retries": self.retries,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "deadline_exceeded": self.deadline_exceeded,
+                "rejected": self.rejected,
+            }
+
+    # ---- admission ----
+
+    def _admit(self, estimate: int, deadline: Optional[float]) -> None:
+        start = self._clock()
+        self._enter_queue()
+        try:
+            delay = self._reserve(estimate)
+            if delay:
+                self._check_wait(delay, deadline, estimate)
+                time.sleep(delay)
+
+            remaining = self._remaining(deadline)
+            if not self._slots.acquire(timeout=remaining):
+                self._refund(estimate)
+                raise self._deadline_error("no free slot before the deadline")
+        finally:
+            self._leave_queue(start)
+        self._enter_flight()
+
+    async def _aadmit(self, estimate: int, deadline: Optional[float]) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._async_slots.get(loop)
+        if slots is None:
+            slots = self._async_slots[loop] = asyncio.Semaphore(self.policy.max_in_flight)
+
+        start = self._clock()
+        self._enter_queue()
+        try:
+            delay = self._reserve(estimate)
+            if delay:
+                self._check_wait(delay, deadline, estimate)
+                await asyncio.sleep(delay)
+
+            try:
+                await asyncio.wait_for(slots.acquire(), timeout=self._remaining(deadline))
+            except asyncio.TimeoutError:
+                self._refund(estimate)
+                raise self._deadline_error("no free slot before the deadline") from None
+        finally:
+            self._leave_queue(start)
+        self._enter_flight()
+        return slots
+
+    def _reserve(self, estimate: int) -> float:
+        delay = 0.0
+        if self._requests is not None:
+            delay = max(delay, self._requests.reserve(1))
+        if self._tokens is not None:
+            delay = max(delay, self._tokens.reserve(estimate))
+        return delay
+
+    def _try_reserve(self, estimate: int) -> bool:
+        if self._requests is not None and not self._requests.try_reserve(1):
+            return False
+        if self._tokens is not None and not self._tokens.try_reserve(estimate):
+            if self._requests is not None:
+                self._requests.refund(1)
+            return False
+        return True
+
+    def _refund(self, estimate: int) -> None:
+        if self._requests is not None:
+            self._requests.refund(1)
+        if self._tokens is not None:
+            self._tokens.refund(estimate)
+
+    def _check_wait(self, delay: float, deadline: Optional[float], estimate: int) -> None:
+        if deadline is not None and self._clock() + delay > deadline:
+            self._refund(estimate)
+            raise self._deadline_error("rate limit wait exceeds the deadline")
+
+    # ---- hedging ----
+
+    def _race(self, call: Callable[[], Completion], estimate: int, deadline: Optional[float]) -> Completion:
+        """
+        Run an admitted sync attempt, plus at most one hedge.
+
+        Each future owns its slot and releases it when it finishes, so
+        an abandoned attempt still counts as in flight.
+        """
+        if self._hedge_pool is None:
+            with self._lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = ThreadPoolExecutor(
+                        max_workers=2 * self.policy.max_in_flight,
+                        thread_name_prefix="rag-llm-hedge",
+                    )
+
+        primary = self._hedge_pool.submit(call)
+        primary.add_done_callback(lambda _: self._release())
+        # All attempts (primary first) / those still running
+        attempts = [primary]
+        running = {primary}
+
+        while True:
+            timeout = self._remaining(deadline)
+            if len(attempts) == 1:
+                timeout = self._until_hedge(timeout)
+
+            # Only unfinished attempts: a failed one would return at once
+            done, running = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            result = self._settle_race(attempts, done, running)
+            if result is not None:
+                return result
+
+            if deadline is not None and self._clock() >= deadline:
+                raise self._deadline_error("no completion before the deadline")
+
+            if not done and len(attempts) == 1 and self._slots.acquire(blocking=False):
+                if not self._try_hedge(estimate):
+                    self._slots.release()
+                    continue
+                hedge = self._hedge_pool.submit(call)
+                hedge.add_done_callback(lambda _: self._release())
+                attempts.append(hedge)
+                running.add(hedge)
+
+    async def _arace(
+        self,
+        call: Callable,
+        slots: asyncio.Semaphore,
+        estimate: int,
+        deadline: Optional[float],
+    ) -> Completion:
+        """
+        Run an admitted async attempt, plus at most one hedge.
+        Losers are cancelled (closing their HTTP requests).
+        """
+        tasks = [asyncio.ensure_future(call())]
+        running = set(tasks)
+        hedged = False
+        try:
+            while True:
+                timeout = self._remaining(deadline)
+                if len(tasks) == 1 and self.policy.hedge_after_s is not None:
+                    timeout = self._until_hedge(timeout)
+
+                # Only unfinished attempts: a failed one would return at once
+                done, running = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                result = self._settle_race(tasks, done, running)
+                if result is not None:
+                    return result
+
+                if deadline is not None and self._clock() >= deadline:
+                    raise self._deadline_error("no completion before the deadline")
+
+                if not done and len(tasks) == 1 and not slots.locked() and self._try_hedge(estimate):
+                    await slots.acquire()  # free: returns immediately
+                    hedged = True
+                    tasks.append(asyncio.ensure_future(call()))
+                    running.add(tasks[-1])
+        finally:
+            for task in tasks:
+                task.cancel()
+            if hedged:
+                slots.release()
+                self._leave_flight()
+
+    def _until_hedge(self, timeout: Optional[float]) -> Optional[float]:
+        hedge_after = self.policy.hedge_after_s
+        if hedge_after is None:
+            return timeout
+        return hedge_after if timeout is None else min(timeout, hedge_after)
+
+    def _try_hedge(self, estimate: int) -> bool:
+        # Only spare capacity is used: a hedge never waits
+        if self.policy.hedge_after_s is None or not self._try_reserve(estimate):
+            return False
+        with self._lock:
+            self.in_flight += 1
+            self.hedges += 1
+        return True
+
+    def _settle_race(self, attempts, done, running) -> Optional[Completion]:
+        """
+        The first successful result among `done`; raises once every
+        attempt has failed; None while some attempt is still running.
+        """
+        for f in attempts:
+            if f in done and f.exception() is None:
+                if f is not attempts[0]:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return f.result()
+
+        if not running:
+            # Every attempt failed: surface the primary's error
+            raise attempts[0].exception()
+        return None
+
+    # ---- retries ----
+
+    def _backoff_or_raise(self, exc: Exception, attempt: int, deadline: Optional[float]) -> float:
+        """
+        Re-raise `exc` unless another attempt is allowed; otherwise
+        return how long to back off before it.
+        """
+        if not is_retryable(exc) or attempt >= self.policy.max_attempts:
+            raise exc
+
+        cap = min(self.policy.backoff_max_s, self.policy.backoff_base_s * 2 ** (attempt - 1))
+        delay = self._rng.uniform(0, cap)
+        hint = retry_after_s(exc)
+        if hint is not None:
+            delay = max(delay, hint)
+
+        if deadline is not None and self._clock() + delay >= deadline:
+            raise self._deadline_error("no time left to retry") from exc
+
+        with self._lock:
+            self.retries += 1
+        return delay
+
+    # ---- bookkeeping ----
+
+    def _finish(self, text: str, usage: Optional[LLMUsage], estimate: int) -> str:
+        if usage is not None:
+            if self._tokens is not None:
+                # Correct the reservation with what the call really used
+                self._tokens.refund(max(estimate - usage.total_tokens, 0))
+                self._tokens.debit(max(usage.total_tokens - estimate, 0))
+            self._record_usage(usage)
+        return text
+
+    def _deadline(self) -> Optional[float]:
+        # The tighter of the per-call budget and the request's deadline
+        now = self._clock()
+        deadlines = []
+        if self.policy.deadline_s is not None:
+            deadlines.append(now + self.policy.deadline_s)
+        request = current_deadline()
+        if request is not None:
+            deadlines.append(now + request.remaining_s())
+        return min(deadlines) if deadlines else None
+
+    def _remaining(self, deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        return max(deadline - self._clock(), 0.0)
+
+    def _deadline_error(self, reason: str) -> LLMDeadlineExceededError:
+        with self._lock:
+            self.deadline_exceeded += 1
+        return LLMDeadlineExceededError(reason)
+
+    def _enter_queue(self) -> None:
+        with self._lock:
+            if self.policy.max_queue is not None and self.queue_depth >= self.policy.max_queue:
+                self.rejected += 1
+                raise LLMOverloadedError(f"{self.queue_depth} calls already waiting")
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def _leave_queue(self, start: float) -> None:
+        waited = self._clock() - start
+        with self._lock:
+            self.queue_depth -= 1
+            self.total_wait_s += waited
+            self.max_wait_s = max(self.max_wait_s, waited)
+
+    def _enter_flight(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.admitted += 1
+
+    def _leave_flight(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _release(self) -> None:
+        self._slots.release()
+        self._leave_flight()
@@ -0,0 +1,419 @@
+"""
+Local OpenAI-compatible stand-in server.
+
+FakeLLM answers instantly and in-process, so load tests never see
+network behavior: connection pooling, latency distributions, streaming
+pace, 429s and 5xxs. This server speaks the chat-completions protocol
+`OpenAILLM` uses (`POST /v1/chat/completions`, JSON and SSE streaming),
+so the real client, scheduler and pipeline run unchanged on one
+machine with no network. `POST /v1/completions` also accepts a LIST of
+prompts and answers all of them in one response, like batch-capable
+OpenAI-compatible servers (vLLM, TGI), for micro-batching:
+
+    python -m infrastructure.llm.standin_server --port 8089 \\
+        --latency-ms 300 --latency-sigma 0.5 --tokens-per-second 80
+    RAG_ENV=local python -m application.app
+
+Behavior (StandInConfig):
+- latency:   time to first token, fixed or lognormal around a median
+- streaming: completion tokens paced at `tokens_per_second`
+- errors:    random 500s (`error_rate`) and 429s (`rate_limit_rate`),
+             plus real 429s past `requests_per_minute`
+- responses: first matching (regex on the prompt, response) rule,
+             else `default_response`; `{source}` is replaced with the
+             first allowed source in the prompt so answers cite
+- batches:   one latency draw per request, tokens of all prompts
+             decoded in parallel (pace of the longest completion)
+
+Standard library only.
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+REFUSAL = "I don't have enough information to answer."
+
+_FIRST_SOURCE = re.compile(r"Allowed sources:\n-+\n- (.+)")
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+@dataclass(frozen=True)
+class StandInConfig:
+    """
+    Fields:
+    - latency_ms / latency_sigma:
+        Median time to first token; sigma > 0 draws it from a
+        lognormal around that median (heavy tail, like real providers).
+    - tokens_per_second:
+        Completion pace. Non-streaming responses wait for all tokens.
+    - error_rate / rate_limit_rate:
+        Probability of answering 500 / 429 instead of a completion.
+    - requests_per_minute:
+        Real limit over a sliding minute; excess requests get 429.
+    - retry_after_s:
+        Retry-After sent with every 429.
+    - rules:
+        (regex, response) pairs matched against the last user message.
+    - default_response:
+        Used when no rule matches (and a source is available).
+    - seed:
+        Makes latency and error draws reproducible.
+    """
+    latency_ms: float = 0.0
+    latency_sigma: float = 0.0
+    tokens_per_second: Optional[float] = None
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    requests_per_minute: Optional[int] = None
+    retry_after_s: float = 1.0
+    rules: Tuple[Tuple[str, str], ...] = ()
+    default_response: str = "This answer is grounded in the context [{source}]."
+    seed: Optional[int] = None
+
+
+@dataclass
+class StandInStats:
+    requests: int = 0
+    completions: int = 0
+    streams: int = 0
+    # Batch requests to /v1/completions and the prompts they carried
+    batches: int = 0
+    batched_prompts: int = 0
+    rate_limited: int = 0
+    errors: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+
+
+class StandInServer:
+    """
+    The server, on a background thread.
+
+        with StandInServer(StandInConfig(latency_ms=50)) as server:
+            llm = OpenAILLM(model="m", api_key="x", base_url=server.base_url)
+    """
+
+    def __init__(self, config: StandInConfig = StandInConfig(), *, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self.stats = StandInStats()
+
+        self._rng = random.Random(config.seed)
+        self._rules = [(re.compile(p), r) for p, r in config.rules]
+        self._recent: deque = deque()
+        self._lock = threading.Lock()
+
+        self._httpd = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            name="rag-llm-standin",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve on the calling thread (CLI use)."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ---- behavior ----
+
+    def admit(self) -> Optional[int]:
+        """
+        HTTP status to fail this request with, or None to serve it.
+        """
+        with self._lock:
+            self.stats.requests += 1
+
+            limit = self.config.requests_per_minute
+            if limit is not None:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] >= 60.0:
+                    self._recent.popleft()
+                if len(self._recent) >= limit:
+                    self.stats.rate_limited += 1
+                    return 429
+                self._recent.append(now)
+
+            draw = self._rng.random()
+            if draw < self.config.rate_limit_rate:
+                self.stats.rate_limited += 1
+                return 429
+            if draw < self.config.rate_limit_rate + self.config.error_rate:
+                self.stats.errors += 1
+                return 500
+        return None
+
+    def first_token_delay_s(self) -> float:
+        median = self.config.latency_ms / 1000.0
+        if median <= 0:
+            return 0.0
+        if self.config.latency_sigma <= 0:
+            return median
+        with self._lock:
+            return median * math.exp(self._rng.gauss(0.0, self.config.latency_sigma))
+
+    def token_delay_s(self) -> float:
+        tps = self.config.tokens_per_second
+        return 1.0 / tps if tps else 0.0
+
+    def respond(self, prompt: str) -> str:
+        for pattern, response in self._rules:
+            if pattern.search(prompt):
+                return self._fill(response, prompt)
+
+        if "{source}" in self.config.default_response and not _FIRST_SOURCE.search(prompt):
+            return REFUSAL
+        return self._fill(self.config.default_response, prompt)
+
+    def record(self, *, streamed: bool, latency_s: float, batch_size: Optional[int] = None) -> None:
+        with self._lock:
+            if batch_size is not None:
+                self.stats.batches += 1
+                self.stats.batched_prompts += batch_size
+            elif streamed:
+                self.stats.streams += 1
+            else:
+                self.stats.completions += 1
+            self.stats.latencies_ms.append(latency_s * 1000.0)
+
+    @staticmethod
+    def _fill(response: str, prompt: str) -> str:
+        match = _FIRST_SOURCE.search(prompt)
+        return response.replace("{source}", match.group(1).strip() if match else "")
+
+
+def completion_tokens(text: str, max_tokens: Optional[int]) -> Tuple[List[str], str]:
+    """
+    Word-level tokens of `text`, cut at `max_tokens`; plus finish_reason.
+    """
+    tokens = _TOKEN.findall(text)
+    if max_tokens is not None and len(tokens) > max_tokens:
+        return tokens[:max_tokens], "length"
+    return tokens, "stop"
+
+
+def _usage(prompt: str, n_completion: int) -> Dict[str, int]:
+    n_prompt = (len(prompt) + 3) // 4
+    return {
+        "prompt_tokens": n_prompt,
+        "completion_tokens": n_completion,
+        "total_tokens": n_prompt + n_completion,
+    }
+
+
+def _handler_for(server: StandInServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like a real provider
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+
+            path = self.path.rstrip("/")
+            if path not in ("/v1/chat/completions", "/v1/completions"):
+                return self._error(404, "not_found", f"unknown path {self.path}")
+
+            status = server.admit()
+            if status == 429:
+                return self._error(429, "rate_limit_exceeded", "Rate limit reached", retry_after=True)
+            if status is not None:
+                return self._error(status, "server_error", "Injected server error")
+
+            if path == "/v1/completions":
+                return self._completions(body)
+
+            messages = body.get("messages") or []
+            prompt = messages[-1].get("content", "") if messages else ""
+            tokens, finish_reason = completion_tokens(server.respond(prompt), body.get("max_tokens"))
+
+            started = time.monotonic()
+            time.sleep(server.first_token_delay_s())
+
+            if body.get("stream"):
+                include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+                self._stream(body, prompt, tokens, finish_reason, include_usage)
+                server.record(streamed=True, latency_s=time.monotonic() - started)
+                return
+
+            time.sleep(server.token_delay_s() * len(tokens))
+            self._json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stand-in"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": finish_reason,
+                }],
+                "usage": _usage(prompt, len(tokens)),
+            })
+            server.record(streamed=False, latency_s=time.monotonic() - started)
+
+        # ---- responses ----
+
+        def _completions(self, body):
+            prompts = body.get("prompt", "")
+            if isinstance(prompts, str):
+                prompts = [prompts]
+
+            outputs = [
+                completion_tokens(server.respond(prompt), body.get("max_tokens"))
+                for prompt in prompts
+            ]
+
+            started = time.monotonic()
+            time.sleep(server.first_token_delay_s())
+            # Sequences in a batch decode in parallel
+            longest = max((len(tokens) for tokens, _ in outputs), default=0)
+            time.sleep(server.token_delay_s() * longest)
+
+            usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            for prompt, (tokens, _) in zip(prompts, outputs):
+                for key, value in _usage(prompt, len(tokens)).items():
+                    usage[key] += value
+
+            self._json(200, {
+                "id": f"cmpl-{uuid.uuid4().hex}",
+                "object": "text_completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stand-in"),
+                "choices": [
+                    {"index": i, "text": "".join(tokens), "finish_reason": finish_reason, "logprobs": None}
+                    for i, (tokens, finish_reason) in enumerate(outputs)
+                ],
+                "usage": usage,
+            })
+            server.record(streamed=False, latency_s=time.monotonic() - started, batch_size=len(prompts))
+
+        def _stream(self, body, prompt, tokens, finish_reason, include_usage):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+            def event(choices, usage=None):
+                payload = {
+                    "id": chunk_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stand-in"),
+                    "choices": choices,
+                }
+                if include_usage:
+                    payload["usage"] = usage
+                self._chunk(f"data: {json.dumps(payload)}\n\n")
+
+            try:
+                event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+                for i, token in enumerate(tokens):
+                    if i:
+                        time.sleep(server.token_delay_s())
+                    event([{"index": 0, "delta": {"content": token}, "finish_reason": None}])
+                event([{"index": 0, "delta": {}, "finish_reason": finish_reason}])
+                if include_usage:
+                    event([], _usage(prompt, len(tokens)))
+                self._chunk("data: [DONE]\n\n")
+                self._chunk("")
+            except (BrokenPipeError, ConnectionResetError):
+                # Client closed the stream early: stop generating
+                self.close_connection = True
+
+        def _chunk(self, text: str) -> None:
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def _error(self, status, code, message, *, retry_after=False):
+            headers = {"Retry-After": str(server.config.retry_after_s)} if retry_after else {}
+            self._json(status, {"error": {"message": message, "type": code, "code": code}}, headers)
+
+        def _json(self, status, payload, headers=None):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--requests-per-minute", type=int)
+    parser.add_argument("--rules", help="JSON file: {regex: response}")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    rules: Tuple[Tuple[str, str], ...] = ()
+    if args.rules:
+        with open(args.rules, encoding="utf-8") as f:
+            rules = tuple(json.load(f).items())
+
+    config = StandInConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        requests_per_minute=args.requests_per_minute,
+        rules=rules,
+        seed=args.seed,
+    )
+
+    server = StandInServer(config, host=args.host, port=args.port)
+    print(f"Stand-in LLM server on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+from day04_retrieval_to_context.build_context import ContextPack, ContextPolicy
+from day05_context_to_answer.answer_generator import agenerate_answer, generate_answer
+from day05_context_to_answer.policies import GenerationPolicy
+from infrastructure.llm.base import LLM, LLMUsage
+from infrastructure.llm.fake import FakeLLM
+
+
+class EchoLLM(LLM):
+    """
+    Sync-only LLM: gets `agenerate` from the base-class bridge.
+    """
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        time.sleep(0.01)
+        self._record_usage(LLMUsage(len(prompt), 1, len(prompt) + 1, 0.0))
+        return f"echo:{prompt}"
+
+
+class SleepyAsyncLLM(LLM):
+    def generate(self, *, prompt, max_tokens, temperature):
+        raise AssertionError("sync path must not be used")
+
+    async def agenerate(self, *, prompt, max_tokens, temperature):
+        await asyncio.sleep(0.05)
+        return prompt
+
+
+def test_sync_llm_gets_async_bridge_with_per_task_usage():
+    llm = EchoLLM()
+
+    async def one(prompt):
+        text = await llm.agenerate(prompt=prompt, max_tokens=5, temperature=0.0)
+        return text, llm.get_last_usage().prompt_tokens
+
+    async def run_all():
+        return await asyncio.gather(*(one("x" * n) for n in range(1, 30)))
+
+    for n, (text, prompt_tokens) in enumerate(asyncio.run(run_all()), start=1):
+        assert text == "echo:" + "x" * n
+        assert prompt_tokens == n
+
+
+def test_usage_is_not_reported_by_another_llm():
+    first, second = EchoLLM(), EchoLLM()
+    first.generate(prompt="abc", max_tokens=5, temperature=0.0)
+
+    assert first.get_last_usage().prompt_tokens == 3
+    assert second.get_last_usage() is None
+
+
+def test_hundreds_of_concurrent_generations_hold_no_threads():
+    llm = SleepyAsyncLLM()
+
+    async def run_all():
+        return await asyncio.gather(
+            *(llm.agenerate(prompt=str(i), max_tokens=5, temperature=0.0) for i in range(500))
+        )
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+
+    assert results == [str(i) for i in range(500)]
+    assert time.perf_counter() - start < 1.0
+
+
+def test_async_answer_matches_sync_answer():
+    pack = ContextPack(
+        query="How long do refunds take?",
+        policy=ContextPolicy(),
+        approved_chunks=[{
+            "text": "Refunds take 5 business days.",
+            "metadata": {"source": "policy.txt::001"},
+        }],
+        dropped_chunks=[],
+        is_valid=True,
+        invalid_reason=None,
+    )
+    llm = FakeLLM(fixed_response="Refunds take 5 business days. [policy.txt::001]")
+    policy = GenerationPolicy()
+
+    expected = generate_answer(context_pack=pack, llm=llm, policy=policy)
+    actual = asyncio.run(agenerate_answer(context_pack=pack, llm=llm, policy=policy))
+
+    assert actual == expected
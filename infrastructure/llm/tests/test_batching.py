@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from infrastructure.llm.base import LLM, LLMUsage
+from infrastructure.llm.batching import BatchPolicy, MicroBatchingLLM, split_usage
+
+
+class BatchRecordingLLM(LLM):
+    """
+    Echoes prompts; records every backend request it receives.
+    """
+
+    model = "batched"
+
+    def __init__(self, latency_s=0.0, error=None):
+        self.latency_s = latency_s
+        self.error = error
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def _serve(self, prompts):
+        with self._lock:
+            self.requests.append(list(prompts))
+        if self.error is not None:
+            raise self.error
+        return [(f"re:{p}", LLMUsage(10, 2, 12, 0.01)) for p in prompts]
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        time.sleep(self.latency_s)
+        text, usage = self._serve([prompt])[0]
+        self._record_usage(usage)
+        return text
+
+    async def agenerate(self, *, prompt, max_tokens, temperature):
+        await asyncio.sleep(self.latency_s)
+        text, usage = self._serve([prompt])[0]
+        self._record_usage(usage)
+        return text
+
+    def generate_batch(self, *, prompts, max_tokens, temperature):
+        time.sleep(self.latency_s)
+        return self._serve(prompts)
+
+    async def agenerate_batch(self, *, prompts, max_tokens, temperature):
+        await asyncio.sleep(self.latency_s)
+        return self._serve(prompts)
+
+
+def ask(llm, prompt, max_tokens=10):
+    return llm.generate(prompt=prompt, max_tokens=max_tokens, temperature=0.0)
+
+
+def ask_all(llm, prompts):
+    with ThreadPoolExecutor(len(prompts)) as pool:
+        return list(pool.map(lambda p: ask(llm, p), prompts))
+
+
+def test_concurrent_calls_share_one_backend_request():
+    inner = BatchRecordingLLM()
+    llm = MicroBatchingLLM(inner, BatchPolicy(max_batch_size=8, max_wait_ms=100))
+
+    prompts = [f"p{i}" for i in range(8)]
+    answers = ask_all(llm, prompts)
+
+    assert answers == [f"re:{p}" for p in prompts]
+    assert len(inner.requests) == 1
+    assert sorted(inner.requests[0]) == prompts
+    assert llm.stats()["largest_batch"] == 8
+
+
+def test_full_batch_is_sent_without_waiting_out_the_window():
+    inner = BatchRecordingLLM()
+    llm = MicroBatchingLLM(inner, BatchPolicy(max_batch_size=4, max_wait_ms=5000))
+
+    start = time.monotonic()
+    ask_all(llm, ["a", "b", "c", "d"])
+
+    assert time.monotonic() - start < 1.0
+    assert [len(r) for r in inner.requests] == [4]
+
+
+def test_lone_call_waits_at_most_the_window_and_goes_out_alone():
+    inner = BatchRecordingLLM()
+    llm = MicroBatchingLLM(inner, BatchPolicy(max_batch_size=8, max_wait_ms=20))
+
+    start = time.monotonic()
+    assert ask(llm, "only") == "re:only"
+
+    assert 0.015 <= time.monotonic() - start < 0.5
+    assert inner.requests == [["only"]]
+    assert llm.get_last_usage().total_tokens == 12
+
+
+def test_calls_with_different_settings_are_not_mixed():
+    inner = BatchRecordingLLM()
+    llm = MicroBatchingLLM(inner, BatchPolicy(max_batch_size=2, max_wait_ms=200))
+
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda args: ask(llm, *args), [("a", 10), ("b", 20), ("c", 10), ("d", 20)]))
+
+    assert sorted(sorted(r) for r in inner.requests) == [["a", "c"], ["b", "d"]]
+
+
+def test_backend_error_reaches_every_caller():
+    inner = BatchRecordingLLM(error=RuntimeError("provider down"))
+    llm = MicroBatchingLLM(inner, BatchPolicy(max_batch_size=3, max_wait_ms=200))
+
+    def call(prompt):
+        with pytest.raises(RuntimeError, match="provider down"):
+            ask(llm, prompt)
+
+    with ThreadPoolExecutor(3) as pool:
+        list(pool.map(call, ["a", "b", "c"]))
+    assert len(inner.requests) == 1
+
+
+def test_async_calls_are_batched_and_fanned_back():
+    inner = BatchRecordingLLM(latency_s=0.01)
+    llm = MicroBatchingLLM(inner, BatchPolicy(max_batch_size=16, max_wait_ms=20))
+
+    async def one(prompt):
+        text = await llm.agenerate(prompt=prompt, max_tokens=10, temperature=0.0)
+        return text, llm.get_last_usage()
+
+    async def run():
+        return await asyncio.gather(*(one(f"p{i}") for i in range(10)))
+
+    results = asyncio.run(run())
+
+    assert [text for text, _ in results] == [f"re:p{i}" for i in range(10)]
+    assert all(usage.total_tokens == 12 for _, usage in results)
+    assert len(inner.requests) == 1
+
+
+def test_cancelled_async_caller_does_not_strand_its_batch():
+    inner = BatchRecordingLLM(latency_s=0.05)
+    llm = MicroBatchingLLM(inner, BatchPolicy(max_batch_size=16, max_wait_ms=10))
+
+    async def run():
+        impatient = asyncio.ensure_future(llm.agenerate(prompt="a", max_tokens=10, temperature=0.0))
+        patient = asyncio.ensure_future(llm.agenerate(prompt="b", max_tokens=10, temperature=0.0))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        return await patient
+
+    assert asyncio.run(run()) == "re:b"
+
+
+def test_default_async_batch_multiplexes_single_calls():
+    class Single(LLM):
+        def generate(self, *, prompt, max_tokens, temperature):
+            return prompt.upper()
+
+    completions = asyncio.run(Single().agenerate_batch(prompts=["a", "b"], max_tokens=5, temperature=0.0))
+
+    assert [text for text, _ in completions] == ["A", "B"]
+
+
+def test_split_usage_shares_batch_totals_by_length():
+    usage = LLMUsage(prompt_tokens=30, completion_tokens=6, total_tokens=36, cost_usd=0.036)
+
+    shares = split_usage(usage, ["x" * 20, "x" * 10], ["yyyy", "yy"])
+
+    assert [s.prompt_tokens for s in shares] == [20, 10]
+    assert [s.completion_tokens for s in shares] == [4, 2]
+    assert sum(s.cost_usd for s in shares) == pytest.approx(0.036)
+    assert split_usage(None, ["a"], ["b"]) == [None]
+
+
+def test_default_sync_batch_runs_single_calls_concurrently():
+    class Slow(LLM):
+        model = "slow"
+
+        def generate(self, *, prompt, max_tokens, temperature):
+            time.sleep(0.2)
+            self._record_usage(LLMUsage(1, 1, 2, 0.0))
+            return prompt.upper()
+
+    llm = MicroBatchingLLM(Slow(), BatchPolicy(max_batch_size=8, max_wait_ms=50))
+
+    start = time.monotonic()
+    answers = ask_all(llm, [f"p{i}" for i in range(8)])
+
+    assert answers == [f"P{i}" for i in range(8)]
+    assert time.monotonic() - start < 0.6
+    assert llm.stats()["largest_batch"] == 8
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from infrastructure.llm.base import LLM, LLMUsage
+from infrastructure.llm.cascade import CascadingLLM
+
+
+class TierLLM(LLM):
+    def __init__(self, response, cost):
+        self.response = response
+        self.cost = cost
+        self.calls = 0
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        self.calls += 1
+        self._record_usage(LLMUsage(100, 10, 110, self.cost))
+        return self.response
+
+
+def ask(llm):
+    return llm.generate(prompt="q", max_tokens=10, temperature=0.0)
+
+
+def test_starts_cheap_and_escalates_per_request():
+    small, large = TierLLM("small", 0.001), TierLLM("large", 0.01)
+    cascade = CascadingLLM([("small", small), ("large", large)])
+
+    cascade.begin()
+    assert ask(cascade) == "small"
+    assert cascade.escalate()
+    assert ask(cascade) == "large"
+    assert not cascade.escalate()  # already at the strongest tier
+
+    route = cascade.route()
+    assert [a.tier for a in route.attempts] == ["small", "large"]
+    assert route.escalations == 1
+    assert route.cost_usd_by_tier() == {"small": 0.001, "large": 0.01}
+
+    # A new request starts at the cheapest tier again
+    cascade.begin()
+    assert ask(cascade) == "small"
+    assert cascade.stats() == {"calls": {"small": 2, "large": 1}, "escalations": {"large": 1}}
+
+
+def test_usage_is_summed_over_the_request():
+    cascade = CascadingLLM([("small", TierLLM("a", 0.001)), ("large", TierLLM("b", 0.01))])
+
+    cascade.begin()
+    ask(cascade)
+    cascade.escalate()
+    ask(cascade)
+
+    usage = cascade.get_last_usage()
+    assert usage.total_tokens == 220
+    assert usage.cost_usd == pytest.approx(0.011)
+
+
+def test_concurrent_requests_route_independently():
+    cascade = CascadingLLM([("small", TierLLM("small", 0)), ("large", TierLLM("large", 0))])
+
+    async def request(escalate):
+        cascade.begin()
+        if escalate:
+            cascade.escalate()
+        await asyncio.sleep(0)
+        return await cascade.agenerate(prompt="q", max_tokens=10, temperature=0.0)
+
+    async def both():
+        return await asyncio.gather(request(True), request(False))
+
+    assert asyncio.run(both()) == ["large", "small"]
+
+
+def test_needs_a_tier():
+    with pytest.raises(ValueError):
+        CascadingLLM([])
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+
+import pytest
+
+from day09_observability.exporters import export_circuit_transition
+from infrastructure.llm.base import LLM, LLMUsage
+from infrastructure.llm.circuit_breaker import (
+    BreakerPolicy,
+    BreakerState,
+    CircuitBreakerLLM,
+)
+from infrastructure.llm.errors import LLMUnavailableError, RetryableLLMError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ControlledLLM(LLM):
+    """Fails while `failing`; each call takes `latency_s` of clock time."""
+
+    model = "controlled"
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.failing = False
+        self.error = RetryableLLMError("503 from provider")
+        self.latency_s = 0.0
+        self.calls = 0
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        self.calls += 1
+        self.clock.now += self.latency_s
+        if self.failing:
+            raise self.error
+        self._record_usage(LLMUsage(10, 5, 15, 0.001))
+        return "ok"
+
+    async def agenerate(self, *, prompt, max_tokens, temperature):
+        return self.generate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+
+
+POLICY = BreakerPolicy(window_s=10, min_calls=4, max_error_rate=0.5, slow_call_s=1.0, max_slow_rate=0.75, open_for_s=5)
+
+
+def ask(llm):
+    return llm.generate(prompt="q", max_tokens=10, temperature=0.0)
+
+
+def call_and_ignore_errors(llm, n):
+    for _ in range(n):
+        try:
+            ask(llm)
+        except RetryableLLMError:
+            pass
+
+
+@pytest.fixture
+def setup():
+    clock = Clock()
+    inner = ControlledLLM(clock)
+    transitions = []
+    breaker = CircuitBreakerLLM(inner, POLICY, clock=clock, on_transition=transitions.append)
+    return clock, inner, breaker, transitions
+
+
+def test_opens_on_sustained_errors_and_fails_fast(setup):
+    clock, inner, breaker, transitions = setup
+
+    inner.failing = True
+    call_and_ignore_errors(breaker, 4)
+    assert breaker.current_state() == BreakerState.OPEN
+
+    with pytest.raises(LLMUnavailableError):
+        ask(breaker)
+    assert inner.calls == 4
+    assert breaker.stats()["rejected"] == 1
+    assert [(t.from_state, t.to_state) for t in transitions] == [(BreakerState.CLOSED, BreakerState.OPEN)]
+    assert transitions[0].reason == "error_rate=1.00"
+
+
+def test_needs_min_calls_before_opening(setup):
+    _, inner, breaker, _ = setup
+
+    inner.failing = True
+    call_and_ignore_errors(breaker, 3)
+
+    assert breaker.current_state() == BreakerState.CLOSED
+
+
+def test_old_outcomes_leave_the_window(setup):
+    clock, inner, breaker, _ = setup
+
+    inner.failing = True
+    call_and_ignore_errors(breaker, 3)
+    clock.now += 60
+    inner.failing = False
+    ask(breaker)
+
+    assert breaker.current_state() == BreakerState.CLOSED
+
+
+def test_opens_on_sustained_slow_calls(setup):
+    _, inner, breaker, transitions = setup
+
+    inner.latency_s = 2.0
+    for _ in range(4):
+        ask(breaker)
+
+    assert breaker.current_state() == BreakerState.OPEN
+    assert transitions[-1].reason.startswith("slow_rate")
+
+
+def test_caller_errors_do_not_count_as_failures(setup):
+    _, inner, breaker, _ = setup
+
+    inner.failing = True
+    inner.error = ValueError("bad request")
+    for _ in range(6):
+        with pytest.raises(ValueError):
+            ask(breaker)
+
+    assert breaker.current_state() == BreakerState.CLOSED
+
+
+def test_half_open_probe_success_closes(setup):
+    clock, inner, breaker, transitions = setup
+
+    inner.failing = True
+    call_and_ignore_errors(breaker, 4)
+    clock.now += 5
+    inner.failing = False
+
+    assert ask(breaker) == "ok"
+    assert breaker.current_state() == BreakerState.CLOSED
+    assert [t.to_state for t in transitions] == [
+        BreakerState.OPEN, BreakerState.HALF_OPEN, BreakerState.CLOSED,
+    ]
+    assert breaker.get_last_usage().total_tokens == 15
+
+
+def test_aborted_probe_stream_closes_after_first_delta(setup):
+    clock, inner, breaker, transitions = setup
+
+    inner.failing = True
+    call_and_ignore_errors(breaker, 4)
+    clock.now += 5
+    inner.failing = False
+
+    stream = breaker.stream(prompt="q", max_tokens=10, temperature=0.0)
+    assert next(stream) == "ok"
+    stream.close()
+
+    assert breaker.current_state() == BreakerState.CLOSED
+    assert transitions[-1].reason == "probe_succeeded"
+
+
+def test_aborted_streams_count_in_the_window(setup):
+    _, _, breaker, _ = setup
+
+    async def first_delta():
+        stream = breaker.astream(prompt="q", max_tokens=10, temperature=0.0)
+        delta = await stream.__anext__()
+        await stream.aclose()
+        return delta
+
+    assert asyncio.run(first_delta()) == "ok"
+    assert breaker.stats()["window_calls"] == 1
+
+
+def test_half_open_probe_failure_reopens(setup):
+    clock, inner, breaker, transitions = setup
+
+    inner.failing = True
+    call_and_ignore_errors(breaker, 4)
+    clock.now += 5
+    call_and_ignore_errors(breaker, 1)
+
+    assert breaker.current_state() == BreakerState.OPEN
+    assert transitions[-1].reason == "probe_failed"
+    with pytest.raises(LLMUnavailableError):
+        ask(breaker)
+
+
+def test_only_one_probe_at_a_time(setup):
+    clock, inner, breaker, _ = setup
+
+    inner.failing = True
+    call_and_ignore_errors(breaker, 4)
+    clock.now += 5
+
+    assert breaker._acquire() is True
+    with pytest.raises(LLMUnavailableError):
+        breaker._acquire()
+
+
+def test_async_calls_are_guarded_too(setup):
+    _, inner, breaker, _ = setup
+
+    inner.failing = True
+    for _ in range(4):
+        with pytest.raises(RetryableLLMError):
+            asyncio.run(breaker.agenerate(prompt="q", max_tokens=10, temperature=0.0))
+
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(breaker.agenerate(prompt="q", max_tokens=10, temperature=0.0))
+
+
+def test_transitions_are_exported_as_day09_signals(setup, caplog):
+    clock, inner, _, _ = setup
+    breaker = CircuitBreakerLLM(inner, POLICY, clock=clock, on_transition=export_circuit_transition)
+
+    inner.failing = True
+    with caplog.at_level(logging.INFO, logger="day09_observability.exporters"):
+        call_and_ignore_errors(breaker, 4)
+
+    assert "signal=llm_circuit_opened" in caplog.text
+    assert "llm=controlled" in caplog.text
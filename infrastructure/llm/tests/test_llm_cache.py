@@ -0,0 +1,172 @@
+import asyncio
+import os
+
+import pytest
+
+from day04_retrieval_to_context.build_context import ContextPack, ContextPolicy
+from day05_context_to_answer.answer_generator import generate_answer
+from day05_context_to_answer.policies import GenerationPolicy
+from infrastructure.llm.base import LLM, LLMUsage
+from infrastructure.llm.cache import CachingLLM, DiskResponseCache, llm_cache_key
+
+
+class CountingLLM(LLM):
+    model = "counting-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        self.calls += 1
+        self._record_usage(LLMUsage(100, 20, 120, 0.01))
+        return f"answer to {prompt}"
+
+    async def agenerate(self, *, prompt, max_tokens, temperature):
+        return self.generate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+
+
+def ask(llm, prompt="p", max_tokens=50, temperature=0.0):
+    return llm.generate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+
+
+def test_key_covers_model_prompt_and_parameters():
+    base = dict(model="m", prompt="p", max_tokens=10, temperature=0.0)
+
+    assert llm_cache_key(**base) == llm_cache_key(**base)
+    for field, value in (("model", "m2"), ("prompt", "p2"), ("max_tokens", 11), ("temperature", 0.1)):
+        assert llm_cache_key(**{**base, field: value}) != llm_cache_key(**base)
+
+
+def test_memory_hit_is_recorded_as_zero_cost_usage():
+    inner = CountingLLM()
+    llm = CachingLLM(inner)
+
+    assert ask(llm) == ask(llm) == "answer to p"
+    assert inner.calls == 1
+
+    usage = llm.get_last_usage()
+    assert usage.cached and usage.cost_usd == 0.0
+    assert llm.stats()["memory_hits"] == 1
+    assert llm.stats()["saved_cost_usd"] == 0.01
+
+
+def test_miss_forwards_inner_usage():
+    llm = CachingLLM(CountingLLM())
+    ask(llm)
+
+    usage = llm.get_last_usage()
+    assert not usage.cached
+    assert usage.total_tokens == 120
+
+
+def test_sampled_generations_bypass_cache_by_default():
+    inner = CountingLLM()
+    llm = CachingLLM(inner)
+
+    ask(llm, temperature=0.7)
+    ask(llm, temperature=0.7)
+    assert inner.calls == 2
+    assert llm.stats()["bypassed"] == 2
+
+    opted_in = CachingLLM(CountingLLM(), cache_sampled=True)
+    ask(opted_in, temperature=0.7)
+    ask(opted_in, temperature=0.7)
+    assert opted_in.inner.calls == 1
+
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    first = CachingLLM(CountingLLM(), disk_dir=str(tmp_path))
+    ask(first, prompt="refunds")
+
+    inner = CountingLLM()
+    second = CachingLLM(inner, disk_dir=str(tmp_path))
+
+    assert ask(second, prompt="refunds") == "answer to refunds"
+    assert inner.calls == 0
+    assert second.stats()["disk_hits"] == 1
+
+    # Promoted to memory: the next hit does not touch the disk
+    ask(second, prompt="refunds")
+    assert second.stats()["memory_hits"] == 1
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    disk = DiskResponseCache(str(tmp_path), max_bytes=10_000)
+    keys = [llm_cache_key(model="m", prompt=str(i), max_tokens=1, temperature=0.0) for i in range(3)]
+
+    for age, key in zip((300, 200, 100), keys):
+        disk.put(key, "x" * 4000, None)
+        path = disk._path(key)
+        os.utime(path, (path.stat().st_atime, path.stat().st_mtime - age))
+
+    disk.put(llm_cache_key(model="m", prompt="new", max_tokens=1, temperature=0.0), "y" * 4000, None)
+
+    assert disk.get(keys[0]) is None
+    assert disk.get(keys[2]) is not None
+    assert disk.evictions >= 1
+
+
+def test_memory_tier_is_lru_bounded():
+    inner = CountingLLM()
+    llm = CachingLLM(inner, max_entries=2)
+
+    for prompt in ("a", "b", "a", "c", "a", "b"):
+        ask(llm, prompt=prompt)
+
+    # "b" was evicted by "c"; "a" stayed hot
+    assert inner.calls == 4
+
+
+def test_async_and_stream_share_the_cache():
+    inner = CountingLLM()
+    llm = CachingLLM(inner)
+
+    first = asyncio.run(llm.agenerate(prompt="q", max_tokens=5, temperature=0.0))
+    streamed = "".join(llm.stream(prompt="q", max_tokens=5, temperature=0.0))
+
+    assert first == streamed == "answer to q"
+    assert inner.calls == 1
+
+
+def test_aborted_stream_is_not_cached():
+    class ChunkyLLM(CountingLLM):
+        def stream(self, *, prompt, max_tokens, temperature):
+            self.calls += 1
+            yield "part one. "
+            yield "part two."
+
+    llm = CachingLLM(ChunkyLLM())
+    stream = llm.stream(prompt="q", max_tokens=5, temperature=0.0)
+    next(stream)
+    stream.close()
+
+    assert "".join(llm.stream(prompt="q", max_tokens=5, temperature=0.0)) == "part one. part two."
+    assert llm.inner.calls == 2
+
+
+def test_default_generation_policy_answer_hits_the_cache_on_rerun(monkeypatch):
+    pytest.importorskip("httpx")  # the factory imports the OpenAI backend
+    from infrastructure.llm.factory import build_llm
+
+    monkeypatch.setenv("RAG_ENV", "test")
+    monkeypatch.setenv("RAG_LLM_CACHE_SIZE", "8")
+    monkeypatch.setenv("RAG_LLM_CACHE_SAMPLED", "1")
+    monkeypatch.delenv("RAG_LLM_CACHE_DIR", raising=False)
+    monkeypatch.delenv("RAG_LLM_CASCADE", raising=False)
+
+    llm = build_llm()
+    policy = GenerationPolicy()
+    assert policy.temperature > 0
+
+    pack = ContextPack(
+        query="How long do refunds take?",
+        policy=ContextPolicy(min_chars=10),
+        approved_chunks=[{"text": "Refunds take 5 days.", "metadata": {"source": "doc_1"}}],
+        dropped_chunks=[],
+        is_valid=True,
+        invalid_reason=None,
+    )
+    for _ in range(2):
+        generate_answer(context_pack=pack, llm=llm, policy=policy)
+
+    assert llm.stats()["memory_hits"] == 1
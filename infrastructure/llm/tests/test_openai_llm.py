@@ -0,0 +1,137 @@
+import asyncio
+import json
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from openai import AsyncOpenAI
+
+from infrastructure.llm.openai_llm import OpenAILLM
+
+
+def test_openai_agenerate_uses_pooled_async_client():
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "id": "cmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "test-model",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "Refunds take 5 days."},
+            }],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 5, "total_tokens": 17},
+        })
+
+    llm = OpenAILLM(model="test-model", api_key="test", max_connections=8)
+    clients = []
+
+    def mock_client():
+        # One client per event loop, like the real pool
+        if not clients:
+            clients.append(AsyncOpenAI(
+                api_key="test",
+                http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            ))
+        return clients[0]
+
+    llm._async_client = mock_client
+
+    async def run_all():
+        return await asyncio.gather(
+            *(llm.agenerate(prompt="q", max_tokens=20, temperature=0.0) for _ in range(10))
+        )
+
+    assert asyncio.run(run_all()) == ["Refunds take 5 days."] * 10
+    assert len(requests) == 10
+    assert requests[0]["model"] == "test-model"
+    assert llm.limits.max_connections == 8
+
+
+def test_openai_stream_yields_deltas_and_records_usage():
+    def sse(payload):
+        return f"data: {json.dumps(payload)}\n\n"
+
+    def chunk(content):
+        return {
+            "id": "c", "object": "chat.completion.chunk", "created": 0, "model": "m",
+            "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+        }
+
+    body = (
+        sse(chunk("Refunds "))
+        + sse(chunk("take 5 days."))
+        + sse({
+            "id": "c", "object": "chat.completion.chunk", "created": 0, "model": "m",
+            "choices": [],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 4, "total_tokens": 14},
+        })
+        + "data: [DONE]\n\n"
+    )
+
+    def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(
+            200, content=body.encode(), headers={"content-type": "text/event-stream"}
+        )
+
+    from openai import OpenAI
+
+    llm = OpenAILLM(model="m", api_key="test")
+    llm.client = OpenAI(
+        api_key="test", http_client=httpx.Client(transport=httpx.MockTransport(handler))
+    )
+
+    deltas = list(llm.stream(prompt="q", max_tokens=20, temperature=0.0))
+
+    assert deltas == ["Refunds ", "take 5 days."]
+    assert llm.get_last_usage().total_tokens == 14
+
+
+def test_openai_llm_against_standin_server():
+    import asyncio
+
+    from infrastructure.llm.scheduler import ScheduledLLM, SchedulerPolicy
+    from infrastructure.llm.standin_server import StandInConfig, StandInServer
+
+    prompt = "Allowed sources:\n---------------\n- a.md::001\n---------------\n"
+    config = StandInConfig(rate_limit_rate=0.5, retry_after_s=0.01, seed=3)
+
+    with StandInServer(config) as server:
+        backend = OpenAILLM(model="stand-in", api_key="local", max_retries=0, base_url=server.base_url)
+        llm = ScheduledLLM(backend, SchedulerPolicy(max_attempts=10, backoff_base_s=0.001))
+
+        answers = [llm.generate(prompt=prompt, max_tokens=50, temperature=0.0) for _ in range(5)]
+        streamed = "".join(llm.stream(prompt=prompt, max_tokens=50, temperature=0.0))
+        awaited = asyncio.run(llm.agenerate(prompt=prompt, max_tokens=50, temperature=0.0))
+
+    assert set(answers) == {streamed, awaited}
+    assert awaited.endswith("[a.md::001].")
+    assert server.stats.rate_limited > 0
+    assert llm.stats()["retries"] == server.stats.rate_limited
+
+
+def test_micro_batches_go_out_as_one_completions_request():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from infrastructure.llm.batching import BatchPolicy, MicroBatchingLLM
+    from infrastructure.llm.standin_server import StandInConfig, StandInServer
+
+    prompt = "Allowed sources:\n---------------\n- a.md::001\n---------------\n"
+
+    with StandInServer(StandInConfig(latency_ms=20)) as server:
+        backend = OpenAILLM(model="stand-in", api_key="local", base_url=server.base_url, batch_endpoint=True)
+        llm = MicroBatchingLLM(backend, BatchPolicy(max_batch_size=8, max_wait_ms=50))
+
+        with ThreadPoolExecutor(8) as pool:
+            answers = list(pool.map(
+                lambda _: llm.generate(prompt=prompt, max_tokens=50, temperature=0.0), range(8)
+            ))
+
+    assert all(a.endswith("[a.md::001].") for a in answers)
+    assert server.stats.batches == 1 and server.stats.batched_prompts == 8
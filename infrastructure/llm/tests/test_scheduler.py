@@ -0,0 +1,305 @@
+import asyncio
+import random
+import threading
+import time
+
+import pytest
+
+from infrastructure.deadline import Deadline, deadline_scope
+from infrastructure.llm.base import LLM, LLMUsage
+from infrastructure.llm.errors import (
+    LLMDeadlineExceededError,
+    LLMOverloadedError,
+    RetryableLLMError,
+    is_retryable,
+    retry_after_s,
+)
+from infrastructure.llm.scheduler import ScheduledLLM, SchedulerPolicy, TokenBucket
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class ScriptedLLM(LLM):
+    """
+    Plays a script of outcomes, one per call:
+    an exception to raise, or (latency_s, text or exception).
+    The last entry repeats.
+    """
+
+    model = "scripted"
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def _next(self):
+        with self._lock:
+            outcome = self.script[min(self.calls, len(self.script) - 1)]
+            self.calls += 1
+        return outcome
+
+    def generate(self, *, prompt, max_tokens, temperature):
+        outcome = self._next()
+        if isinstance(outcome, Exception):
+            raise outcome
+
+        latency, text = outcome
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(latency)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+        if isinstance(text, Exception):
+            raise text
+        self._record_usage(LLMUsage(10, 5, 15, 0.001))
+        return text
+
+    async def agenerate(self, *, prompt, max_tokens, temperature):
+        outcome = self._next()
+        if isinstance(outcome, Exception):
+            raise outcome
+
+        latency, text = outcome
+        await asyncio.sleep(latency)
+        if isinstance(text, Exception):
+            raise text
+        self._record_usage(LLMUsage(10, 5, 15, 0.001))
+        return text
+
+
+FAST_RETRY = dict(backoff_base_s=0.001, backoff_max_s=0.002)
+
+
+def ask(llm):
+    return llm.generate(prompt="q", max_tokens=10, temperature=0.0)
+
+
+def aask(llm):
+    return llm.agenerate(prompt="q", max_tokens=10, temperature=0.0)
+
+
+def test_retryable_classification():
+    assert is_retryable(ProviderError(429))
+    assert is_retryable(ProviderError(503))
+    assert not is_retryable(ProviderError(400))
+    assert is_retryable(RetryableLLMError("busy"))
+    assert is_retryable(ConnectionError())
+    assert not is_retryable(LLMDeadlineExceededError())
+    assert not is_retryable(ValueError())
+
+    assert retry_after_s(RetryableLLMError("busy", retry_after_s=2)) == 2.0
+
+
+def test_retries_transient_errors_then_succeeds():
+    inner = ScriptedLLM(ProviderError(429), ProviderError(503), (0, "ok"))
+    llm = ScheduledLLM(inner, SchedulerPolicy(**FAST_RETRY), rng=random.Random(0))
+
+    assert ask(llm) == "ok"
+    assert inner.calls == 3
+    assert llm.stats()["retries"] == 2
+    assert llm.get_last_usage().total_tokens == 15
+
+
+def test_non_retryable_error_is_raised_immediately():
+    inner = ScriptedLLM(ProviderError(400))
+    llm = ScheduledLLM(inner, SchedulerPolicy(**FAST_RETRY))
+
+    with pytest.raises(ProviderError):
+        ask(llm)
+    assert inner.calls == 1
+
+
+def test_gives_up_after_max_attempts():
+    inner = ScriptedLLM(ProviderError(500))
+    llm = ScheduledLLM(inner, SchedulerPolicy(max_attempts=3, **FAST_RETRY))
+
+    with pytest.raises(ProviderError):
+        ask(llm)
+    assert inner.calls == 3
+
+
+def test_retry_after_beyond_deadline_fails_fast():
+    inner = ScriptedLLM(RetryableLLMError("slow down", retry_after_s=30))
+    llm = ScheduledLLM(inner, SchedulerPolicy(deadline_s=1.0, **FAST_RETRY))
+
+    start = time.monotonic()
+    with pytest.raises(LLMDeadlineExceededError):
+        ask(llm)
+    assert time.monotonic() - start < 0.5
+    assert llm.stats()["deadline_exceeded"] == 1
+
+
+def test_max_in_flight_bounds_concurrency():
+    inner = ScriptedLLM((0.02, "ok"))
+    llm = ScheduledLLM(inner, SchedulerPolicy(max_in_flight=2))
+
+    threads = [threading.Thread(target=ask, args=(llm,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert inner.calls == 8
+    assert inner.max_active <= 2
+
+    stats = llm.stats()
+    assert stats["in_flight"] == 0
+    assert stats["max_queue_depth"] >= 2
+    assert stats["max_wait_s"] > 0
+
+
+def test_full_queue_rejects_instead_of_waiting():
+    inner = ScriptedLLM((0.1, "ok"))
+    llm = ScheduledLLM(inner, SchedulerPolicy(max_in_flight=1, max_queue=1))
+
+    async def burst():
+        return await asyncio.gather(*(aask(llm) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(burst())
+
+    assert sum(isinstance(r, LLMOverloadedError) for r in results) >= 1
+    assert "ok" in results
+    assert llm.stats()["rejected"] >= 1
+
+
+def test_token_bucket_reservations_queue_in_order():
+    now = [0.0]
+    bucket = TokenBucket(60, capacity=2, clock=lambda: now[0])  # 1 token/s
+
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+    assert not bucket.try_reserve(1)
+
+    now[0] = 4.0
+    assert bucket.try_reserve(1)
+
+
+def test_requests_per_minute_spaces_out_calls():
+    inner = ScriptedLLM((0, "ok"))
+    # 1200/min = one request every 50ms after a burst of 1
+    llm = ScheduledLLM(inner, SchedulerPolicy(requests_per_minute=1200))
+    llm._requests = TokenBucket(1200, capacity=1)
+
+    start = time.monotonic()
+    for _ in range(3):
+        ask(llm)
+
+    assert time.monotonic() - start >= 0.09
+    assert llm.stats()["avg_wait_s"] > 0
+
+
+def test_rate_limit_wait_beyond_deadline_fails_without_spending_capacity():
+    inner = ScriptedLLM((0, "ok"))
+    llm = ScheduledLLM(inner, SchedulerPolicy(requests_per_minute=1, deadline_s=0.5))
+
+    ask(llm)
+    with pytest.raises(LLMDeadlineExceededError):
+        ask(llm)
+    assert inner.calls == 1
+
+
+def test_async_deadline_cancels_slow_call():
+    inner = ScriptedLLM((5.0, "too late"))
+    llm = ScheduledLLM(inner, SchedulerPolicy(deadline_s=0.05))
+
+    start = time.monotonic()
+    with pytest.raises(LLMDeadlineExceededError):
+        asyncio.run(aask(llm))
+    assert time.monotonic() - start < 1.0
+    assert llm.stats()["in_flight"] == 0
+
+
+def test_request_deadline_in_scope_shortens_call_deadline():
+    inner = ScriptedLLM(RetryableLLMError("slow down", retry_after_s=1.0))
+    llm = ScheduledLLM(inner, SchedulerPolicy(deadline_s=60.0, **FAST_RETRY))
+
+    with deadline_scope(Deadline(0.2)):
+        with pytest.raises(LLMDeadlineExceededError):
+            ask(llm)
+    assert inner.calls == 1
+
+
+def test_async_hedge_wins_over_slow_primary():
+    inner = ScriptedLLM((5.0, "slow"), (0.01, "fast"))
+    llm = ScheduledLLM(inner, SchedulerPolicy(hedge_after_s=0.02))
+
+    assert asyncio.run(aask(llm)) == "fast"
+
+    stats = llm.stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_sync_hedge_wins_over_slow_primary():
+    inner = ScriptedLLM((0.5, "slow"), (0.01, "fast"))
+    llm = ScheduledLLM(inner, SchedulerPolicy(hedge_after_s=0.02))
+
+    start = time.monotonic()
+    assert ask(llm) == "fast"
+    assert time.monotonic() - start < 0.4
+    assert llm.stats()["hedge_wins"] == 1
+
+
+@pytest.mark.parametrize("run", [ask, lambda llm: asyncio.run(aask(llm))])
+def test_primary_failing_while_hedge_is_pending_waits_for_the_hedge(run):
+    inner = ScriptedLLM((0.2, ProviderError(400)), (0.4, "hedge"))
+    llm = ScheduledLLM(inner, SchedulerPolicy(hedge_after_s=0.05, deadline_s=5.0))
+
+    start = time.monotonic()
+    assert run(llm) == "hedge"
+    assert time.monotonic() - start < 1.0
+    assert llm.stats()["hedge_wins"] == 1
+
+
+@pytest.mark.parametrize("run", [ask, lambda llm: asyncio.run(aask(llm))])
+def test_deadline_passing_while_hedge_is_pending_raises_on_time(run):
+    inner = ScriptedLLM((0.2, ProviderError(400)), (1.5, "too late"))
+    llm = ScheduledLLM(inner, SchedulerPolicy(hedge_after_s=0.05, deadline_s=0.5))
+
+    start = time.monotonic()
+    with pytest.raises(LLMDeadlineExceededError):
+        run(llm)
+    assert time.monotonic() - start < 1.0
+
+
+def test_no_hedge_without_spare_slot():
+    inner = ScriptedLLM((0.05, "ok"))
+    llm = ScheduledLLM(inner, SchedulerPolicy(max_in_flight=1, hedge_after_s=0.01))
+
+    assert asyncio.run(aask(llm)) == "ok"
+    assert inner.calls == 1
+    assert llm.stats()["hedges"] == 0
+
+
+def test_stream_retries_only_before_first_delta():
+    class FlakyStream(ScriptedLLM):
+        def stream(self, *, prompt, max_tokens, temperature):
+            self.calls += 1
+            if self.calls == 1:
+                raise ProviderError(503)
+            yield "hello "
+            if self.calls == 2:
+                raise ProviderError(503)
+            yield "world"
+
+    inner = FlakyStream()
+    llm = ScheduledLLM(inner, SchedulerPolicy(**FAST_RETRY))
+
+    with pytest.raises(ProviderError):
+        list(llm.stream(prompt="q", max_tokens=10, temperature=0.0))
+    assert inner.calls == 2
+    assert llm.stats()["in_flight"] == 0
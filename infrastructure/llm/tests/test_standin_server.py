@@ -0,0 +1,161 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from infrastructure.llm.standin_server import (
+    REFUSAL,
+    StandInConfig,
+    StandInServer,
+    completion_tokens,
+)
+
+PROMPT = """Allowed sources:
+---------------
+- refunds.md::002
+- refunds.md::003
+---------------
+
+Question:
+How long does a refund take?
+"""
+
+
+def post(server, body, *, raw=False):
+    request = urllib.request.Request(
+        server.base_url + "/chat/completions",
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        data = response.read().decode("utf-8")
+    return data if raw else json.loads(data)
+
+
+def chat(prompt=PROMPT, **extra):
+    return {"model": "stand-in", "messages": [{"role": "user", "content": prompt}], **extra}
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**config):
+        server = StandInServer(StandInConfig(**config)).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def test_completion_cites_first_allowed_source(serve):
+    server = serve()
+    body = post(server, chat(max_tokens=50))
+
+    assert body["object"] == "chat.completion"
+    assert body["choices"][0]["message"]["content"].endswith("[refunds.md::002].")
+    assert body["choices"][0]["finish_reason"] == "stop"
+    assert body["usage"]["total_tokens"] == (
+        body["usage"]["prompt_tokens"] + body["usage"]["completion_tokens"]
+    )
+
+
+def test_no_sources_means_refusal(serve):
+    server = serve()
+    body = post(server, chat("Question: anything?"))
+
+    assert body["choices"][0]["message"]["content"] == REFUSAL
+
+
+def test_scripted_rules_match_prompt_patterns(serve):
+    server = serve(rules=(("(?i)refund", "Refunds take 5 days [{source}]."),))
+
+    assert post(server, chat())["choices"][0]["message"]["content"] == "Refunds take 5 days [refunds.md::002]."
+
+
+def test_max_tokens_truncates_with_length_finish_reason():
+    tokens, reason = completion_tokens("one two three four", 2)
+
+    assert tokens == ["one ", "two "]
+    assert reason == "length"
+
+
+def test_streaming_sends_sse_deltas_and_usage(serve):
+    server = serve(tokens_per_second=200)
+    raw = post(server, chat(stream=True, stream_options={"include_usage": True}), raw=True)
+
+    events = [line[len("data: "):] for line in raw.splitlines() if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+
+    chunks = [json.loads(e) for e in events[:-1]]
+    text = "".join(
+        c["choices"][0]["delta"].get("content", "") for c in chunks if c["choices"]
+    )
+    assert text.endswith("[refunds.md::002].")
+    assert chunks[-1]["choices"] == [] and chunks[-1]["usage"]["completion_tokens"] > 0
+    assert server.stats.streams == 1
+
+
+def test_latency_and_token_pace_are_applied(serve):
+    server = serve(latency_ms=50, tokens_per_second=100)
+
+    start = time.monotonic()
+    post(server, chat())
+    # 50ms first token + 7 tokens at 10ms
+    assert time.monotonic() - start >= 0.1
+
+
+def test_injected_rate_limit_sends_retry_after(serve):
+    server = serve(rate_limit_rate=1.0, retry_after_s=2)
+
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        post(server, chat())
+    assert excinfo.value.code == 429
+    assert excinfo.value.headers["Retry-After"] == "2"
+    assert server.stats.rate_limited == 1
+
+
+def test_injected_server_errors(serve):
+    server = serve(error_rate=1.0)
+
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        post(server, chat())
+    assert excinfo.value.code == 500
+
+
+def test_requests_per_minute_limit(serve):
+    server = serve(requests_per_minute=2)
+
+    post(server, chat())
+    post(server, chat())
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        post(server, chat())
+    assert excinfo.value.code == 429
+
+
+def test_completions_endpoint_answers_a_batch_in_one_request(serve):
+    server = serve(latency_ms=50)
+    body = {"model": "stand-in", "prompt": [PROMPT, "Question: anything?", PROMPT], "max_tokens": 50}
+
+    request = urllib.request.Request(
+        server.base_url + "/completions",
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    start = time.monotonic()
+    with urllib.request.urlopen(request, timeout=5) as response:
+        data = json.loads(response.read().decode("utf-8"))
+
+    # One latency draw for the whole batch
+    assert time.monotonic() - start < 0.15
+    assert [c["index"] for c in data["choices"]] == [0, 1, 2]
+    assert data["choices"][0]["text"].endswith("[refunds.md::002].")
+    assert data["choices"][1]["text"] == REFUSAL
+    assert data["usage"]["total_tokens"] == (
+        data["usage"]["prompt_tokens"] + data["usage"]["completion_tokens"]
+    )
+    assert (server.stats.requests, server.stats.batches, server.stats.batched_prompts) == (1, 1, 3)
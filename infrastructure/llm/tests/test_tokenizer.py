@@ -0,0 +1,25 @@
+from infrastructure.llm.scheduler import estimate_request_tokens
+from infrastructure.llm.tokenizer import (
+    CHAT_PROMPT_OVERHEAD_TOKENS,
+    ESTIMATING_TOKENIZER,
+    Tokenizer,
+    get_tokenizer,
+)
+
+
+def test_estimating_tokenizer_uses_four_chars_per_token():
+    assert not ESTIMATING_TOKENIZER.exact
+    assert ESTIMATING_TOKENIZER.count("x" * 40) == 10
+    assert ESTIMATING_TOKENIZER.count_prompt("x" * 40) == 10 + CHAT_PROMPT_OVERHEAD_TOKENS
+
+
+def test_get_tokenizer_is_cached_per_model():
+    assert get_tokenizer("gpt-4.1-mini") is get_tokenizer("gpt-4.1-mini")
+    assert get_tokenizer("some-local-model").count("hello world") > 0
+
+
+def test_scheduler_reserves_prompt_plus_completion_tokens():
+    words = Tokenizer("words", str.split)
+
+    assert words.exact
+    assert estimate_request_tokens("a b c", 10, words) == 3 + CHAT_PROMPT_OVERHEAD_TOKENS + 10
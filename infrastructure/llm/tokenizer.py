@@ -0,0 +1,75 @@
+"""
+Local (pre-flight) token counting.
+
+Provider usage is only known after the call returns. Counting locally
+BEFORE the call lets the pipeline keep a prompt under a token ceiling
+instead of discovering an oversized prompt from a rejection or a bill.
+
+- tiktoken installed → exact counts for OpenAI models
+- otherwise          → ~4 characters per token, the same estimate the
+                       Day 4 / Day 5 budgets use
+
+`predicted_prompt_tokens` is recorded next to the provider-reported
+`prompt_tokens`, so the accuracy of the prediction is observable.
+"""
+
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+# Chat format framing around a single user message:
+# 3 (message) + 1 (role) + 3 (assistant reply priming)
+CHAT_PROMPT_OVERHEAD_TOKENS = 7
+
+DEFAULT_ENCODING = "o200k_base"
+
+
+class Tokenizer:
+    """
+    Counts tokens with `encode` when available, else estimates them.
+    """
+
+    def __init__(self, name: str, encode: Optional[Callable[[str], List[int]]] = None):
+        self.name = name
+        self._encode = encode
+
+    @property
+    def exact(self) -> bool:
+        return self._encode is not None
+
+    def count(self, text: str) -> int:
+        if self._encode is None:
+            return (len(text) + 3) // 4
+        return len(self._encode(text))
+
+    def count_prompt(self, prompt: str) -> int:
+        """Tokens billed for `prompt` sent as one chat message."""
+        return self.count(prompt) + CHAT_PROMPT_OVERHEAD_TOKENS
+
+
+ESTIMATING_TOKENIZER = Tokenizer("chars/4")
+
+
+@lru_cache(maxsize=32)
+def get_tokenizer(model: Optional[str] = None) -> Tokenizer:
+    """
+    Tokenizer for `model` (cached per model name).
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return ESTIMATING_TOKENIZER
+
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model or "")
+        except KeyError:
+            # Unknown / non-OpenAI model name
+            encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception:
+        # Offline without a cached BPE file: estimate instead of failing
+        return ESTIMATING_TOKENIZER
+
+    return Tokenizer(
+        encoding.name,
+        lambda text: encoding.encode(text, disallowed_special=()),
+    )
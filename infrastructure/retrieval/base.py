@@ -0,0 +1,138 @@
+# infrastructure/retrieval/base.py
+
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from infrastructure.retrieval.models import RetrievalTimings
+
+
+# Per-context (thread / asyncio task) so concurrent requests
+# never read each other's timings. Stores (retriever, timings): one
+# retriever's timings are never reported by another.
+_last_timings: ContextVar[Optional[Tuple["Retriever", RetrievalTimings]]] = ContextVar(
+    "rag_last_retrieval_timings", default=None
+)
+
+
+class Retriever(ABC):
+    """
+    Abstract retrieval interface.
+
+    All retrievers (StubRetriever, VectorStoreRetriever,
+    ShardedRetriever, etc.) MUST implement this interface.
+
+    The application must depend ONLY on this interface.
+
+    Output contract:
+    - A list of chunk dicts, best match first
+    - Each dict has at least 'text' and 'metadata'
+    - Candidates are NOT trusted: judgment happens in Day 4
+    """
+
+    default_top_k: int = 5
+
+    @abstractmethod
+    def retrieve(
+        self,
+        query: str,
+        *,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[Dict]:
+        """
+        Return the top-k candidate chunks for a query.
+
+        `filters` is an exact-match metadata filter
+        (e.g. {"doc_label": "POLICY"}).
+        """
+        raise NotImplementedError
+
+    @property
+    def index_version(self) -> int:
+        """
+        Monotonic version of the underlying index.
+
+        Bumped on every (incremental) indexing operation, so caches
+        can tell when their entries may be stale.
+        Default: a static corpus that never changes.
+        """
+        return 0
+
+    async def aretrieve(
+        self,
+        query: str,
+        *,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[Dict]:
+        """
+        Async variant of `retrieve`.
+
+        Default: run the sync implementation on the bounded search
+        executor so the event loop is never blocked. Backends with
+        separable phases override this to offload each phase.
+        """
+        from infrastructure.retrieval.executors import SEARCH_EXECUTOR
+
+        def _run():
+            hits = self.retrieve(query, top_k=top_k, filters=filters)
+            return hits, self.get_last_timings()
+
+        hits, timings = await SEARCH_EXECUTOR.run(_run)
+
+        # Worker threads have their own context: re-record in ours
+        if timings is not None:
+            self._record_timings(timings)
+
+        return hits
+
+    def encode_query(self, query: str) -> Any:
+        """
+        Query encoding reusable across several retrievals of the same
+        query (e.g. adaptive top-k rounds), for `retrieve_encoded`.
+        Default: None (nothing worth reusing).
+        """
+        return None
+
+    def retrieve_encoded(
+        self,
+        query: str,
+        encoded: Any,
+        *,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[Dict]:
+        """
+        `retrieve`, reusing the result of `encode_query(query)`.
+        Default: plain `retrieve`.
+        """
+        return self.retrieve(query, top_k=top_k, filters=filters)
+
+    async def aencode_query(self, query: str) -> Any:
+        """Async variant of `encode_query`."""
+        return None
+
+    async def aretrieve_encoded(
+        self,
+        query: str,
+        encoded: Any,
+        *,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[Dict]:
+        """Async variant of `retrieve_encoded`."""
+        return await self.aretrieve(query, top_k=top_k, filters=filters)
+
+    def get_last_timings(self) -> Optional[RetrievalTimings]:
+        """
+        Optional observability hook.
+        Timings of this retriever's last retrieval in the current context.
+        """
+        recorded = _last_timings.get()
+        if recorded is None or recorded[0] is not self:
+            return None
+        return recorded[1]
+
+    def _record_timings(self, timings: RetrievalTimings) -> None:
+        _last_timings.set((self, timings))
@@ -0,0 +1,317 @@
+"""
+Retrieval result cache.
+
+Popular questions are asked over and over. Each repeat pays
+encode + search + hydrate for an answer we already computed.
+
+Cache key:
+    (normalized query, top_k, filters, index version)
+
+Cache value:
+    ((chunk_id, distance), ...) — NOT the chunks themselves.
+    Hits are rehydrated from the chunk store, so an entry costs a few
+    dozen bytes instead of a few KB of text + metadata.
+
+Invalidation:
+- TTL:            entries expire after `ttl_s`
+- Size:           least-recently-used entries are evicted past `max_entries`
+- Index version:  incremental indexing bumps the version; the whole cache
+                  is dropped the first time a new version is observed
+"""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from infrastructure.retrieval.base import Retriever
+from infrastructure.retrieval.chunk_store import ChunkStore
+from infrastructure.retrieval.models import RetrievalTimings
+from infrastructure.retrieval.vector_store import hydrate_hit
+
+CacheKey = Tuple[str, int, str, int]
+CachedHits = Tuple[Tuple[str, float], ...]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form used for cache keys.
+
+    Only meaning-preserving rewrites: case, whitespace, trailing punctuation.
+    Paraphrases are NOT merged here (that needs embeddings).
+    """
+    return _WHITESPACE.sub(" ", query.casefold()).strip().rstrip("?!. ")
+
+
+class _DeferredEncoding:
+    """
+    `inner.encode_query(query)`, computed on first use: rounds served
+    from the cache never pay for encoding.
+    """
+
+    __slots__ = ("inner", "query", "_value", "_done")
+
+    def __init__(self, inner: Retriever, query: str):
+        self.inner = inner
+        self.query = query
+        self._value = None
+        self._done = False
+
+    def get(self):
+        if not self._done:
+            self._value = self.inner.encode_query(self.query)
+            self._done = True
+        return self._value
+
+    async def aget(self):
+        if not self._done:
+            self._value = await self.inner.aencode_query(self.query)
+            self._done = True
+        return self._value
+
+
+class CachedRetriever(Retriever):
+    """
+    Retriever wrapper with a TTL + LRU result cache.
+
+    `inner` must expose `chunk_store` (or one must be passed explicitly)
+    and report `index_version`.
+    """
+
+    def __init__(
+        self,
+        inner: Retriever,
+        *,
+        chunk_store: Optional[ChunkStore] = None,
+        max_entries: int = 1024,
+        ttl_s: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.inner = inner
+        if chunk_store is None:
+            chunk_store = getattr(inner, "chunk_store", None)
+        if chunk_store is None:
+            raise ValueError(
+                f"{type(inner).__name__} has no chunk_store: pass chunk_store= to CachedRetriever"
+            )
+        self.chunk_store = chunk_store
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.default_top_k = inner.default_top_k
+
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, CachedHits]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._seen_version = inner.index_version
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ---- Retriever interface ----
+
+    @property
+    def index_version(self) -> int:
+        return self.inner.index_version
+
+    def add_chunks(self, chunks: List[Dict]) -> int:
+        return self.inner.add_chunks(chunks)
+
+    def retrieve(
+        self,
+        query: str,
+        *,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[Dict]:
+        key = self._key(query, top_k, filters)
+
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        hits = self.inner.retrieve(query, top_k=top_k, filters=filters)
+        self._store(key, hits)
+        self._record_inner_timings()
+        return hits
+
+    async def aretrieve(
+        self,
+        query: str,
+        *,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[Dict]:
+        key = self._key(query, top_k, filters)
+
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        hits = await self.inner.aretrieve(query, top_k=top_k, filters=filters)
+        self._store(key, hits)
+        self._record_inner_timings()
+        return hits
+
+    def encode_query(self, query: str) -> _DeferredEncoding:
+        return _DeferredEncoding(self.inner, query)
+
+    def retrieve_encoded(
+        self,
+        query: str,
+        encoded: _DeferredEncoding,
+        *,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[Dict]:
+        key = self._key(query, top_k, filters)
+
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        hits = self.inner.retrieve_encoded(query, encoded.get(), top_k=top_k, filters=filters)
+        self._store(key, hits)
+        self._record_inner_timings()
+        return hits
+
+    async def aencode_query(self, query: str) -> _DeferredEncoding:
+        return _DeferredEncoding(self.inner, query)
+
+    async def aretrieve_encoded(
+        self,
+        query: str,
+        encoded: _DeferredEncoding,
+        *,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[Dict]:
+        key = self._key(query, top_k, filters)
+
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        hits = await self.inner.aretrieve_encoded(
+            query, await encoded.aget(), top_k=top_k, filters=filters
+        )
+        self._store(key, hits)
+        self._record_inner_timings()
+        return hits
+
+    # ---- observability ----
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ---- internals ----
+
+    def _key(self, query: str, top_k: Optional[int], filters: Optional[Dict]) -> CacheKey:
+        return (
+            normalize_query(query),
+            top_k or self.default_top_k,
+            json.dumps(filters or {}, sort_keys=True, default=str),
+            self.inner.index_version,
+        )
+
+    def _lookup(self, key: CacheKey) -> Optional[List[Dict]]:
+        t0 = time.perf_counter()
+
+        with self._lock:
+            self._invalidate_if_reindexed(key[3])
+
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            cached_hits = entry[1]
+
+        records = self.chunk_store.get_many(cid for cid, _ in cached_hits)
+        with_embeddings = getattr(self.inner, "include_embeddings", False)
+
+        if any(
+            r is None or (with_embeddings and "embedding" not in r)
+            for r in records
+        ):
+            # Chunk vanished from the store (or lacks the embedding the
+            # caller asked for): never serve a partial result
+            with self._lock:
+                self._entries.pop(key, None)
+                self.misses += 1
+            return None
+
+        hits = [
+            hydrate_hit(
+                chunk_id=record["chunk_id"],
+                text=record["text"],
+                metadata=record["metadata"],
+                distance=distance,
+            )
+            for record, (_, distance) in zip(records, cached_hits)
+        ]
+
+        if with_embeddings:
+            for hit, record in zip(hits, records):
+                hit["embedding"] = record["embedding"]
+
+        with self._lock:
+            self.hits += 1
+
+        self._record_timings(
+            RetrievalTimings(hydrate_ms=(time.perf_counter() - t0) * 1000)
+        )
+        return hits
+
+    def _record_inner_timings(self) -> None:
+        # A miss took as long as the inner retrieval: report it as ours
+        timings = self.inner.get_last_timings()
+        if timings is not None:
+            self._record_timings(timings)
+
+    def _store(self, key: CacheKey, hits: List[Dict]) -> None:
+        # Only chunks the store can rehydrate are cacheable
+        if any("chunk_id" not in h or h["chunk_id"] not in self.chunk_store for h in hits):
+            return
+
+        value: CachedHits = tuple((h["chunk_id"], h["distance"]) for h in hits)
+
+        with self._lock:
+            self._invalidate_if_reindexed(key[3])
+            if key[3] != self._seen_version:
+                return  # index moved on while we were searching
+
+            self._entries[key] = (self._clock() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _invalidate_if_reindexed(self, version: int) -> None:
+        # Caller holds self._lock
+        current = self.inner.index_version
+        if current != self._seen_version:
+            self._entries.clear()
+            self._seen_version = current
+            self.invalidations += 1
@@ -0,0 +1,109 @@
+"""
+Chunk store: chunk_id → chunk record.
+
+The vector index answers "which chunks are close to this query?".
+The chunk store answers "what IS chunk X?" in O(1), without a search.
+
+It lets caches keep only (chunk_id, distance) pairs and rehydrate
+full chunks on demand, so cached results stay small.
+
+It also keeps a neighbor index, (doc_id, chunk_index) → chunk_id,
+built at ingestion. Day 4 context expansion uses it to fetch the chunks
+around an approved chunk, even when they were not in the top-k.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Position = Tuple[str, int]
+
+
+def parse_chunk_id(chunk_id: str) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Split a '<doc_id>::<index>' chunk id.
+
+    Returns (None, None) for ids that do not follow the convention.
+    """
+    doc_id, sep, suffix = chunk_id.rpartition("::")
+    if not sep:
+        return None, None
+    return doc_id, int(suffix) if suffix.isdigit() else None
+
+
+def chunk_position(chunk_id: str, metadata: Dict) -> Optional[Position]:
+    """
+    (doc_id, chunk_index) of a chunk: metadata first, chunk_id as fallback.
+    """
+    parsed_doc_id, parsed_index = parse_chunk_id(chunk_id)
+    doc_id = metadata.get("doc_id", parsed_doc_id)
+    index = metadata.get("chunk_index", parsed_index)
+
+    if doc_id is None or index is None:
+        return None
+    return doc_id, index
+
+
+class ChunkStore:
+    """
+    In-memory, thread-safe chunk record store.
+
+    Records have the same shape retrievers hydrate:
+        {"chunk_id": ..., "text": ..., "metadata": {...}}
+    plus the chunk's "embedding" when ingestion provided one.
+    """
+
+    def __init__(self):
+        self._records: Dict[str, Dict] = {}
+        self._positions: Dict[Position, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, records: Iterable[Dict]) -> None:
+        with self._lock:
+            for record in records:
+                chunk_id = record["chunk_id"]
+                metadata = dict(record.get("metadata") or {})
+
+                position = chunk_position(chunk_id, metadata)
+                if position is not None:
+                    metadata.setdefault("doc_id", position[0])
+                    metadata.setdefault("chunk_index", position[1])
+                    self._positions[position] = chunk_id
+
+                stored = {
+                    "chunk_id": chunk_id,
+                    "text": record["text"],
+                    "metadata": metadata,
+                }
+                if record.get("embedding") is not None:
+                    stored["embedding"] = record["embedding"]
+
+                self._records[chunk_id] = stored
+
+    def get(self, chunk_id: str) -> Optional[Dict]:
+        return self._records.get(chunk_id)
+
+    def get_many(self, chunk_ids: Iterable[str]) -> List[Optional[Dict]]:
+        return [self._records.get(cid) for cid in chunk_ids]
+
+    def neighbors(self, doc_id: str, chunk_index: int, window: int = 1) -> List[Dict]:
+        """
+        Chunks within ±window positions of (doc_id, chunk_index),
+        nearest first. O(window), independent of corpus size.
+
+        Returns copies: callers annotate chunks (e.g. '_reason').
+        """
+        found = []
+        for offset in range(1, window + 1):
+            for index in (chunk_index - offset, chunk_index + offset):
+                chunk_id = self._positions.get((doc_id, index))
+                if chunk_id is None:
+                    continue
+                record = self._records[chunk_id]
+                found.append({**record, "metadata": dict(record["metadata"])})
+        return found
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
@@ -0,0 +1,74 @@
+"""
+Bounded executors for blocking retrieval work.
+
+Embedding and vector search are blocking calls. Under asyncio they must
+run off the event loop, but an unbounded hand-off would let a traffic
+spike queue thousands of jobs behind a few threads.
+
+BoundedExecutor caps BOTH:
+- max_workers: threads doing work
+- max_pending: jobs admitted per event loop (running + queued)
+
+Callers beyond max_pending wait on the event loop (cheap) instead of
+piling up inside the thread pool (invisible and unbounded).
+"""
+
+import asyncio
+import contextvars
+import os
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class BoundedExecutor:
+    def __init__(self, *, max_workers: int, max_pending: int, name: str):
+        if max_pending < max_workers:
+            raise ValueError("max_pending must be >= max_workers")
+
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=name,
+        )
+        # asyncio.Semaphore binds to one event loop: keep one per loop
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.max_pending)
+
+        async with slots:
+            return await loop.run_in_executor(self._pool, fn, *args)
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        """
+        Sync hand-off: run `fn` in the pool, in a copy of the caller's
+        context (deadlines and other ContextVars carry over).
+        """
+        context = contextvars.copy_context()
+        return self._pool.submit(context.run, fn, *args)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
+
+
+# Process-wide defaults (threads are created lazily)
+EMBEDDING_EXECUTOR = BoundedExecutor(
+    max_workers=int(os.getenv("RAG_EMBED_WORKERS", "4")),
+    max_pending=int(os.getenv("RAG_EMBED_MAX_PENDING", "64")),
+    name="rag-embed",
+)
+
+SEARCH_EXECUTOR = BoundedExecutor(
+    max_workers=int(os.getenv("RAG_SEARCH_WORKERS", "16")),
+    max_pending=int(os.getenv("RAG_SEARCH_MAX_PENDING", "256")),
+    name="rag-search",
+)
@@ -0,0 +1,52 @@
+import os
+
+from infrastructure.retrieval.base import Retriever
+from infrastructure.retrieval.cache import CachedRetriever
+from infrastructure.retrieval.stub import StubRetriever
+
+
+def build_retriever() -> Retriever:
+    """
+    Select the retrieval backend from the environment.
+
+    - RAG_RETRIEVER=stub    → fixed example corpus (default when RAG_ENV=test)
+    - RAG_RETRIEVER=vector  → Day 3 embeddings + vector store (default when RAG_ENV=prod)
+        RAG_CHUNKS_PATH        chunk JSONL to index (required)
+        RAG_EMBEDDING_MODEL    sentence-transformer name
+        RAG_RETRIEVAL_SHARDS   > 1 enables sharded scatter-gather
+        RAG_SELECTION_STRATEGY "mmr" → hits carry embeddings, so
+                               ContextPolicy(selection_strategy="mmr") can run
+        RAG_RETRIEVAL_CACHE_SIZE   result cache entries (0 disables)
+        RAG_RETRIEVAL_CACHE_TTL_S  result cache time-to-live
+    """
+    env = os.getenv("RAG_ENV", "test")
+    backend = os.getenv("RAG_RETRIEVER") or ("vector" if env == "prod" else "stub")
+
+    if backend == "stub":
+        return StubRetriever()
+
+    if backend == "vector":
+        from infrastructure.retrieval.resources import get_vector_retriever
+
+        chunks_path = os.getenv("RAG_CHUNKS_PATH")
+        if not chunks_path:
+            raise RuntimeError("RAG_CHUNKS_PATH is required when RAG_RETRIEVER=vector")
+
+        retriever = get_vector_retriever(
+            chunks_path,
+            model_name=os.getenv("RAG_EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
+            num_shards=int(os.getenv("RAG_RETRIEVAL_SHARDS", "1")),
+            include_embeddings=os.getenv("RAG_SELECTION_STRATEGY", "distance") == "mmr",
+        )
+
+        cache_size = int(os.getenv("RAG_RETRIEVAL_CACHE_SIZE", "1024"))
+        if cache_size <= 0:
+            return retriever
+
+        return CachedRetriever(
+            retriever,
+            max_entries=cache_size,
+            ttl_s=float(os.getenv("RAG_RETRIEVAL_CACHE_TTL_S", "300")),
+        )
+
+    raise RuntimeError(f"Unknown RAG_RETRIEVER: {backend}")
@@ -12,4 +12,22 @@ class RetrievedChunk:
     """
     text: str
     score: float
-    metadata: Dict
\ No newline at end of file
+    metadata: Dict
+
+
+@dataclass(frozen=True)
+class RetrievalTimings:
+    """
+    Wall-clock cost of one retrieval, split by phase.
+
+    - encode_ms:  query text → query embedding
+    - search_ms:  vector search (single collection or scatter-gather)
+    - hydrate_ms: raw search output → chunk dicts for Day 4
+    """
+    encode_ms: float = 0.0
+    search_ms: float = 0.0
+    hydrate_ms: float = 0.0
+
+    @property
+    def total_ms(self) -> float:
+        return self.encode_ms + self.search_ms + self.hydrate_ms
@@ -0,0 +1,96 @@
+"""
+Process-wide retrieval resources.
+
+Loading an embedding model or indexing a corpus takes seconds.
+Doing it per request would dominate latency, so each resource is
+built ONCE per process and shared by every request.
+"""
+
+import atexit
+import threading
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from infrastructure.retrieval.sharding import ShardedVectorStore
+from infrastructure.retrieval.vector_store import ShardedRetriever, VectorStoreRetriever
+
+_lock = threading.RLock()
+_models: Dict[str, Any] = {}
+_retrievers: Dict[Tuple[str, str, int], VectorStoreRetriever] = {}
+
+
+def get_embedding_model(model_name: str = "all-MiniLM-L6-v2"):
+    """
+    Return the shared SentenceTransformer for `model_name`.
+    """
+    with _lock:
+        if model_name not in _models:
+            from day03_chunks_to_embeddings.embed_and_query import load_embedding_model
+
+            _models[model_name] = load_embedding_model(model_name)
+        return _models[model_name]
+
+
+def get_vector_retriever(
+    chunks_path: str,
+    *,
+    model_name: str = "all-MiniLM-L6-v2",
+    num_shards: int = 1,
+    include_embeddings: bool = False,
+) -> VectorStoreRetriever:
+    """
+    Return the shared retriever over a fully indexed chunk file.
+
+    - num_shards == 1 → one Day 3 Chroma collection
+    - num_shards  > 1 → ShardedVectorStore with one worker per shard
+    - include_embeddings → hits carry their 'embedding' (for MMR);
+      single collection only
+
+    The chunk file is ingested through `add_chunks`, so the vector
+    index and the chunk store are populated together. Day 4 filter
+    flags are computed once here, not on every query.
+    """
+    if include_embeddings and num_shards > 1:
+        raise ValueError("include_embeddings is not supported with sharded retrieval")
+
+    key = (str(chunks_path), model_name, num_shards, include_embeddings)
+
+    with _lock:
+        if key in _retrievers:
+            return _retrievers[key]
+
+        from day03_chunks_to_embeddings.embed_and_query import (
+            create_vector_store,
+            load_chunks,
+        )
+
+        chunks = load_chunks(Path(chunks_path))
+        model = get_embedding_model(model_name)
+
+        if num_shards > 1:
+            store = ShardedVectorStore(num_shards).start()
+            atexit.register(store.close)
+            retriever = ShardedRetriever(model, store, annotate=_filter_flags)
+        else:
+            collection = create_vector_store(collection_name=Path(chunks_path).stem)
+            retriever = VectorStoreRetriever(
+                model,
+                collection,
+                annotate=_filter_flags,
+                include_embeddings=include_embeddings,
+            )
+
+        retriever.add_chunks(chunks)
+
+        _retrievers[key] = retriever
+        return retriever
+
+
+def _filter_flags(chunk: Dict) -> Dict:
+    # Flags for the default Day 4 policy; other policies re-evaluate
+    from day04_retrieval_to_context.build_context import (
+        ContextPolicy,
+        compute_filter_flags,
+    )
+
+    return compute_filter_flags(chunk["text"], ContextPolicy())
@@ -1,39 +1,65 @@
-from typing import List
-from infrastructure.retrieval.models import RetrievedChunk
-
-
-def retrieve_chunks(query: str) -> List[dict]:
-    """
-    TEMPORARY retriever.
-
-    This will later be replaced by:
-    - embeddings
-    - vector DB
-    - hybrid retrieval
-
-    For now, this is deterministic and testable.
-    """
-
-    # 🔴 Stub data (example corpus)
-    corpus = [
-        RetrievedChunk(
-            text="Refunds are processed within 5–7 business days.",
-            score=0.92,
-            metadata={"source": "policy_doc"},
-        ),
-        RetrievedChunk(
-            text="Welcome to our company handbook.",
-            score=0.12,
-            metadata={"source": "boilerplate"},
-        ),
-    ]
-
-    # Return as dicts to match existing pipeline expectations
-    return [
-        {
-            "text": c.text,
-            "score": c.score,
-            "metadata": c.metadata,
-        }
-        for c in corpus
-    ]
\ No newline at end of file
+import threading
+from typing import List, Optional
+
+from infrastructure.retrieval.base import Retriever
+
+_retriever: Optional[Retriever] = None
+_retriever_lock = threading.Lock()
+
+
+def get_retriever() -> Retriever:
+    """
+    Process-wide retriever, built from the environment on first use.
+
+    The embedding model and index behind it are loaded once and
+    reused by every request.
+    """
+    global _retriever
+
+    if _retriever is None:
+        with _retriever_lock:
+            if _retriever is None:
+                from infrastructure.retrieval.factory import build_retriever
+
+                _retriever = build_retriever()
+
+    return _retriever
+
+
+def set_retriever(retriever: Optional[Retriever]) -> None:
+    """
+    Install a specific retriever (or None to rebuild from the environment).
+    """
+    global _retriever
+
+    with _retriever_lock:
+        _retriever = retriever
+
+
+def retrieve_chunks(
+    query: str,
+    top_k: Optional[int] = None,
+    filters: Optional[dict] = None,
+) -> List[dict]:
+    """
+    Retrieve candidate chunks for a query.
+
+    Thin entry point over the configured Retriever
+    (see infrastructure.retrieval.factory.build_retriever).
+    Candidates are NOT trusted: judgment happens in Day 4.
+    """
+    return get_retriever().retrieve(query, top_k=top_k, filters=filters)
+
+
+async def aretrieve_chunks(
+    query: str,
+    top_k: Optional[int] = None,
+    filters: Optional[dict] = None,
+) -> List[dict]:
+    """
+    Async variant of `retrieve_chunks` for asyncio servers.
+
+    Embedding and search run on bounded executors, so one slow
+    search never blocks other in-flight requests on the event loop.
+    """
+    return await get_retriever().aretrieve(query, top_k=top_k, filters=filters)
@@ -0,0 +1,497 @@
+"""
+Sharded scatter-gather vector search.
+
+One in-memory Chroma collection lives inside ONE process, which caps a
+tenant's corpus at one process's memory and one core's query throughput.
+
+This module partitions chunks across N local worker processes:
+
+Index time
+    1. Encode chunk texts ONCE in the parent (same model as queries)
+    2. Route each chunk to shard = hash(doc_id) % N
+    3. Each worker stores its partition in its own collection
+
+Query time
+    1. Encode the query ONCE in the parent
+    2. Scatter the query vector to every live shard
+    3. Gather per-shard top-k within a timeout
+    4. Merge the sorted per-shard lists with a heap (k-way merge)
+
+Failure semantics:
+- A shard that errors, dies, or misses the timeout is reported,
+  never silently ignored
+- The query still returns the hits from healthy shards (degraded mode)
+- Judgment about whether degraded results are good enough stays in Day 4
+"""
+
+import hashlib
+import heapq
+import itertools
+import multiprocessing
+import threading
+from concurrent.futures import Future, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+# -------------------------
+# Partitioning
+# -------------------------
+
+def shard_for_doc_id(doc_id: str, num_shards: int) -> int:
+    """
+    Stable shard assignment for a document.
+
+    Python's built-in hash() is randomized per process, so it cannot be
+    used to route chunks across processes or restarts.
+    """
+    digest = hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % num_shards
+
+
+def doc_id_for_chunk(chunk: Dict) -> str:
+    """
+    Resolve the document a chunk belongs to.
+
+    Day 2 records carry 'doc_id'; older records only carry
+    'chunk_id' of the form '<doc_id>::<index>'.
+    """
+    doc_id = chunk.get("doc_id")
+    if doc_id:
+        return doc_id
+    return chunk["chunk_id"].split("::", 1)[0]
+
+
+def chunk_metadata(chunk: Dict) -> Dict:
+    """
+    Metadata stored next to each embedding.
+
+    Mirrors Day 3 `index_chunks`, plus doc_id so results stay
+    traceable to their document (and shard).
+    """
+    return {
+        "doc_id": doc_id_for_chunk(chunk),
+        "section_title": chunk["section_title"],
+        "doc_label": chunk["doc_label"],
+        "confidence": chunk["confidence"],
+    }
+
+
+# -------------------------
+# Worker process
+# -------------------------
+
+def _default_store_factory(collection_name: str):
+    # Imported lazily: only worker processes need Chroma.
+    from day03_chunks_to_embeddings.embed_and_query import create_vector_store
+
+    return create_vector_store(collection_name=collection_name)
+
+
+def _hits_from_results(results: Dict) -> List[Dict]:
+    hits = []
+    for i in range(len(results["ids"][0])):
+        hits.append({
+            "chunk_id": results["ids"][0][i],
+            "text": results["documents"][0][i],
+            "metadata": results["metadatas"][0][i],
+            "distance": results["distances"][0][i],
+        })
+    return hits
+
+
+def _shard_worker(shard_id: int, conn, store_factory: Callable) -> None:
+    """
+    Event loop of one shard process.
+
+    Protocol (tuples over a Pipe):
+        request: (op, request_id, payload)
+        reply:   ("ok" | "error", request_id, result)
+    """
+    collection = store_factory(f"shard_{shard_id}")
+
+    while True:
+        try:
+            op, request_id, payload = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        if op == "stop":
+            break
+
+        try:
+            if op == "add":
+                collection.add(**payload)
+                result = None
+            elif op == "count":
+                result = collection.count()
+            elif op == "query":
+                n_results = min(payload["top_k"], collection.count())
+                if n_results == 0:
+                    result = []
+                else:
+                    kwargs = {}
+                    if payload.get("where"):
+                        kwargs["where"] = payload["where"]
+                    result = _hits_from_results(
+                        collection.query(
+                            query_embeddings=[payload["embedding"]],
+                            n_results=n_results,
+                            include=["documents", "metadatas", "distances"],
+                            **kwargs,
+                        )
+                    )
+            else:
+                raise ValueError(f"Unknown shard op: {op}")
+
+            conn.send(("ok", request_id, result))
+        except Exception as e:
+            conn.send(("error", request_id, f"{type(e).__name__}: {e}"))
+
+    conn.close()
+
+
+class ShardError(Exception):
+    """Raised inside the parent when a shard cannot serve a request."""
+
+
+class _ShardHandle:
+    """
+    Parent-side handle for one worker process.
+
+    A reader thread routes replies to per-request futures, so several
+    threads can scatter queries concurrently over the same pipe.
+    Replies for requests that already timed out are discarded.
+    """
+
+    def __init__(self, shard_id: int, process, conn):
+        self.shard_id = shard_id
+        self.process = process
+        self.conn = conn
+        self.alive = True
+
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+
+        self._reader = threading.Thread(
+            target=self._read_replies,
+            name=f"rag-shard-{shard_id}-reader",
+            daemon=True,
+        )
+        self._reader.start()
+
+    def submit(self, op: str, request_id: int, payload: Any) -> Future:
+        future: Future = Future()
+
+        if not self.alive:
+            future.set_exception(ShardError("shard process is not running"))
+            return future
+
+        with self._pending_lock:
+            self._pending[request_id] = future
+
+        try:
+            with self._send_lock:
+                self.conn.send((op, request_id, payload))
+        except (OSError, ValueError) as e:
+            self._mark_dead(f"send failed: {e}")
+
+        return future
+
+    def forget(self, request_id: int) -> None:
+        with self._pending_lock:
+            self._pending.pop(request_id, None)
+
+    def _read_replies(self) -> None:
+        while True:
+            try:
+                status, request_id, result = self.conn.recv()
+            except (EOFError, OSError):
+                self._mark_dead("shard process exited")
+                return
+
+            with self._pending_lock:
+                future = self._pending.pop(request_id, None)
+
+            if future is None:
+                continue  # late reply for a timed-out request
+
+            if status == "ok":
+                future.set_result(result)
+            else:
+                future.set_exception(ShardError(result))
+
+    def _mark_dead(self, reason: str) -> None:
+        self.alive = False
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ShardError(reason))
+
+
+# -------------------------
+# Results
+# -------------------------
+
+@dataclass
+class ScatterGatherResult:
+    """
+    Merged retrieval output plus an honest account of shard health.
+
+    Fields:
+    - hits:
+        Global top-k, ascending distance. Same dict shape as
+        Day 3 `query_chunks`.
+    - shard_count:
+        Number of shards the query was scattered to.
+    - failed_shards:
+        shard_id -> error description (errors and dead workers).
+    - timed_out_shards:
+        Shards that did not answer within the timeout.
+    """
+    hits: List[Dict]
+    shard_count: int
+    failed_shards: Dict[int, str] = field(default_factory=dict)
+    timed_out_shards: List[int] = field(default_factory=list)
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.failed_shards or self.timed_out_shards)
+
+
+# -------------------------
+# Sharded store
+# -------------------------
+
+class ShardedVectorStore:
+    """
+    N worker processes, each holding one partition of the corpus.
+
+    Usage:
+        with ShardedVectorStore(num_shards=4) as store:
+            store.index_chunks(model, chunks)
+            result = store.query_chunks(model, "How long do refunds take?")
+
+    `store_factory(collection_name)` runs INSIDE each worker and must be
+    a picklable top-level callable. It defaults to Day 3
+    `create_vector_store`.
+    """
+
+    def __init__(
+        self,
+        num_shards: int,
+        *,
+        store_factory: Optional[Callable] = None,
+        query_timeout_s: float = 2.0,
+        start_method: str = "spawn",
+    ):
+        if num_shards < 1:
+            raise ValueError("num_shards must be >= 1")
+
+        self.num_shards = num_shards
+        self.query_timeout_s = query_timeout_s
+
+        self._store_factory = store_factory or _default_store_factory
+        self._ctx = multiprocessing.get_context(start_method)
+        self._request_ids = itertools.count(1)
+        self._shards: List[_ShardHandle] = []
+
+    # ---- lifecycle ----
+
+    def start(self) -> "ShardedVectorStore":
+        if self._shards:
+            return self
+
+        for shard_id in range(self.num_shards):
+            parent_conn, child_conn = self._ctx.Pipe()
+            process = self._ctx.Process(
+                target=_shard_worker,
+                args=(shard_id, child_conn, self._store_factory),
+                name=f"rag-shard-{shard_id}",
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._shards.append(_ShardHandle(shard_id, process, parent_conn))
+
+        return self
+
+    def close(self, timeout_s: float = 5.0) -> None:
+        for shard in self._shards:
+            if shard.alive:
+                shard.submit("stop", 0, None)
+
+        for shard in self._shards:
+            shard.process.join(timeout_s)
+            if shard.process.is_alive():
+                shard.process.terminate()
+                shard.process.join(timeout_s)
+            shard.conn.close()
+
+        self._shards = []
+
+    def __enter__(self) -> "ShardedVectorStore":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- indexing ----
+
+    def add(
+        self,
+        *,
+        ids: List[str],
+        documents: List[str],
+        embeddings: List,
+        metadatas: List[Dict],
+        doc_ids: List[str],
+    ) -> Dict[int, int]:
+        """
+        Route pre-computed embeddings to their shards.
+
+        Returns shard_id -> number of chunks added.
+        Indexing is NOT degradable: any shard failure raises.
+        """
+        self.start()
+
+        partitions: Dict[int, Dict[str, list]] = {}
+        for cid, doc, emb, meta, doc_id in zip(
+            ids, documents, embeddings, metadatas, doc_ids
+        ):
+            shard_id = shard_for_doc_id(doc_id, self.num_shards)
+            part = partitions.setdefault(
+                shard_id,
+                {"ids": [], "documents": [], "embeddings": [], "metadatas": []},
+            )
+            part["ids"].append(cid)
+            part["documents"].append(doc)
+            part["embeddings"].append(_as_list(emb))
+            part["metadatas"].append(meta)
+
+        futures = {
+            shard_id: self._shards[shard_id].submit(
+                "add", next(self._request_ids), payload
+            )
+            for shard_id, payload in partitions.items()
+        }
+
+        for shard_id, future in futures.items():
+            try:
+                future.result()
+            except ShardError as e:
+                raise ShardError(
+                    f"Indexing failed on shard {shard_id}: {e}"
+                ) from e
+
+        return {
+            shard_id: len(payload["ids"])
+            for shard_id, payload in partitions.items()
+        }
+
+    def index_chunks(self, model, chunks: List[Dict]) -> Dict[int, int]:
+        """
+        Sharded equivalent of Day 3 `index_chunks`.
+
+        The embedding model stays in the parent: chunks are encoded
+        once, and workers only store and search vectors.
+        """
+        embeddings = model.encode([c["text"] for c in chunks])
+
+        return self.add(
+            ids=[c["chunk_id"] for c in chunks],
+            documents=[c["text"] for c in chunks],
+            embeddings=embeddings,
+            metadatas=[chunk_metadata(c) for c in chunks],
+            doc_ids=[doc_id_for_chunk(c) for c in chunks],
+        )
+
+    def count(self) -> int:
+        self.start()
+        futures = [
+            shard.submit("count", next(self._request_ids), None)
+            for shard in self._shards
+        ]
+        return sum(f.result(self.query_timeout_s) for f in futures)
+
+    # ---- querying ----
+
+    def query(
+        self,
+        query_embedding,
+        top_k: int = 5,
+        *,
+        timeout_s: Optional[float] = None,
+        where: Optional[Dict] = None,
+    ) -> ScatterGatherResult:
+        """
+        Scatter one query vector to all shards and merge their top-k.
+
+        Every shard returns its own top-k sorted by distance, so the
+        global top-k is a k-way heap merge of those lists.
+        """
+        self.start()
+
+        timeout_s = self.query_timeout_s if timeout_s is None else timeout_s
+        payload = {
+            "embedding": _as_list(query_embedding),
+            "top_k": top_k,
+            "where": where,
+        }
+
+        request_id = next(self._request_ids)
+        futures = {
+            shard.shard_id: shard.submit("query", request_id, payload)
+            for shard in self._shards
+        }
+
+        wait(futures.values(), timeout=timeout_s)
+
+        per_shard_hits: List[List[Dict]] = []
+        failed: Dict[int, str] = {}
+        timed_out: List[int] = []
+
+        for shard_id, future in futures.items():
+            if not future.done():
+                self._shards[shard_id].forget(request_id)
+                timed_out.append(shard_id)
+                continue
+
+            error = future.exception()
+            if error is not None:
+                failed[shard_id] = str(error)
+                continue
+
+            per_shard_hits.append(future.result())
+
+        merged = heapq.merge(*per_shard_hits, key=lambda h: h["distance"])
+
+        return ScatterGatherResult(
+            hits=list(itertools.islice(merged, top_k)),
+            shard_count=len(futures),
+            failed_shards=failed,
+            timed_out_shards=timed_out,
+        )
+
+    def query_chunks(
+        self,
+        model,
+        query: str,
+        top_k: int = 5,
+        *,
+        timeout_s: Optional[float] = None,
+        where: Optional[Dict] = None,
+    ) -> ScatterGatherResult:
+        """
+        Sharded equivalent of Day 3 `query_chunks`.
+        """
+        return self.query(
+            model.encode(query), top_k, timeout_s=timeout_s, where=where
+        )
+
+
+def _as_list(vector) -> List[float]:
+    # numpy arrays pickle fine, but plain lists keep workers numpy-agnostic
+    return vector.tolist() if hasattr(vector, "tolist") else list(vector)
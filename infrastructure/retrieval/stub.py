@@ -0,0 +1,51 @@
+from typing import Dict, List, Optional
+
+from infrastructure.retrieval.base import Retriever
+from infrastructure.retrieval.models import RetrievedChunk
+
+
+class StubRetriever(Retriever):
+    """
+    Deterministic, dependency-free retriever for tests and demos.
+
+    Always returns the same example corpus, whatever the query.
+    """
+
+    def __init__(self, corpus: Optional[List[RetrievedChunk]] = None):
+        self.corpus = corpus if corpus is not None else [
+            RetrievedChunk(
+                text="Refunds are processed within 5–7 business days.",
+                score=0.92,
+                metadata={"source": "policy_doc"},
+            ),
+            RetrievedChunk(
+                text="Welcome to our company handbook.",
+                score=0.12,
+                metadata={"source": "boilerplate"},
+            ),
+        ]
+
+    def retrieve(
+        self,
+        query: str,
+        *,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[Dict]:
+        corpus = [
+            c for c in self.corpus
+            if not filters
+            or all(c.metadata.get(k) == v for k, v in filters.items())
+        ]
+        if top_k is not None:
+            corpus = corpus[:top_k]
+
+        # Return as dicts to match existing pipeline expectations
+        return [
+            {
+                "text": c.text,
+                "score": c.score,
+                "metadata": c.metadata,
+            }
+            for c in corpus
+        ]
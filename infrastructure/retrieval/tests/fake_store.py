@@ -0,0 +1,141 @@
+import math
+import time
+
+from infrastructure.retrieval.vector_store import VectorStoreRetriever
+
+
+class FakeEmbeddingModel:
+    """
+    Deterministic bag-of-letters encoder.
+
+    Good enough to make similar strings land close together
+    without downloading a real sentence-transformer.
+    """
+
+    def encode(self, texts, show_progress_bar=False):
+        if isinstance(texts, str):
+            return self._encode_one(texts)
+        return [self._encode_one(t) for t in texts]
+
+    def _encode_one(self, text):
+        vector = [0.0] * 26
+        for ch in text.lower():
+            if "a" <= ch <= "z":
+                vector[ord(ch) - ord("a")] += 1.0
+        return vector
+
+
+class FakeVectorStore:
+    """
+    Brute-force cosine store with the subset of the Chroma API we use.
+    """
+
+    def __init__(self, query_delay_s=0.0, fail_queries=False):
+        self.query_delay_s = query_delay_s
+        self.fail_queries = fail_queries
+        self._rows = []
+
+    def add(self, *, ids, documents, embeddings, metadatas):
+        for row in zip(ids, documents, embeddings, metadatas):
+            self._rows.append(row)
+
+    def count(self):
+        return len(self._rows)
+
+    def get(self, ids=None):
+        wanted = set(ids or [])
+        return {"ids": [r[0] for r in self._rows if r[0] in wanted]}
+
+    def query(self, *, query_embeddings, n_results, include=None, where=None):
+        if self.query_delay_s:
+            time.sleep(self.query_delay_s)
+        if self.fail_queries:
+            raise RuntimeError("simulated shard failure")
+
+        query = query_embeddings[0]
+        rows = [
+            r for r in self._rows
+            if not where or all(r[3].get(k) == v for k, v in where.items())
+        ]
+        scored = sorted(
+            ((_cosine_distance(query, r[2]), r) for r in rows),
+            key=lambda pair: pair[0],
+        )[:n_results]
+
+        results = {
+            "ids": [[r[0] for _, r in scored]],
+            "documents": [[r[1] for _, r in scored]],
+            "metadatas": [[r[3] for _, r in scored]],
+            "distances": [[d for d, _ in scored]],
+        }
+        if include and "embeddings" in include:
+            results["embeddings"] = [[r[2] for _, r in scored]]
+        return results
+
+
+def _cosine_distance(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    if norm == 0:
+        return 1.0
+    return 1.0 - dot / norm
+
+
+# -------------------------
+# Store factories (must be top-level: they run in shard processes)
+# -------------------------
+
+def healthy_store_factory(collection_name):
+    return FakeVectorStore()
+
+
+def slow_shard_1_factory(collection_name):
+    if collection_name == "shard_1":
+        return FakeVectorStore(query_delay_s=1.5)
+    return FakeVectorStore()
+
+
+def failing_shard_1_factory(collection_name):
+    if collection_name == "shard_1":
+        return FakeVectorStore(fail_queries=True)
+    return FakeVectorStore()
+
+
+def make_chunks(n_docs=6, chunks_per_doc=2):
+    chunks = []
+    for d in range(n_docs):
+        for i in range(1, chunks_per_doc + 1):
+            chunks.append({
+                "doc_id": f"doc_{d}.txt",
+                "chunk_id": f"doc_{d}.txt::{i:03d}",
+                "section_title": f"Section {i}",
+                "text": f"Document {d} paragraph {i} about refunds and returns {'x' * d}",
+                "doc_label": "POLICY",
+                "confidence": 0.9,
+            })
+    return chunks
+
+
+def build_vector_retriever():
+    model = FakeEmbeddingModel()
+    chunks = make_chunks()
+
+    store = FakeVectorStore()
+    store.add(
+        ids=[c["chunk_id"] for c in chunks],
+        documents=[c["text"] for c in chunks],
+        embeddings=model.encode([c["text"] for c in chunks]),
+        metadatas=[{"section_title": c["section_title"]} for c in chunks],
+    )
+
+    return VectorStoreRetriever(model, store)
+
+
+def build_indexed_retriever(chunks=None, **kwargs):
+    """
+    VectorStoreRetriever populated through `add_chunks`,
+    so its chunk store and index version are live.
+    """
+    retriever = VectorStoreRetriever(FakeEmbeddingModel(), FakeVectorStore(), **kwargs)
+    retriever.add_chunks(make_chunks() if chunks is None else chunks)
+    return retriever
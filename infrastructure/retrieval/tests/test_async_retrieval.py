@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+
+from infrastructure.retrieval.executors import BoundedExecutor
+from infrastructure.retrieval.retriever import aretrieve_chunks, set_retriever
+from infrastructure.retrieval.stub import StubRetriever
+from infrastructure.retrieval.tests.fake_store import build_vector_retriever
+
+
+def test_aretrieve_matches_sync_retrieve():
+    retriever = build_vector_retriever()
+    queries = [f"paragraph {i} about refunds" for i in range(20)]
+
+    async def run_all():
+        return await asyncio.gather(
+            *(retriever.aretrieve(q, top_k=3) for q in queries)
+        )
+
+    async_results = asyncio.run(run_all())
+    sync_results = [retriever.retrieve(q, top_k=3) for q in queries]
+
+    assert async_results == sync_results
+
+
+def test_aretrieve_records_timings_per_task():
+    retriever = build_vector_retriever()
+
+    async def one(query):
+        await retriever.aretrieve(query)
+        return retriever.get_last_timings()
+
+    async def run_all():
+        return await asyncio.gather(one("refunds"), one("returns"))
+
+    timings = asyncio.run(run_all())
+
+    assert all(t is not None for t in timings)
+    assert timings[0] is not timings[1]
+
+
+def test_default_aretrieve_wraps_sync_retriever():
+    set_retriever(StubRetriever())
+    try:
+        chunks = asyncio.run(aretrieve_chunks("How long does a refund take?"))
+    finally:
+        set_retriever(None)
+
+    assert [c["metadata"]["source"] for c in chunks] == [
+        "policy_doc",
+        "boilerplate",
+    ]
+
+
+def test_bounded_executor_caps_concurrency():
+    executor = BoundedExecutor(max_workers=2, max_pending=2, name="test-bounded")
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+
+    async def run_all():
+        await asyncio.gather(*(executor.run(work) for _ in range(10)))
+
+    asyncio.run(run_all())
+    executor.shutdown()
+
+    assert peak == 2
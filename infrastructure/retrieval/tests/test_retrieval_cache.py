@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from infrastructure.retrieval.cache import CachedRetriever, normalize_query
+from infrastructure.retrieval.tests.fake_store import (
+    build_indexed_retriever,
+    make_chunks,
+)
+from infrastructure.retrieval.stub import StubRetriever
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def counting(retriever):
+    calls = []
+    original = retriever.retrieve
+
+    def retrieve(query, **kwargs):
+        calls.append(query)
+        return original(query, **kwargs)
+
+    retriever.retrieve = retrieve
+    return calls
+
+
+def test_normalize_query_merges_trivial_variants():
+    assert normalize_query("  What is the REFUND policy? ") == "what is the refund policy"
+    assert normalize_query("what  is the refund policy") == "what is the refund policy"
+
+
+def test_cache_hit_matches_uncached_result():
+    inner = build_indexed_retriever()
+    calls = counting(inner)
+    cached = CachedRetriever(inner)
+
+    first = cached.retrieve("refunds and returns", top_k=3)
+    second = cached.retrieve("Refunds and returns?", top_k=3)
+
+    assert second == first
+    assert calls == ["refunds and returns"]
+    assert cached.stats()["hits"] == 1
+    assert cached.get_last_timings().search_ms == 0.0
+
+
+def test_timings_belong_to_the_retriever_that_recorded_them():
+    inner = build_indexed_retriever()
+    cached = CachedRetriever(inner)
+    other = build_indexed_retriever()
+
+    cached.retrieve("refunds and returns", top_k=3)
+
+    # A miss reports the inner search as the cache's own
+    assert cached.get_last_timings().encode_ms > 0.0
+    assert other.get_last_timings() is None
+
+
+def test_cache_stores_only_ids_and_distances():
+    cached = CachedRetriever(build_indexed_retriever())
+    hits = cached.retrieve("refunds", top_k=2)
+
+    (_, value), = cached._entries.values()
+    assert value == tuple((h["chunk_id"], h["distance"]) for h in hits)
+
+
+def test_key_includes_top_k_and_filters():
+    inner = build_indexed_retriever()
+    calls = counting(inner)
+    cached = CachedRetriever(inner)
+
+    cached.retrieve("refunds", top_k=2)
+    cached.retrieve("refunds", top_k=3)
+    cached.retrieve("refunds", top_k=3, filters={"doc_id": "doc_1.txt"})
+
+    assert len(calls) == 3
+
+
+def test_ttl_expiry():
+    inner = build_indexed_retriever()
+    calls = counting(inner)
+    clock = FakeClock()
+    cached = CachedRetriever(inner, ttl_s=10, clock=clock)
+
+    cached.retrieve("refunds")
+    clock.now = 9.9
+    cached.retrieve("refunds")
+    clock.now = 10.0
+    cached.retrieve("refunds")
+
+    assert len(calls) == 2
+
+
+def test_lru_eviction():
+    inner = build_indexed_retriever()
+    calls = counting(inner)
+    cached = CachedRetriever(inner, max_entries=2)
+
+    cached.retrieve("a")
+    cached.retrieve("b")
+    cached.retrieve("a")  # refresh "a"
+    cached.retrieve("c")  # evicts "b"
+    cached.retrieve("a")
+    cached.retrieve("b")
+
+    assert calls == ["a", "b", "c", "b"]
+    assert cached.stats()["evictions"] == 2
+
+
+def test_incremental_indexing_invalidates_cache():
+    inner = build_indexed_retriever()
+    calls = counting(inner)
+    cached = CachedRetriever(inner)
+
+    before = cached.retrieve("zebra quiz", top_k=1)
+
+    cached.add_chunks([{
+        "doc_id": "zoo.txt",
+        "chunk_id": "zoo.txt::001",
+        "section_title": "Zoo",
+        "text": "zebra quiz zebra quiz",
+        "doc_label": "FAQ",
+        "confidence": 0.9,
+    }])
+    after = cached.retrieve("zebra quiz", top_k=1)
+
+    assert len(calls) == 2
+    assert before[0]["chunk_id"] != "zoo.txt::001"
+    assert after[0]["chunk_id"] == "zoo.txt::001"
+    assert cached.stats()["invalidations"] == 1
+
+
+def test_async_path_shares_the_cache():
+    inner = build_indexed_retriever(make_chunks(n_docs=3))
+    cached = CachedRetriever(inner)
+
+    first = cached.retrieve("refunds", top_k=2)
+    second = asyncio.run(cached.aretrieve("refunds", top_k=2))
+
+    assert second == first
+    assert cached.stats()["hits"] == 1
+
+
+def test_cache_hit_keeps_embeddings_when_requested():
+    cached = CachedRetriever(build_indexed_retriever(include_embeddings=True))
+
+    first = cached.retrieve("refunds", top_k=2)
+    second = cached.retrieve("refunds", top_k=2)
+
+    assert cached.stats()["hits"] == 1
+    assert [h["embedding"] for h in second] == [h["embedding"] for h in first]
+
+
+def test_inner_without_chunk_store_needs_one_passed():
+    with pytest.raises(ValueError, match="chunk_store"):
+        CachedRetriever(StubRetriever())
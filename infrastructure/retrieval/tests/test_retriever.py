@@ -0,0 +1,113 @@
+import pytest
+
+from infrastructure.retrieval.factory import build_retriever
+from infrastructure.retrieval.retriever import (
+    get_retriever,
+    retrieve_chunks,
+    set_retriever,
+)
+from infrastructure.retrieval.stub import StubRetriever
+from infrastructure.retrieval.tests.fake_store import (
+    build_indexed_retriever,
+    build_vector_retriever,
+)
+
+
+def test_vector_retriever_hydrates_chunks_for_day4():
+    retriever = build_vector_retriever()
+
+    hits = retriever.retrieve("paragraph about refunds", top_k=3)
+
+    assert len(hits) == 3
+    for hit in hits:
+        meta = hit["metadata"]
+        assert meta["source"] == hit["chunk_id"]
+        assert hit["chunk_id"] == f"{meta['doc_id']}::{meta['chunk_index']:03d}"
+        assert hit["score"] == pytest.approx(1.0 - hit["distance"])
+
+    distances = [h["distance"] for h in hits]
+    assert distances == sorted(distances)
+
+
+def test_vector_retriever_records_phase_timings():
+    retriever = build_vector_retriever()
+
+    retriever.retrieve("refunds")
+    timings = retriever.get_last_timings()
+
+    assert timings is not None
+    assert timings.encode_ms >= 0
+    assert timings.search_ms >= 0
+    assert timings.hydrate_ms >= 0
+    assert timings.total_ms == pytest.approx(
+        timings.encode_ms + timings.search_ms + timings.hydrate_ms
+    )
+
+
+def test_default_retriever_is_a_process_singleton(monkeypatch):
+    monkeypatch.delenv("RAG_RETRIEVER", raising=False)
+    monkeypatch.setenv("RAG_ENV", "test")
+    set_retriever(None)
+
+    try:
+        assert get_retriever() is get_retriever()
+        assert isinstance(get_retriever(), StubRetriever)
+
+        # Backward compatible stub output
+        chunks = retrieve_chunks("How long does a refund take?")
+        assert [c["metadata"]["source"] for c in chunks] == [
+            "policy_doc",
+            "boilerplate",
+        ]
+    finally:
+        set_retriever(None)
+
+
+def test_vector_backend_requires_chunks_path(monkeypatch):
+    monkeypatch.setenv("RAG_RETRIEVER", "vector")
+    monkeypatch.delenv("RAG_CHUNKS_PATH", raising=False)
+
+    with pytest.raises(RuntimeError):
+        build_retriever()
+
+
+def test_mmr_selection_makes_the_factory_attach_embeddings(monkeypatch):
+    from infrastructure.retrieval import resources
+
+    calls = []
+    monkeypatch.setattr(resources, "get_vector_retriever", lambda path, **kwargs: calls.append(kwargs))
+    monkeypatch.setenv("RAG_RETRIEVER", "vector")
+    monkeypatch.setenv("RAG_CHUNKS_PATH", "chunks.jsonl")
+    monkeypatch.setenv("RAG_RETRIEVAL_CACHE_SIZE", "0")
+
+    monkeypatch.setenv("RAG_SELECTION_STRATEGY", "mmr")
+    build_retriever()
+    monkeypatch.setenv("RAG_SELECTION_STRATEGY", "distance")
+    build_retriever()
+
+    assert [c["include_embeddings"] for c in calls] == [True, False]
+
+
+def test_vector_retriever_can_attach_embeddings_for_mmr():
+    plain = build_indexed_retriever()
+    with_embeddings = build_indexed_retriever(include_embeddings=True)
+
+    assert "embedding" not in plain.retrieve("refunds", top_k=2)[0]
+
+    hits = with_embeddings.retrieve("refunds", top_k=2)
+    assert all(len(h["embedding"]) == 26 for h in hits)
+
+    # The chunk store keeps vectors only when hits carry them
+    assert "embedding" not in plain.chunk_store.get("doc_0.txt::001")
+    assert len(with_embeddings.chunk_store.get("doc_0.txt::001")["embedding"]) == 26
+
+
+def test_ingestion_annotations_are_stored_and_returned():
+    retriever = build_indexed_retriever(
+        annotate=lambda chunk: {"is_boilerplate": chunk["text"].startswith("Document")}
+    )
+
+    hit = retriever.retrieve("refunds", top_k=1)[0]
+
+    assert hit["metadata"]["is_boilerplate"] is True
+    assert retriever.chunk_store.get(hit["chunk_id"])["metadata"]["is_boilerplate"] is True
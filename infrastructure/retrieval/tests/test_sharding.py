@@ -0,0 +1,84 @@
+from infrastructure.retrieval.sharding import (
+    ShardedVectorStore,
+    shard_for_doc_id,
+)
+from infrastructure.retrieval.tests.fake_store import (
+    FakeEmbeddingModel,
+    FakeVectorStore,
+    failing_shard_1_factory,
+    healthy_store_factory,
+    make_chunks,
+    slow_shard_1_factory,
+)
+
+
+def test_shard_assignment_is_stable_and_in_range():
+    for doc_id in ["a.pdf", "b.pdf", "policy.txt"]:
+        shard = shard_for_doc_id(doc_id, 4)
+        assert 0 <= shard < 4
+        assert shard == shard_for_doc_id(doc_id, 4)
+
+
+def test_sharded_query_matches_single_store_top_k():
+    model = FakeEmbeddingModel()
+    chunks = make_chunks()
+    query = "paragraph about refunds xxxx"
+
+    single = FakeVectorStore()
+    single.add(
+        ids=[c["chunk_id"] for c in chunks],
+        documents=[c["text"] for c in chunks],
+        embeddings=model.encode([c["text"] for c in chunks]),
+        metadatas=[{} for _ in chunks],
+    )
+    expected = single.query(
+        query_embeddings=[model.encode(query)], n_results=5
+    )["ids"][0]
+
+    with ShardedVectorStore(3, store_factory=healthy_store_factory) as store:
+        per_shard = store.index_chunks(model, chunks)
+        result = store.query_chunks(model, query, top_k=5)
+
+        assert sum(per_shard.values()) == len(chunks)
+        assert store.count() == len(chunks)
+
+    assert not result.degraded
+    assert [h["chunk_id"] for h in result.hits] == expected
+    distances = [h["distance"] for h in result.hits]
+    assert distances == sorted(distances)
+
+
+def test_slow_shard_times_out_and_query_degrades():
+    model = FakeEmbeddingModel()
+
+    with ShardedVectorStore(
+        3, store_factory=slow_shard_1_factory, query_timeout_s=0.3
+    ) as store:
+        store.index_chunks(model, make_chunks())
+        result = store.query_chunks(model, "refunds", top_k=4)
+
+    assert result.degraded
+    assert result.timed_out_shards == [1]
+    assert result.hits
+    assert all(
+        shard_for_doc_id(h["metadata"]["doc_id"], 3) != 1
+        for h in result.hits
+    )
+
+
+def test_failing_and_dead_shards_are_reported():
+    model = FakeEmbeddingModel()
+
+    with ShardedVectorStore(3, store_factory=failing_shard_1_factory) as store:
+        store.index_chunks(model, make_chunks())
+
+        result = store.query_chunks(model, "refunds", top_k=4)
+        assert set(result.failed_shards) == {1}
+        assert "simulated shard failure" in result.failed_shards[1]
+
+        store._shards[2].process.kill()
+        store._shards[2].process.join()
+
+        result = store.query_chunks(model, "refunds", top_k=4)
+        assert set(result.failed_shards) == {1, 2}
+        assert result.hits
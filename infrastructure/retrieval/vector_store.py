@@ -0,0 +1,348 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from infrastructure.retrieval.base import Retriever
+from infrastructure.retrieval.chunk_store import ChunkStore, parse_chunk_id
+from infrastructure.retrieval.executors import (
+    EMBEDDING_EXECUTOR,
+    SEARCH_EXECUTOR,
+    BoundedExecutor,
+)
+from infrastructure.retrieval.models import RetrievalTimings
+from infrastructure.retrieval.sharding import (
+    ScatterGatherResult,
+    ShardedVectorStore,
+    chunk_metadata,
+    doc_id_for_chunk,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def hydrate_hit(
+    *,
+    chunk_id: str,
+    text: str,
+    metadata: Optional[Dict],
+    distance: float,
+) -> Dict:
+    """
+    Turn one raw search hit into the chunk dict Day 4 expects.
+
+    Fills in what downstream layers rely on when the index did not store it:
+    - source:      citation id for Day 5 (defaults to chunk_id)
+    - doc_id:      '<doc_id>::<index>' prefix of chunk_id
+    - chunk_index: '<doc_id>::<index>' suffix of chunk_id
+    """
+    meta = dict(metadata or {})
+    meta.setdefault("source", chunk_id)
+
+    doc_id, chunk_index = parse_chunk_id(chunk_id)
+    if doc_id is not None:
+        meta.setdefault("doc_id", doc_id)
+    if chunk_index is not None:
+        meta.setdefault("chunk_index", chunk_index)
+
+    return {
+        "chunk_id": chunk_id,
+        "text": text,
+        "metadata": meta,
+        "distance": distance,
+        "score": 1.0 - distance,
+    }
+
+
+class VectorStoreRetriever(Retriever):
+    """
+    Day 3 retrieval behind the Retriever interface.
+
+    Query path (each phase is timed):
+        encode  → model.encode(query)
+        search  → collection.query(...)
+        hydrate → chunk dicts with chunk_id, text, metadata, distance
+
+    `model` and `collection` are long-lived: build them once per process
+    (see infrastructure.retrieval.resources) and share this object.
+
+    Incremental indexing (`add_chunks`) writes to both the vector index
+    and the chunk store, then bumps `index_version`.
+
+    `include_embeddings=True` attaches each hit's 'embedding'
+    (needed by Day 4 MMR selection).
+
+    `annotate(chunk) -> dict` adds metadata computed once at ingestion
+    (e.g. Day 4 filter flags), so queries only read it back.
+    """
+
+    def __init__(
+        self,
+        model,
+        collection,
+        *,
+        chunk_store: Optional[ChunkStore] = None,
+        default_top_k: int = 5,
+        include_embeddings: bool = False,
+        annotate: Optional[Callable[[Dict], Dict]] = None,
+        embedding_executor: Optional[BoundedExecutor] = None,
+        search_executor: Optional[BoundedExecutor] = None,
+    ):
+        self.model = model
+        self.collection = collection
+        self.chunk_store = chunk_store if chunk_store is not None else ChunkStore()
+        self.default_top_k = default_top_k
+        self.include_embeddings = include_embeddings
+        self.annotate = annotate
+        self.embedding_executor = embedding_executor or EMBEDDING_EXECUTOR
+        self.search_executor = search_executor or SEARCH_EXECUTOR
+
+        self._index_version = 0
+        self._index_lock = threading.Lock()
+
+    @property
+    def index_version(self) -> int:
+        return self._index_version
+
+    def add_chunks(self, chunks: List[Dict]) -> int:
+        """
+        Incrementally index Day 2 chunk records.
+
+        Returns the new index version.
+        """
+        if not chunks:
+            return self._index_version
+
+        embeddings = self.model.encode([c["text"] for c in chunks])
+        metadatas = [chunk_metadata(c) for c in chunks]
+        if self.annotate is not None:
+            for c, m in zip(chunks, metadatas):
+                m.update(self.annotate(c))
+
+        with self._index_lock:
+            self._add_to_index(chunks, embeddings, metadatas)
+            # Embeddings are kept only for retrievers that return them:
+            # otherwise they are dead weight, one vector per chunk
+            self.chunk_store.add(
+                {
+                    "chunk_id": c["chunk_id"],
+                    "text": c["text"],
+                    "metadata": m,
+                    "embedding": e if self.include_embeddings else None,
+                }
+                for c, m, e in zip(chunks, metadatas, embeddings)
+            )
+            self._index_version += 1
+            return self._index_version
+
+    def retrieve(
+        self,
+        query: str,
+        *,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[Dict]:
+        t0 = time.perf_counter()
+        embedding = self._encode(query)
+        encode_ms = (time.perf_counter() - t0) * 1000
+
+        return self._retrieve_embedded(embedding, top_k, filters, encode_ms=encode_ms)
+
+    async def aretrieve(
+        self,
+        query: str,
+        *,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[Dict]:
+        """
+        Same phases as `retrieve`, without blocking the event loop:
+        - encode runs on the bounded embedding executor
+        - search runs on the bounded search executor
+        - hydrate is cheap and runs inline
+        """
+        t0 = time.perf_counter()
+        embedding = await self.embedding_executor.run(self._encode, query)
+        encode_ms = (time.perf_counter() - t0) * 1000
+
+        return await self._aretrieve_embedded(embedding, top_k, filters, encode_ms=encode_ms)
+
+    def encode_query(self, query: str):
+        return self._encode(query)
+
+    def retrieve_encoded(
+        self,
+        query: str,
+        encoded,
+        *,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[Dict]:
+        return self._retrieve_embedded(encoded, top_k, filters, encode_ms=0.0)
+
+    async def aencode_query(self, query: str):
+        return await self.embedding_executor.run(self._encode, query)
+
+    async def aretrieve_encoded(
+        self,
+        query: str,
+        encoded,
+        *,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict] = None,
+    ) -> List[Dict]:
+        return await self._aretrieve_embedded(encoded, top_k, filters, encode_ms=0.0)
+
+    # ---- search + hydrate ----
+
+    def _retrieve_embedded(
+        self, embedding, top_k: Optional[int], filters: Optional[Dict], *, encode_ms: float
+    ) -> List[Dict]:
+        top_k = top_k or self.default_top_k
+
+        t1 = time.perf_counter()
+        raw = self._search(embedding, top_k, filters)
+
+        t2 = time.perf_counter()
+        hits = self._hydrate(raw)
+
+        t3 = time.perf_counter()
+        self._record_timings(
+            RetrievalTimings(
+                encode_ms=encode_ms,
+                search_ms=(t2 - t1) * 1000,
+                hydrate_ms=(t3 - t2) * 1000,
+            )
+        )
+
+        return hits
+
+    async def _aretrieve_embedded(
+        self, embedding, top_k: Optional[int], filters: Optional[Dict], *, encode_ms: float
+    ) -> List[Dict]:
+        top_k = top_k or self.default_top_k
+
+        t1 = time.perf_counter()
+        raw = await self.search_executor.run(
+            self._search, embedding, top_k, filters
+        )
+
+        t2 = time.perf_counter()
+        hits = self._hydrate(raw)
+
+        t3 = time.perf_counter()
+        self._record_timings(
+            RetrievalTimings(
+                encode_ms=encode_ms,
+                search_ms=(t2 - t1) * 1000,
+                hydrate_ms=(t3 - t2) * 1000,
+            )
+        )
+
+        return hits
+
+    # ---- phases ----
+
+    def _encode(self, query: str):
+        return self.model.encode(query)
+
+    def _search(self, embedding, top_k: int, filters: Optional[Dict] = None) -> Dict:
+        n_results = min(top_k, self.collection.count())
+        if n_results == 0:
+            return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+        kwargs = {"where": filters} if filters else {}
+
+        include = ["documents", "metadatas", "distances"]
+        if self.include_embeddings:
+            include.append("embeddings")
+
+        return self.collection.query(
+            query_embeddings=[embedding],
+            n_results=n_results,
+            include=include,
+            **kwargs,
+        )
+
+    def _add_to_index(self, chunks: List[Dict], embeddings, metadatas: List[Dict]) -> None:
+        self.collection.add(
+            ids=[c["chunk_id"] for c in chunks],
+            documents=[c["text"] for c in chunks],
+            embeddings=embeddings,
+            metadatas=metadatas,
+        )
+
+    def _hydrate(self, raw: Dict) -> List[Dict]:
+        hits = [
+            hydrate_hit(
+                chunk_id=raw["ids"][0][i],
+                text=raw["documents"][0][i],
+                metadata=raw["metadatas"][0][i],
+                distance=raw["distances"][0][i],
+            )
+            for i in range(len(raw["ids"][0]))
+        ]
+
+        embeddings = raw.get("embeddings")
+        if self.include_embeddings and embeddings is not None:
+            for hit, embedding in zip(hits, embeddings[0]):
+                hit["embedding"] = embedding
+
+        return hits
+
+
+class ShardedRetriever(VectorStoreRetriever):
+    """
+    Same contract as VectorStoreRetriever, backed by a ShardedVectorStore.
+
+    Degraded searches (failed or slow shards) still return the healthy
+    shards' hits, and are logged so they never go unnoticed.
+    """
+
+    def __init__(
+        self,
+        model,
+        store: ShardedVectorStore,
+        *,
+        default_top_k: int = 5,
+        timeout_s: Optional[float] = None,
+        **kwargs,
+    ):
+        super().__init__(model, store, default_top_k=default_top_k, **kwargs)
+        self.timeout_s = timeout_s
+
+    def _search(
+        self, embedding, top_k: int, filters: Optional[Dict] = None
+    ) -> ScatterGatherResult:
+        result = self.collection.query(
+            embedding, top_k, timeout_s=self.timeout_s, where=filters
+        )
+
+        if result.degraded:
+            logger.warning(
+                "Degraded sharded retrieval | failed=%s | timed_out=%s",
+                result.failed_shards,
+                result.timed_out_shards,
+            )
+
+        return result
+
+    def _add_to_index(self, chunks: List[Dict], embeddings, metadatas: List[Dict]) -> None:
+        self.collection.add(
+            ids=[c["chunk_id"] for c in chunks],
+            documents=[c["text"] for c in chunks],
+            embeddings=embeddings,
+            metadatas=metadatas,
+            doc_ids=[doc_id_for_chunk(c) for c in chunks],
+        )
+
+    def _hydrate(self, raw: ScatterGatherResult) -> List[Dict]:
+        return [
+            hydrate_hit(
+                chunk_id=h["chunk_id"],
+                text=h["text"],
+                metadata=h["metadata"],
+                distance=h["distance"],
+            )
+            for h in raw.hits
+        ]